@@ -0,0 +1,48 @@
+"""
+Спільне налаштування Django для бенчмарків.
+
+Бенчмарки запускаються з каталогу bikeshop, наприклад::
+
+    python -m benchmarks.bench_templates
+
+і працюють на тестовій (тимчасовій) базі, не торкаючись db.sqlite3.
+"""
+
+import os
+import sys
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+
+
+def setup() -> None:
+    """Ініціалізує Django і створює тестову базу з міграціями."""
+    sys.path.insert(0, str(BASE_DIR))
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'bikeshop.settings')
+
+    import django
+    django.setup()
+
+    from django.db import connection
+    from django.test.utils import setup_test_environment
+
+    setup_test_environment()
+    connection.creation.create_test_db(verbosity=0)
+
+
+@contextmanager
+def timer(results: dict, name: str):
+    """Записує тривалість блоку в мілісекундах у results[name]."""
+    started = time.perf_counter()
+    yield
+    results[name] = (time.perf_counter() - started) * 1000
+
+
+def report(title: str, rows) -> None:
+    """Друкує таблицю результатів (назва, значення)."""
+    print(f"\n{title}")
+    print('-' * len(title))
+    for name, value in rows:
+        print(f"{name:<44} {value}")
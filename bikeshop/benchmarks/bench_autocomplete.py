@@ -0,0 +1,77 @@
+"""
+Бенчмарк підказок пошуку: побудова індексу зі знімка і затримка запиту
+на 10 тис. велосипедів порівняно з ORM ``name__icontains``.
+
+    python -m benchmarks.bench_autocomplete [велосипедів]
+"""
+
+import os
+import random
+import sys
+import tempfile
+
+from . import _django
+
+
+def main(bike_count: int = 10_000) -> None:
+    _django.setup()
+
+    from decimal import Decimal
+
+    from django.test.utils import override_settings
+
+    from shop import autocomplete
+    from shop.catalog import bump_catalog_version
+    from shop.catalog_snapshot import write_snapshot
+    from shop.models import Bike, BikeType
+
+    words = ['Гірський', 'Шосейний', 'Міський', 'Швидкий', 'Вітер', 'Орел', 'Сокіл', 'М’який', 'Шлях', 'Легкий']
+    rng = random.Random(42)
+    types = [BikeType.objects.create(name=name, description='') for name in words[:3]]
+    Bike.objects.bulk_create(
+        (Bike(name=f'{rng.choice(words)} {rng.choice(words)} {i}', bike_type=types[i % 3],
+              price=Decimal('10000.00'), description='', image=f'bikes/{i}.jpg')
+         for i in range(bike_count)),
+        batch_size=5000,
+    )
+    queries = [word[:length].lower() for word in words for length in (1, 2, 4)] + ["м'як", 'вітер 1']
+    rounds = 100
+    results = {}
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'catalog.snapshot')
+        settings = override_settings(SHOP_CATALOG_SNAPSHOT=path)
+        settings.enable()
+        bump_catalog_version()
+        write_snapshot(path)
+        autocomplete.reset()
+        with _django.timer(results, 'build'):
+            index = autocomplete.get_index()
+
+        with _django.timer(results, 'search'):
+            for _ in range(rounds):
+                for query in queries:
+                    autocomplete.search(query)
+
+        bike = Bike.objects.first()
+        with _django.timer(results, 'put'):
+            for i in range(1000):
+                autocomplete.item_changed(autocomplete.BIKE, bike.pk, f'Перейменований {i}')
+        autocomplete.reset()
+        settings.disable()
+
+    with _django.timer(results, 'orm'):
+        for query in queries:
+            list(Bike.objects.filter(in_stock=True, name__icontains=query).values('pk', 'name')[:10])
+
+    searches = rounds * len(queries)
+    _django.report(f'Підказки пошуку ({bike_count} велосипедів, {len(index.entries)} ключів)', [
+        ('Побудова індексу зі знімка, мс', f"{results['build']:.1f}"),
+        ('Запит з індексу, мкс', f"{results['search'] * 1000 / searches:.1f}"),
+        ('Інкрементальне оновлення, мкс', f"{results['put']:.1f}"),
+        ('ORM icontains, мкс', f"{results['orm'] * 1000 / len(queries):.0f}"),
+    ])
+
+
+if __name__ == '__main__':
+    main(*(int(arg) for arg in sys.argv[1:2]))
@@ -0,0 +1,61 @@
+"""
+Бенчмарк масового запису на SQLite: ``shop.bulk`` (один executemany)
+проти ``bulk_update``/``bulk_create`` Django на тих самих рядках.
+
+    python -m benchmarks.bench_bulk_writes [рядків]
+"""
+
+import sys
+
+from . import _django
+
+
+def main(row_count: int = 20_000) -> None:
+    _django.setup()
+
+    from decimal import Decimal
+
+    from django.db import transaction
+    from django.utils import timezone
+
+    from shop import bulk
+    from shop.models import Bike, BikeType, OrderStatusTransition
+
+    bike_type = BikeType.objects.create(name='road', description='')
+    Bike.objects.bulk_create(
+        (Bike(name=f'Bike {i}', bike_type=bike_type, price=Decimal('1000.00'), description='', image='bikes/x.jpg')
+         for i in range(row_count)),
+        batch_size=5000,
+    )
+    bikes = list(Bike.objects.only('pk', 'price'))
+    now = timezone.now()
+    results = {}
+
+    def timed(name, write):
+        with _django.timer(results, name), transaction.atomic():
+            write()
+
+    for round_no, price in enumerate((Decimal('900.00'), Decimal('800.00'))):
+        for bike in bikes:
+            bike.price = price + round_no
+        timed('update_orm', lambda: Bike.objects.bulk_update(bikes, ['price'], batch_size=1000))
+        timed('update_bulk', lambda: bulk.update_rows(Bike, ['price'], ((bike.pk, bike.price) for bike in bikes)))
+
+    fields = ('order_id', 'from_status', 'to_status', 'at', 'actor_id')
+    rows = [(order_id, 1, 2, now, None) for order_id in range(row_count)]
+    timed('insert_orm', lambda: OrderStatusTransition.objects.bulk_create(
+        (OrderStatusTransition(**dict(zip(fields, row))) for row in rows), batch_size=1000,
+    ))
+    timed('insert_bulk', lambda: bulk.insert_rows(OrderStatusTransition, fields, rows))
+    assert OrderStatusTransition.objects.count() == 2 * row_count
+
+    _django.report(f'Масовий запис на SQLite ({row_count} рядків)', [
+        ('UPDATE ціни: bulk_update, мс', f"{results['update_orm']:.0f}"),
+        ('UPDATE ціни: bulk.update_rows, мс', f"{results['update_bulk']:.0f}"),
+        ('INSERT журналу: bulk_create, мс', f"{results['insert_orm']:.0f}"),
+        ('INSERT журналу: bulk.insert_rows, мс', f"{results['insert_bulk']:.0f}"),
+    ])
+
+
+if __name__ == '__main__':
+    main(*(int(arg) for arg in sys.argv[1:2]))
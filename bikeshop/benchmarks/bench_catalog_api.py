@@ -0,0 +1,70 @@
+"""
+Бенчмарк JSON API каталогу: розмір і час серіалізації на 1000 велосипедів.
+
+    python -m benchmarks.bench_catalog_api [велосипедів]
+"""
+
+import os
+import sys
+import tempfile
+
+from . import _django
+
+
+def main(bike_count: int = 10_000) -> None:
+    _django.setup()
+
+    from decimal import Decimal
+
+    from django.core.serializers.json import DjangoJSONEncoder
+    from django.http import JsonResponse
+
+    from shop.catalog_api import DEFAULT_FIELDS, FIELDS, bike_page, render
+    from shop.catalog_snapshot import CatalogSnapshot, write_snapshot
+    from shop.models import Bike, BikeType
+
+    types = [BikeType.objects.create(name=name, description='') for name in ('Гірський', 'Шосейний', 'Міський')]
+    Bike.objects.bulk_create(
+        (Bike(name=f'Велосипед {i}', bike_type=types[i % 3], price=Decimal('10000.00') + i,
+              description='Опис велосипеда ' * 8, image=f'bikes/{i}.jpg',
+              specifics_text='Легкий шосейний велосипед (8.5 кг)')
+         for i in range(bike_count)),
+        batch_size=5000,
+    )
+    per_page = 1000
+    pages = bike_count // per_page
+    results, sizes = {}, {}
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'catalog.snapshot')
+        write_snapshot(path)
+        snapshot = CatalogSnapshot(path)
+
+        for name, fields in (('sparse', ('id', 'price')), ('default', DEFAULT_FIELDS), ('all', tuple(FIELDS))):
+            with _django.timer(results, name):
+                after, size = 0, 0
+                for _ in range(pages):
+                    page = bike_page(snapshot, fields, after=after, limit=per_page, in_stock=None)
+                    after = page['results'][-1]['id'] if 'id' in fields else after + per_page
+                    size += len(render(page))
+            sizes[name] = size / pages
+
+    # Те саме, що віддав би «наївний» view: ORM .values() і JsonResponse з DjangoJSONEncoder
+    values = ('id', 'name', 'bike_type_id', 'price', 'in_stock', 'image')
+    with _django.timer(results, 'orm'):
+        size = 0
+        for page in range(pages):
+            rows = list(Bike.objects.order_by('pk').values(*values)[page * per_page:(page + 1) * per_page])
+            size += len(JsonResponse({'results': rows}, encoder=DjangoJSONEncoder).content)
+    sizes['orm'] = size / pages
+
+    _django.report(f'JSON API каталогу (на {per_page} велосипедів, {pages} сторінок)', [
+        ('fields=id,price: мс / КБ', f"{results['sparse'] / pages:.1f} / {sizes['sparse'] / 1024:.0f}"),
+        ('типові поля: мс / КБ', f"{results['default'] / pages:.1f} / {sizes['default'] / 1024:.0f}"),
+        ('усі поля: мс / КБ', f"{results['all'] / pages:.1f} / {sizes['all'] / 1024:.0f}"),
+        ('ORM + JsonResponse: мс / КБ', f"{results['orm'] / pages:.1f} / {sizes['orm'] / 1024:.0f}"),
+    ])
+
+
+if __name__ == '__main__':
+    main(*(int(arg) for arg in sys.argv[1:2]))
@@ -0,0 +1,81 @@
+"""
+Бенчмарк знімка каталогу: побудова, розмір і читання проти ORM.
+
+    python -m benchmarks.bench_catalog_snapshot [велосипедів]
+"""
+
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from . import _django
+
+
+def main(bike_count: int = 10_000) -> None:
+    _django.setup()
+
+    from decimal import Decimal
+
+    from shop.catalog_snapshot import CatalogSnapshot, write_snapshot
+    from shop.models import Bike, BikeType
+
+    types = [BikeType.objects.create(name=name, description='') for name in ('Гірський', 'Шосейний', 'Міський')]
+    Bike.objects.bulk_create(
+        (Bike(name=f'Велосипед {i}', bike_type=types[i % 3], price=Decimal('10000.00') + i,
+              description='Опис велосипеда ' * 8, image=f'bikes/{i}.jpg', in_stock=i % 10 != 0,
+              specifics_text='Легкий шосейний велосипед (8.5 кг)')
+         for i in range(bike_count)),
+        batch_size=5000,
+    )
+
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'catalog.snapshot')
+        with _django.timer(results, 'build'):
+            write_snapshot(path)
+        size = os.path.getsize(path)
+
+        # Як у bike_list: вибірка в наявності одного типу і поля картки
+        def render(bikes):
+            return [(b.id, b.name, b.price, b.get_specifics()) for b in bikes]
+
+        tracemalloc.start()
+        started = time.perf_counter()
+        snapshot = CatalogSnapshot(path)
+        open_ms = (time.perf_counter() - started) * 1000
+        opened_kb = tracemalloc.get_traced_memory()[0] / 1024
+        tracemalloc.stop()
+
+        rounds = 20
+        with _django.timer(results, 'snapshot'):
+            for _ in range(rounds):
+                render(snapshot.bikes(in_stock=True, bike_type_id=types[1].pk))
+        with _django.timer(results, 'orm'):
+            for _ in range(rounds):
+                render(Bike.objects.filter(in_stock=True, bike_type=types[1]))
+        with _django.timer(results, 'ids'):
+            for _ in range(rounds):
+                [b.id for b in snapshot.bikes(in_stock=True, bike_type_id=types[1].pk)]
+
+        tracemalloc.start()
+        orm_bikes = list(Bike.objects.all())
+        orm_kb = tracemalloc.get_traced_memory()[0] / 1024
+        tracemalloc.stop()
+        del orm_bikes
+
+    _django.report(f'Знімок каталогу ({bike_count} велосипедів)', [
+        ('Побудова, мс', f"{results['build']:.0f}"),
+        ('Розмір файлу, КБ', f'{size / 1024:.0f}'),
+        ('Відкриття (mmap), мс', f'{open_ms:.2f}'),
+        ("Пам'ять процесу після відкриття, КБ", f'{opened_kb:.0f}'),
+        ("Пам'ять list(Bike.objects.all()), КБ", f'{orm_kb:.0f}'),
+        ('Сторінка типу зі знімка, мс', f"{results['snapshot'] / rounds:.2f}"),
+        ('Сторінка типу з ORM, мс', f"{results['orm'] / rounds:.2f}"),
+        ('Лише id (закешовані картки), мс', f"{results['ids'] / rounds:.2f}"),
+    ])
+
+
+if __name__ == '__main__':
+    main(*(int(arg) for arg in sys.argv[1:2]))
@@ -0,0 +1,68 @@
+"""
+Бенчмарк завантаження маніфесту перевізника.
+
+    python -m benchmarks.bench_ingest_tracking [рядків]
+
+Маніфест: 80% рядків — нові номери відстеження за order_id зі статусом
+in_transit, 19% — доставка вже відправлених замовлень лише за номером,
+1% — невідомі замовлення.
+"""
+
+import csv
+import os
+import sys
+import tempfile
+
+from . import _django
+
+
+def main(line_count: int = 500_000) -> None:
+    _django.setup()
+
+    from django.contrib.auth.models import User
+
+    from shop import tracking
+    from shop.models import Order
+
+    user = User.objects.create_user(username='bench', password='x')
+    order_count = line_count * 99 // 100
+    shipped_from = order_count * 80 // 99
+    Order.objects.bulk_create(
+        (Order(user=user, status='shipped' if i >= shipped_from else 'new',
+               tracking_number=f'UA{i:09d}' if i >= shipped_from else None)
+         for i in range(order_count)),
+        batch_size=5000,
+    )
+    order_ids = list(Order.objects.order_by('pk').values_list('pk', flat=True))
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'manifest.csv')
+        with open(path, 'w', encoding='utf-8', newline='') as f:
+            writer = csv.writer(f)
+            writer.writerow(('order_id', 'tracking_number', 'status'))
+            for i, order_id in enumerate(order_ids):
+                if i < shipped_from:
+                    writer.writerow((order_id, f'UA{i:09d}', 'in_transit'))
+                else:
+                    writer.writerow(('', f'UA{i:09d}', 'delivered'))
+            for i in range(line_count - order_count):
+                writer.writerow(('', f'XX{i:09d}', 'delivered'))
+        size = os.path.getsize(path)
+
+        results = {}
+        with _django.timer(results, 'ingest'):
+            with tracking.open_manifest(path) as f:
+                report = tracking.ingest(tracking.read_records(f, 'csv'))
+
+    _django.report(f'Маніфест перевізника ({report.lines} рядків, {size / 2 ** 20:.1f} МБ)', [
+        ('Час, с', f"{results['ingest'] / 1000:.1f}"),
+        ('Рядків/с', f"{report.lines / (results['ingest'] / 1000):.0f}"),
+        ('Зіставлено', report.matched),
+        ('Нових номерів відстеження', report.tracking_updated),
+        ('Переходів статусу', report.transitions),
+        ('Незіставлених', report.unmatched),
+    ])
+
+
+if __name__ == '__main__':
+    main(*(int(arg) for arg in sys.argv[1:2]))
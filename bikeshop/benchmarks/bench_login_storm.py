@@ -0,0 +1,105 @@
+"""
+Бенчмарк: затримка каталогу під час шторму входів.
+
+    python -m benchmarks.bench_login_storm [паралельних_входів] [входів_на_клієнта]
+
+Асинхронний клієнт Django в одному циклі подій одночасно виконує шторм
+POST /login/ і періодичні GET /bikes/. Порівнюються хешування в потоці
+запиту (SHOP_HASHING_WORKERS=0) і в пулі процесів.
+"""
+
+import asyncio
+import statistics
+import sys
+import time
+
+from . import _django
+
+PASSWORD = 'bench-pass-123'
+
+
+def percentile(values, fraction: float) -> float:
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * fraction))]
+
+
+async def sample_catalog(client, stop: asyncio.Event, latencies: list) -> None:
+    while not stop.is_set():
+        started = time.perf_counter()
+        response = await client.get('/bikes/')
+        latencies.append((time.perf_counter() - started) * 1000)
+        assert response.status_code == 200
+        await asyncio.sleep(0.01)
+
+
+async def login_storm(concurrency: int, per_client: int) -> float:
+    from django.test import AsyncClient
+
+    async def one_client():
+        for _ in range(per_client):
+            response = await AsyncClient().post('/login/', {'username': 'bench', 'password': PASSWORD})
+            assert response.status_code == 302, response.status_code
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one_client() for _ in range(concurrency)))
+    return time.perf_counter() - started
+
+
+async def measure(catalog_client, concurrency: int, per_client: int, storm: bool):
+    latencies = []
+    stop = asyncio.Event()
+    sampler = asyncio.create_task(sample_catalog(catalog_client, stop, latencies))
+    if storm:
+        elapsed = await login_storm(concurrency, per_client)
+    else:
+        await asyncio.sleep(1.0)
+        elapsed = 0.0
+    stop.set()
+    await sampler
+    return latencies, elapsed
+
+
+def main(concurrency: int = 8, per_client: int = 4) -> None:
+    _django.setup()
+
+    from decimal import Decimal
+    from asgiref.sync import async_to_sync
+    from django.contrib.auth.models import User
+    from django.test import AsyncClient, override_settings
+
+    from shop.hashing import get_pool
+    from shop.models import Bike, BikeType
+
+    User.objects.create_user('bench', password=PASSWORD)
+    bike_type = BikeType.objects.create(name='road', description='')
+    Bike.objects.bulk_create(
+        Bike(name=f'Bike {i}', bike_type=bike_type, price=Decimal('999.00'), description='', image='bikes/x.jpg')
+        for i in range(30)
+    )
+    catalog_client = AsyncClient()
+    catalog_client.force_login(User.objects.get(username='bench'))
+
+    rows = []
+    logins = concurrency * per_client
+    for workers, label in ((0, 'хешування в потоці запиту'), (2, 'пул процесів (2)')):
+        # Без обмеження частоти: шторм іде з однієї IP
+        with override_settings(SHOP_HASHING_WORKERS=workers, SHOP_HASHING_MAX_PENDING=logins,
+                               SHOP_THROTTLE_RULES={}):
+            pool = get_pool()
+            if pool:
+                pool.prestart()
+            idle, _ = async_to_sync(measure)(catalog_client, concurrency, per_client, storm=False)
+            busy, elapsed = async_to_sync(measure)(catalog_client, concurrency, per_client, storm=True)
+            rows.append((f'[{label}] каталог без навантаження p50/p95, мс',
+                         f'{statistics.median(idle):.1f} / {percentile(idle, 0.95):.1f}'))
+            rows.append((f'[{label}] каталог під штормом p50/p95, мс',
+                         f'{statistics.median(busy):.1f} / {percentile(busy, 0.95):.1f}'))
+            rows.append((f'[{label}] {logins} входів, с', f'{elapsed:.2f}'))
+            if pool:
+                rows.append((f'[{label}] пікова черга', str(pool.stats()['peak_pending'])))
+
+    _django.report(f'Каталог під час шторму входів ({concurrency} паралельних клієнтів)', rows)
+
+
+if __name__ == '__main__':
+    main(*(int(arg) for arg in sys.argv[1:3]))
@@ -0,0 +1,74 @@
+"""
+Бенчмарк історії цін: розмір сховища і швидкість запитів.
+
+    python -m benchmarks.bench_price_history [подій] [велосипедів]
+"""
+
+import random
+import sys
+import time
+
+from . import _django
+
+
+def main(event_count: int = 1_000_000, bike_count: int = 1_000) -> None:
+    _django.setup()
+
+    from datetime import timedelta
+    from decimal import Decimal
+    from django.db.models import Sum
+    from django.db.models.functions import Length
+    from django.utils import timezone
+
+    from shop import price_history
+    from shop.models import Bike, BikeType, PriceHistoryBlock
+
+    bike_type = BikeType.objects.create(name='road', description='')
+    Bike.objects.bulk_create(
+        (Bike(name=f'Bike {i}', bike_type=bike_type, price=Decimal('10000.00'), description='', image='bikes/x.jpg')
+         for i in range(bike_count)),
+        batch_size=5000,
+    )
+    bike_ids = list(Bike.objects.values_list('pk', flat=True))
+    prices = dict.fromkeys(bike_ids, 1_000_000)
+
+    # Кожен «прогін» змінює ціни всіх велосипедів раз на годину, як reprice_catalog
+    rng = random.Random(42)
+    started_at = timezone.now() - timedelta(hours=event_count // bike_count + 1)
+    results = {}
+    with _django.timer(results, 'record'):
+        for run in range(event_count // bike_count):
+            for bike_id in bike_ids:
+                prices[bike_id] = max(100, prices[bike_id] + rng.randint(-5000, 5000))
+            price_history.record(
+                ((bike_id, Decimal(cents).scaleb(-2)) for bike_id, cents in prices.items()),
+                at=started_at + timedelta(hours=run),
+            )
+
+    stats = PriceHistoryBlock.objects.aggregate(data=Sum(Length('data')), events=Sum('count'))
+    blocks = PriceHistoryBlock.objects.count()
+
+    queries = 2000
+    moments = [started_at + timedelta(minutes=rng.randint(0, event_count // bike_count * 60)) for _ in range(queries)]
+    started = time.perf_counter()
+    for moment in moments:
+        price_history.price_at(rng.choice(bike_ids), moment)
+    price_at_ms = (time.perf_counter() - started) / queries * 1000
+
+    started = time.perf_counter()
+    for moment in moments[:200]:
+        price_history.price_changes(rng.choice(bike_ids), moment, moment + timedelta(days=7))
+    range_ms = (time.perf_counter() - started) / 200 * 1000
+
+    _django.report(f'Історія цін ({stats["events"]} подій, {bike_count} велосипедів)', [
+        ('Запис, подій/с', f"{stats['events'] / (results['record'] / 1000):.0f}"),
+        ('Рядків PriceHistoryBlock', blocks),
+        ('Дані подій, МБ', f"{stats['data'] / 2 ** 20:.1f}"),
+        ('Байтів на подію', f"{stats['data'] / stats['events']:.2f}"),
+        ('price_at(), мс', f'{price_at_ms:.2f}'),
+        ('price_changes() за тиждень, мс', f'{range_ms:.2f}'),
+    ])
+
+
+if __name__ == '__main__':
+    main(*(int(arg) for arg in sys.argv[1:3]))
@@ -0,0 +1,68 @@
+"""
+Бенчмарк повної перебудови рекомендацій «часто купують разом».
+
+    python -m benchmarks.bench_recommendations [рядків_замовлень] [велосипедів]
+"""
+
+import random
+import sys
+import tracemalloc
+
+from . import _django
+
+
+def main(line_count: int = 1_000_000, bike_count: int = 2_000) -> None:
+    _django.setup()
+
+    from decimal import Decimal
+    from django.contrib.auth.models import User
+
+    from shop import recommendations
+    from shop.models import Bike, BikeType, Order, OrderItem
+
+    bike_type = BikeType.objects.create(name='road', description='')
+    Bike.objects.bulk_create(
+        (Bike(name=f'Bike {i}', bike_type=bike_type, price=Decimal('1000.00'), description='', image='bikes/x.jpg')
+         for i in range(bike_count)),
+        batch_size=5000,
+    )
+    bike_ids = list(Bike.objects.values_list('pk', flat=True))
+    user = User.objects.create_user('bench')
+
+    # Замовлення по 1–5 позицій; популярність велосипедів нерівномірна
+    rng = random.Random(42)
+    weights = [1 / (rank + 1) for rank in range(bike_count)]
+    sizes, total = [], 0
+    while total < line_count:
+        sizes.append(min(rng.randint(1, 5), line_count - total))
+        total += sizes[-1]
+    Order.objects.bulk_create(
+        (Order(user=user, status='delivered', completed=True, total=0) for _ in sizes), batch_size=10000,
+    )
+    order_ids = list(Order.objects.order_by('pk').values_list('pk', flat=True))
+    OrderItem.objects.bulk_create(
+        (OrderItem(order_id=order_id, bike_id=bike_id, price=Decimal('1000.00'))
+         for order_id, size in zip(order_ids, sizes)
+         for bike_id in rng.choices(bike_ids, weights, k=size)),
+        batch_size=10000,
+    )
+
+    results = {}
+    with _django.timer(results, 'rebuild'):
+        written = recommendations.rebuild()
+    # Пам'ять — окремим прогоном: tracemalloc у кілька разів сповільнює код
+    tracemalloc.start()
+    recommendations.rebuild()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    rows = [
+        ('Перебудова, с', f"{results['rebuild'] / 1000:.2f}"),
+        ('Пік пам\'яті, МБ', f'{peak / 2 ** 20:.1f}'),
+        ('Записано пар', written),
+    ]
+
+    _django.report(f'Рекомендації ({line_count} рядків, {len(order_ids)} замовлень, {bike_count} велосипедів)', rows)
+
+
+if __name__ == '__main__':
+    main(*(int(arg) for arg in sys.argv[1:3]))
@@ -0,0 +1,48 @@
+"""
+Бенчмарк масової зміни цін.
+
+    python -m benchmarks.bench_repricing [кількість_велосипедів] [відкритих_кошиків]
+"""
+
+import sys
+
+from . import _django
+
+
+def main(bike_count: int = 100_000, open_carts: int = 2_000) -> None:
+    _django.setup()
+
+    from decimal import Decimal
+    from django.contrib.auth.models import User
+
+    from shop.models import Bike, BikeType, Order, OrderItem
+    from shop.repricing import PriceChangeSpec, reprice_catalog
+
+    types = [BikeType.objects.create(name=name, description='') for name in ('mountain', 'road', 'city')]
+    Bike.objects.bulk_create(
+        (Bike(name=f'Bike {i}', bike_type=types[i % 3], price=Decimal('9999.99'), description='', image='bikes/x.jpg')
+         for i in range(bike_count)),
+        batch_size=5000,
+    )
+    user = User.objects.create_user('bench')
+    orders = Order.objects.bulk_create(Order(user=user, total=0) for _ in range(open_carts))
+    bike_ids = list(Bike.objects.values_list('pk', flat=True)[:open_carts * 3])
+    OrderItem.objects.bulk_create(
+        (OrderItem(order=orders[i % open_carts], bike_id=bike_id, price=Decimal('9999.99'))
+         for i, bike_id in enumerate(bike_ids)),
+        batch_size=5000,
+    )
+
+    spec = PriceChangeSpec(percent_by_type={'mountain': Decimal('-7.5'), 'road': Decimal('3'), 'city': Decimal('12')})
+    report = reprice_catalog(spec)
+
+    _django.report(f'Зміна цін ({bike_count} велосипедів, {open_carts} відкритих кошиків)', [
+        ('Велосипедів змінено', report.bikes),
+        ('Позицій у кошиках', report.order_items),
+        ('Замовлень перераховано', report.orders),
+        ('Час, с', f'{report.seconds:.2f}'),
+    ])
+
+
+if __name__ == '__main__':
+    main(*(int(arg) for arg in sys.argv[1:3]))
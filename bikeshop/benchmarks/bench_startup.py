@@ -0,0 +1,89 @@
+"""
+Бенчмарк старту воркера: час імпорту (налаштування + django.setup) і час
+до першої відповіді без прогріву та з прогрівом ``warm_worker``.
+
+    python -m benchmarks.bench_startup [повторів]
+
+Кожен замір виконується в окремому процесі, щоб імпорти були холодними.
+"""
+
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+from . import _django
+
+
+def child(mode: str) -> None:
+    """Один холодний старт: друкує JSON із замірами в мілісекундах."""
+    os.environ['SHOP_WARMUP_ON_READY'] = '0'
+    sys.path.insert(0, str(_django.BASE_DIR))
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'bikeshop.settings')
+    results = {}
+
+    started = time.perf_counter()
+    import django
+    django.setup()
+    results['setup'] = (time.perf_counter() - started) * 1000
+
+    from decimal import Decimal
+    from django.contrib.auth.models import User
+    from django.db import connection
+    from django.test import Client
+    from django.test.utils import setup_test_environment
+
+    setup_test_environment()
+    connection.creation.create_test_db(verbosity=0)
+    from shop.models import Bike, BikeType
+    bike_type = BikeType.objects.create(name='road', description='')
+    Bike.objects.bulk_create(
+        Bike(name=f'Bike {i}', bike_type=bike_type, price=Decimal('999.00'), description='', image='bikes/x.jpg')
+        for i in range(30)
+    )
+
+    results['warmup'] = 0.0
+    if mode == 'warm':
+        from shop.warmup import warm_worker
+        started = time.perf_counter()
+        warm_worker()
+        results['warmup'] = (time.perf_counter() - started) * 1000
+
+    client = Client()
+    client.force_login(User.objects.create_user('bench', password='bench-pass-123'))
+    for name in ('first', 'second'):
+        started = time.perf_counter()
+        response = client.get('/bikes/')
+        results[name] = (time.perf_counter() - started) * 1000
+        assert response.status_code == 200, response.status_code
+    print(json.dumps(results))
+
+
+def run(mode: str) -> dict:
+    output = subprocess.run(
+        [sys.executable, '-m', 'benchmarks.bench_startup', '--child', mode],
+        cwd=_django.BASE_DIR, check=True, capture_output=True, text=True,
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main(repeats: int = 5) -> None:
+    rows = []
+    for mode, label in (('cold', 'без прогріву'), ('warm', 'з warm_worker()')):
+        samples = [run(mode) for _ in range(repeats)]
+        median = {key: statistics.median(sample[key] for sample in samples) for key in samples[0]}
+        rows.append((f'[{label}] імпорт + django.setup(), мс', f"{median['setup']:.1f}"))
+        if mode == 'warm':
+            rows.append((f'[{label}] прогрів під час старту, мс', f"{median['warmup']:.1f}"))
+        rows.append((f'[{label}] перший GET /bikes/, мс', f"{median['first']:.1f}"))
+        rows.append((f'[{label}] другий GET /bikes/, мс', f"{median['second']:.1f}"))
+    _django.report(f'Старт воркера (медіана з {repeats} процесів)', rows)
+
+
+if __name__ == '__main__':
+    if sys.argv[1:2] == ['--child']:
+        child(sys.argv[2])
+    else:
+        main(*(int(arg) for arg in sys.argv[1:2]))
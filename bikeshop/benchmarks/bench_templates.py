@@ -0,0 +1,66 @@
+"""
+Бенчмарк рендерингу каталогу: компіляція шаблонів і кешування фрагментів.
+
+    python -m benchmarks.bench_templates [кількість_велосипедів] [ітерацій]
+"""
+
+import statistics
+import sys
+import time
+
+from . import _django
+
+
+def main(bike_count: int = 60, iterations: int = 30) -> None:
+    _django.setup()
+
+    from decimal import Decimal
+    from django.contrib.auth.models import User
+    from django.core.cache import caches
+    from django.template import engines
+    from django.test import Client
+
+    from shop.patterns import BikeFactory
+    from shop.warmup import warm_templates
+
+    factory = BikeFactory()
+    kinds = [('mountain', {'suspension': 'пневматична'}), ('road', {'weight': 8.1}), ('city', {'has_basket': True})]
+    for i in range(bike_count):
+        kind, extra = kinds[i % len(kinds)]
+        factory.create_bike(kind, f'Bike {i}', Decimal('9999.99'), 'Опис велосипеда ' * 10, image='bikes/x.jpg', **extra)
+
+    user = User.objects.create_user('bench', password='bench-pass-123')
+    client = Client()
+    client.force_login(user)
+
+    results = []
+
+    # Компіляція: перший get_template проти прогрітого кешу завантажувача
+    for loader in engines['django'].engine.template_loaders:
+        loader.reset()
+    started = time.perf_counter()
+    count = warm_templates()
+    results.append((f'warm_templates() ({count} шаблонів), мс', f'{(time.perf_counter() - started) * 1000:.2f}'))
+
+    def render_ms(clear_fragments: bool) -> float:
+        timings = []
+        for _ in range(iterations):
+            if clear_fragments:
+                caches['default'].clear()
+            started = time.perf_counter()
+            response = client.get('/bikes/')
+            timings.append((time.perf_counter() - started) * 1000)
+            assert response.status_code == 200
+        return statistics.median(timings)
+
+    cold = render_ms(clear_fragments=True)
+    warm = render_ms(clear_fragments=False)
+    results.append(('GET /bikes/ без кешу фрагментів, мс (медіана)', f'{cold:.2f}'))
+    results.append(('GET /bikes/ з кешем фрагментів, мс (медіана)', f'{warm:.2f}'))
+    results.append(('Економія', f'{(1 - warm / cold) * 100:.0f}%'))
+
+    _django.report(f'Рендеринг каталогу ({bike_count} велосипедів)', results)
+
+
+if __name__ == '__main__':
+    main(*(int(arg) for arg in sys.argv[1:3]))
@@ -0,0 +1,54 @@
+"""
+Бенчмарк накладних витрат обмеження частоти запитів.
+
+    python -m benchmarks.bench_throttling [ітерацій]
+"""
+
+import os
+import sys
+import tempfile
+import time
+
+from . import _django
+
+
+def main(iterations: int = 200000) -> None:
+    _django.setup()
+
+    from django.contrib.auth.models import AnonymousUser
+    from django.http import HttpResponse
+    from django.test import RequestFactory, override_settings
+    from django.urls import resolve
+
+    from shop.middleware import ThrottleMiddleware
+    from shop.throttling import BucketTable, Rate
+
+    rows = []
+    with tempfile.TemporaryDirectory() as directory:
+        table = BucketTable(os.path.join(directory, 'throttle.bin'))
+        rate = Rate.parse('1000000/s')
+        keys = [f'ip:bench:10.0.{i // 256}.{i % 256}' for i in range(1000)]
+        started = time.perf_counter()
+        for i in range(iterations):
+            table.consume(keys[i % len(keys)], rate)
+        rows.append(('BucketTable.consume(), мкс', f'{(time.perf_counter() - started) / iterations * 1e6:.2f}'))
+
+        rules = {'register': {'ip': '1000000/s'}}
+        with override_settings(SHOP_THROTTLE_RULES=rules, SHOP_THROTTLE_TABLE=os.path.join(directory, 'mw.bin')):
+            middleware = ThrottleMiddleware(lambda request: HttpResponse())
+        for path in ('/bikes/', '/register/'):
+            request = RequestFactory().post(path)
+            request.user = AnonymousUser()
+            request.resolver_match = resolve(path)
+            started = time.perf_counter()
+            for _ in range(iterations):
+                assert middleware.process_view(request, None, (), {}) is None
+            label = 'без правила' if path == '/bikes/' else 'правило по IP'
+            rows.append((f'process_view {path} ({label}), мкс',
+                         f'{(time.perf_counter() - started) / iterations * 1e6:.2f}'))
+
+    _django.report(f'Обмеження частоти ({iterations} перевірок)', rows)
+
+
+if __name__ == '__main__':
+    main(*(int(arg) for arg in sys.argv[1:2]))
@@ -0,0 +1,62 @@
+"""
+Бенчмарк трасування: ціна спана вимкненого, поза вибіркою і записуваного.
+
+    python -m benchmarks.bench_tracing [спанів]
+"""
+
+import os
+import sys
+import tempfile
+
+from . import _django
+
+
+def main(span_count: int = 200_000) -> None:
+    _django.setup()
+
+    from django.test.utils import override_settings
+
+    from shop.tracing import start_span, traced
+
+    @traced('work')
+    def work():
+        return 1
+
+    def run():
+        # Типовий запит: корінь і десять вкладених спанів, половина з атрибутами
+        for _ in range(span_count // 10):
+            with start_span('root'):
+                for i in range(9):
+                    with start_span('child', {'i': i}) as span:
+                        if span.recording:
+                            span.set_attribute('expensive', str(i))
+                work()
+
+    results = {}
+    with _django.timer(results, 'baseline'):
+        for _ in range(span_count // 10):
+            for i in range(9):
+                {'i': i}
+            work.__wrapped__()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'traces.jsonl')
+        for name, rate in (('disabled', 0), ('sampled_out', 1e-9), ('sampled_in', 1)):
+            with override_settings(SHOP_TRACE_SAMPLE_RATE=rate, SHOP_TRACE_EXPORTER='jsonl', SHOP_TRACE_FILE=path):
+                with _django.timer(results, name):
+                    run()
+        size = os.path.getsize(path)
+
+    def per_span(name):
+        return (results[name] - results['baseline']) * 1e6 / span_count
+
+    _django.report(f'Трасування ({span_count} спанів, по 10 на трасування)', [
+        ('Вимкнено (rate=0), нс/спан', f"{per_span('disabled'):.0f}"),
+        ('Поза вибіркою, нс/спан', f"{per_span('sampled_out'):.0f}"),
+        ('Записується в JSONL, нс/спан', f"{per_span('sampled_in'):.0f}"),
+        ('Розмір JSONL, КБ', f'{size / 1024:.0f}'),
+    ])
+
+
+if __name__ == '__main__':
+    main(*(int(arg) for arg in sys.argv[1:2]))
@@ -0,0 +1,80 @@
+"""
+Бенчмарк розсилки списку бажань: зміна цін 10 тис. велосипедів при
+1 млн записів у списках бажань — час і пікова пам'ять.
+
+    python -m benchmarks.bench_watchlist [велосипедів] [записів]
+"""
+
+import random
+import sys
+import tracemalloc
+
+from . import _django
+
+
+def main(bike_count: int = 10_000, entry_count: int = 1_000_000) -> None:
+    _django.setup()
+
+    from decimal import Decimal
+
+    from django.contrib.auth.models import User
+    from django.db import connection
+    from django.test.utils import CaptureQueriesContext, override_settings
+
+    from shop.models import Bike, BikeType, WatchlistEntry
+    from shop.repricing import PriceChangeSpec, reprice_catalog
+    from shop.watchlist import iter_watchers, notify_watchers
+
+    per_user = 50
+    user_count = entry_count // per_user
+    bike_type = BikeType.objects.create(name='road', description='')
+    Bike.objects.bulk_create(
+        (Bike(name=f'Велосипед {i}', bike_type=bike_type, price=Decimal('10000.00'), description='',
+              image=f'bikes/{i}.jpg') for i in range(bike_count)),
+        batch_size=5000,
+    )
+    User.objects.bulk_create(
+        (User(username=f'user{i}', email=f'user{i}@example.com', password='!') for i in range(user_count)),
+        batch_size=5000,
+    )
+    bike_ids = list(Bike.objects.values_list('pk', flat=True))
+    user_ids = list(User.objects.values_list('pk', flat=True))
+    rng = random.Random(42)
+    table = WatchlistEntry._meta.db_table
+    with connection.cursor() as cursor:
+        cursor.executemany(
+            f'INSERT INTO {table} (user_id, bike_id, created_at) VALUES (%s, %s, CURRENT_TIMESTAMP)',
+            [(user_id, bike_id) for user_id in user_ids for bike_id in rng.sample(bike_ids, per_user)],
+        )
+        cursor.execute('ANALYZE')
+
+    results = {}
+    with _django.timer(results, 'reprice'):
+        reprice_catalog(PriceChangeSpec(percent_by_type={'road': Decimal('-10')}))
+
+    with CaptureQueriesContext(connection) as ctx:
+        next(iter_watchers(10 ** 12))
+    page_sql = ctx.captured_queries[-1]['sql']
+    with connection.cursor() as cursor:
+        cursor.execute('EXPLAIN QUERY PLAN ' + page_sql)
+        plan = '; '.join(row[-1] for row in cursor.fetchall())
+
+    with override_settings(EMAIL_BACKEND='django.core.mail.backends.dummy.EmailBackend'):
+        tracemalloc.start()
+        with _django.timer(results, 'notify'):
+            report = notify_watchers()
+        peak_kb = tracemalloc.get_traced_memory()[1] / 1024
+        tracemalloc.stop()
+
+    _django.report(f'Список бажань ({bike_count} велосипедів, {entry_count} записів, {user_count} користувачів)', [
+        ('Зміна цін з чергою подій, с', f"{results['reprice'] / 1000:.1f}"),
+        ('Розсилка (під tracemalloc), с', f"{results['notify'] / 1000:.1f}"),
+        ('Пікова пам\'ять розсилки, КБ', f'{peak_kb:.0f}'),
+        ('Подій / велосипедів / записів', f'{report.events} / {report.bikes} / {report.entries}'),
+        ('Листів / пачок send_messages', f'{report.sent} / {report.batches}'),
+        ('План сторінки записів', plan),
+    ])
+
+
+if __name__ == '__main__':
+    main(*(int(arg) for arg in sys.argv[1:3]))
@@ -12,5 +12,7 @@ import os
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'bikeshop.settings')
+# Прогріваємо воркер (маршрути, шаблони, кеші каталогу) в ShopConfig.ready до першого запиту
+os.environ.setdefault('SHOP_WARMUP_ON_READY', '1')
 
 application = get_asgi_application()
@@ -10,19 +10,18 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.1/ref/settings/
 """
 
-from pathlib import Path
-import os
 from pathlib import Path
 import os
 from dotenv import load_dotenv
 
-# Завантажити .env файл
-load_dotenv()
-
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
 
+# Завантажити .env файл. Явний шлях: без нього load_dotenv шукає файл,
+# обходячи стек викликів і батьківські каталоги при кожному старті
+load_dotenv(BASE_DIR / '.env')
+
 
 # Quick-start development settings - unsuitable for production
 # See https://docs.djangoproject.com/en/5.1/howto/deployment/checklist/
@@ -50,10 +49,13 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    'shop.middleware.FileServingMiddleware',
+    'shop.middleware.TracingMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'shop.middleware.ThrottleMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -132,16 +134,129 @@ STATICFILES_DIRS = [os.path.join(BASE_DIR, 'static')]  # папка для ст
 
 STATIC_ROOT = os.path.join(BASE_DIR, 'staticfiles')  # для команди collectstatic (продакшн)
 
+# collectstatic додає хеш вмісту до імен і пише .gz-варіанти CSS/JS/SVG (див. shop/backends/staticfiles.py)
+STORAGES = {
+    'default': {'BACKEND': 'django.core.files.storage.FileSystemStorage'},
+    'staticfiles': {'BACKEND': 'shop.backends.staticfiles.CompressedManifestStaticFilesStorage'},
+}
+
 
 # Media files (завантажені користувачами файли)
 
 MEDIA_URL = '/media/'
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
 
+# Віддавати статику й медіа з Django (shop.middleware.FileServingMiddleware);
+# вимкніть, якщо файли віддає зворотний проксі
+SHOP_SERVE_FILES = os.environ.get('SHOP_SERVE_FILES', '1') == '1'
+
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 
+# Кеші: локальний (в межах процесу) і спільний файловий (для всіх воркерів на хості)
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'bikeshop-default',
+    },
+    'shared': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': os.path.join(BASE_DIR, 'var', 'cache'),
+        'TIMEOUT': None,
+        'OPTIONS': {'MAX_ENTRIES': 50000},
+    },
+    # Окремий каталог для сесій: FileBasedCache при кожному set сканує весь
+    # каталог і при переповненні видаляє випадкові записи, зокрема ще не
+    # синхронізовані з БД сесії. SessionFileCache сканує не частіше ніж раз
+    # на CULL_INTERVAL секунд і спершу прибирає прострочене. На сесію —
+    # два записи (дані і мітка синхронізації)
+    'sessions': {
+        'BACKEND': 'shop.backends.cache.SessionFileCache',
+        'LOCATION': os.path.join(BASE_DIR, 'var', 'sessions'),
+        'OPTIONS': {'MAX_ENTRIES': 400000, 'CULL_FREQUENCY': 4, 'CULL_INTERVAL': 60},
+    },
+}
+
+
+# Сесії в кеші з відкладеним записом у БД (див. shop/backends/sessions.py)
+
+SESSION_ENGINE = 'shop.backends.sessions'
+SESSION_CACHE_ALIAS = 'sessions'
+# Секунд між синхронізаціями сесії з БД — верхня межа змін, які можна
+# втратити, якщо запис сесії зникне з кешу
+SHOP_SESSION_SYNC_INTERVAL = 60
+
+
+# Flash-повідомлення зберігаються в cookie, а не в сесії
+
+MESSAGE_STORAGE = 'shop.backends.messages.GuardedCookieStorage'
+SHOP_MESSAGE_COOKIE_MAX_SIZE = 2048
+SHOP_MESSAGE_MAX_LENGTH = 300
+
+
+# Обмеження частоти запитів за іменем маршруту (див. shop/throttling.py).
+# Стан бакетів — спільний для воркерів хоста mmap-файл
+
+SHOP_THROTTLE_RULES = {
+    # Реєстрація хешує пароль PBKDF2 — дорогий POST
+    'register': {'ip': '5/m', 'methods': ['POST']},
+    # Кожен запит відкриває транзакцію запису
+    'shop:create_order': {'user': '30/m', 'ip': '120/m'},
+}
+SHOP_THROTTLE_TABLE = BASE_DIR / 'var' / 'throttle.bin'
+SHOP_THROTTLE_SLOTS = 65536
+
+
+# Пул процесів для хешування паролів при вході й реєстрації (див. shop/hashing.py);
+# 0 — хешувати в потоці запиту
+
+SHOP_HASHING_WORKERS = 2
+SHOP_HASHING_MAX_PENDING = 32  # більше завдань у черзі — 503 з Retry-After
+
+
+# Доставлені/скасовані замовлення, старші за стільки днів, переносяться
+# в архівні таблиці командою archive_orders (див. shop/archive.py)
+
+SHOP_ARCHIVE_AFTER_DAYS = 180
+
+
+# Незавершені замовлення (кошики) без змін довше за стільки днів видаляє
+# команда sweep_carts (див. shop/abandoned_carts.py)
+
+SHOP_ABANDONED_CART_DAYS = 14
+
+
+# Рекомендації «часто купують разом» (див. shop/recommendations.py):
+# сусідів на велосипед у таблиці та скільки з них показувати
+
+SHOP_RECOMMENDATION_SLOTS = 20
+SHOP_RECOMMENDATIONS_SHOWN = 4
+
+
+# Бінарний знімок каталогу, спільний для воркерів через mmap (див. shop/catalog_snapshot.py);
+# перебудовується першим воркером, що побачив нову версію каталогу
+
+SHOP_CATALOG_SNAPSHOT = BASE_DIR / 'var' / 'catalog.snapshot'
+
+
+# Прогрів воркера в ShopConfig.ready (див. shop/warmup.py); вмикається точками входу wsgi.py/asgi.py
+
+SHOP_WARMUP_ON_READY = os.environ.get('SHOP_WARMUP_ON_READY') == '1'
+
+
+# Трасування запитів (див. shop/tracing.py): частка запитів, що трасуються
+# (0 — вимкнено, TracingMiddleware не підключається), і куди експортувати
+# спани — 'jsonl' у SHOP_TRACE_FILE або 'otlp' на локальний колектор
+
+SHOP_TRACE_SAMPLE_RATE = float(os.environ.get('SHOP_TRACE_SAMPLE_RATE', '0'))
+SHOP_TRACE_EXPORTER = os.environ.get('SHOP_TRACE_EXPORTER', 'jsonl')
+SHOP_TRACE_FILE = BASE_DIR / 'var' / 'traces.jsonl'
+SHOP_TRACE_OTLP_ENDPOINT = os.environ.get('SHOP_TRACE_OTLP_ENDPOINT', 'http://127.0.0.1:4318/v1/traces')
+SHOP_TRACE_SERVICE_NAME = 'bikeshop'
+
+
 # Налаштування авторизації/редиректів
 
 LOGIN_REDIRECT_URL = 'shop:bike_list'  # Куди після логіну
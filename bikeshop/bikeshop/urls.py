@@ -13,10 +13,8 @@ urlpatterns = [
 
     # Користувацькі маршрути
     path('register/', shop_views.register, name='register'),
-    path('login/', auth_views.LoginView.as_view(
-        template_name='registration/login.html',
-        redirect_authenticated_user=True
-    ), name='login'),
+    # Асинхронний вхід: пароль перевіряється в пулі процесів
+    path('login/', shop_views.login_view, name='login'),
     path('logout/', auth_views.LogoutView.as_view(next_page='shop:home'), name='logout'),
     path('profile/', shop_views.profile, name='profile'),
 ]
@@ -0,0 +1,95 @@
+"""
+Прибирання покинутих кошиків.
+
+Кожен візит на сторінку замовлення може лишити незавершене замовлення
+(кошик). Кошики без змін довше за ``SHOP_ABANDONED_CART_DAYS`` днів
+(``Order.updated_at``; зміни кошика оновлюють його через
+``OrderQuerySet.touch``) видаляються разом із позиціями або, з ``expire``,
+переводяться в ``canceled`` автоматом статусів і перестають бути
+відкритими кошиками.
+
+Кандидати вибираються за індексом (completed, updated_at) пачками по
+``chunk_size`` у порядку (updated_at, id); кожна пачка — окрема коротка
+транзакція, а умова «кошик досі покинутий» перевіряється повторно в
+самому DELETE/UPDATE, тож кошик, який користувач змінив між вибіркою і
+видаленням, лишається.
+"""
+
+import logging
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import List, Optional, Tuple
+
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from .models import Order, OrderItem
+from .patterns.state import machine
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CHUNK_SIZE = 1000
+
+
+@dataclass
+class SweepReport:
+    """Підсумок прибирання: скільки кошиків і позицій звільнено."""
+    cutoff: datetime
+    expire: bool = False
+    orders: int = 0
+    items: int = 0
+    chunks: int = 0
+
+    @property
+    def rows(self) -> int:
+        return self.orders + self.items
+
+
+def delete_chunk(order_ids: List[int], cutoff: datetime) -> Tuple[int, int]:
+    """Видаляє покинуті кошики пачки з позиціями; повертає (кошиків, позицій)."""
+    with transaction.atomic():
+        _, deleted = Order.objects.idle_carts(cutoff).filter(pk__in=order_ids).delete()
+    return deleted.get(Order._meta.label, 0), deleted.get(OrderItem._meta.label, 0)
+
+
+def expire_chunk(order_ids: List[int], cutoff: datetime) -> int:
+    """Скасовує покинуті кошики пачки; повертає кількість скасованих."""
+    result = machine.bulk_transition(Order.objects.idle_carts(cutoff).filter(pk__in=order_ids), 'canceled')
+    return result.total
+
+
+def sweep_abandoned_carts(older_than_days: int, chunk_size: int = DEFAULT_CHUNK_SIZE, expire: bool = False,
+                          now: Optional[datetime] = None, dry_run: bool = False) -> SweepReport:
+    """
+    Видаляє (або з ``expire`` скасовує) кошики без змін понад
+    ``older_than_days`` днів. ``dry_run`` лише рахує такі кошики.
+    """
+    cutoff = (now or timezone.now()) - timedelta(days=older_than_days)
+    report = SweepReport(cutoff=cutoff, expire=expire)
+    candidates = Order.objects.idle_carts(cutoff)
+    if dry_run:
+        report.orders = candidates.count()
+        return report
+
+    position = None
+    while True:
+        page = candidates
+        if position is not None:
+            last_at, last_pk = position
+            page = page.filter(Q(updated_at__gt=last_at) | Q(updated_at=last_at, pk__gt=last_pk))
+        rows = list(page.order_by('updated_at', 'pk').values_list('updated_at', 'pk')[:chunk_size])
+        if not rows:
+            break
+        position = rows[-1]
+        order_ids = [pk for _, pk in rows]
+        if expire:
+            report.orders += expire_chunk(order_ids, cutoff)
+        else:
+            orders, items = delete_chunk(order_ids, cutoff)
+            report.orders += orders
+            report.items += items
+        report.chunks += 1
+    logger.info("%s %d abandoned carts (%d items) idle since %s",
+                "Expired" if expire else "Deleted", report.orders, report.items, cutoff)
+    return report
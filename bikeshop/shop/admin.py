@@ -1,10 +1,264 @@
 """Адміністративна конфігурація для моделей магазину велосипедів."""
 
-from django.contrib import admin
-from .models import BikeType, Bike, MountainBikeSpec, RoadBikeSpec, CityBikeSpec
-
-admin.site.register(BikeType)
-admin.site.register(Bike)
-admin.site.register(MountainBikeSpec)
-admin.site.register(RoadBikeSpec)
-admin.site.register(CityBikeSpec)
+from django.contrib import admin, messages
+from django.core.paginator import Paginator
+from django.db import connection, transaction
+from django.utils.functional import cached_property
+
+from .catalog import bump_catalog_version
+from .catalog_api import is_number
+from .models import (
+    BikeType, Bike, MountainBikeSpec, RoadBikeSpec, CityBikeSpec,
+    Order, OrderItem, ArchivedOrder, ArchivedOrderItem, PromotionRule, SalesRollup,
+)
+from .patterns import state as order_state
+from . import watchlist
+
+# Верхня межа діапазону для пошуку за префіксом (найбільший символ BMP)
+PREFIX_END = '\uffff'
+
+
+# ===== СПІЛЬНІ ЗАСОБИ =====
+
+class EstimatedCountPaginator(Paginator):
+    """
+    Пагінатор, що для нефільтрованих великих таблиць повертає оцінку кількості
+    рядків зі статистики PostgreSQL/MySQL замість повного COUNT(*).
+    """
+    exact_threshold = 10000
+
+    @cached_property
+    def count(self) -> int:
+        query = getattr(self.object_list, 'query', None)
+        if query is None or query.where:
+            return super().count
+        estimate = self._estimate(self.object_list)
+        if estimate is None or estimate < self.exact_threshold:
+            return super().count
+        return estimate
+
+    @staticmethod
+    def _estimate(queryset):
+        """
+        Оцінка зі статистики СУБД або None — тоді рахується точний COUNT(*).
+        Максимальний первинний ключ не годиться: після архівації замовлень і
+        прибирання кошиків він у рази більший за кількість рядків, і список
+        показує сторінки без рядків.
+        """
+        table = queryset.model._meta.db_table
+        if connection.vendor == 'postgresql':
+            sql = "SELECT reltuples::bigint FROM pg_class WHERE relname = %s"
+        elif connection.vendor == 'mysql':
+            sql = "SELECT table_rows FROM information_schema.tables WHERE table_schema = DATABASE() AND table_name = %s"
+        else:
+            # SQLite не зберігає кількість рядків; COUNT(*) проходить найменший індекс і на цих обсягах дешевий
+            return None
+        with connection.cursor() as cursor:
+            cursor.execute(sql, [table])
+            row = cursor.fetchone()
+        return row[0] if row and row[0] is not None and row[0] >= 0 else None
+
+
+class LargeTableAdmin(admin.ModelAdmin):
+    """База для адмінок великих таблиць: оцінка кількості й без повного COUNT у заголовку."""
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+    list_per_page = 50
+
+
+class IndexedSearchMixin:
+    """
+    Пошук лише точними збігами по індексованих полях замість icontains,
+    який на великих таблицях означає повне сканування.
+    """
+    # Значення, що не підходять до типу поля (нечислове для id), пропускаються.
+    # Поле з «^» шукається за початком рядка — діапазоном, який читає індекс
+    indexed_search_fields = ()
+    search_help_text = "Точний збіг"
+
+    def get_search_fields(self, request):
+        return self.indexed_search_fields
+
+    def get_search_results(self, request, queryset, search_term):
+        term = search_term.strip()
+        if not term:
+            return queryset, False
+        matches = None
+        for field in self.indexed_search_fields:
+            if field.startswith('^'):
+                # LIKE/startswith на SQLite регістронезалежний і індекс не читає;
+                # діапазон [term, term + U+FFFF) — той самий префікс з урахуванням регістру
+                field = field[1:]
+                match = queryset.filter(**{f'{field}__gte': term, f'{field}__lt': term + PREFIX_END})
+            elif field in ('pk', 'id') or field.endswith('__id'):
+                if not is_number(term):
+                    continue
+                match = queryset.filter(**{field: int(term)})
+            else:
+                match = queryset.filter(**{field: term})
+            matches = match if matches is None else matches | match
+        return (queryset.none() if matches is None else matches), False
+
+
+# ===== КАТАЛОГ =====
+
+@admin.register(BikeType)
+class BikeTypeAdmin(admin.ModelAdmin):
+    list_display = ('name',)
+    search_fields = ('name',)
+
+
+class SpecInline(admin.StackedInline):
+    extra = 0
+    max_num = 1
+
+
+class MountainBikeSpecInline(SpecInline):
+    model = MountainBikeSpec
+
+
+class RoadBikeSpecInline(SpecInline):
+    model = RoadBikeSpec
+
+
+class CityBikeSpecInline(SpecInline):
+    model = CityBikeSpec
+
+
+@admin.register(Bike)
+class BikeAdmin(IndexedSearchMixin, LargeTableAdmin):
+    list_display = ('name', 'bike_type', 'price', 'in_stock')
+    list_filter = ('in_stock', 'bike_type')
+    list_select_related = ('bike_type',)
+    indexed_search_fields = ('pk', '^name')
+    search_help_text = "id або початок назви (з урахуванням регістру)"
+    # Зведені специфікації заповнюються сигналами з інлайнів нижче
+    readonly_fields = ('specs', 'specifics_text')
+    inlines = (MountainBikeSpecInline, RoadBikeSpecInline, CityBikeSpecInline)
+    actions = ('restock', 'mark_out_of_stock')
+
+    @admin.action(description="Повернути в наявність")
+    def restock(self, request, queryset):
+        self._set_in_stock(request, queryset, True)
+
+    @admin.action(description="Зняти з наявності")
+    def mark_out_of_stock(self, request, queryset):
+        self._set_in_stock(request, queryset, False)
+
+    def _set_in_stock(self, request, queryset, in_stock: bool) -> None:
+        # Один UPDATE замість save() кожного об'єкта; сигнали не спрацьовують,
+        # тому версію каталогу збільшуємо і події списку бажань додаємо явно
+        with transaction.atomic():
+            if in_stock:
+                watchlist.record_restocks(queryset)
+            updated = queryset.exclude(in_stock=in_stock).update(in_stock=in_stock)
+            transaction.on_commit(bump_catalog_version)
+        self.message_user(request, f"Оновлено велосипедів: {updated}", messages.SUCCESS)
+
+
+class SpecAdmin(IndexedSearchMixin, LargeTableAdmin):
+    list_select_related = ('bike',)
+    raw_id_fields = ('bike',)
+    indexed_search_fields = ('bike__id',)
+
+
+@admin.register(MountainBikeSpec)
+class MountainBikeSpecAdmin(SpecAdmin):
+    list_display = ('__str__', 'suspension')
+
+
+@admin.register(RoadBikeSpec)
+class RoadBikeSpecAdmin(SpecAdmin):
+    list_display = ('__str__', 'weight')
+
+
+@admin.register(CityBikeSpec)
+class CityBikeSpecAdmin(SpecAdmin):
+    list_display = ('__str__', 'has_basket')
+
+
+# ===== ЗАМОВЛЕННЯ =====
+
+class OrderItemInline(admin.TabularInline):
+    model = OrderItem
+    extra = 0
+    raw_id_fields = ('bike',)
+
+
+def _status_action(status: str, label: str):
+    @admin.action(description=f"Статус: {label}")
+    def action(modeladmin, request, queryset):
+        modeladmin.set_status(request, queryset, status)
+    action.__name__ = f'mark_{status}'
+    return action
+
+
+@admin.register(Order)
+class OrderAdmin(IndexedSearchMixin, LargeTableAdmin):
+    list_display = ('id', 'user', 'status', 'completed', 'total', 'created_at')
+    list_filter = ('status', 'completed')
+    list_select_related = ('user',)
+    raw_id_fields = ('user',)
+    indexed_search_fields = ('pk', 'tracking_number', 'user__username')
+    inlines = (OrderItemInline,)
+    readonly_fields = ('status',)
+    actions = [
+        _status_action(status, label) for status, label in Order.STATUS_CHOICES if order_state.machine.sources(status)
+    ]
+
+    def set_status(self, request, queryset, status: str) -> None:
+        """Переводить вибрані замовлення через автомат статусів; недозволені переходи пропускаються."""
+        result = order_state.machine.bulk_transition(queryset, status, actor=request.user)
+        self.message_user(request, f"Оновлено замовлень: {result.total}", messages.SUCCESS)
+        skipped = queryset.exclude(status=status).count()
+        if skipped:
+            self.message_user(request, f"Пропущено (перехід заборонено): {skipped}", messages.WARNING)
+
+
+@admin.register(OrderItem)
+class OrderItemAdmin(IndexedSearchMixin, LargeTableAdmin):
+    list_display = ('__str__', 'order', 'price', 'discount')
+    list_select_related = ('bike', 'order__user')
+    raw_id_fields = ('order', 'bike')
+    indexed_search_fields = ('order__id', 'bike__id')
+
+
+class ArchivedOrderItemInline(admin.TabularInline):
+    model = ArchivedOrderItem
+    extra = 0
+    raw_id_fields = ('bike',)
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+
+@admin.register(ArchivedOrder)
+class ArchivedOrderAdmin(IndexedSearchMixin, LargeTableAdmin):
+    """Архів лише для читання: замовлення потрапляють сюди командою archive_orders."""
+    list_display = ('id', 'user', 'status', 'total', 'created_at', 'archived_at')
+    list_filter = ('status',)
+    list_select_related = ('user',)
+    indexed_search_fields = ('pk', 'user__username')
+    inlines = (ArchivedOrderItemInline,)
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+
+# ===== ЗНИЖКИ ТА ЗВІТИ =====
+
+@admin.register(PromotionRule)
+class PromotionRuleAdmin(admin.ModelAdmin):
+    list_display = ('name', 'kind', 'percent', 'bike_type', 'min_quantity', 'is_active')
+    list_filter = ('kind', 'is_active')
+    list_select_related = ('bike_type',)
+
+
+@admin.register(SalesRollup)
+class SalesRollupAdmin(LargeTableAdmin):
+    list_display = ('day', 'bike_type', 'status', 'units', 'gross', 'discount', 'net')
+    list_filter = ('status', 'bike_type')
+    list_select_related = ('bike_type',)
@@ -1,9 +1,16 @@
 """Конфігурація додатку 'shop'."""
 
 from django.apps import AppConfig
+from django.conf import settings
 
 class ShopConfig(AppConfig):
     """Конфігураційний клас для додатку 'shop'."""
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'shop'
 
+    def ready(self) -> None:
+        from . import signals  # noqa: F401 — реєстрація обробників сигналів
+
+        if getattr(settings, 'SHOP_WARMUP_ON_READY', False):
+            from .warmup import warm_worker
+            warm_worker()
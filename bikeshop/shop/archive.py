@@ -0,0 +1,103 @@
+"""
+Перенесення старих замовлень у архівні таблиці.
+
+Доставлені та скасовані замовлення старші за ``SHOP_ARCHIVE_AFTER_DAYS``
+днів переносяться з ``Order``/``OrderItem`` в ``ArchivedOrder``/
+``ArchivedOrderItem``, тож робочі таблиці та їхні індекси лишаються малими.
+Архівне замовлення зберігає свій id, поля і позиції.
+
+Перенесення йде пачками за первинним ключем; кожна пачка — окрема
+транзакція (вставка в архів + видалення з робочих таблиць), тож перерване
+завдання можна просто запустити знову: вже перенесені пачки не
+зачіпаються, а вставка з ``ignore_conflicts`` терпить повтор пачки.
+
+Зведення продажів (``SalesRollup``) не змінюються: видалення замовлень
+у них не віднімається, а ``rollups.rebuild`` враховує і архів. Історія
+замовлень користувача читається через :func:`user_orders`.
+"""
+
+import logging
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from itertools import chain
+from operator import attrgetter
+from typing import List, Optional
+
+from django.db import transaction
+from django.utils import timezone
+
+from .models import ArchivedOrder, ArchivedOrderItem, Order, OrderFields, OrderItem
+
+logger = logging.getLogger(__name__)
+
+ARCHIVABLE_STATUSES = ('delivered', 'canceled')
+DEFAULT_CHUNK_SIZE = 1000
+
+ORDER_FIELDS = [field.attname for field in OrderFields._meta.concrete_fields]
+ITEM_FIELDS = ['id', 'order_id', 'bike_id', 'quantity', 'price', 'discount']
+
+
+@dataclass
+class ArchiveReport:
+    """Підсумок запуску архівації."""
+    cutoff: datetime
+    orders: int = 0
+    items: int = 0
+    chunks: int = 0
+
+
+def archivable_orders(cutoff: datetime):
+    """Замовлення, що підлягають перенесенню в архів."""
+    return Order.objects.filter(status__in=ARCHIVABLE_STATUSES, created_at__lt=cutoff)
+
+
+def archive_chunk(order_ids: List[int]) -> int:
+    """Переносить замовлення з позиціями в одній транзакції; повертає кількість позицій."""
+    with transaction.atomic():
+        orders = list(Order.objects.filter(pk__in=order_ids).values('id', *ORDER_FIELDS))
+        items = list(OrderItem.objects.filter(order_id__in=order_ids).values(*ITEM_FIELDS))
+        ArchivedOrder.objects.bulk_create(
+            [ArchivedOrder(**row) for row in orders], ignore_conflicts=True,
+        )
+        ArchivedOrderItem.objects.bulk_create(
+            [ArchivedOrderItem(**row) for row in items], ignore_conflicts=True,
+        )
+        # Без обробників post_delete на цих моделях Django видаляє одним DELETE
+        # на таблицю, не завантажуючи рядки
+        Order.objects.filter(pk__in=order_ids).delete()
+    return len(items)
+
+
+def archive_orders(older_than_days: int, chunk_size: int = DEFAULT_CHUNK_SIZE,
+                   now: Optional[datetime] = None, dry_run: bool = False) -> ArchiveReport:
+    """
+    Переносить доставлені та скасовані замовлення, створені понад
+    ``older_than_days`` днів тому, пачками по ``chunk_size``. ``dry_run``
+    лише рахує замовлення, які було б перенесено.
+    """
+    cutoff = (now or timezone.now()) - timedelta(days=older_than_days)
+    report = ArchiveReport(cutoff=cutoff)
+    candidates = archivable_orders(cutoff).order_by('pk')
+    if dry_run:
+        report.orders = candidates.count()
+        return report
+
+    last_pk = 0
+    while True:
+        order_ids = list(candidates.filter(pk__gt=last_pk).values_list('pk', flat=True)[:chunk_size])
+        if not order_ids:
+            break
+        last_pk = order_ids[-1]
+        report.items += archive_chunk(order_ids)
+        report.orders += len(order_ids)
+        report.chunks += 1
+        logger.debug("Archived orders up to #%s", last_pk)
+    logger.info("Archived %d orders (%d items) created before %s", report.orders, report.items, cutoff)
+    return report
+
+
+def user_orders(user) -> list:
+    """Робочі й архівні замовлення користувача, від найновіших."""
+    hot = Order.objects.filter(user=user).order_by('-created_at')
+    cold = ArchivedOrder.objects.filter(user=user).order_by('-created_at')
+    return sorted(chain(hot, cold), key=attrgetter('created_at'), reverse=True)
@@ -0,0 +1,190 @@
+"""
+Підказки пошуку під час набору: назви велосипедів у наявності і типів.
+
+Індекс — відсортований список ключів у пам'яті процесу. Для кожної назви
+ключами є згорнуті (``catalog_snapshot.fold``) хвости від початку кожного
+слова: «Швидкий Вітер» дає «швидкий вітер» і «вітер», тож префікс «віт»
+знаходить велосипед. Ключі розкладені за групами ранжування — типи, збіг
+з початку назви велосипеда, збіг з іншого слова — в одному відсортованому
+списку. Пошук — ``bisect`` до першого ключа з префіксом у кожній групі і
+прохід, доки не набереться ``limit`` різних елементів: результати вже
+впорядковані (група, потім абетка), тож запит не сортує кандидатів і не
+залежить від того, скільки назв починається з однієї літери.
+
+Індекс будується зі знімка каталогу (shop/catalog_snapshot.py) і
+оновлюється інкрементально сигналами ``Bike``/``BikeType`` після коміту.
+Зміни з інших воркерів (і масові UPDATE без сигналів) приходять з новою
+версією каталогу: коли на диску з'являється знімок цієї версії, індекс
+перечитується з нього. Запит ніколи не звертається до БД: якщо знімка
+нової версії ще немає, відповідає наявний індекс.
+
+Тож знімок на диску обов'язковий: його записує прогрів воркера
+(shop/warmup.py) або команда ``build_catalog_snapshot`` під час деплою.
+Поки знімка немає, підказки порожні, про що індекс попереджає в лозі.
+"""
+
+import logging
+import os
+import threading
+from bisect import bisect_left, insort
+from typing import Dict, List, Optional, Tuple
+
+from django.conf import settings
+
+from .catalog import get_catalog_version
+from .catalog_snapshot import CatalogSnapshot, fold, peek_snapshot
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_LIMIT = 10
+MAX_LIMIT = 20
+MAX_QUERY_LENGTH = 100
+MAX_SCAN = 1000
+
+BIKE = 'bike'
+TYPE = 'type'
+
+# Групи ранжування: у видачі йдуть саме в цьому порядку
+TYPE_TIER, START_TIER, WORD_TIER = range(3)
+
+# (група, ключ, вид, id): кортежі порівнюються поелементно, тож (група, префікс) —
+# нижня межа ключів групи, що з нього починаються
+Entry = Tuple[int, str, str, int]
+
+
+def name_keys(name: str) -> List[Tuple[str, int]]:
+    """Згорнуті хвости назви від початку кожного слова з номером слова."""
+    words = fold(name).split()
+    return [(' '.join(words[position:]), position) for position in range(len(words))]
+
+
+def item_entries(kind: str, item_id: int, name: str) -> List[Entry]:
+    entries = []
+    for key, position in name_keys(name):
+        tier = TYPE_TIER if kind == TYPE else START_TIER if position == 0 else WORD_TIER
+        entries.append((tier, key, kind, item_id))
+    return entries
+
+
+class PrefixIndex:
+    """Відсортований масив ключів назв; зміни й пошук — під блокуванням."""
+
+    def __init__(self, version: Optional[int] = None):
+        self.version = version
+        self.entries: List[Entry] = []
+        self.names: Dict[Tuple[str, int], str] = {}
+        self.lock = threading.Lock()
+
+    @classmethod
+    def from_snapshot(cls, snapshot: CatalogSnapshot) -> 'PrefixIndex':
+        index = cls(snapshot.version)
+        items = [(TYPE, bike_type.id, bike_type.name) for bike_type in snapshot.bike_types()]
+        items += [(BIKE, bike.id, bike.name) for bike in snapshot.bikes(in_stock=True)]
+        index.entries = sorted(entry for item in items for entry in item_entries(*item))
+        index.names = {(kind, item_id): name for kind, item_id, name in items}
+        return index
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def put(self, kind: str, item_id: int, name: Optional[str]) -> None:
+        """Додає, перейменовує або (``name=None``) прибирає елемент."""
+        with self.lock:
+            old = self.names.pop((kind, item_id), None)
+            if old is not None:
+                for entry in item_entries(kind, item_id, old):
+                    at = bisect_left(self.entries, entry)
+                    if at < len(self.entries) and self.entries[at] == entry:
+                        del self.entries[at]
+            if name:
+                self.names[(kind, item_id)] = name
+                for entry in item_entries(kind, item_id, name):
+                    insort(self.entries, entry)
+
+    def search(self, query: str, limit: int = DEFAULT_LIMIT) -> List[dict]:
+        prefix = ' '.join(fold(query).split())
+        if not prefix or limit < 1:
+            return []
+        found: Dict[Tuple[str, int], str] = {}
+        with self.lock:
+            entries, names = self.entries, self.names
+            for tier in (TYPE_TIER, START_TIER, WORD_TIER):
+                at = bisect_left(entries, (tier, prefix))
+                # Елемент може трапитися кілька разів (кілька слів з префіксом) — MAX_SCAN обмежує прохід
+                for position in range(at, min(at + MAX_SCAN, len(entries))):
+                    entry_tier, key, kind, item_id = entries[position]
+                    if entry_tier != tier or not key.startswith(prefix):
+                        break
+                    item = (kind, item_id)
+                    if item not in found:
+                        found[item] = names[item]
+                        if len(found) == limit:
+                            break
+                if len(found) == limit:
+                    break
+        return [{'kind': kind, 'id': item_id, 'name': name} for (kind, item_id), name in found.items()]
+
+
+# ===== ІНДЕКС ПРОЦЕСУ =====
+
+_index: Optional[PrefixIndex] = None
+_index_lock = threading.Lock()
+# Остання перевірена ідентичність файлу знімка: поки файл не змінився, повторно не відкриваємо
+_seen_file: Optional[tuple] = None
+
+
+def _snapshot_file() -> Optional[tuple]:
+    try:
+        stat = os.stat(settings.SHOP_CATALOG_SNAPSHOT)
+    except OSError:
+        return None
+    return stat.st_ino, stat.st_mtime_ns, stat.st_size
+
+
+def get_index() -> PrefixIndex:
+    """
+    Індекс процесу. Якщо версія каталогу новіша за індекс і на диску
+    з'явився знімок цієї версії, індекс перебудовується з нього; інакше
+    повертається наявний (порожній, доки знімка немає взагалі).
+    """
+    global _index, _seen_file
+    index = _index
+    version = get_catalog_version()
+    if index is not None and index.version == version:
+        return index
+    file_id = _snapshot_file()
+    if index is not None and file_id == _seen_file:
+        return index
+    with _index_lock:
+        if _index is not None and (_index.version == version or file_id == _seen_file):
+            return _index
+        snapshot = peek_snapshot(version)
+        _seen_file = file_id
+        if snapshot is not None:
+            _index = PrefixIndex.from_snapshot(snapshot)
+        elif _index is None or _index.version is None:
+            # Раз на стан файлу: наступні запити повертаються вище, доки файл не зміниться
+            logger.warning("Autocomplete index is empty: no catalog snapshot v%s at %s "
+                           "(run build_catalog_snapshot)", version, settings.SHOP_CATALOG_SNAPSHOT)
+            _index = _index or PrefixIndex()
+        return _index
+
+
+def reset() -> None:
+    """Забуває індекс процесу (тести, зміна налаштувань)."""
+    global _index, _seen_file
+    _index, _seen_file = None, None
+
+
+def search(query: str, limit: int = DEFAULT_LIMIT) -> List[dict]:
+    return get_index().search(query, limit)
+
+
+def item_changed(kind: str, item_id: int, name: Optional[str]) -> None:
+    """
+    Інкрементальне оновлення з сигналів після коміту (``name=None`` —
+    прибрати); без побудованого індексу нічого не робить.
+    """
+    index = _index
+    if index is not None:
+        index.put(kind, item_id, name)
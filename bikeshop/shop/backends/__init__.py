@@ -0,0 +1,4 @@
+"""
+Інфраструктурні бекенди додатку shop: сесії, сховище flash-повідомлень
+і сховище статики з хешованими іменами.
+"""
@@ -0,0 +1,71 @@
+"""
+Файловий кеш для сесій без сканування каталогу на кожен запис.
+
+``FileBasedCache._cull`` перелічує весь каталог кешу при кожному ``set``,
+тож за десятків тисяч сесій кожне збереження сесії коштує O(записів). Крім
+того, при переповненні він видаляє випадкові записи — серед них і сесії,
+зміни яких ще не синхронізовані з БД (див. shop/backends/sessions.py).
+
+Тут каталог перевіряється не частіше ніж раз на ``CULL_INTERVAL`` секунд
+(у межах процесу), і спершу з нього прибираються прострочені записи. Живі
+записи видаляються випадково, лише якщо після цього кеш усе ще переповнений,
+і про це пишеться попередження в лог.
+"""
+
+import logging
+import random
+import threading
+import time
+
+from django.core.cache.backends.filebased import FileBasedCache
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CULL_INTERVAL = 60
+
+
+class SessionFileCache(FileBasedCache):
+    """FileBasedCache з рідкісним відсіюванням, що спершу видаляє прострочене."""
+
+    # Час останньої перевірки за каталогом кешу — спільний для всіх
+    # екземплярів процесу (Django створює екземпляр кешу на потік)
+    _culled_at = {}
+    _cull_lock = threading.Lock()
+
+    def __init__(self, dir, params):
+        super().__init__(dir, params)
+        options = params.get('OPTIONS', {})
+        self._cull_interval = int(options.get('CULL_INTERVAL', DEFAULT_CULL_INTERVAL))
+
+    def _cull(self):
+        now = time.monotonic()
+        with self._cull_lock:
+            if now - self._culled_at.get(self._dir, -self._cull_interval) < self._cull_interval:
+                return
+            self._culled_at[self._dir] = now
+
+        filelist = self._list_cache_files()
+        if len(filelist) < self._max_entries:
+            return
+        filelist = [fname for fname in filelist if not self._expire(fname)]
+        num_entries = len(filelist)
+        if num_entries < self._max_entries:
+            return
+        if self._cull_frequency == 0:
+            doomed = filelist
+        else:
+            doomed = random.sample(filelist, int(num_entries / self._cull_frequency))
+        logger.warning(
+            "Session cache %s is full (%d live entries, MAX_ENTRIES %d): dropping %d; "
+            "unsynced session changes are lost", self._dir, num_entries, self._max_entries, len(doomed),
+        )
+        for fname in doomed:
+            self._delete(fname)
+
+    def _expire(self, fname: str) -> bool:
+        """Видаляє файл, якщо запис прострочений; True — якщо файлу вже немає."""
+        try:
+            with open(fname, 'rb') as f:
+                return self._is_expired(f)
+        except FileNotFoundError:
+            return True
@@ -0,0 +1,43 @@
+"""
+Cookie-сховище flash-повідомлень з обмеженням розміру.
+
+``messages.info/success/error`` у ``create_order`` та ``apply_discount``
+викликаються майже на кожну дію з кошиком. Зберігання повідомлень у cookie
+замість сесії прибирає зайві записи в ``django_session``.
+"""
+
+import logging
+
+from django.conf import settings
+from django.contrib.messages.storage.base import Message
+from django.contrib.messages.storage.cookie import CookieStorage
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_COOKIE_SIZE = 2048
+DEFAULT_MAX_MESSAGE_LENGTH = 300
+
+
+class GuardedCookieStorage(CookieStorage):
+    """
+    CookieStorage, що обрізає надто довгі повідомлення та логує ті,
+    які не вмістилися в cookie (найстаріші відкидаються першими).
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.max_cookie_size = getattr(settings, 'SHOP_MESSAGE_COOKIE_MAX_SIZE', DEFAULT_MAX_COOKIE_SIZE)
+        self.max_message_length = getattr(settings, 'SHOP_MESSAGE_MAX_LENGTH', DEFAULT_MAX_MESSAGE_LENGTH)
+
+    def _truncate(self, message: Message) -> Message:
+        text = str(message.message)
+        if len(text) <= self.max_message_length:
+            return message
+        return Message(message.level, text[:self.max_message_length - 1] + '…', message.extra_tags)
+
+    def _store(self, messages, response, remove_oldest=True, *args, **kwargs):
+        messages = [self._truncate(message) for message in messages]
+        unstored = super()._store(messages, response, remove_oldest, *args, **kwargs)
+        if unstored:
+            logger.warning("Dropped %d flash message(s) that did not fit into the cookie", len(unstored))
+        return unstored
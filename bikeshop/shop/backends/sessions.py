@@ -0,0 +1,102 @@
+"""
+Сесії в кеші з відкладеним (write-behind) записом у базу даних.
+
+Стандартний ``cached_db`` записує сесію в таблицю ``django_session`` при
+кожній зміні. Цей бекенд тримає актуальні дані в кеші, а в БД синхронізує їх
+лише коли це справді потрібно:
+
+* при створенні сесії або зміні ключа (``cycle_key`` під час входу);
+* коли змінилися дані автентифікації (``_auth_user_id``/``_auth_user_hash``);
+* коли від останньої синхронізації минуло ``SHOP_SESSION_SYNC_INTERVAL`` секунд.
+
+Вихід (``flush``) видаляє рядок із БД та кешу. Підключення в settings.py::
+
+    SESSION_ENGINE = 'shop.backends.sessions'
+    SESSION_CACHE_ALIAS = 'sessions'
+
+Якщо запис сесії зник із кешу (відсіювання при переповненні), сесія
+читається з БД, тож втрачаються щонайбільше зміни за останній інтервал
+синхронізації. Тому сесіям потрібен окремий кеш (``SessionFileCache`` з
+shop/backends/cache.py), а не спільний із рештою даних.
+"""
+
+import logging
+import time
+
+from django.conf import settings
+from django.contrib.auth import HASH_SESSION_KEY, SESSION_KEY
+from django.contrib.sessions.backends.cached_db import SessionStore as CachedDBStore
+
+logger = logging.getLogger(__name__)
+
+SYNC_KEY_SUFFIX = ':sync'
+DEFAULT_SYNC_INTERVAL = 60
+
+
+class SessionStore(CachedDBStore):
+    """Сесія, що пише в кеш одразу, а в БД — лише при вході/виході або за інтервалом."""
+
+    @property
+    def sync_interval(self) -> int:
+        return getattr(settings, 'SHOP_SESSION_SYNC_INTERVAL', DEFAULT_SYNC_INTERVAL)
+
+    def _sync_key(self, session_key: str) -> str:
+        return self.cache_key_prefix + session_key + SYNC_KEY_SUFFIX
+
+    def _auth_fingerprint(self, data: dict) -> tuple:
+        return data.get(SESSION_KEY), data.get(HASH_SESSION_KEY)
+
+    def _needs_db_sync(self, meta, data: dict) -> bool:
+        """Чи треба зараз записати сесію в БД, а не лише в кеш."""
+        if meta is None:
+            return True
+        synced_at, auth = meta
+        if auth != self._auth_fingerprint(data):
+            return True
+        return time.time() - synced_at >= self.sync_interval
+
+    def _sync_meta(self, data: dict) -> tuple:
+        return time.time(), self._auth_fingerprint(data)
+
+    def save(self, must_create=False):
+        if self.session_key is None:
+            return self.create()
+        data = self._get_session(no_load=must_create)
+        sync_key = self._sync_key(self.session_key)
+        if must_create or self._needs_db_sync(self._cache.get(sync_key), data):
+            super().save(must_create)
+            self._cache.set(sync_key, self._sync_meta(data), self.get_expiry_age())
+            return
+        # Write-behind: БД оновиться при наступній синхронізації.
+        try:
+            self._cache.set(self.cache_key, data, self.get_expiry_age())
+        except Exception:
+            logger.exception("Error saving session to cache (%s)", self._cache)
+
+    async def asave(self, must_create=False):
+        if self.session_key is None:
+            return await self.acreate()
+        data = await self._aget_session(no_load=must_create)
+        sync_key = self._sync_key(self.session_key)
+        if must_create or self._needs_db_sync(await self._cache.aget(sync_key), data):
+            await super().asave(must_create)
+            await self._cache.aset(sync_key, self._sync_meta(data), await self.aget_expiry_age())
+            return
+        try:
+            await self._cache.aset(await self.acache_key(), data, await self.aget_expiry_age())
+        except Exception:
+            logger.exception("Error saving session to cache (%s)", self._cache)
+
+    def delete(self, session_key=None):
+        if session_key is None:
+            session_key = self.session_key
+        super().delete(session_key)
+        if session_key is not None:
+            self._cache.delete(self._sync_key(session_key))
+
+    async def adelete(self, session_key=None):
+        if session_key is None:
+            session_key = self.session_key
+        await super().adelete(session_key)
+        if session_key is not None:
+            await self._cache.adelete(self._sync_key(session_key))
@@ -0,0 +1,66 @@
+"""
+Сховище статики з хешами вмісту в іменах і gzip-варіантами.
+
+``collectstatic`` копіює файли в ``STATIC_ROOT`` під іменами на кшталт
+``css/styles.3f2a9c1b0d4e.css`` і пише маніфест; такі файли незмінні, тож
+їх можна віддавати з кешуванням «назавжди». Для CSS, JS і SVG поруч
+записується ``.gz``-варіант (лише якщо він менший за оригінал), який
+``FileServingMiddleware`` віддає клієнтам з ``Accept-Encoding: gzip``.
+
+Поки маніфесту немає (розробка, тести без collectstatic), ``{% static %}``
+повертає звичайні імена замість помилки.
+"""
+
+import gzip
+import logging
+import os
+
+from django.contrib.staticfiles.storage import ManifestStaticFilesStorage
+
+logger = logging.getLogger(__name__)
+
+COMPRESSIBLE_EXTENSIONS = ('.css', '.js', '.svg')
+GZIP_LEVEL = 9
+
+
+class CompressedManifestStaticFilesStorage(ManifestStaticFilesStorage):
+    """ManifestStaticFilesStorage з gzip-варіантами і запасними іменами без маніфесту."""
+    manifest_strict = False
+
+    def stored_name(self, name):
+        if not self.hashed_files:
+            # Маніфест ще не зібрано: віддаємо ім'я як є
+            return name
+        return super().stored_name(name)
+
+    def post_process(self, paths, dry_run=False, **options):
+        processed_names = []
+        for name, hashed_name, processed in super().post_process(paths, dry_run, **options):
+            if isinstance(processed, Exception):
+                yield name, hashed_name, processed
+                continue
+            processed_names.append(name)
+            if hashed_name:
+                processed_names.append(hashed_name)
+            yield name, hashed_name, processed
+        if dry_run:
+            return
+
+        compressed = sum(self.compress(name) for name in processed_names
+                         if name.endswith(COMPRESSIBLE_EXTENSIONS))
+        logger.info("Wrote %d gzip variants of static files", compressed)
+
+    def compress(self, name: str) -> bool:
+        """Записує ``name.gz``, якщо стиснення зменшує файл. Повертає True, якщо записано."""
+        path = self.path(name)
+        with open(path, 'rb') as f:
+            content = f.read()
+        # mtime=0 — однаковий вміст дає однакові байти при повторних збираннях
+        packed = gzip.compress(content, compresslevel=GZIP_LEVEL, mtime=0)
+        if len(packed) >= len(content):
+            return False
+        tmp_path = path + '.gz.tmp'
+        with open(tmp_path, 'wb') as f:
+            f.write(packed)
+        os.replace(tmp_path, path + '.gz')
+        return True
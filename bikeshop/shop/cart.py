@@ -0,0 +1,131 @@
+"""
+Пакетне додавання велосипедів у кошик.
+
+Запит з багатьма парами (велосипед, кількість) обробляється фіксованою
+кількістю запитів незалежно від їхнього числа: один на перевірку всіх
+велосипедів, один на наявні позиції кошика, ``bulk_create``/``bulk_update``
+для позицій і один перерахунок знижок через ``pricing.price_orders``.
+"""
+
+from dataclasses import dataclass
+from typing import Dict, Optional
+
+from django.db import transaction
+
+from .models import Bike, Order, OrderItem
+from .pricing import PricingResult, price_orders
+
+MODES = ('add', 'set')
+MAX_LINES = 200
+MAX_QUANTITY = 1000
+
+
+class CartError(ValueError):
+    """Некоректний запит до кошика; ``details`` — дані для відповіді JSON."""
+
+    def __init__(self, message: str, **details):
+        super().__init__(message)
+        self.details = details
+
+
+@dataclass
+class CartUpdate:
+    """Результат оновлення кошика."""
+    order: Order
+    created: int = 0
+    updated: int = 0
+    removed: int = 0
+    pricing: Optional[PricingResult] = None
+
+
+def parse_lines(payload, mode: str = 'add', max_lines: int = MAX_LINES) -> Dict[int, int]:
+    """
+    Перевіряє список ``[{"bike_id": 1, "quantity": 2}, ...]`` і повертає
+    {bike_id: кількість}; повтори одного велосипеда підсумовуються.
+    У режимі ``set`` кількість 0 прибирає позицію.
+    """
+    if mode not in MODES:
+        raise CartError(f"Невідомий режим {mode!r}")
+    if not isinstance(payload, list) or not payload:
+        raise CartError("Очікується непорожній список позицій")
+    if len(payload) > max_lines:
+        raise CartError(f"Не більше {max_lines} позицій за запит")
+
+    min_quantity = 0 if mode == 'set' else 1
+    lines: Dict[int, int] = {}
+    for index, line in enumerate(payload):
+        try:
+            bike_id, quantity = line['bike_id'], line.get('quantity', 1)
+        except (TypeError, KeyError):
+            raise CartError("Позиція має містити bike_id", line=index)
+        # type() замість isinstance: True/False не мають проходити як 1/0
+        if type(bike_id) is not int or type(quantity) is not int or not min_quantity <= quantity <= MAX_QUANTITY:
+            raise CartError("Некоректний bike_id або кількість", line=index)
+        lines[bike_id] = lines.get(bike_id, 0) + quantity
+    if any(quantity > MAX_QUANTITY for quantity in lines.values()):
+        raise CartError(f"Кількість одного велосипеда не може перевищувати {MAX_QUANTITY}")
+    return lines
+
+
+def update_cart(user, lines: Dict[int, int], mode: str = 'add') -> CartUpdate:
+    """
+    Додає (``add``) або встановлює (``set``) кількості велосипедів у відкритому
+    кошику користувача, створюючи кошик за потреби, і раз перераховує знижки.
+    """
+    with transaction.atomic():
+        # Прибрати позицію (``set`` з 0) можна й для велосипеда, якого вже немає в наявності
+        wanted = [bike_id for bike_id, quantity in lines.items() if quantity]
+        prices = dict(Bike.objects.filter(pk__in=wanted, in_stock=True).values_list('pk', 'price'))
+        missing = sorted(set(wanted) - set(prices))
+        if missing:
+            raise CartError("Велосипеди не знайдено або їх немає в наявності", bike_ids=missing)
+
+        order = user.order_set.open_carts().last()
+        if order is None:
+            order = Order.objects.create(user=user, total=0)
+        else:
+            Order.objects.filter(pk=order.pk).touch()
+        existing = {item.bike_id: item for item in order.items.filter(bike_id__in=lines)}
+        if mode == 'add':
+            # parse_lines перевіряє лише запит; разом із кошиком межа теж діє
+            over = sorted(bike_id for bike_id, item in existing.items()
+                          if item.quantity + lines[bike_id] > MAX_QUANTITY)
+            if over:
+                raise CartError(f"Кількість одного велосипеда не може перевищувати {MAX_QUANTITY}", bike_ids=over)
+
+        update = CartUpdate(order=order)
+        to_create, to_update, to_delete = [], [], []
+        for bike_id, quantity in lines.items():
+            item = existing.get(bike_id)
+            if item is None:
+                if quantity:
+                    to_create.append(OrderItem(order=order, bike_id=bike_id, quantity=quantity, price=prices[bike_id]))
+            elif mode == 'add' or quantity != item.quantity:
+                if quantity:
+                    item.quantity = item.quantity + quantity if mode == 'add' else quantity
+                    to_update.append(item)
+                else:
+                    to_delete.append(item.pk)
+
+        OrderItem.objects.bulk_create(to_create, batch_size=500)
+        OrderItem.objects.bulk_update(to_update, ['quantity'], batch_size=500)
+        if to_delete:
+            OrderItem.objects.filter(pk__in=to_delete).delete()
+        update.created, update.updated, update.removed = len(to_create), len(to_update), len(to_delete)
+        update.pricing = price_orders([order])[order.pk]
+    return update
+
+
+def cart_payload(order: Order) -> dict:
+    """Стан кошика для відповіді JSON; суми рядками, щоб не втрачати точність."""
+    items = order.items.order_by('pk').values_list('bike_id', 'quantity', 'price', 'discount')
+    return {
+        'order_id': order.pk,
+        'items': [
+            {'bike_id': bike_id, 'quantity': quantity, 'price': str(price), 'discount': str(discount)}
+            for bike_id, quantity, price, discount in items
+        ],
+        'total': f'{order.total:.2f}',
+        'discount': f'{order.discount:.2f}',
+        'discount_percent': order.discount_percent,
+    }
@@ -0,0 +1,69 @@
+"""
+Версія каталогу велосипедів.
+
+Версія — це число у спільному кеші, яке збільшується при кожній зміні
+``Bike``, ``BikeType`` або специфікацій. Її використовують як частину ключів
+кешу (фрагменти шаблонів тощо), тож застарілі записи просто перестають
+читатися і не потребують явної інвалідації.
+"""
+
+import time
+from typing import List
+
+from django.core.cache import caches
+
+CATALOG_VERSION_KEY = 'shop:catalog_version'
+CATALOG_CACHE_ALIAS = 'shared'
+BIKE_TYPES_KEY = 'shop:bike_types:{version}'
+
+
+def _cache():
+    return caches[CATALOG_CACHE_ALIAS]
+
+
+def get_version(key: str) -> int:
+    """Повертає лічильник версії зі спільного кешу, ініціалізуючи його за потреби."""
+    cache = _cache()
+    version = cache.get(key)
+    if version is None:
+        # Початкове значення від часу, щоб після очищення кешу версії не повторювалися
+        cache.add(key, time.time_ns() // 1000)
+        version = cache.get(key)
+    return version
+
+
+def bump_version(key: str) -> int:
+    """Збільшує лічильник версії і повертає нове значення."""
+    cache = _cache()
+    try:
+        return cache.incr(key)
+    except ValueError:
+        get_version(key)
+        return cache.incr(key)
+
+
+def get_catalog_version() -> int:
+    """Повертає поточну версію каталогу."""
+    return get_version(CATALOG_VERSION_KEY)
+
+
+def bump_catalog_version() -> int:
+    """Збільшує версію каталогу і повертає нове значення."""
+    return bump_version(CATALOG_VERSION_KEY)
+
+
+def get_bike_types() -> List:
+    """
+    Список типів велосипедів для навігації каталогу. Зберігається в локальному
+    кеші процесу під ключем з версією каталогу, тож запит до БД виконується
+    лише після зміни каталогу.
+    """
+    from .models import BikeType
+
+    cache = caches['default']
+    key = BIKE_TYPES_KEY.format(version=get_catalog_version())
+    bike_types = cache.get(key)
+    if bike_types is None:
+        bike_types = list(BikeType.objects.all())
+        cache.set(key, bike_types, None)
+    return bike_types
@@ -0,0 +1,209 @@
+"""
+JSON API каталогу для мобільного застосунку.
+
+    GET /api/bikes/?fields=id,name,price&type=2&limit=50&cursor=…
+    GET /api/bikes/?ids=1,2,3&fields=id,price
+
+Дані читаються з відображеного знімка каталогу (shop/catalog_snapshot.py),
+тож ні список, ні пакетний пошук за ``ids`` не звертаються до БД: кожен id
+знаходиться двійковим пошуком у колонці id знімка.
+
+* ``fields`` — розріджений набір полів (``FIELDS``); без нього —
+  ``DEFAULT_FIELDS``. Значення беруться прямо з колонок знімка, тож
+  непотрібні поля (і рядки, які їх зберігають) не декодуються;
+* ціна — рядок з копійок (``"12500.50"``) без проміжних ``float`` і ``Decimal``;
+* пагінація курсором за id: ``next`` — непрозорий курсор наступної
+  сторінки або null; зміни каталогу між сторінками не зсувають позицію;
+* ``ETag`` — версія каталогу; ``If-None-Match`` з поточною версією
+  отримує 304 ще до відкриття знімка.
+"""
+
+import base64
+import json
+from itertools import islice
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+from django.core.files.storage import FileSystemStorage
+from django.utils.encoding import filepath_to_uri
+
+from .catalog_snapshot import CatalogSnapshot
+
+DEFAULT_FIELDS = ('id', 'name', 'type', 'price', 'in_stock', 'image')
+DEFAULT_LIMIT = 50
+MAX_LIMIT = 500
+MAX_IDS = 200
+STOCK_FILTERS = {'1': True, '0': False, 'all': None}
+
+# Компактний JSON без перевірки циклів: дані — лише словники, рядки й числа
+_encode = json.JSONEncoder(ensure_ascii=False, check_circular=False, separators=(',', ':')).encode
+
+
+class CatalogApiError(ValueError):
+    """Некоректні параметри запиту (400)."""
+
+
+# ===== ПОЛЯ =====
+# Кожне поле — функція, що за знімком повертає читача значення за номером рядка
+
+def _number(column: str) -> Callable:
+    def bind(snapshot: CatalogSnapshot) -> Callable[[int], int]:
+        return snapshot.bike_columns[column].__getitem__
+    return bind
+
+
+def _text(column: str) -> Callable:
+    def bind(snapshot: CatalogSnapshot) -> Callable[[int], str]:
+        values, string = snapshot.bike_columns[column], snapshot.string
+        return lambda index: string(values[index])
+    return bind
+
+
+def _price(snapshot: CatalogSnapshot) -> Callable[[int], str]:
+    cents = snapshot.bike_columns['price']
+    return lambda index: '%d.%02d' % divmod(cents[index], 100)
+
+
+def _in_stock(snapshot: CatalogSnapshot) -> Callable[[int], bool]:
+    values = snapshot.bike_columns['in_stock']
+    return lambda index: bool(values[index])
+
+
+def _type_name(snapshot: CatalogSnapshot) -> Callable[[int], str]:
+    names = {bike_type.id: bike_type.name for bike_type in snapshot.bike_types()}
+    types = snapshot.bike_columns['bike_type_id']
+    return lambda index: names.get(types[index], '')
+
+
+def _image(snapshot: CatalogSnapshot) -> Callable[[int], Optional[str]]:
+    from .models import Bike
+
+    storage = Bike._meta.get_field('image').storage
+    values, string = snapshot.bike_columns['image'], snapshot.string
+    # Те саме, що FileSystemStorage.url, але без urljoin на кожен рядок: він у рази повільніший за решту полів
+    base_url = storage.base_url if isinstance(storage, FileSystemStorage) else None
+
+    def image(index: int) -> Optional[str]:
+        name = string(values[index])
+        if not name:
+            return None
+        return base_url + filepath_to_uri(name).lstrip('/') if base_url is not None else storage.url(name)
+    return image
+
+
+def _specifics(snapshot: CatalogSnapshot) -> Callable[[int], str]:
+    from .models import DEFAULT_SPECIFICS
+
+    values, string = snapshot.bike_columns['specifics_text'], snapshot.string
+    return lambda index: string(values[index]) or DEFAULT_SPECIFICS
+
+
+def _specs(snapshot: CatalogSnapshot) -> Callable[[int], dict]:
+    values, string = snapshot.bike_columns['specs'], snapshot.string
+    return lambda index: json.loads(string(values[index]))
+
+
+FIELDS: Dict[str, Callable] = {
+    'id': _number('id'),
+    'name': _text('name'),
+    'type': _number('bike_type_id'),
+    'type_name': _type_name,
+    'price': _price,
+    'in_stock': _in_stock,
+    'description': _text('description'),
+    'image': _image,
+    'specifics': _specifics,
+    'specs': _specs,
+}
+
+
+# ===== ПАРАМЕТРИ =====
+
+def parse_fields(value: Optional[str]) -> Tuple[str, ...]:
+    """Поля з ``?fields=a,b`` у порядку запиту, без повторів."""
+    if not value:
+        return DEFAULT_FIELDS
+    fields = tuple(dict.fromkeys(name.strip() for name in value.split(',') if name.strip()))
+    unknown = [name for name in fields if name not in FIELDS]
+    if unknown or not fields:
+        raise CatalogApiError(f"Невідомі поля: {', '.join(unknown)}; доступні: {', '.join(FIELDS)}")
+    return fields
+
+
+def parse_ids(value: str) -> List[int]:
+    """Id з ``?ids=1,2,3`` у порядку запиту, без повторів."""
+    try:
+        ids = list(dict.fromkeys(int(part) for part in value.split(',') if part.strip()))
+    except ValueError:
+        raise CatalogApiError("ids — список цілих чисел через кому") from None
+    if not ids:
+        raise CatalogApiError("Порожній список ids")
+    if len(ids) > MAX_IDS:
+        raise CatalogApiError(f"Не більше {MAX_IDS} ids за запит")
+    return ids
+
+
+def is_number(value: str) -> bool:
+    """Невід'ємне ціле з цифр ASCII: ``isdigit()`` пропускає «²», яке не приймає ``int()``."""
+    return value.isascii() and value.isdecimal()
+
+
+def parse_limit(value: Optional[str]) -> int:
+    if not value:
+        return DEFAULT_LIMIT
+    if not is_number(value) or not 1 <= int(value) <= MAX_LIMIT:
+        raise CatalogApiError(f"limit — число від 1 до {MAX_LIMIT}")
+    return int(value)
+
+
+def encode_cursor(last_id: int) -> str:
+    return base64.urlsafe_b64encode(f'id:{last_id}'.encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor: Optional[str]) -> int:
+    """Id, після якого починається сторінка (0 — перша сторінка)."""
+    if not cursor:
+        return 0
+    try:
+        kind, _, value = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)).decode().partition(':')
+        if kind == 'id' and is_number(value):
+            return int(value)
+    # binascii.Error, UnicodeDecodeError і ValueError самого urlsafe_b64decode для не-ASCII курсора
+    except ValueError:
+        pass
+    raise CatalogApiError("Некоректний курсор")
+
+
+# ===== ВІДПОВІДІ =====
+
+def serialize(snapshot: CatalogSnapshot, indexes: Sequence[int], fields: Sequence[str]) -> List[dict]:
+    """Словники з полями ``fields`` для рядків знімка ``indexes``."""
+    readers = [(name, FIELDS[name](snapshot)) for name in fields]
+    return [{name: read(index) for name, read in readers} for index in indexes]
+
+
+def bike_page(snapshot: CatalogSnapshot, fields: Sequence[str], after: int = 0, limit: int = DEFAULT_LIMIT,
+              in_stock: Optional[bool] = True, bike_type_id: Optional[int] = None) -> dict:
+    """Сторінка каталогу після id ``after`` і курсор наступної."""
+    # Зайвий рядок показує, чи є наступна сторінка
+    indexes = list(islice(snapshot.scan(after, in_stock, bike_type_id), limit + 1))
+    has_next = len(indexes) > limit
+    del indexes[limit:]
+    return {
+        'version': snapshot.version,
+        'results': serialize(snapshot, indexes, fields),
+        'next': encode_cursor(snapshot.bike_columns['id'][indexes[-1]]) if has_next else None,
+    }
+
+
+def bike_batch(snapshot: CatalogSnapshot, ids: Sequence[int], fields: Sequence[str]) -> dict:
+    """Велосипеди за id у порядку запиту; відсутні id — у ``missing``."""
+    found = [(bike_id, snapshot.index(bike_id)) for bike_id in ids]
+    return {
+        'version': snapshot.version,
+        'results': serialize(snapshot, [index for _, index in found if index is not None], fields),
+        'missing': [bike_id for bike_id, index in found if index is None],
+    }
+
+
+def render(payload: dict) -> bytes:
+    return _encode(payload).encode()
@@ -0,0 +1,415 @@
+"""
+Бінарний знімок каталогу, спільний для воркерів хоста через mmap.
+
+Файл ``SHOP_CATALOG_SNAPSHOT`` містить велосипеди, типи і зведені
+специфікації у вигляді масивів-колонок і таблиці рядків:
+
+* заголовок ``HEADER`` — сигнатура, формат, версія каталогу, кількості;
+* колонки велосипедів (``BIKE_COLUMNS``, відсортовані за id) і типів
+  (``TYPE_COLUMNS``); текстові поля — індекси в таблиці рядків, ціна —
+  копійки;
+* таблиця рядків: зсуви (u32) і UTF-8 дані; однакові рядки (тексти
+  специфік, шляхи зображень) зберігаються один раз.
+
+Кожна секція вирівняна на 8 байтів; числа — у нативному порядку байтів
+(little-endian на всіх цільових платформах). Воркер відображає файл через
+mmap і читає колонки як ``memoryview.cast`` без копіювання: сторінки файлу
+спільні в кеші ОС, а рядки декодуються лише при зверненні до поля, тож
+закешована картка каталогу (їй потрібен лише id) не декодує нічого.
+
+Знімок позначено версією каталогу (shop/catalog.py). Перший воркер, який
+побачив нову версію, перебудовує файл під блокуванням (fcntl) і атомарно
+підміняє його ``os.replace``; решта відкривають уже готовий файл. Старе
+відображення лишається чинним, доки на нього є посилання.
+"""
+
+import json
+import logging
+import mmap
+import os
+import struct
+import threading
+import time
+import unicodedata
+from array import array
+from bisect import bisect_left, bisect_right
+from contextlib import contextmanager
+from decimal import Decimal
+from typing import Dict, Iterator, List, Optional
+
+try:
+    import fcntl
+except ImportError:  # Windows: без блокувань, можлива зайва паралельна перебудова
+    fcntl = None
+
+from django.conf import settings
+from django.db.models.fields.files import FieldFile
+
+from .catalog import get_catalog_version
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b'BKSN'
+FORMAT_VERSION = 2
+# Сигнатура, формат, версія каталогу, велосипедів, типів, рядків
+HEADER = struct.Struct('<4sHxxQIII')
+ALIGN = 8
+
+BIKE_COLUMNS = (
+    ('id', 'q'), ('bike_type_id', 'q'), ('price', 'q'),
+    ('name', 'I'), ('folded_name', 'I'), ('description', 'I'), ('image', 'I'),
+    ('specifics_text', 'I'), ('specs', 'I'), ('in_stock', 'B'),
+)
+TYPE_COLUMNS = (('id', 'q'), ('name', 'I'), ('description', 'I'))
+BIKE_VALUES = (
+    'pk', 'bike_type_id', 'price', 'name', 'description', 'image', 'specifics_text', 'specs', 'in_stock',
+)
+
+
+class SnapshotError(ValueError):
+    """Файл не є знімком каталогу або має інший формат."""
+
+
+# Апостроф в українських словах набирають різними символами: ’ (U+2019), ʼ (U+02BC), ‘, `, ´
+APOSTROPHES = str.maketrans({'\u2019': "'", '\u02bc': "'", '\u2018': "'", '`': "'", '\u00b4': "'"})
+
+
+def fold(text: str) -> str:
+    """
+    Нормалізація для пошуку без урахування регістру: NFC (складені «й», «ї»
+    з комбінованими знаками), casefold і один вид апострофа («м’який» = «м'який»).
+    """
+    return unicodedata.normalize('NFC', text).casefold().translate(APOSTROPHES)
+
+
+def _align(offset: int) -> int:
+    return -(-offset // ALIGN) * ALIGN
+
+
+def _layout(bikes: int, types: int, strings: int) -> Dict[str, tuple]:
+    """Зсуви секцій: ім'я -> (зсув, код масиву, кількість); 'blob' — початок даних рядків."""
+    layout, offset = {}, HEADER.size
+    sections = [(f'bike.{name}', code, bikes) for name, code in BIKE_COLUMNS]
+    sections += [(f'type.{name}', code, types) for name, code in TYPE_COLUMNS]
+    sections.append(('strings', 'I', strings + 1))
+    for name, code, count in sections:
+        offset = _align(offset)
+        layout[name] = (offset, code, count)
+        offset += array(code).itemsize * count
+    layout['blob'] = (_align(offset), 'B', None)
+    return layout
+
+
+# ===== ЗАПИС =====
+
+class _StringTable:
+    def __init__(self):
+        self.index: Dict[str, int] = {}
+        self.offsets = array('I', [0])
+        self.data = bytearray()
+
+    def add(self, text: str) -> int:
+        position = self.index.get(text)
+        if position is None:
+            position = self.index[text] = len(self.offsets) - 1
+            self.data += text.encode()
+            self.offsets.append(len(self.data))
+        return position
+
+
+def write_snapshot(path: str, chunk_size: int = 2000) -> int:
+    """
+    Будує знімок з БД і атомарно підміняє ним файл ``path``. Повертає
+    версію каталогу, якою позначено знімок.
+    """
+    from .models import Bike, BikeType
+
+    # Версія читається до даних: зміна під час побудови дасть нову версію,
+    # і знімок просто перебудують ще раз
+    version = get_catalog_version()
+    strings = _StringTable()
+    bikes = {name: array(code) for name, code in BIKE_COLUMNS}
+    for pk, type_id, price, name, description, image, specifics, specs, in_stock in (
+        Bike.objects.order_by('pk').values_list(*BIKE_VALUES).iterator(chunk_size=chunk_size)
+    ):
+        row = (
+            pk, type_id, int(price.scaleb(2)), strings.add(name), strings.add(fold(name)),
+            strings.add(description), strings.add(image or ''), strings.add(specifics),
+            strings.add(json.dumps(specs, ensure_ascii=False, sort_keys=True)), in_stock,
+        )
+        for (column, _), value in zip(BIKE_COLUMNS, row):
+            bikes[column].append(value)
+    types = {name: array(code) for name, code in TYPE_COLUMNS}
+    for pk, name, description in BikeType.objects.order_by('pk').values_list('pk', 'name', 'description'):
+        for (column, _), value in zip(TYPE_COLUMNS, (pk, strings.add(name), strings.add(description))):
+            types[column].append(value)
+
+    arrays = {f'bike.{name}': values for name, values in bikes.items()}
+    arrays.update((f'type.{name}', values) for name, values in types.items())
+    arrays['strings'] = strings.offsets
+    layout = _layout(len(bikes['id']), len(types['id']), len(strings.index))
+
+    directory = os.path.dirname(path) or '.'
+    os.makedirs(directory, exist_ok=True)
+    tmp_path = f'{path}.{os.getpid()}.tmp'
+    try:
+        with open(tmp_path, 'wb') as f:
+            f.write(HEADER.pack(MAGIC, FORMAT_VERSION, version, len(bikes['id']), len(types['id']),
+                                len(strings.index)))
+            for name, (offset, _, _) in layout.items():
+                f.write(b'\0' * (offset - f.tell()))
+                f.write(strings.data if name == 'blob' else arrays[name].tobytes())
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+        raise
+    return version
+
+
+# ===== ЧИТАННЯ =====
+
+class SnapshotBike:
+    """Велосипед зі знімка з тими полями, що потрібні шаблонам каталогу."""
+    __slots__ = ('_snapshot', '_index')
+
+    def __init__(self, snapshot: 'CatalogSnapshot', index: int):
+        self._snapshot = snapshot
+        self._index = index
+
+    def _string(self, column: str) -> str:
+        return self._snapshot.string(self._snapshot.bike_columns[column][self._index])
+
+    @property
+    def id(self) -> int:
+        return self._snapshot.bike_columns['id'][self._index]
+
+    pk = id
+
+    @property
+    def bike_type_id(self) -> int:
+        return self._snapshot.bike_columns['bike_type_id'][self._index]
+
+    @property
+    def price(self) -> Decimal:
+        return Decimal(self._snapshot.bike_columns['price'][self._index]).scaleb(-2)
+
+    @property
+    def in_stock(self) -> bool:
+        return bool(self._snapshot.bike_columns['in_stock'][self._index])
+
+    @property
+    def name(self) -> str:
+        return self._string('name')
+
+    @property
+    def description(self) -> str:
+        return self._string('description')
+
+    @property
+    def image(self) -> FieldFile:
+        from .models import Bike
+        return FieldFile(None, Bike._meta.get_field('image'), self._string('image'))
+
+    @property
+    def specifics_text(self) -> str:
+        return self._string('specifics_text')
+
+    @property
+    def specs(self) -> dict:
+        return json.loads(self._string('specs'))
+
+    def get_specifics(self) -> str:
+        from .models import DEFAULT_SPECIFICS
+        return self.specifics_text or DEFAULT_SPECIFICS
+
+    def __eq__(self, other) -> bool:
+        return isinstance(other, SnapshotBike) and self.id == other.id
+
+    def __hash__(self) -> int:
+        return hash(self.id)
+
+    def __repr__(self) -> str:
+        return f"<SnapshotBike {self.id}: {self.name}>"
+
+
+class SnapshotBikeType:
+    """Тип велосипеда зі знімка."""
+    __slots__ = ('id', 'name', 'description')
+
+    def __init__(self, id: int, name: str, description: str):
+        self.id, self.name, self.description = id, name, description
+
+    @property
+    def pk(self) -> int:
+        return self.id
+
+    def __str__(self) -> str:
+        return self.name
+
+
+class CatalogSnapshot:
+    """Відображений у пам'ять знімок; колонки — ``memoryview`` без копіювання."""
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, 'rb') as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if len(self._map) < HEADER.size:
+            raise SnapshotError(f"{path}: файл обрізано")
+        magic, fmt, self.version, bikes, types, strings = HEADER.unpack_from(self._map)
+        if magic != MAGIC or fmt != FORMAT_VERSION:
+            raise SnapshotError(f"{path}: невідомий формат знімка")
+        view = memoryview(self._map)
+        layout = _layout(bikes, types, strings)
+        columns = {}
+        for name, (offset, code, count) in layout.items():
+            if name != 'blob':
+                size = array(code).itemsize * count
+                columns[name] = view[offset:offset + size].cast(code)
+        self._offsets = columns.pop('strings')
+        blob_start = layout['blob'][0]
+        if len(self._map) < blob_start + self._offsets[-1]:
+            raise SnapshotError(f"{path}: файл обрізано")
+        self._blob = view[blob_start:blob_start + self._offsets[-1]]
+        self.bike_columns = {name[5:]: values for name, values in columns.items() if name.startswith('bike.')}
+        self.type_columns = {name[5:]: values for name, values in columns.items() if name.startswith('type.')}
+
+    def __len__(self) -> int:
+        return len(self.bike_columns['id'])
+
+    def string(self, index: int) -> str:
+        return str(self._blob[self._offsets[index]:self._offsets[index + 1]], 'utf-8')
+
+    def index(self, bike_id: int) -> Optional[int]:
+        """Номер рядка велосипеда за id (двійковий пошук) або None."""
+        ids = self.bike_columns['id']
+        index = bisect_left(ids, bike_id)
+        if index < len(ids) and ids[index] == bike_id:
+            return index
+        return None
+
+    def get(self, bike_id: int) -> Optional[SnapshotBike]:
+        """Велосипед за id або None."""
+        index = self.index(bike_id)
+        return None if index is None else SnapshotBike(self, index)
+
+    def scan(self, after: int = 0, in_stock: Optional[bool] = None,
+             bike_type_id: Optional[int] = None) -> Iterator[int]:
+        """Номери рядків велосипедів з id більшим за ``after``, у порядку id, з фільтрами."""
+        columns = self.bike_columns
+        stock, types = columns['in_stock'], columns['bike_type_id']
+        for index in range(bisect_right(columns['id'], after), len(self)):
+            if ((in_stock is None or bool(stock[index]) == in_stock)
+                    and (bike_type_id is None or types[index] == bike_type_id)):
+                yield index
+
+    def bikes(self, in_stock: Optional[bool] = None, bike_type_id: Optional[int] = None,
+              query: str = '') -> List[SnapshotBike]:
+        """Велосипеди в порядку id з фільтрами наявності, типу і підрядка назви."""
+        columns = self.bike_columns
+        stock, types, names = columns['in_stock'], columns['bike_type_id'], columns['folded_name']
+        query = fold(query)
+        return [
+            SnapshotBike(self, index) for index in range(len(self))
+            if (in_stock is None or bool(stock[index]) == in_stock)
+            and (bike_type_id is None or types[index] == bike_type_id)
+            and (not query or query in self.string(names[index]))
+        ]
+
+    def bike_types(self) -> List[SnapshotBikeType]:
+        return [self._bike_type(index) for index in range(len(self.type_columns['id']))]
+
+    def bike_type(self, type_id: int) -> Optional[SnapshotBikeType]:
+        ids = self.type_columns['id']
+        index = bisect_left(ids, type_id)
+        if index < len(ids) and ids[index] == type_id:
+            return self._bike_type(index)
+        return None
+
+    def _bike_type(self, index: int) -> SnapshotBikeType:
+        columns = self.type_columns
+        return SnapshotBikeType(columns['id'][index], self.string(columns['name'][index]),
+                                self.string(columns['description'][index]))
+
+
+# ===== ЗНІМОК ПРОЦЕСУ =====
+
+_current: Optional[CatalogSnapshot] = None
+_current_lock = threading.Lock()
+
+
+@contextmanager
+def _build_lock(path: str):
+    """Міжпроцесне блокування перебудови (файл ``<path>.lock``)."""
+    if fcntl is None:
+        yield
+        return
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    fd = os.open(f'{path}.lock', os.O_RDWR | os.O_CREAT, 0o600)
+    try:
+        fcntl.flock(fd, fcntl.LOCK_EX)
+        yield
+    finally:
+        os.close(fd)
+
+
+def _open(path: str, version: int) -> Optional[CatalogSnapshot]:
+    """Знімок з файлу, якщо він є і позначений потрібною версією."""
+    try:
+        snapshot = CatalogSnapshot(path)
+    except (OSError, SnapshotError):
+        return None
+    return snapshot if snapshot.version == version else None
+
+
+def peek_snapshot(version: Optional[int] = None) -> Optional[CatalogSnapshot]:
+    """
+    Знімок версії ``version`` (за замовчуванням поточної), якщо він уже
+    відкритий у процесі або записаний на диск; None — інакше. Ніколи не
+    будує знімок, тож не звертається до БД.
+    """
+    global _current
+    path = str(settings.SHOP_CATALOG_SNAPSHOT)
+    version = get_catalog_version() if version is None else version
+    snapshot = _current
+    if snapshot is not None and snapshot.path == path and snapshot.version == version:
+        return snapshot
+    with _current_lock:
+        snapshot = _current
+        if snapshot is None or snapshot.path != path or snapshot.version != version:
+            snapshot = _open(path, version)
+            if snapshot is not None:
+                _current = snapshot
+    return snapshot
+
+
+def get_snapshot() -> CatalogSnapshot:
+    """
+    Знімок поточної версії каталогу. Відкривається один раз на версію
+    в процесі; застарілий файл перебудовується одним із воркерів.
+    """
+    global _current
+    path = str(settings.SHOP_CATALOG_SNAPSHOT)
+    version = get_catalog_version()
+    snapshot = peek_snapshot(version)
+    if snapshot is not None:
+        return snapshot
+    with _current_lock:
+        snapshot = _current
+        if snapshot is not None and snapshot.path == path and snapshot.version == version:
+            return snapshot
+        snapshot = _open(path, version)
+        if snapshot is None:
+            with _build_lock(path):
+                snapshot = _open(path, version)
+                if snapshot is None:
+                    started = time.perf_counter()
+                    write_snapshot(path)
+                    snapshot = CatalogSnapshot(path)
+                    logger.info("Built catalog snapshot v%d (%d bikes) in %.1f ms", snapshot.version,
+                                len(snapshot), (time.perf_counter() - started) * 1000)
+        _current = snapshot
+    return snapshot
@@ -0,0 +1,144 @@
+"""
+Потокове вивантаження замовлень для бухгалтерії (CSV або JSON Lines).
+
+Кожен рядок — позиція замовлення разом із полями замовлення, користувачем
+і назвою велосипеда; робочі й архівні замовлення (див. shop/archive.py)
+вивантажуються разом. Рядки читаються ``values_list(...).iterator()``
+пачками без створення об'єктів моделей і одразу кодуються, тож пам'ять не
+залежить від обсягу вивантаження. ``gzip=True`` стискає потік на льоту.
+
+Використовується представленням ``export_orders`` (``StreamingHttpResponse``)
+і командою ``manage.py export_orders``.
+"""
+
+import csv
+import io
+import json
+import zlib
+from dataclasses import dataclass
+from datetime import date, datetime, time, timedelta
+from decimal import Decimal
+from itertools import chain, islice
+from typing import Iterable, Iterator, Optional, Sequence, Tuple
+
+from django.utils import timezone
+
+from .models import ArchivedOrderItem, Order, OrderItem
+
+FORMATS = ('csv', 'jsonl')
+CONTENT_TYPES = {'csv': 'text/csv; charset=utf-8', 'jsonl': 'application/x-ndjson'}
+DEFAULT_CHUNK_SIZE = 2000
+# Рядків на один фрагмент відповіді: менше викликів write() на сервері
+ROWS_PER_CHUNK = 500
+
+COLUMNS = (
+    'order_id', 'created_at', 'username', 'email', 'status', 'completed', 'tracking_number',
+    'order_total', 'order_discount', 'item_id', 'bike_id', 'bike_name', 'quantity', 'price', 'item_discount',
+)
+ITEM_LOOKUPS = (
+    'order_id', 'order__created_at', 'order__user__username', 'order__user__email', 'order__status',
+    'order__completed', 'order__tracking_number', 'order__total', 'order__discount', 'id', 'bike_id',
+    'bike__name', 'quantity', 'price', 'discount',
+)
+
+
+@dataclass(frozen=True)
+class ExportFilter:
+    """Умови вибірки: дні створення (включно) і статуси замовлень."""
+    since: Optional[date] = None
+    until: Optional[date] = None
+    statuses: Tuple[str, ...] = ()
+
+    def __post_init__(self):
+        valid = {status for status, _ in Order.STATUS_CHOICES}
+        unknown = set(self.statuses) - valid
+        if unknown:
+            raise ValueError(f"Невідомі статуси: {', '.join(sorted(unknown))}")
+
+    def lookups(self) -> dict:
+        # Межі як datetime, а не __date: так працює індекс за created_at
+        lookups = {}
+        if self.since:
+            lookups['order__created_at__gte'] = timezone.make_aware(datetime.combine(self.since, time.min))
+        if self.until:
+            lookups['order__created_at__lt'] = timezone.make_aware(
+                datetime.combine(self.until + timedelta(days=1), time.min)
+            )
+        if self.statuses:
+            lookups['order__status__in'] = self.statuses
+        return lookups
+
+
+def export_rows(filters: ExportFilter = ExportFilter(), chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[tuple]:
+    """Кортежі значень у порядку ``COLUMNS``: спершу архівні, потім робочі замовлення."""
+    lookups = filters.lookups()
+    querysets = (
+        model.objects.filter(**lookups).order_by('order_id', 'pk').values_list(*ITEM_LOOKUPS)
+        for model in (ArchivedOrderItem, OrderItem)
+    )
+    return chain.from_iterable(queryset.iterator(chunk_size=chunk_size) for queryset in querysets)
+
+
+def _json_default(value):
+    if isinstance(value, Decimal):
+        # Рядком, щоб не втратити копійки при розборі як float
+        return str(value)
+    if isinstance(value, datetime):
+        return value.isoformat()
+    raise TypeError(f"{type(value).__name__} не серіалізується в JSON")
+
+
+def _batches(rows: Iterable[Sequence], size: int) -> Iterator[list]:
+    iterator = iter(rows)
+    while True:
+        batch = list(islice(iterator, size))
+        if not batch:
+            return
+        yield batch
+
+
+def encode_csv(rows: Iterable[Sequence], rows_per_chunk: int = ROWS_PER_CHUNK) -> Iterator[bytes]:
+    """CSV з заголовком; Decimal і datetime пише їхнім ``str()``."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(COLUMNS)
+    for batch in _batches(rows, rows_per_chunk):
+        writer.writerows(batch)
+        yield buffer.getvalue().encode()
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue().encode()
+
+
+def encode_jsonl(rows: Iterable[Sequence], rows_per_chunk: int = ROWS_PER_CHUNK) -> Iterator[bytes]:
+    """Об'єкт JSON на рядок; суми рядками, дати в ISO 8601."""
+    dumps = json.JSONEncoder(ensure_ascii=False, default=_json_default).encode
+    for batch in _batches(rows, rows_per_chunk):
+        yield ''.join([dumps(dict(zip(COLUMNS, row))) + '\n' for row in batch]).encode()
+
+
+ENCODERS = {'csv': encode_csv, 'jsonl': encode_jsonl}
+
+
+def gzip_stream(chunks: Iterable[bytes], level: int = 6) -> Iterator[bytes]:
+    """Стискає потік у формат gzip, не накопичуючи його в пам'яті."""
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+    for chunk in chunks:
+        data = compressor.compress(chunk)
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+def stream(rows: Iterable[Sequence], fmt: str = 'csv', gzip: bool = False) -> Iterator[bytes]:
+    """Байтовий потік вивантаження у форматі ``fmt`` (``csv`` або ``jsonl``)."""
+    if fmt not in ENCODERS:
+        raise ValueError(f"Невідомий формат {fmt!r}, очікується один з: {', '.join(FORMATS)}")
+    chunks = ENCODERS[fmt](rows)
+    return gzip_stream(chunks) if gzip else chunks
+
+
+def filename(fmt: str, gzip: bool = False) -> str:
+    name = f"orders-{timezone.localdate():%Y%m%d}.{fmt}"
+    return name + '.gz' if gzip else name
@@ -0,0 +1,183 @@
+"""
+Хешування і перевірка паролів в обмеженому пулі процесів.
+
+PBKDF2 із сотнями тисяч ітерацій займає потік запиту на десятки-сотні
+мілісекунд. Асинхронні представлення входу й реєстрації віддають цю роботу
+в ``ProcessPoolExecutor`` і чекають результат, не блокуючи цикл подій,
+тож інші запити воркера (каталог тощо) обслуговуються паралельно.
+
+Черга обмежена ``SHOP_HASHING_MAX_PENDING``: коли в роботі стільки завдань,
+нові відхиляються з :class:`HashingPoolBusy` (представлення відповідають
+503 з ``Retry-After``). Лічильники черги повертає :func:`stats`.
+``SHOP_HASHING_WORKERS = 0`` вимикає пул: хешування виконується на місці.
+"""
+
+import asyncio
+import logging
+import multiprocessing
+import os
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import Callable, Dict, Optional, Tuple
+
+from django.conf import settings
+from django.contrib.auth.hashers import check_password, identify_hasher, make_password
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_WORKERS = 2
+DEFAULT_MAX_PENDING = 32
+
+
+class HashingPoolBusy(Exception):
+    """У черзі хешування вже максимальна кількість завдань."""
+
+
+# ===== ФУНКЦІЇ ДЛЯ ПРОЦЕСІВ ПУЛУ =====
+
+def _init_worker(settings_module: str) -> None:
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', settings_module)
+    # Процес пулу лише хешує: прогрів воркера йому не потрібен
+    os.environ['SHOP_WARMUP_ON_READY'] = '0'
+    import django
+    django.setup()
+
+
+def _hash(raw_password: str) -> str:
+    return make_password(raw_password)
+
+
+def _verify(raw_password: str, encoded: str) -> Tuple[bool, bool]:
+    """Повертає (пароль правильний, хеш потребує оновлення)."""
+    if not check_password(raw_password, encoded):
+        return False, False
+    try:
+        must_update = identify_hasher(encoded).must_update(encoded)
+    except ValueError:
+        must_update = False
+    return True, must_update
+
+
+# ===== ПУЛ =====
+
+class HashingPool:
+    """ProcessPoolExecutor з обмеженою чергою і лічильниками."""
+
+    def __init__(self, workers: int, max_pending: int):
+        self.workers = workers
+        self.max_pending = max_pending
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+        self.pending = 0
+        self.peak_pending = 0
+        self.completed = 0
+        self.rejected = 0
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            # spawn, а не fork: воркер сервера може мати потоки з захопленими блокуваннями
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context('spawn'),
+                initializer=_init_worker,
+                initargs=(os.environ.get('DJANGO_SETTINGS_MODULE', 'bikeshop.settings'),),
+            )
+        return self._executor
+
+    def submit(self, fn: Callable, *args) -> Future:
+        with self._lock:
+            if self.pending >= self.max_pending:
+                self.rejected += 1
+                logger.warning("Password hashing queue is full (%d pending)", self.pending)
+                raise HashingPoolBusy
+            self.pending += 1
+            self.peak_pending = max(self.peak_pending, self.pending)
+            executor = self._get_executor()
+        try:
+            future = executor.submit(fn, *args)
+        except Exception:
+            self._done(None)
+            raise
+        future.add_done_callback(self._done)
+        return future
+
+    def _done(self, future) -> None:
+        with self._lock:
+            self.pending -= 1
+            if future is not None:
+                self.completed += 1
+
+    def prestart(self) -> None:
+        """Запускає процеси пулу заздалегідь, щоб перший вхід не чекав на spawn."""
+        executor = self._get_executor()
+        for future in [executor.submit(os.getpid) for _ in range(self.workers)]:
+            future.result()
+
+    def shutdown(self) -> None:
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True, cancel_futures=True)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                'workers': self.workers,
+                'max_pending': self.max_pending,
+                'pending': self.pending,
+                'peak_pending': self.peak_pending,
+                'completed': self.completed,
+                'rejected': self.rejected,
+            }
+
+
+_pool: Optional[HashingPool] = None
+_pool_lock = threading.Lock()
+
+
+def get_pool() -> Optional[HashingPool]:
+    """Пул процесу (None, якщо ``SHOP_HASHING_WORKERS = 0``)."""
+    global _pool
+    workers = getattr(settings, 'SHOP_HASHING_WORKERS', DEFAULT_WORKERS)
+    if not workers:
+        return None
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = HashingPool(workers, getattr(settings, 'SHOP_HASHING_MAX_PENDING', DEFAULT_MAX_PENDING))
+    return _pool
+
+
+@receiver(setting_changed)
+def _reset_pool(setting, **kwargs) -> None:
+    """Зміна налаштувань пулу (наприклад, у тестах) створює новий пул."""
+    global _pool
+    if setting in ('SHOP_HASHING_WORKERS', 'SHOP_HASHING_MAX_PENDING'):
+        with _pool_lock:
+            pool, _pool = _pool, None
+        if pool is not None:
+            pool.shutdown()
+
+
+def stats() -> Dict[str, int]:
+    pool = get_pool()
+    return pool.stats() if pool else {'workers': 0}
+
+
+async def _run(fn: Callable, *args):
+    pool = get_pool()
+    if pool is None:
+        return fn(*args)
+    return await asyncio.wrap_future(pool.submit(fn, *args))
+
+
+async def ahash_password(raw_password: str) -> str:
+    """Хеш пароля для ``User.password``, обчислений у пулі."""
+    return await _run(_hash, raw_password)
+
+
+async def averify_password(raw_password: str, encoded: str) -> Tuple[bool, bool]:
+    """Перевіряє пароль у пулі; повертає (правильний, потрібне оновлення хешу)."""
+    return await _run(_verify, raw_password, encoded)
@@ -0,0 +1,339 @@
+"""
+Радник індексів: аналізує журнал запитів за допомогою EXPLAIN QUERY PLAN.
+
+Запити беруться з журналу (сирий SQL по рядку, JSONL ``{"sql", "params"}``
+або вивід логера ``django.db.backends``) чи захоплюються під час прогону
+представлень магазину на згенерованих даних. Для кожного унікального
+запиту (літерали відкидаються) радник шукає:
+
+* ``full_scan`` — повне сканування таблиці без індексу;
+* ``partial_index`` — індекс покриває не всі умови рівності по таблиці;
+* ``temp_sort`` — сортування через тимчасове B-дерево.
+
+Для таких запитів пропонується складений індекс (спершу колонки рівності,
+потім колонки діапазону/сортування), який пробно створюється в транзакції,
+що відкочується, щоб порівняти план і час виконання до та після.
+Працює з SQLite.
+"""
+
+import json
+import re
+import statistics
+import time
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from django.apps import apps
+from django.db import connection, models, transaction
+
+# Рядок логера django.db.backends: "(0.001) SELECT ...; args=(...); alias=default"
+BACKEND_LOG_RE = re.compile(r'^\(\d+(?:\.\d+)?\)\s+(?P<sql>.+?);\s+args=.*$')
+LITERAL_RE = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b")
+PREDICATE_RE = re.compile(
+    r'"(?P<table>\w+)"\."(?P<column>\w+)"\s*(?P<op>=|IN\s*\(|>=|<=|>|<|BETWEEN|IS\b)', re.IGNORECASE
+)
+# Булеві умови SQLite: "t"."c" або NOT "t"."c" без оператора порівняння
+BOOLEAN_RE = re.compile(r'(?:NOT\s+)?"(?P<table>\w+)"\."(?P<column>\w+)"(?=\s*(?:\)|AND\b|OR\b|$))', re.IGNORECASE)
+ORDER_COLUMN_RE = re.compile(r'"(?P<table>\w+)"\."(?P<column>\w+)"\s*(?:ASC|DESC)', re.IGNORECASE)
+PLAN_TABLE_RE = re.compile(r'^(?P<kind>SCAN|SEARCH) (?:TABLE )?(?P<table>\w+)(?: AS \w+)?(?P<rest>.*)$')
+PLAN_INDEX_COLUMNS_RE = re.compile(r'\((?P<columns>[^)]*)\)\s*$')
+
+ANALYZED_PREFIXES = ('SELECT', 'UPDATE', 'DELETE')
+TIMING_RUNS = 5
+
+
+class AdvisorError(Exception):
+    """Радник не може працювати з цією базою або журналом."""
+
+
+@dataclass
+class PlanSummary:
+    """Стислий план виконання запиту."""
+    lines: List[str]
+    full_scans: List[str] = field(default_factory=list)
+    temp_sorts: int = 0
+    # таблиця -> колонки, що використав індекс
+    index_columns: Dict[str, List[str]] = field(default_factory=dict)
+
+    @property
+    def cost(self) -> int:
+        """Умовна вартість плану: повне сканування значно дорожче за сортування."""
+        return 100 * len(self.full_scans) + 10 * self.temp_sorts + len(self.lines)
+
+
+@dataclass
+class IndexProposal:
+    """Запропонований складений індекс для моделі."""
+    model: type
+    fields: Tuple[str, ...]
+
+    @property
+    def table(self) -> str:
+        return self.model._meta.db_table
+
+    def columns(self) -> List[str]:
+        return [self.model._meta.get_field(name).column for name in self.fields]
+
+    def index_name(self) -> str:
+        """
+        Описове ім'я на кшталт ``shop_order_user_created``: таблиця і поля без
+        суфіксів ``_at``/``_id``. Задовге для Django — ім'я з хешем від Django.
+        """
+        name = '_'.join([self.table, *(re.sub(r'_(?:at|id)$', '', name) for name in self.fields)])
+        if len(name) <= models.Index.max_name_length:
+            return name
+        index = models.Index(fields=list(self.fields))
+        index.set_name_with_model(self.model)
+        return index.name
+
+    def as_index(self) -> models.Index:
+        return models.Index(fields=list(self.fields), name=self.index_name())
+
+
+@dataclass
+class QueryFinding:
+    """Результат аналізу одного унікального запиту."""
+    sql: str
+    count: int
+    problems: List[str]
+    plan_before: PlanSummary
+    proposal: Optional[IndexProposal] = None
+    plan_after: Optional[PlanSummary] = None
+    ms_before: Optional[float] = None
+    ms_after: Optional[float] = None
+
+    @property
+    def improved(self) -> bool:
+        """Пробний індекс здешевив план або задіяв більше колонок."""
+        if self.plan_after is None:
+            return False
+        if self.plan_after.cost < self.plan_before.cost:
+            return True
+        used_before = sum(map(len, self.plan_before.index_columns.values()))
+        used_after = sum(map(len, self.plan_after.index_columns.values()))
+        return used_after > used_before
+
+
+# ===== ЖУРНАЛ ЗАПИТІВ =====
+
+def parse_query_log(lines: Iterable[str]) -> List[Tuple[str, Optional[list]]]:
+    """Розбирає журнал у пари (sql, params)."""
+    queries = []
+    for line in lines:
+        line = line.strip()
+        if not line:
+            continue
+        if line.startswith('{'):
+            record = json.loads(line)
+            queries.append((record['sql'], record.get('params')))
+            continue
+        match = BACKEND_LOG_RE.match(line)
+        queries.append((match.group('sql') if match else line.rstrip(';'), None))
+    return queries
+
+
+def fingerprint(sql: str) -> str:
+    """Нормалізує запит: літерали замінюються на '?', пробіли стискаються."""
+    return ' '.join(LITERAL_RE.sub('?', sql).split())
+
+
+def distinct_queries(queries: Iterable[Tuple[str, Optional[list]]]) -> List[Tuple[str, Optional[list], int]]:
+    """Групує запити за відбитком, зберігаючи перший зразок і кількість повторів."""
+    samples: Dict[str, list] = {}
+    for sql, params in queries:
+        if not sql.lstrip().upper().startswith(ANALYZED_PREFIXES):
+            continue
+        key = fingerprint(sql)
+        if key in samples:
+            samples[key][2] += 1
+        else:
+            samples[key] = [sql, params, 1]
+    return [tuple(sample) for sample in samples.values()]
+
+
+# ===== ПЛАНИ =====
+
+def explain(sql: str, params: Optional[list] = None) -> PlanSummary:
+    if connection.vendor != 'sqlite':
+        raise AdvisorError("Радник індексів підтримує лише SQLite (EXPLAIN QUERY PLAN)")
+    with connection.cursor() as cursor:
+        cursor.execute('EXPLAIN QUERY PLAN ' + sql, params or None)
+        details = [row[3] for row in cursor.fetchall()]
+
+    summary = PlanSummary(lines=details)
+    for detail in details:
+        if 'TEMP B-TREE' in detail and 'ORDER BY' in detail:
+            summary.temp_sorts += 1
+        match = PLAN_TABLE_RE.match(detail)
+        if not match:
+            continue
+        table, rest = match.group('table'), match.group('rest')
+        if match.group('kind') == 'SCAN' and 'INDEX' not in rest:
+            summary.full_scans.append(table)
+        columns = PLAN_INDEX_COLUMNS_RE.search(rest)
+        if 'INDEX' in rest and columns:
+            used = [part.split('=')[0].split('>')[0].split('<')[0].strip()
+                    for part in columns.group('columns').split(' AND ')]
+            summary.index_columns[table] = [column for column in used if column]
+    return summary
+
+
+def time_query(sql: str, params: Optional[list] = None) -> float:
+    """
+    Медіанний час виконання запиту в мілісекундах. Кожен прогін іде в
+    точці збереження, що відкочується: UPDATE/DELETE з журналу не змінюють
+    даних, і кожен прогін бачить ті самі рядки.
+    """
+    timings = []
+    with transaction.atomic(), connection.cursor() as cursor:
+        for _ in range(TIMING_RUNS):
+            savepoint = transaction.savepoint()
+            try:
+                started = time.perf_counter()
+                cursor.execute(sql, params or None)
+                if cursor.description:
+                    cursor.fetchall()
+                timings.append((time.perf_counter() - started) * 1000)
+            finally:
+                transaction.savepoint_rollback(savepoint)
+    return statistics.median(timings)
+
+
+# ===== ПРОПОЗИЦІЇ =====
+
+def _models_by_table() -> Dict[str, type]:
+    return {model._meta.db_table: model for model in apps.get_models()}
+
+
+def _where_clause(sql: str) -> str:
+    upper = sql.upper()
+    start = upper.find(' WHERE ')
+    if start < 0:
+        return ''
+    end = len(sql)
+    for keyword in (' GROUP BY ', ' ORDER BY ', ' LIMIT '):
+        position = upper.find(keyword, start)
+        if position >= 0:
+            end = min(end, position)
+    return sql[start:end]
+
+
+def _order_clause(sql: str) -> str:
+    position = sql.upper().rfind(' ORDER BY ')
+    return sql[position:] if position >= 0 else ''
+
+
+def predicate_columns(sql: str, table: str) -> Tuple[List[str], List[str], List[str]]:
+    """Колонки таблиці в умовах рівності, діапазону та в ORDER BY (у порядку появи)."""
+    equality, ranges, ordering = [], [], []
+    where = _where_clause(sql)
+    matches = [(m.start(), m.group('table'), m.group('column'), m.group('op').upper())
+               for m in PREDICATE_RE.finditer(where)]
+    matches += [(m.start(), m.group('table'), m.group('column'), '=') for m in BOOLEAN_RE.finditer(where)]
+    for _, match_table, column, op in sorted(matches):
+        if match_table != table:
+            continue
+        target = equality if op == '=' or op.startswith('IN') or op.startswith('IS') else ranges
+        if column not in equality and column not in ranges:
+            target.append(column)
+    for match in ORDER_COLUMN_RE.finditer(_order_clause(sql)):
+        column = match.group('column')
+        if match.group('table') == table and column not in equality + ranges + ordering:
+            ordering.append(column)
+    return equality, ranges, ordering
+
+
+def _existing_indexes(table: str) -> List[List[str]]:
+    with connection.cursor() as cursor:
+        constraints = connection.introspection.get_constraints(cursor, table)
+    return [info['columns'] for info in constraints.values() if info['index'] or info['unique']]
+
+
+def propose_index(sql: str, plan: PlanSummary) -> Tuple[List[str], Optional[IndexProposal]]:
+    """Визначає проблеми плану і пропонує індекс для першої проблемної таблиці."""
+    tables = _models_by_table()
+    problems = []
+    for table in dict.fromkeys(plan.full_scans + list(plan.index_columns) + list(tables)):
+        if table not in tables or f'"{table}"' not in sql:
+            continue
+        equality, ranges, ordering = predicate_columns(sql, table)
+        if not equality and not ranges and not ordering:
+            continue
+        used = plan.index_columns.get(table, [])
+        if table in plan.full_scans:
+            problems.append(f'full_scan:{table}')
+        elif table in plan.index_columns and len(used) < len(equality):
+            problems.append(f'partial_index:{table}')
+        elif plan.temp_sorts and ordering and table in plan.index_columns:
+            problems.append(f'temp_sort:{table}')
+        else:
+            continue
+
+        tail = ranges[:1] if ranges else ordering
+        columns = equality + [column for column in tail if column not in equality]
+        model = tables[table]
+        # Первинний ключ і так є ключем B-дерева таблиці
+        columns = [column for column in columns if column != model._meta.pk.column]
+        if not columns or any(existing[:len(columns)] == columns for existing in _existing_indexes(table)):
+            continue
+        by_column = {f.column: f.name for f in model._meta.concrete_fields}
+        if not all(column in by_column for column in columns):
+            continue
+        return problems, IndexProposal(model, tuple(by_column[column] for column in columns))
+    return problems, None
+
+
+def analyze(queries: Iterable[Tuple[str, Optional[list]]], measure: bool = True) -> List[QueryFinding]:
+    """Аналізує унікальні запити і пробно застосовує запропоновані індекси."""
+    findings = []
+    for sql, params, count in distinct_queries(queries):
+        plan = explain(sql, params)
+        problems, proposal = propose_index(sql, plan)
+        if not problems:
+            continue
+        finding = QueryFinding(sql=sql, count=count, problems=problems, plan_before=plan, proposal=proposal)
+        if measure:
+            finding.ms_before = time_query(sql, params)
+        if proposal:
+            _try_index(finding, params, measure)
+        findings.append(finding)
+    return findings
+
+
+def _try_index(finding: QueryFinding, params: Optional[list], measure: bool) -> None:
+    """Створює індекс у транзакції, знімає план і час, потім відкочує зміни."""
+    proposal = finding.proposal
+    quote = connection.ops.quote_name
+    # Без schema_editor: у SQLite він не працює всередині транзакції з увімкненими FK
+    create_sql = 'CREATE INDEX {} ON {} ({})'.format(
+        quote(proposal.as_index().name), quote(proposal.table),
+        ', '.join(quote(column) for column in proposal.columns()),
+    )
+    with transaction.atomic():
+        savepoint = transaction.savepoint()
+        try:
+            with connection.cursor() as cursor:
+                cursor.execute(create_sql)
+            finding.plan_after = explain(finding.sql, params)
+            if measure:
+                finding.ms_after = time_query(finding.sql, params)
+        finally:
+            transaction.savepoint_rollback(savepoint)
+
+
+def merge_proposals(findings: Iterable[QueryFinding]) -> List[IndexProposal]:
+    """
+    Залишає лише індекси, що покращили план, без дублікатів і без тих,
+    що є префіксом іншого запропонованого.
+    """
+    proposals: List[IndexProposal] = []
+    for finding in findings:
+        if finding.proposal and finding.improved and all(
+            (p.model, p.fields) != (finding.proposal.model, finding.proposal.fields) for p in proposals
+        ):
+            proposals.append(finding.proposal)
+    return [
+        p for p in proposals
+        if not any(o is not p and o.model is p.model and len(o.fields) > len(p.fields)
+                   and o.fields[:len(p.fields)] == p.fields for o in proposals)
+    ]
@@ -0,0 +1,142 @@
+"""
+Радник індексів на основі EXPLAIN QUERY PLAN.
+
+    python manage.py advise_indexes --log queries.log
+    python manage.py advise_indexes --seed --write-migration
+
+З ``--log`` аналізуються запити з журналу на поточній базі (пробні індекси
+створюються в транзакції, що відкочується). З ``--seed`` (типово) команда
+створює тимчасову тестову базу, наповнює її даними, проганяє представлення
+магазину і аналізує захоплені запити.
+"""
+
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.db.migrations import Migration, AddIndex
+from django.db.migrations.loader import MigrationLoader
+from django.db.migrations.writer import MigrationWriter
+from django.test.utils import CaptureQueriesContext, setup_test_environment, teardown_test_environment
+
+from ...index_advisor import AdvisorError, analyze, merge_proposals, parse_query_log
+
+
+def seed_dataset(bikes: int = 2000, users: int = 50, orders_per_user: int = 40):
+    """Генерує каталог і історію замовлень для прогону представлень."""
+    from django.contrib.auth.models import User
+    from ...models import Bike, BikeType, Order, OrderItem
+
+    types = [BikeType.objects.create(name=name, description='') for name in ('mountain', 'road', 'city')]
+    Bike.objects.bulk_create(
+        Bike(name=f'Bike {i}', bike_type=types[i % 3], price=Decimal('1000.00') + i, description='',
+             image='bikes/x.jpg', in_stock=i % 5 != 0)
+        for i in range(bikes)
+    )
+    bike_ids = list(Bike.objects.values_list('pk', flat=True))
+    people = User.objects.bulk_create(User(username=f'seed{i}', is_staff=i == 0, is_superuser=i == 0) for i in range(users))
+    orders = Order.objects.bulk_create(
+        Order(user=user, total=0, completed=n % 10 != 0) for user in people for n in range(orders_per_user)
+    )
+    OrderItem.objects.bulk_create(
+        (OrderItem(order=order, bike_id=bike_ids[(order.pk * 7 + k) % len(bike_ids)], price=Decimal('1000.00'))
+         for order in orders for k in range(3)),
+        batch_size=2000,
+    )
+    return people[0], types[0], bike_ids[1]
+
+
+def capture_shop_views(user, bike_type, bike_id):
+    """Проганяє основні представлення і повертає захоплені запити."""
+    from django.test import Client
+
+    client = Client()
+    client.force_login(user)
+    urls = [
+        '/bikes/', f'/bikes/?type={bike_type.pk}', f'/bikes/{bike_id}/order/',
+        '/profile/', '/reports/sales/', '/admin/shop/order/',
+    ]
+    with CaptureQueriesContext(connection) as ctx:
+        for url in urls:
+            client.get(url)
+    return [(query['sql'], None) for query in ctx.captured_queries]
+
+
+class Command(BaseCommand):
+    help = "Знаходить повні сканування в запитах і пропонує складені індекси"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--log', help="Журнал запитів: SQL по рядку, JSONL {sql, params} або лог django.db.backends")
+        parser.add_argument('--seed', action='store_true', help="Прогнати представлення на згенерованих даних (типово)")
+        parser.add_argument('--write-migration', action='store_true', help="Створити міграцію з індексами")
+        parser.add_argument('--no-timing', action='store_true', help="Не вимірювати час виконання запитів")
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'sqlite':
+            raise CommandError("Радник індексів підтримує лише SQLite")
+        measure = not options['no_timing']
+        try:
+            if options['log']:
+                with open(options['log'], encoding='utf-8') as f:
+                    findings = analyze(parse_query_log(f), measure=measure)
+            else:
+                findings = self._seeded_findings(measure)
+        except (OSError, ValueError, AdvisorError) as e:
+            raise CommandError(str(e))
+
+        self._report(findings)
+        proposals = merge_proposals(findings)
+        if not proposals:
+            self.stdout.write(self.style.SUCCESS("Відсутніх індексів не знайдено"))
+            return
+
+        self.stdout.write("\nДодайте до Meta.indexes відповідних моделей:")
+        for proposal in proposals:
+            index = proposal.as_index()
+            self.stdout.write(
+                f"  {proposal.model.__name__}: models.Index(fields={list(proposal.fields)!r}, name={index.name!r})"
+            )
+        if options['write_migration']:
+            path = self._write_migration(proposals)
+            self.stdout.write(self.style.SUCCESS(f"Міграцію записано: {path}"))
+
+    def _seeded_findings(self, measure: bool):
+        setup_test_environment()
+        old_name = connection.creation.create_test_db(verbosity=0, serialize=False)
+        try:
+            queries = capture_shop_views(*seed_dataset())
+            self.stdout.write(f"Захоплено запитів: {len(queries)}")
+            return analyze(queries, measure=measure)
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+            teardown_test_environment()
+
+    def _report(self, findings) -> None:
+        for finding in findings:
+            self.stdout.write(self.style.WARNING(f"\n[{', '.join(finding.problems)}] x{finding.count}"))
+            self.stdout.write(f"  {finding.sql[:300]}")
+            self.stdout.write(f"  план до:    {' | '.join(finding.plan_before.lines)} (вартість {finding.plan_before.cost})")
+            if finding.plan_after:
+                self.stdout.write(f"  план після: {' | '.join(finding.plan_after.lines)} (вартість {finding.plan_after.cost})")
+            if finding.ms_before is not None:
+                after = f"{finding.ms_after:.3f}" if finding.ms_after is not None else "—"
+                self.stdout.write(f"  час, мс:    {finding.ms_before:.3f} -> {after}")
+            if finding.proposal:
+                verdict = "покращує план" if finding.improved else "не покращує план"
+                self.stdout.write(f"  індекс:     {finding.proposal.model.__name__}{finding.proposal.fields} — {verdict}")
+
+    def _write_migration(self, proposals) -> str:
+        app_label = 'shop'
+        loader = MigrationLoader(None, ignore_no_migrations=True)
+        leaf = loader.graph.leaf_nodes(app_label)[0]
+        number = int(leaf[1].split('_')[0]) + 1
+        migration = Migration(f'{number:04d}_advised_indexes', app_label)
+        migration.dependencies = [leaf]
+        migration.operations = [
+            AddIndex(model_name=proposal.model._meta.model_name, index=proposal.as_index())
+            for proposal in proposals
+        ]
+        writer = MigrationWriter(migration)
+        with open(writer.path, 'w', encoding='utf-8') as f:
+            f.write(writer.as_string())
+        return writer.path
@@ -0,0 +1,31 @@
+"""
+Перенесення старих доставлених і скасованих замовлень в архівні таблиці.
+
+    python manage.py archive_orders --days 180 --chunk-size 1000
+
+Перервану команду можна запустити знову: вона продовжить з того місця,
+де зупинилася.
+"""
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from ...archive import archive_orders, DEFAULT_CHUNK_SIZE
+
+
+class Command(BaseCommand):
+    help = "Переносить доставлені та скасовані замовлення старші за N днів в архів"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, default=settings.SHOP_ARCHIVE_AFTER_DAYS)
+        parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE)
+        parser.add_argument('--dry-run', action='store_true', help="Лише порахувати замовлення")
+
+    def handle(self, *args, **options):
+        report = archive_orders(options['days'], chunk_size=options['chunk_size'], dry_run=options['dry_run'])
+        if options['dry_run']:
+            self.stdout.write(f"До архівації: {report.orders} замовлень, створених до {report.cutoff:%d.%m.%Y}")
+            return
+        self.stdout.write(self.style.SUCCESS(
+            f"Перенесено в архів: {report.orders} замовлень, {report.items} позицій ({report.chunks} пачок)"
+        ))
@@ -0,0 +1,31 @@
+"""
+Побудова знімка каталогу до запуску воркерів (наприклад, під час деплою).
+
+    python manage.py build_catalog_snapshot
+
+Воркери й самі перебудовують знімок при зміні каталогу; команда лише
+знімає цю роботу з першого запиту.
+"""
+
+import os
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from ...catalog_snapshot import CatalogSnapshot, write_snapshot
+
+
+class Command(BaseCommand):
+    help = "Записує бінарний знімок каталогу для спільного читання воркерами через mmap"
+
+    def add_arguments(self, parser):
+        parser.add_argument('-o', '--output', help="Файл (за замовчуванням SHOP_CATALOG_SNAPSHOT)")
+
+    def handle(self, *args, **options):
+        path = options['output'] or str(settings.SHOP_CATALOG_SNAPSHOT)
+        version = write_snapshot(path)
+        snapshot = CatalogSnapshot(path)
+        self.stdout.write(self.style.SUCCESS(
+            f"Знімок каталогу v{version}: {len(snapshot)} велосипедів, "
+            f"{os.path.getsize(path)} байтів у {path}"
+        ))
@@ -0,0 +1,55 @@
+"""
+Потокове вивантаження замовлень у файл або stdout.
+
+    python manage.py export_orders --format jsonl --since 2024-01-01 --status delivered --gzip -o orders.jsonl.gz
+"""
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils.dateparse import parse_date
+
+from ...export import DEFAULT_CHUNK_SIZE, FORMATS, ExportFilter, export_rows, stream
+
+
+def _date(value: str):
+    parsed = parse_date(value)
+    if parsed is None:
+        raise ValueError(value)
+    return parsed
+
+
+class Command(BaseCommand):
+    help = "Вивантажує позиції замовлень у CSV або JSON Lines, не тримаючи їх у пам'яті"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--format', choices=FORMATS, default='csv')
+        parser.add_argument('--since', type=_date, help="Перший день (YYYY-MM-DD)")
+        parser.add_argument('--until', type=_date, help="Останній день включно (YYYY-MM-DD)")
+        parser.add_argument('--status', action='append', default=[], help="Статус замовлення (можна кілька)")
+        parser.add_argument('--gzip', action='store_true', help="Стискати на льоту")
+        parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE)
+        parser.add_argument('-o', '--output', help="Файл (за замовчуванням stdout)")
+
+    def handle(self, *args, **options):
+        try:
+            filters = ExportFilter(since=options['since'], until=options['until'],
+                                   statuses=tuple(options['status']))
+        except ValueError as e:
+            raise CommandError(e)
+        chunks = stream(export_rows(filters, options['chunk_size']), options['format'], gzip=options['gzip'])
+
+        if options['output']:
+            with open(options['output'], 'wb') as f:
+                written = sum(f.write(chunk) for chunk in chunks)
+            self.stderr.write(self.style.SUCCESS(f"Записано {written} байтів у {options['output']}"))
+            return
+
+        buffer = getattr(self.stdout, 'buffer', None)
+        if buffer is not None:
+            for chunk in chunks:
+                buffer.write(chunk)
+            buffer.flush()
+        elif options['gzip']:
+            raise CommandError("Для --gzip без бінарного stdout вкажіть --output")
+        else:
+            for chunk in chunks:
+                self.stdout.write(chunk.decode(), ending='')
@@ -0,0 +1,61 @@
+"""
+Завантаження маніфесту перевізника: номери відстеження і статуси доставки.
+
+    python manage.py ingest_tracking manifest-2024-05-01.csv.gz --unmatched unmatched.csv
+
+Незіставлені, некоректні й відхилені рядки записуються в CSV ``--unmatched``
+(номер рядка, order_id, tracking_number, status, причина).
+"""
+
+import csv
+
+from django.core.management.base import BaseCommand, CommandError
+
+from ...tracking import DEFAULT_CHUNK_SIZE, FORMATS, detect_format, ingest, open_manifest, read_records
+
+PROBLEM_COLUMNS = ('line', 'order_id', 'tracking_number', 'status', 'reason')
+
+
+class Command(BaseCommand):
+    help = "Застосовує маніфест перевізника (CSV або JSON Lines) до замовлень"
+
+    def add_arguments(self, parser):
+        parser.add_argument('manifest', help="Файл маніфесту; *.gz розпаковується на льоту")
+        parser.add_argument('--format', choices=FORMATS, help="За замовчуванням — за розширенням файлу")
+        parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE)
+        parser.add_argument('--unmatched', help="CSV для незіставлених і відхилених рядків")
+
+    def handle(self, *args, **options):
+        path = options['manifest']
+        fmt = options['format'] or detect_format(path)
+        problems_file = writer = None
+        if options['unmatched']:
+            problems_file = open(options['unmatched'], 'w', encoding='utf-8', newline='')
+            writer = csv.writer(problems_file)
+            writer.writerow(PROBLEM_COLUMNS)
+
+        def on_problem(number, record, reason):
+            if writer is not None:
+                record = record or {}
+                writer.writerow((number, record.get('order_id', ''), record.get('tracking_number', ''),
+                                 record.get('status', ''), reason))
+
+        try:
+            with open_manifest(path) as f:
+                report = ingest(read_records(f, fmt), chunk_size=options['chunk_size'], on_problem=on_problem)
+        except OSError as e:
+            raise CommandError(e)
+        finally:
+            if problems_file is not None:
+                problems_file.close()
+
+        transitions = ', '.join(f"{status}: {count}" for status, count in sorted(report.transitions.items()))
+        self.stdout.write(self.style.SUCCESS(
+            f"Оброблено {report.lines} рядків за {report.seconds:.1f} с: зіставлено {report.matched}, "
+            f"нових номерів відстеження {report.tracking_updated}, переходів статусу {transitions or 0}"
+        ))
+        if report.unmatched or report.invalid or report.rejected:
+            self.stdout.write(self.style.WARNING(
+                f"Не знайдено замовлення: {report.unmatched}, некоректних: {report.invalid}, "
+                f"відхилених переходів: {report.rejected}"
+            ))
@@ -0,0 +1,27 @@
+"""
+Розсилка листів списку бажань за чергою змін; розраховано на запуск з cron.
+
+    python manage.py notify_watchers --page-size 5000 --mail-batch 100
+"""
+
+from django.core.management.base import BaseCommand
+
+from ...watchlist import DEFAULT_MAIL_BATCH, DEFAULT_PAGE_SIZE, notify_watchers
+
+
+class Command(BaseCommand):
+    help = "Надсилає дайджести про здешевлення і повернення в наявність велосипедів зі списків бажань"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--page-size', type=int, default=DEFAULT_PAGE_SIZE,
+                            help="Записів списку бажань на запит")
+        parser.add_argument('--mail-batch', type=int, default=DEFAULT_MAIL_BATCH,
+                            help="Листів на один виклик send_messages")
+
+    def handle(self, *args, **options):
+        report = notify_watchers(page_size=options['page_size'], mail_batch=options['mail_batch'])
+        self.stdout.write(self.style.SUCCESS(
+            f"Надіслано листів: {report.sent} з {report.digests} ({report.batches} пачок); "
+            f"велосипедів: {report.bikes}, подій: {report.events}, записів: {report.entries}, "
+            f"без email: {report.without_email}, {report.seconds:.2f} с"
+        ))
@@ -0,0 +1,21 @@
+"""
+Повна перебудова рекомендацій «часто купують разом» з історії замовлень.
+
+    python manage.py rebuild_recommendations --chunk-size 100000
+"""
+
+from django.core.management.base import BaseCommand
+
+from ...recommendations import rebuild, DEFAULT_CHUNK_SIZE
+
+
+class Command(BaseCommand):
+    help = "Перераховує BikeRecommendation зі спільних покупок у завершених замовленнях"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE,
+                            help="Рядків замовлень у пачці (обмежує пам'ять)")
+
+    def handle(self, *args, **options):
+        rows = rebuild(chunk_size=options['chunk_size'])
+        self.stdout.write(self.style.SUCCESS(f"Записано рекомендацій: {rows}"))
@@ -0,0 +1,20 @@
+"""
+Повна перебудова зведених таблиць продажів з історії замовлень.
+
+    python manage.py rebuild_sales_rollups --chunk-size 5000
+"""
+
+from django.core.management.base import BaseCommand
+
+from ...rollups import rebuild, DEFAULT_CHUNK_SIZE
+
+
+class Command(BaseCommand):
+    help = "Перебудовує SalesRollup, обробляючи завершені замовлення пачками"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE)
+
+    def handle(self, *args, **options):
+        buckets = rebuild(chunk_size=options['chunk_size'])
+        self.stdout.write(self.style.SUCCESS(f"Створено бакетів: {buckets}"))
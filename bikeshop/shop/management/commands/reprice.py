@@ -0,0 +1,63 @@
+"""
+Масова зміна цін каталогу.
+
+Приклади::
+
+    python manage.py reprice --type mountain=-10 --type road=5
+    python manage.py reprice --set 12=15999.00
+    python manage.py reprice --csv prices.csv
+"""
+
+from decimal import Decimal, InvalidOperation
+
+from django.core.management.base import BaseCommand, CommandError
+
+from ...repricing import PriceChangeSpec, PriceSpecError, reprice_catalog, DEFAULT_CHUNK_SIZE
+
+
+def _pair(value: str):
+    key, sep, amount = value.partition('=')
+    if not sep:
+        raise CommandError(f"Очікується формат КЛЮЧ=ЗНАЧЕННЯ, отримано '{value}'")
+    try:
+        return key.strip(), Decimal(amount)
+    except InvalidOperation:
+        raise CommandError(f"Некоректне число в '{value}'")
+
+
+class Command(BaseCommand):
+    help = "Змінює ціни велосипедів пачками та переносить їх у відкриті замовлення"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--type', action='append', default=[], metavar='ТИП=ВІДСОТОК',
+                            help="Відсоток зміни для типу (назва або id), напр. mountain=-10")
+        parser.add_argument('--set', action='append', default=[], metavar='ID=ЦІНА',
+                            help="Абсолютна ціна для велосипеда")
+        parser.add_argument('--csv', help="CSV з колонками bike_id,price або bike_type,percent")
+        parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE)
+
+    def handle(self, *args, **options):
+        spec = PriceChangeSpec()
+        try:
+            if options['csv']:
+                with open(options['csv'], newline='', encoding='utf-8') as f:
+                    spec = PriceChangeSpec.from_csv(f)
+            for value in options['type']:
+                key, percent = _pair(value)
+                spec.percent_by_type[key] = percent
+            for value in options['set']:
+                key, price = _pair(value)
+                if not key.isdigit():
+                    raise CommandError(f"Очікується id велосипеда, отримано '{key}'")
+                spec.overrides[int(key)] = price
+            if not spec.percent_by_type and not spec.overrides:
+                raise CommandError("Не задано жодної зміни цін (--type, --set або --csv)")
+
+            report = reprice_catalog(spec, chunk_size=options['chunk_size'])
+        except (OSError, PriceSpecError) as e:
+            raise CommandError(str(e))
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Змінено цін: {report.bikes}; позицій у відкритих замовленнях: {report.order_items}; "
+            f"замовлень перераховано: {report.orders} ({report.seconds:.2f} с)"
+        ))
@@ -0,0 +1,36 @@
+"""
+Прибирання покинутих кошиків; розраховано на запуск з cron.
+
+    python manage.py sweep_carts --days 14 --chunk-size 1000
+    python manage.py sweep_carts --expire   # скасувати замість видалення
+"""
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from ...abandoned_carts import DEFAULT_CHUNK_SIZE, sweep_abandoned_carts
+
+
+class Command(BaseCommand):
+    help = "Видаляє або скасовує незавершені замовлення без змін довше за N днів"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, default=settings.SHOP_ABANDONED_CART_DAYS)
+        parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE)
+        parser.add_argument('--expire', action='store_true', help="Скасувати кошики замість видалення")
+        parser.add_argument('--dry-run', action='store_true', help="Лише порахувати кошики")
+
+    def handle(self, *args, **options):
+        report = sweep_abandoned_carts(options['days'], chunk_size=options['chunk_size'],
+                                       expire=options['expire'], dry_run=options['dry_run'])
+        if options['dry_run']:
+            self.stdout.write(f"Покинутих кошиків: {report.orders} (без змін з {report.cutoff:%d.%m.%Y})")
+        elif report.expire:
+            self.stdout.write(self.style.SUCCESS(
+                f"Скасовано кошиків: {report.orders} ({report.chunks} пачок)"
+            ))
+        else:
+            self.stdout.write(self.style.SUCCESS(
+                f"Звільнено рядків: {report.rows} ({report.orders} кошиків, {report.items} позицій, "
+                f"{report.chunks} пачок)"
+            ))
@@ -0,0 +1,309 @@
+"""
+Middleware додатку shop.
+
+``TracingMiddleware`` відкриває кореневий спан трасування запиту
+(див. shop/tracing.py).
+
+``ThrottleMiddleware`` обмежує частоту запитів до маршрутів із
+``SHOP_THROTTLE_RULES`` (див. shop/throttling.py).
+
+``FileServingMiddleware`` віддає статику з ``STATIC_ROOT`` і зображення
+велосипедів з ``MEDIA_ROOT`` без зворотного проксі перед Django:
+
+* ``FileResponse`` — WSGI-сервери з ``wsgi.file_wrapper`` (gunicorn тощо)
+  передають файл через sendfile без копіювання в Python;
+* ``Range: bytes=…`` — часткові відповіді 206 (один діапазон);
+* ``.gz``-варіанти від ``CompressedManifestStaticFilesStorage`` для
+  клієнтів з ``Accept-Encoding: gzip``;
+* ``Cache-Control: immutable`` на рік для імен з хешем вмісту,
+  ``If-Modified-Since`` → 304 для решти.
+
+Вимикається ``SHOP_SERVE_FILES = False``, коли файли віддає nginx.
+"""
+
+import math
+import mimetypes
+import os
+import re
+import stat
+from typing import Optional, Tuple
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed, SuspiciousFileOperation
+from django.http import FileResponse, HttpResponse, HttpResponseNotModified
+from django.utils._os import safe_join
+from django.utils.functional import empty
+from django.utils.http import http_date
+from django.views.static import was_modified_since
+
+from . import tracing
+from .throttling import DEFAULT_SLOTS, ThrottleRule, acheck, check, get_table
+
+# Ім'я з хешем від ManifestStaticFilesStorage: styles.3f2a9c1b0d4e.css
+HASHED_NAME_RE = re.compile(r'\.[0-9a-f]{12}\.\w+$')
+RANGE_RE = re.compile(r'^bytes=(\d*)-(\d*)$')
+
+IMMUTABLE_CACHE_CONTROL = 'public, max-age=31536000, immutable'
+STATIC_CACHE_CONTROL = 'public, max-age=3600'
+MEDIA_CACHE_CONTROL = 'public, max-age=86400'
+
+
+class FileRange:
+    """
+    Файл, обмежений діапазоном байтів. Позиція (``tell``) абсолютна, тож
+    сервер із sendfile бере зсув із ``tell()``, а довжину з Content-Length.
+    """
+
+    def __init__(self, file, start: int, end: int):
+        self.file = file
+        self.name = file.name
+        self.end = end
+        file.seek(start)
+
+    def read(self, size: int = -1) -> bytes:
+        remaining = self.end + 1 - self.file.tell()
+        if remaining <= 0:
+            return b''
+        return self.file.read(remaining if size is None or size < 0 else min(size, remaining))
+
+    def fileno(self) -> int:
+        return self.file.fileno()
+
+    def tell(self) -> int:
+        return self.file.tell()
+
+    def seek(self, offset: int, whence: int = os.SEEK_SET) -> int:
+        return self.file.seek(offset, whence)
+
+    def close(self) -> None:
+        self.file.close()
+
+
+def parse_range(header: Optional[str], size: int) -> Optional[Tuple[int, int]]:
+    """
+    Розбирає заголовок Range з одним діапазоном і повертає (start, end)
+    включно. None — заголовка немає або він не підтримується (віддаємо
+    весь файл); ValueError — діапазон поза межами файлу (416).
+    """
+    match = RANGE_RE.match(header or '')
+    if not match:
+        return None
+    first, last = match.groups()
+    if not first and not last:
+        return None
+    if not first:
+        # bytes=-N — останні N байтів
+        start, end = max(size - int(last), 0), size - 1
+    else:
+        start = int(first)
+        end = min(int(last), size - 1) if last else size - 1
+    if start >= size or start > end:
+        raise ValueError(header)
+    return start, end
+
+
+class FileServingMiddleware:
+    """Віддає файли статики та медіа до решти middleware і представлень."""
+    # Підтримка обох режимів: синхронний middleware в ASGI змусив би Django
+    # викликати асинхронні представлення через async_to_sync в одному потоці
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not getattr(settings, 'SHOP_SERVE_FILES', True):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+        self.roots = [
+            (prefix, root, cache_control)
+            for prefix, root, cache_control in (
+                (settings.STATIC_URL, settings.STATIC_ROOT, STATIC_CACHE_CONTROL),
+                (settings.MEDIA_URL, settings.MEDIA_ROOT, MEDIA_CACHE_CONTROL),
+            )
+            if prefix and root and prefix.startswith('/')
+        ]
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        return self.find_file(request) or self.get_response(request)
+
+    async def __acall__(self, request):
+        # stat() і open() локального файлу — мікросекунди, тож без виносу в потік
+        return self.find_file(request) or await self.get_response(request)
+
+    def find_file(self, request) -> Optional[HttpResponse]:
+        if request.method in ('GET', 'HEAD'):
+            for prefix, root, cache_control in self.roots:
+                if request.path.startswith(prefix):
+                    response = self.serve(request, root, request.path[len(prefix):], cache_control)
+                    if response is not None:
+                        return response
+        return None
+
+    def serve(self, request, root: str, relative_path: str, cache_control: str) -> Optional[HttpResponse]:
+        """Повертає відповідь з файлом або None, якщо такого файлу немає."""
+        try:
+            path = safe_join(root, relative_path)
+        except SuspiciousFileOperation:
+            return None
+        try:
+            file_stat = os.stat(path)
+        except OSError:
+            return None
+        if not stat.S_ISREG(file_stat.st_mode):
+            return None
+
+        if HASHED_NAME_RE.search(relative_path):
+            cache_control = IMMUTABLE_CACHE_CONTROL
+        if not was_modified_since(request.META.get('HTTP_IF_MODIFIED_SINCE'), file_stat.st_mtime):
+            response = HttpResponseNotModified()
+            response['Cache-Control'] = cache_control
+            return response
+
+        content_type, _ = mimetypes.guess_type(path)
+        content_type = content_type or 'application/octet-stream'
+        try:
+            byte_range = parse_range(request.META.get('HTTP_RANGE'), file_stat.st_size)
+        except ValueError:
+            response = HttpResponse(status=416)
+            response['Content-Range'] = f'bytes */{file_stat.st_size}'
+            return response
+
+        try:
+            gz_stat = os.stat(path + '.gz')
+        except OSError:
+            gz_stat = None
+        filename = os.path.basename(path)
+        encoding = None
+        if gz_stat and byte_range is None and 'gzip' in request.META.get('HTTP_ACCEPT_ENCODING', ''):
+            path, file_stat, encoding = path + '.gz', gz_stat, 'gzip'
+
+        file = open(path, 'rb')
+        if byte_range is None:
+            response = FileResponse(file, content_type=content_type, filename=filename)
+            response['Content-Length'] = file_stat.st_size
+        else:
+            start, end = byte_range
+            response = FileResponse(
+                FileRange(file, start, end), content_type=content_type, filename=filename, status=206
+            )
+            response['Content-Length'] = end - start + 1
+            response['Content-Range'] = f'bytes {start}-{end}/{file_stat.st_size}'
+        if encoding:
+            response['Content-Encoding'] = encoding
+        if gz_stat:
+            response['Vary'] = 'Accept-Encoding'
+        response['Accept-Ranges'] = 'bytes'
+        response['Last-Modified'] = http_date(file_stat.st_mtime)
+        response['Cache-Control'] = cache_control
+        return response
+
+
+class TracingMiddleware:
+    """
+    Кореневий спан ``http.request`` на запит: метод, маршрут, статус і
+    користувач. Продовжує трасування з вхідного заголовка ``traceparent``.
+    Не підключається, коли ``SHOP_TRACE_SAMPLE_RATE = 0``.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not tracing.get_tracer().sample_rate:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        with self.start(request) as span:
+            response = self.get_response(request)
+            self.finish(span, request, response)
+        return response
+
+    async def __acall__(self, request):
+        with self.start(request) as span:
+            response = await self.get_response(request)
+            self.finish(span, request, response)
+        return response
+
+    def start(self, request):
+        return tracing.start_span('http.request', {
+            'http.method': request.method,
+            'http.target': request.path,
+        }, traceparent=request.META.get('HTTP_TRACEPARENT'))
+
+    def finish(self, span, request, response) -> None:
+        if not span.recording:
+            return
+        match = request.resolver_match
+        # Користувача з сесії не завантажуємо заради атрибута: лише якщо його вже прочитало представлення
+        user = getattr(request, 'user', None)
+        if getattr(user, '_wrapped', None) is empty:
+            user = None
+        span.set_attributes({
+            'http.route': match.view_name if match else '',
+            'http.status_code': response.status_code,
+            'user.id': user.pk if user is not None and user.is_authenticated else '',
+        })
+        if response.status_code >= 500:
+            span.status = 'error'
+
+
+class ThrottleMiddleware:
+    """
+    Повертає 429 з ``Retry-After``, коли в бакеті користувача або IP для
+    маршруту немає токенів. Маршрути без правил коштують один пошук у словнику.
+    Має стояти після ``AuthenticationMiddleware``.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        rules = getattr(settings, 'SHOP_THROTTLE_RULES', None)
+        if not rules:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+            # Синхронний process_view Django обгорнув би в sync_to_async на кожен запит
+            self.process_view = self.aprocess_view
+        self.rules = {name: ThrottleRule.from_setting(value) for name, value in rules.items()}
+        self.table_path = str(settings.SHOP_THROTTLE_TABLE)
+        self.slots = getattr(settings, 'SHOP_THROTTLE_SLOTS', DEFAULT_SLOTS)
+
+    def __call__(self, request):
+        return self.get_response(request)
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        view_name, rule = self.rule_for(request)
+        if rule is None:
+            return None
+        return self.limited(check(get_table(self.table_path, self.slots), view_name, rule, request))
+
+    async def aprocess_view(self, request, view_func, view_args, view_kwargs):
+        # Бакети — mmap у пам'яті без вводу-виводу, тож перевірка йде прямо в циклі подій
+        view_name, rule = self.rule_for(request)
+        if rule is None:
+            return None
+        return self.limited(await acheck(get_table(self.table_path, self.slots), view_name, rule, request))
+
+    def rule_for(self, request) -> Tuple[str, Optional[ThrottleRule]]:
+        view_name = request.resolver_match.view_name
+        rule = self.rules.get(view_name)
+        if rule is None or (rule.methods and request.method not in rule.methods):
+            return view_name, None
+        return view_name, rule
+
+    def limited(self, wait: float) -> Optional[HttpResponse]:
+        if not wait:
+            return None
+        response = HttpResponse("Забагато запитів. Спробуйте пізніше.", status=429,
+                                content_type='text/plain; charset=utf-8')
+        response['Retry-After'] = max(1, math.ceil(wait))
+        return response
@@ -0,0 +1,26 @@
+# Generated by Django 5.1.7 on 2026-10-19 11:29
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('shop', '0004_order_completed'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PromotionRule',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=100)),
+                ('kind', models.CharField(choices=[('bike_type', 'Знижка на тип велосипеда'), ('quantity_tier', 'Знижка від кількості'), ('first_order', 'Перше замовлення')], max_length=20)),
+                ('percent', models.PositiveIntegerField()),
+                ('min_quantity', models.PositiveIntegerField(default=1)),
+                ('is_active', models.BooleanField(default=True)),
+                ('bike_type', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, to='shop.biketype')),
+            ],
+        ),
+    ]
@@ -0,0 +1,22 @@
+from django.db import migrations
+
+
+def create_default_rule(apps, schema_editor):
+    """Переносить колишній жорстко заданий @apply_discount(10) у правило."""
+    PromotionRule = apps.get_model('shop', 'PromotionRule')
+    PromotionRule.objects.get_or_create(
+        kind='bike_type',
+        bike_type=None,
+        defaults={'name': 'Базова знижка 10%', 'percent': 10},
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('shop', '0005_promotionrule'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_default_rule, migrations.RunPython.noop),
+    ]
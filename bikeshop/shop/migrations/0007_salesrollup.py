@@ -0,0 +1,30 @@
+# Generated by Django 5.1.7 on 2026-10-19 11:33
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('shop', '0006_default_promotion_rule'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SalesRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+                ('status', models.CharField(choices=[('new', 'Нове'), ('processing', 'В обробці'), ('shipped', 'Відправлено'), ('delivered', 'Доставлено'), ('canceled', 'Скасовано')], max_length=20)),
+                ('units', models.IntegerField(default=0)),
+                ('gross', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('discount', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('net', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('bike_type', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='shop.biketype')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('day', 'bike_type', 'status'), name='unique_sales_rollup_bucket')],
+            },
+        ),
+    ]
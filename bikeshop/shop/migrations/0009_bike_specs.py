@@ -0,0 +1,23 @@
+# Generated by Django 5.1.7 on 2026-10-19 11:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('shop', '0008_advised_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='bike',
+            name='specifics_text',
+            field=models.CharField(default='Звичайний велосипед', max_length=200),
+        ),
+        migrations.AddField(
+            model_name='bike',
+            name='specs',
+            field=models.JSONField(blank=True, default=dict),
+        ),
+    ]
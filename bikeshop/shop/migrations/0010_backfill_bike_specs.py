@@ -0,0 +1,55 @@
+from django.db import migrations, transaction
+
+CHUNK_SIZE = 2000
+
+
+def _specs_for(bike):
+    """Історичні моделі не мають методів, тож тексти повторюють get_specifics spec-моделей."""
+    for attr in ('mountain_spec', 'road_spec', 'city_spec'):
+        try:
+            spec = getattr(bike, attr)
+        except bike._meta.get_field(attr).related_model.DoesNotExist:
+            continue
+        if attr == 'mountain_spec':
+            return ({'kind': 'mountain', 'suspension': spec.suspension},
+                    f"Гірський велосипед з {spec.suspension} амортизацією")
+        if attr == 'road_spec':
+            return {'kind': 'road', 'weight': spec.weight}, f"Легкий шосейний велосипед ({spec.weight} кг)"
+        basket_text = " з кошиком" if spec.has_basket else ""
+        return {'kind': 'city', 'has_basket': spec.has_basket}, "Міський велосипед" + basket_text
+    return {}, "Звичайний велосипед"
+
+
+def backfill_specs(apps, schema_editor):
+    """
+    Заповнює зведені колонки пачками за первинним ключем: кожна пачка — один
+    запит з LEFT JOIN трьох spec-таблиць і один bulk_update у власній транзакції,
+    тож перервану міграцію можна безпечно повторити.
+    """
+    Bike = apps.get_model('shop', 'Bike')
+    last_pk = 0
+    while True:
+        chunk = list(
+            Bike.objects.filter(pk__gt=last_pk).order_by('pk')
+            .select_related('mountain_spec', 'road_spec', 'city_spec')
+            .only('pk', 'mountain_spec__suspension', 'road_spec__weight', 'city_spec__has_basket')[:CHUNK_SIZE]
+        )
+        if not chunk:
+            break
+        last_pk = chunk[-1].pk
+        for bike in chunk:
+            bike.specs, bike.specifics_text = _specs_for(bike)
+        with transaction.atomic():
+            Bike.objects.bulk_update(chunk, ['specs', 'specifics_text'], batch_size=500)
+
+
+class Migration(migrations.Migration):
+    atomic = False
+
+    dependencies = [
+        ('shop', '0009_bike_specs'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_specs, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 5.1.7 on 2026-10-19 12:05
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('shop', '0011_order_archive'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BikeRecommendation',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('score', models.PositiveIntegerField(default=0)),
+                ('bike', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='recommendations', to='shop.bike')),
+                ('recommended', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='shop.bike')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['bike', '-score'], name='shop_bikerec_bike_score')],
+                'constraints': [models.UniqueConstraint(fields=('bike', 'recommended'), name='unique_bike_recommendation')],
+            },
+        ),
+    ]
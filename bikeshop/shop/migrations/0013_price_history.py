@@ -0,0 +1,29 @@
+# Generated by Django 5.1.7 on 2026-10-19 12:10
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('shop', '0012_bike_recommendation'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PriceHistoryBlock',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('start', models.DateTimeField()),
+                ('end', models.DateTimeField()),
+                ('count', models.PositiveIntegerField(default=0)),
+                ('last_price', models.DecimalField(decimal_places=2, max_digits=10)),
+                ('data', models.BinaryField()),
+                ('bike', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='price_history', to='shop.bike')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['bike', 'start'], name='shop_pricehist_bike_start')],
+            },
+        ),
+    ]
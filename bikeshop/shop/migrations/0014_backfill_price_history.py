@@ -0,0 +1,52 @@
+from django.db import migrations, transaction
+from django.utils import timezone
+
+CHUNK_SIZE = 2000
+
+
+def _varint(value):
+    out = bytearray()
+    while value > 0x7f:
+        out.append((value & 0x7f) | 0x80)
+        value >>= 7
+    out.append(value)
+    return bytes(out)
+
+
+def backfill_price_history(apps, schema_editor):
+    """
+    Починає історію кожного велосипеда з поточної ціни: блок з однією подією
+    (дельта часу 0, ціна в копійках у zigzag-varint, як у shop/price_history.py).
+    Велосипеди, що вже мають історію, пропускаються, тож міграцію можна повторити.
+    """
+    Bike = apps.get_model('shop', 'Bike')
+    PriceHistoryBlock = apps.get_model('shop', 'PriceHistoryBlock')
+    now = timezone.now().replace(microsecond=0)
+    last_pk = 0
+    while True:
+        chunk = list(
+            Bike.objects.filter(pk__gt=last_pk, price_history__isnull=True)
+            .order_by('pk').values_list('pk', 'price')[:CHUNK_SIZE]
+        )
+        if not chunk:
+            break
+        last_pk = chunk[-1][0]
+        with transaction.atomic():
+            PriceHistoryBlock.objects.bulk_create(
+                (PriceHistoryBlock(bike_id=bike_id, start=now, end=now, count=1, last_price=price,
+                                   data=b'\x00' + _varint(int(price * 100) * 2))
+                 for bike_id, price in chunk),
+                batch_size=500,
+            )
+
+
+class Migration(migrations.Migration):
+    atomic = False
+
+    dependencies = [
+        ('shop', '0013_price_history'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_price_history, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 5.1.7 on 2026-10-19 12:15
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('shop', '0014_backfill_price_history'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='OrderStatusTransition',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('order_id', models.BigIntegerField()),
+                ('from_status', models.PositiveSmallIntegerField(choices=[(1, 'Нове'), (2, 'В обробці'), (3, 'Відправлено'), (4, 'Доставлено'), (5, 'Скасовано')])),
+                ('to_status', models.PositiveSmallIntegerField(choices=[(1, 'Нове'), (2, 'В обробці'), (3, 'Відправлено'), (4, 'Доставлено'), (5, 'Скасовано')])),
+                ('at', models.DateTimeField()),
+                ('actor_id', models.IntegerField(blank=True, null=True)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['order_id', 'at'], name='shop_statuslog_order_at')],
+            },
+        ),
+    ]
@@ -0,0 +1,39 @@
+# Generated by Django 5.1.7 on 2026-10-19 12:44
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('shop', '0017_order_updated_at'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='WatchlistEvent',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('price', 'Зміна ціни'), ('restock', 'Знову в наявності')], max_length=10)),
+                ('old_price', models.DecimalField(blank=True, decimal_places=2, max_digits=10, null=True)),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('bike', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='shop.bike')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='WatchlistEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('bike', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='watchers', to='shop.bike')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='watchlist', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('user', 'bike'), name='unique_watchlist_entry')],
+            },
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.1.7 on 2026-10-19 13:31
+
+import django.core.validators
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('shop', '0018_watchlist'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='promotionrule',
+            name='percent',
+            field=models.PositiveIntegerField(validators=[django.core.validators.MaxValueValidator(100)]),
+        ),
+    ]
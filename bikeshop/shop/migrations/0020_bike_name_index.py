@@ -0,0 +1,17 @@
+# Generated by Django 5.1.7 on 2026-10-19 13:46
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('shop', '0019_promotion_rule_percent_max'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='bike',
+            index=models.Index(fields=['name'], name='shop_bike_name_idx'),
+        ),
+    ]
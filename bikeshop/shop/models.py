@@ -1,5 +1,7 @@
 from decimal import Decimal
+from django.core.validators import MaxValueValidator
 from django.db import models
+from django.utils import timezone
 from django.contrib.auth.models import User
 
 """
@@ -8,6 +10,9 @@ from django.contrib.auth.models import User
 
 # ===== ВЕЛОСИПЕДИ =====
 
+DEFAULT_SPECIFICS = "Звичайний велосипед"
+
+
 class BikeType(models.Model):
     """Тип велосипеда, наприклад: гірський, шосейний, міський."""
     name = models.CharField(max_length=50)
@@ -25,19 +30,35 @@ class Bike(models.Model):
     description = models.TextField()
     image = models.ImageField(upload_to='bikes/')
     in_stock = models.BooleanField(default=True)
+    # Зведені специфікації, напр. {"kind": "mountain", "suspension": "пружинна"},
+    # і готовий текст для шаблонів — каталог читається без з'єднань зі spec-таблицями.
+    # Синхронізуються з таблицями *BikeSpec сигналами (див. shop/specs.py)
+    specs = models.JSONField(default=dict, blank=True)
+    specifics_text = models.CharField(max_length=200, default=DEFAULT_SPECIFICS)
+
+    class Meta:
+        indexes = [
+            # Пошук в адмінці за початком назви (IndexedSearchMixin)
+            models.Index(fields=['name'], name='shop_bike_name_idx'),
+        ]
 
     def __str__(self) -> str:
         return f"{self.name} ({self.bike_type.name})"
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Ціна й наявність на момент завантаження: за ними сигнали пишуть в історію
+        # цін і в чергу списку бажань лише справжні зміни
+        if 'price' in instance.__dict__:
+            instance._loaded_price = instance.__dict__['price']
+        if 'in_stock' in instance.__dict__:
+            instance._loaded_in_stock = instance.__dict__['in_stock']
+        return instance
+
     def get_specifics(self) -> str:
         """Повертає специфіку велосипеда залежно від типу."""
-        if hasattr(self, 'mountain_spec'):
-            return self.mountain_spec.get_specifics()
-        if hasattr(self, 'road_spec'):
-            return self.road_spec.get_specifics()
-        if hasattr(self, 'city_spec'):
-            return self.city_spec.get_specifics()
-        return "Звичайний велосипед"
+        return self.specifics_text or DEFAULT_SPECIFICS
 
 
 class MountainBikeSpec(models.Model):
@@ -45,6 +66,9 @@ class MountainBikeSpec(models.Model):
     bike = models.OneToOneField(Bike, on_delete=models.CASCADE, related_name='mountain_spec')
     suspension = models.CharField(max_length=50)
 
+    kind = 'mountain'
+    spec_fields = ('suspension',)
+
     def __str__(self) -> str:
         return f"Гірський ({self.bike.name})"
 
@@ -57,6 +81,9 @@ class RoadBikeSpec(models.Model):
     bike = models.OneToOneField(Bike, on_delete=models.CASCADE, related_name='road_spec')
     weight = models.FloatField()
 
+    kind = 'road'
+    spec_fields = ('weight',)
+
     def __str__(self) -> str:
         return f"Шосейний ({self.bike.name})"
 
@@ -69,6 +96,9 @@ class CityBikeSpec(models.Model):
     bike = models.OneToOneField(Bike, on_delete=models.CASCADE, related_name='city_spec')
     has_basket = models.BooleanField(default=False)
 
+    kind = 'city'
+    spec_fields = ('has_basket',)
+
     def __str__(self) -> str:
         return f"Міський ({self.bike.name})"
 
@@ -79,8 +109,8 @@ class CityBikeSpec(models.Model):
 
 # ===== ЗАМОВЛЕННЯ =====
 
-class Order(models.Model):
-    """Модель замовлення велосипеда користувачем."""
+class OrderFields(models.Model):
+    """Спільні поля і методи замовлення для робочої та архівної таблиць."""
     STATUS_CHOICES = [
         ('new', 'Нове'),
         ('processing', 'В обробці'),
@@ -99,13 +129,59 @@ class Order(models.Model):
     success_handled = models.BooleanField(default=False)
     completed = models.BooleanField(default=False)
 
-    def __str__(self) -> str:
-        return f"Замовлення #{self.pk} ({self.user.username})"
+    class Meta:
+        abstract = True
 
     def get_status_display(self) -> str:
         """Повертає текстове представлення статусу замовлення."""
         return dict(self.STATUS_CHOICES).get(self.status, self.status)
 
+
+class OrderQuerySet(models.QuerySet):
+    """Вибірки відкритих кошиків (незавершених і не скасованих замовлень)."""
+
+    def open_carts(self) -> 'OrderQuerySet':
+        return self.filter(completed=False).exclude(status='canceled')
+
+    def idle_carts(self, cutoff) -> 'OrderQuerySet':
+        """Кошики без змін з ``cutoff``; індекс (completed, updated_at)."""
+        # completed=False дає "NOT completed", з яким SQLite не бере індекс; IN (0) — бере
+        return self.filter(completed__in=[False], updated_at__lt=cutoff).exclude(status='canceled')
+
+    def touch(self) -> int:
+        """Позначає кошики активними, не зачіпаючи інших полів."""
+        return self.update(updated_at=timezone.now())
+
+
+class Order(OrderFields):
+    """Модель замовлення велосипеда користувачем."""
+    # Остання зміна кошика; за нею shop/abandoned_carts.py знаходить покинуті кошики
+    updated_at = models.DateTimeField(auto_now=True)
+
+    objects = OrderQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            # Історія замовлень у профілі: user_id = ? ORDER BY created_at
+            models.Index(fields=['user', 'created_at'], name='shop_order_user_created'),
+            # Зіставлення рядків маніфесту перевізника (shop/tracking.py)
+            models.Index(fields=['tracking_number'], name='shop_order_tracking_idx'),
+            # Покинуті кошики: completed = 0 AND updated_at < ?
+            models.Index(fields=['completed', 'updated_at'], name='shop_order_open_idle_idx'),
+        ]
+
+    def __str__(self) -> str:
+        return f"Замовлення #{self.pk} ({self.user.username})"
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Стан на момент завантаження: за ним сигнали визначають зміну статусу
+        loaded = instance.__dict__
+        if 'completed' in loaded and 'status' in loaded:
+            instance._loaded_state = (loaded['completed'], loaded['status'])
+        return instance
+
     @property
     def total_before_discount(self) -> Decimal:
         """Обчислює суму замовлення до застосування знижки."""
@@ -138,9 +214,206 @@ class OrderItem(models.Model):
     price = models.DecimalField(max_digits=10, decimal_places=2)
     discount = models.DecimalField(max_digits=10, decimal_places=2, default=0)
 
+    class Meta:
+        indexes = [
+            # Пошук позиції велосипеда в кошику при додаванні
+            models.Index(fields=['order', 'bike'], name='shop_orderitem_order_bike'),
+        ]
+
     def __str__(self) -> str:
         return f"{self.quantity} x {self.bike.name}"
 
     def get_total(self) -> Decimal:
         """Обчислює суму позиції з урахуванням знижки."""
         return self.quantity * self.price - self.discount
+
+
+class OrderStatusTransition(models.Model):
+    """
+    Запис журналу змін статусу замовлення (лише дописується, див.
+    shop/patterns/state.py). Статуси зберігаються кодами з ``STATUS_CODES``,
+    а ``order_id`` — без зовнішнього ключа, щоб журнал переживав архівацію.
+    """
+    STATUS_CODES = {status: code for code, (status, _) in enumerate(OrderFields.STATUS_CHOICES, start=1)}
+    CODE_CHOICES = [(code, label) for code, (_, label) in enumerate(OrderFields.STATUS_CHOICES, start=1)]
+
+    order_id = models.BigIntegerField()
+    from_status = models.PositiveSmallIntegerField(choices=CODE_CHOICES)
+    to_status = models.PositiveSmallIntegerField(choices=CODE_CHOICES)
+    at = models.DateTimeField()
+    # Хто змінив (id користувача); порожньо — система
+    actor_id = models.IntegerField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['order_id', 'at'], name='shop_statuslog_order_at'),
+        ]
+
+    def __str__(self) -> str:
+        return f"#{self.order_id}: {self.get_from_status_display()} → {self.get_to_status_display()}"
+
+
+# ===== АРХІВ ЗАМОВЛЕНЬ =====
+
+class ArchivedOrder(OrderFields):
+    """
+    Доставлене або скасоване замовлення, перенесене з робочої таблиці
+    (див. shop/archive.py). Первинний ключ збігається з колишнім ``Order.id``.
+    """
+    # Без auto_now_add: зберігається початковий час створення
+    created_at = models.DateTimeField()
+    archived_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['user', 'created_at'], name='shop_archorder_user_created'),
+        ]
+
+    def __str__(self) -> str:
+        return f"Архівне замовлення #{self.pk}"
+
+
+class ArchivedOrderItem(models.Model):
+    """Позиція архівного замовлення."""
+    order = models.ForeignKey(ArchivedOrder, related_name='items', on_delete=models.CASCADE)
+    bike = models.ForeignKey(Bike, on_delete=models.CASCADE)
+    quantity = models.PositiveIntegerField(default=1)
+    price = models.DecimalField(max_digits=10, decimal_places=2)
+    discount = models.DecimalField(max_digits=10, decimal_places=2, default=0)
+
+    def __str__(self) -> str:
+        return f"{self.quantity} x {self.bike.name}"
+
+    def get_total(self) -> Decimal:
+        return self.quantity * self.price - self.discount
+
+
+# ===== ЗНИЖКИ =====
+
+class PromotionRule(models.Model):
+    """Правило промо-акції, яке обчислює рушій ціноутворення (shop/pricing.py)."""
+    KIND_CHOICES = [
+        ('bike_type', 'Знижка на тип велосипеда'),
+        ('quantity_tier', 'Знижка від кількості'),
+        ('first_order', 'Перше замовлення'),
+    ]
+
+    name = models.CharField(max_length=100)
+    kind = models.CharField(max_length=20, choices=KIND_CHOICES)
+    # Більше 100% зробило б суму замовлення від'ємною
+    percent = models.PositiveIntegerField(validators=[MaxValueValidator(100)])
+    # Порожній тип означає знижку на всі велосипеди
+    bike_type = models.ForeignKey(BikeType, on_delete=models.CASCADE, null=True, blank=True)
+    # Для quantity_tier: мінімальна кількість одиниць у кошику
+    min_quantity = models.PositiveIntegerField(default=1)
+    is_active = models.BooleanField(default=True)
+
+    def __str__(self) -> str:
+        return f"{self.name} ({self.percent}%)"
+
+
+# ===== ЗВІТНІСТЬ =====
+
+class SalesRollup(models.Model):
+    """Денний підсумок продажів завершених замовлень за типом велосипеда і статусом."""
+    day = models.DateField()
+    bike_type = models.ForeignKey(BikeType, on_delete=models.CASCADE)
+    status = models.CharField(max_length=20, choices=Order.STATUS_CHOICES)
+    units = models.IntegerField(default=0)
+    gross = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    discount = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    net = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['day', 'bike_type', 'status'], name='unique_sales_rollup_bucket'),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.day} {self.bike_type_id} {self.status}: {self.net}"
+
+
+# ===== ІСТОРІЯ ЦІН =====
+
+class PriceHistoryBlock(models.Model):
+    """
+    Блок до ``price_history.BLOCK_EVENTS`` змін ціни велосипеда. Події
+    закодовані в ``data`` як varint-дельти (секунди, копійки) від попередньої
+    події; перша — від (``start``, 0). ``end`` і ``last_price`` дають відповідь
+    для моментів після останньої зміни без декодування (див. shop/price_history.py).
+    """
+    bike = models.ForeignKey(Bike, related_name='price_history', on_delete=models.CASCADE)
+    start = models.DateTimeField()
+    end = models.DateTimeField()
+    count = models.PositiveIntegerField(default=0)
+    last_price = models.DecimalField(max_digits=10, decimal_places=2)
+    data = models.BinaryField()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['bike', 'start'], name='shop_pricehist_bike_start'),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.bike_id} з {self.start:%d.%m.%Y %H:%M} ({self.count})"
+
+
+# ===== РЕКОМЕНДАЦІЇ =====
+
+class BikeRecommendation(models.Model):
+    """
+    Сусід велосипеда за спільними покупками: ``score`` — у скількох
+    завершених замовленнях обидва велосипеди були разом (див. shop/recommendations.py).
+    """
+    bike = models.ForeignKey(Bike, related_name='recommendations', on_delete=models.CASCADE)
+    recommended = models.ForeignKey(Bike, related_name='+', on_delete=models.CASCADE)
+    score = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['bike', 'recommended'], name='unique_bike_recommendation'),
+        ]
+        indexes = [
+            # Найкращі сусіди велосипеда одним проходом по індексу
+            models.Index(fields=['bike', '-score'], name='shop_bikerec_bike_score'),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.bike_id} -> {self.recommended_id} ({self.score})"
+
+
+# ===== СПИСОК БАЖАНЬ =====
+
+class WatchlistEntry(models.Model):
+    """Велосипед у списку бажань користувача (див. shop/watchlist.py)."""
+    user = models.ForeignKey(User, related_name='watchlist', on_delete=models.CASCADE)
+    bike = models.ForeignKey(Bike, related_name='watchers', on_delete=models.CASCADE)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        constraints = [
+            # Унікальний індекс (user, bike) — і порядок обходу розсилки за користувачами
+            models.UniqueConstraint(fields=['user', 'bike'], name='unique_watchlist_entry'),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.user_id} стежить за {self.bike_id}"
+
+
+class WatchlistEvent(models.Model):
+    """
+    Зміна велосипеда, про яку ще не повідомлено тих, хто за ним стежить:
+    зміна ціни (з ціною до неї) або повернення в наявність. Черга
+    розбирається і очищається командою notify_watchers.
+    """
+    PRICE = 'price'
+    RESTOCK = 'restock'
+    KIND_CHOICES = [(PRICE, 'Зміна ціни'), (RESTOCK, 'Знову в наявності')]
+
+    bike = models.ForeignKey(Bike, related_name='+', on_delete=models.CASCADE)
+    kind = models.CharField(max_length=10, choices=KIND_CHOICES)
+    old_price = models.DecimalField(max_digits=10, decimal_places=2, null=True, blank=True)
+    created_at = models.DateTimeField(default=timezone.now)
+
+    def __str__(self) -> str:
+        return f"{self.bike_id}: {self.get_kind_display()}"
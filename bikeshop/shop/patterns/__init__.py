@@ -1,20 +1,37 @@
-from .decorator import apply_discount, login_required_ajax
-from .factory import BikeFactory
-from .strategy import (
-    PaymentStrategy,
-    CreditCardPayment,
-    PayPalPayment,
-    CashOnDeliveryPayment,
-    PaymentContext
-)
-
-__all__ = [
-    'apply_discount',
-    'login_required_ajax',
-    'BikeFactory',
-    'PaymentStrategy',
-    'CreditCardPayment',
-    'PayPalPayment',
-    'CashOnDeliveryPayment',
-    'PaymentContext'
-]
\ No newline at end of file
+"""
+Шаблони проєктування магазину.
+
+Підмодулі імпортуються ліниво (PEP 562): ``factory`` тягне за собою всі
+моделі, а представленням, яким потрібна лише стратегія оплати, не варто
+платити за це під час старту воркера.
+"""
+
+from importlib import import_module
+
+_EXPORTS = {
+    'apply_discount': 'decorator',
+    'login_required_ajax': 'decorator',
+    'BikeFactory': 'factory',
+    'PaymentStrategy': 'strategy',
+    'CreditCardPayment': 'strategy',
+    'PayPalPayment': 'strategy',
+    'CashOnDeliveryPayment': 'strategy',
+    'PaymentContext': 'strategy',
+    'OrderStateMachine': 'state',
+    'TransitionError': 'state',
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name: str):
+    module_name = _EXPORTS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(import_module(f'.{module_name}', __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_EXPORTS))
@@ -4,6 +4,7 @@ from decimal import Decimal # Ensure Decimal is imported for proper calculations
 from django.contrib import messages
 from django.http import JsonResponse
 import logging
+from .. import tracing
 # Assuming Order model is accessible via request.user.order_set
 # If Order is in ..models, you might also need to import it explicitly for clarity
 # from ..models import Order
@@ -14,11 +15,19 @@ def apply_discount(percent):
     def decorator(view_func):
         @wraps(view_func)
         def wrapper(request, *args, **kwargs):
+            with tracing.start_span('discount.apply', {'discount.percent': percent}) as span:
+                apply(request, span)
+            return view_func(request, *args, **kwargs)
+
+        def apply(request, span):
+            # Логи з %-аргументами: рядок (і Order.__str__ із запитом до users) будується лише для ввімкненого рівня
             if request.user.is_authenticated:
                 logger.debug("User is authenticated.")
 
-                order = request.user.order_set.filter(completed=False).last()
-                logger.debug(f"Found order: {order}")
+                order = request.user.order_set.open_carts().last()
+                logger.debug("Found order: %s", order)
+                if span.recording:
+                    span.set_attribute('order.id', order.id if order else '')
 
                 if order and order.total and not order.discount_percent:
                     try:
@@ -26,32 +35,33 @@ def apply_discount(percent):
                         order.discount = discount_amount
                         order.discount_percent = percent
                         order.total -= discount_amount
-                        logger.debug(f"Applied order discount: {discount_amount}")
+                        logger.debug("Applied order discount: %s", discount_amount)
 
                         for item in order.items.all():
                             item_discount = item.get_total() * Decimal(str(percent)) / Decimal('100')
                             item.discount = item_discount
                             item.save()
-                            logger.debug(f"Item {item.id} discount: {item_discount}")
+                            logger.debug("Item %s discount: %s", item.id, item_discount)
 
                         order.save()
                         messages.info(request, f"Було автоматично застосовано знижку {percent}% (-{discount_amount} грн)")
-                        logger.info(f"Discount {percent}% applied to order #{order.id} for user {request.user.id}")
+                        logger.info("Discount %s%% applied to order #%s for user %s", percent, order.id, request.user.id)
+                        span.set_attribute('discount.amount', discount_amount)
                     except Exception as e:
-                        logger.error(f"Error applying discount: {e}", exc_info=True)
+                        logger.error("Error applying discount: %s", e, exc_info=True)
+                        span.record_exception(e)
                         messages.error(request, "Помилка при застосуванні знижки.")
                 else:
                     logger.debug("Discount conditions not met.")
                     if not order:
-                        logger.debug(f"No active order found for user {request.user.id} to apply discount.")
+                        logger.debug("No active order found for user %s to apply discount.", request.user.id)
                     elif not order.total:
-                        logger.debug(f"Order #{order.id} has no total.")
+                        logger.debug("Order #%s has no total.", order.id)
                     elif order.discount_percent:
-                        logger.debug(f"Order #{order.id} already has discount.")
+                        logger.debug("Order #%s already has discount.", order.id)
             else:
                 logger.debug("Unauthenticated user.")
 
-            return view_func(request, *args, **kwargs)
         return wrapper
     return decorator
 
@@ -65,7 +75,7 @@ def login_required_ajax(view_func):
     @wraps(view_func)
     def wrapper(request, *args, **kwargs):
         if not request.user.is_authenticated:
-            logger.warning(f"Anonymous user attempted to access {view_func.__name__} (AJAX protected).")
+            logger.warning("Anonymous user attempted to access %s (AJAX protected).", view_func.__name__)
             return JsonResponse({'error': 'Authentication required'}, status=403)
         return view_func(request, *args, **kwargs)
     return wrapper
\ No newline at end of file
@@ -0,0 +1,177 @@
+# shop/patterns/state.py
+"""
+Скінченний автомат статусів замовлення.
+
+Дозволені переходи задає ``TRANSITIONS``; ``delivered`` і ``canceled`` —
+кінцеві стани. Перехід застосовується умовним UPDATE
+(``WHERE status = <очікуваний>``), тож з двох одночасних змін одного
+замовлення спрацьовує лише одна, а друга бачить, що статус уже інший.
+
+Кожна зміна дописується в журнал ``OrderStatusTransition`` і переносить
+внесок завершених замовлень між бакетами ``SalesRollup``. Масовий перехід
+(:meth:`OrderStateMachine.bulk_transition`) обробляє замовлення пачками:
+на пачку — вибірка з блокуванням, один UPDATE, один executemany у журнал
+(shop/bulk.py) і оновлення зведень, незалежно від кількості замовлень у ній.
+"""
+
+import logging
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, Optional, Tuple
+
+from django.db import transaction
+from django.db.models import QuerySet
+from django.utils import timezone
+
+from .. import bulk, rollups, tracing
+from ..models import Order, OrderStatusTransition
+
+logger = logging.getLogger(__name__)
+
+TRANSITIONS: Dict[str, Tuple[str, ...]] = {
+    'new': ('processing', 'shipped', 'canceled'),
+    'processing': ('shipped', 'canceled'),
+    'shipped': ('delivered',),
+    'delivered': (),
+    'canceled': (),
+}
+DEFAULT_CHUNK_SIZE = 5000
+
+
+class TransitionError(ValueError):
+    """Перехід заборонено або статус замовлення вже змінився."""
+
+
+@dataclass
+class BulkTransitionResult:
+    """Підсумок масового переходу: скільки замовлень перейшло з кожного статусу."""
+    target: str
+    moved: Dict[str, int] = field(default_factory=dict)
+
+    @property
+    def total(self) -> int:
+        return sum(self.moved.values())
+
+
+class OrderStateMachine:
+    """Переходи статусів замовлень з перевіркою, журналом і оновленням зведень."""
+
+    def __init__(self, transitions: Dict[str, Iterable[str]] = None):
+        transitions = TRANSITIONS if transitions is None else transitions
+        self.transitions = {source: frozenset(targets) for source, targets in transitions.items()}
+
+    def can_transition(self, source: str, target: str) -> bool:
+        return target in self.transitions.get(source, ())
+
+    def sources(self, target: str) -> Tuple[str, ...]:
+        """Статуси, з яких можна перейти в ``target``."""
+        return tuple(source for source, targets in self.transitions.items() if target in targets)
+
+    def path(self, source: str, target: str) -> Optional[Tuple[str, ...]]:
+        """
+        Найкоротший ланцюжок дозволених переходів із ``source`` у ``target``
+        (без ``source``): ``()`` — якщо статус уже той, None — якщо недосяжний.
+        """
+        previous = {source: None}
+        queue = deque([source])
+        while queue:
+            status = queue.popleft()
+            if status == target:
+                steps = []
+                while status != source:
+                    steps.append(status)
+                    status = previous[status]
+                return tuple(reversed(steps))
+            for following in sorted(self.transitions.get(status, ())):
+                if following not in previous:
+                    previous[following] = status
+                    queue.append(following)
+        return None
+
+    def transition(self, order: Order, target: str, actor=None) -> None:
+        """
+        Переводить одне замовлення в ``target``. TransitionError — якщо перехід
+        заборонено або статус у БД уже не той, що в об'єкті.
+        """
+        source = order.status
+        if not self.can_transition(source, target):
+            raise TransitionError(f"Перехід {source} → {target} заборонено")
+        with tracing.start_span('order.transition', {'order.id': order.pk, 'order.source': source,
+                                                     'order.target': target}), transaction.atomic():
+            if not Order.objects.filter(pk=order.pk, status=source).update(status=target):
+                raise TransitionError(f"Статус замовлення #{order.pk} вже змінився")
+            self._log([order.pk], source, target, actor)
+            rollups.move_orders([order.pk], (order.completed, source), (order.completed, target))
+        order.status = target
+        order._loaded_state = (order.completed, target)
+
+    def bulk_transition(self, queryset: QuerySet, target: str, actor=None,
+                        chunk_size: int = DEFAULT_CHUNK_SIZE) -> BulkTransitionResult:
+        """
+        Переводить замовлення з ``queryset`` у ``target``. Замовлення, для яких
+        перехід заборонено, пропускаються. Повертає кількість переходів за
+        вихідним статусом.
+        """
+        with tracing.start_span('order.bulk_transition', {'order.target': target}) as span:
+            result = self._bulk_transition(queryset, target, actor, chunk_size)
+            if span.recording:
+                span.set_attributes({f'order.moved.{source}': moved for source, moved in result.moved.items()})
+        logger.info("Moved %d orders to %s", result.total, target)
+        return result
+
+    def _bulk_transition(self, queryset: QuerySet, target: str, actor, chunk_size: int) -> BulkTransitionResult:
+        result = BulkTransitionResult(target=target)
+        selected = queryset.values('pk')
+        for source in self.sources(target):
+            last_pk = 0
+            while True:
+                with transaction.atomic():
+                    # Блокування рядків (на PostgreSQL) гарантує, що UPDATE зачепить саме їх
+                    rows = list(
+                        Order.objects.select_for_update()
+                        .filter(pk__in=selected, status=source, pk__gt=last_pk)
+                        .order_by('pk').values_list('pk', 'completed')[:chunk_size]
+                    )
+                    if not rows:
+                        break
+                    last_pk = rows[-1][0]
+                    order_ids = [pk for pk, _ in rows]
+                    savepoint = transaction.savepoint()
+                    moved = Order.objects.filter(pk__in=order_ids, status=source).update(status=target)
+                    if moved < len(rows):
+                        # Частину статусів встигли змінити після вибірки (SQLite не блокує рядки).
+                        # Пачковий UPDATE не каже, які саме рядки він змінив, тож відкочуємо його
+                        # і переводимо по одному: у журнал і зведення — лише переведені тут
+                        transaction.savepoint_rollback(savepoint)
+                        rows = [(pk, completed) for pk, completed in rows
+                                if Order.objects.filter(pk=pk, status=source).update(status=target)]
+                        order_ids = [pk for pk, _ in rows]
+                        moved = len(rows)
+                    else:
+                        transaction.savepoint_commit(savepoint)
+                    completed_ids = [pk for pk, completed in rows if completed]
+                    self._log(order_ids, source, target, actor)
+                    rollups.move_orders(completed_ids, (True, source), (True, target))
+                result.moved[source] = result.moved.get(source, 0) + moved
+        return result
+
+    @staticmethod
+    def _log(order_ids, source: str, target: str, actor=None) -> None:
+        codes = OrderStatusTransition.STATUS_CODES
+        at, actor_id = timezone.now(), getattr(actor, 'pk', actor)
+        bulk.insert_rows(OrderStatusTransition, ('order_id', 'from_status', 'to_status', 'at', 'actor_id'), (
+            (order_id, codes[source], codes[target], at, actor_id) for order_id in order_ids
+        ))
+
+
+machine = OrderStateMachine()
+
+
+def history(order_id: int) -> list:
+    """Журнал переходів замовлення від найдавнішого: [(час, з, в, id автора)]."""
+    names = {code: status for status, code in OrderStatusTransition.STATUS_CODES.items()}
+    return [
+        (at, names[source], names[target], actor_id)
+        for at, source, target, actor_id in OrderStatusTransition.objects.filter(order_id=order_id)
+        .order_by('at', 'pk').values_list('at', 'from_status', 'to_status', 'actor_id')
+    ]
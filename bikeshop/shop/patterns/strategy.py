@@ -3,6 +3,8 @@ from abc import ABC, abstractmethod
 from decimal import Decimal
 from typing import Optional
 
+from .. import tracing
+
 logger = logging.getLogger(__name__)
 
 
@@ -20,7 +22,7 @@ class CreditCardPayment(PaymentStrategy):
     """Оплата кредитною карткою"""
 
     def pay(self, amount: Decimal) -> bool:
-        logger.info(f"Processing credit card payment for {amount}")
+        logger.info("Processing credit card payment for %s", amount)
         # TODO: додати реальну інтеграцію з платіжним шлюзом
         # Якщо оплата неуспішна — повертати False
         return True
@@ -30,7 +32,7 @@ class PayPalPayment(PaymentStrategy):
     """Оплата через PayPal"""
 
     def pay(self, amount: Decimal) -> bool:
-        logger.info(f"Processing PayPal payment for {amount}")
+        logger.info("Processing PayPal payment for %s", amount)
         # TODO: інтеграція з PayPal API
         return True
 
@@ -39,7 +41,7 @@ class CashOnDeliveryPayment(PaymentStrategy):
     """Оплата при отриманні"""
 
     def pay(self, amount: Decimal) -> bool:
-        logger.info(f"Order will be paid on delivery: {amount}")
+        logger.info("Order will be paid on delivery: %s", amount)
         # Можна додати логіку перевірки або підтвердження при доставці
         return True
 
@@ -54,7 +56,11 @@ class PaymentContext:
         self._strategy = strategy
 
     def execute_payment(self, amount: Decimal) -> bool:
-        success = self._strategy.pay(amount)
+        with tracing.start_span('payment.execute') as span:
+            success = self._strategy.pay(amount)
+            if span.recording:
+                span.set_attributes({'payment.strategy': type(self._strategy).__name__,
+                                     'payment.amount': amount, 'payment.success': success})
         if success:
             logger.info("Payment succeeded")
         else:
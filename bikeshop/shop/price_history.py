@@ -0,0 +1,176 @@
+"""
+Історія цін велосипедів у стислих блоках.
+
+Кожна зміна ``Bike.price`` (збереження моделі або ``reprice_catalog``)
+дописується в головний блок велосипеда ``PriceHistoryBlock``. Блок містить
+до ``BLOCK_EVENTS`` подій, закодованих varint-дельтами: секунди від
+попередньої події й різниця ціни в копійках (зі знаком, zigzag). Типова
+подія займає 3–6 байтів, тож мільйони змін займають кілька мегабайтів,
+а кількість рядків — у ``BLOCK_EVENTS`` разів менша за кількість подій.
+
+* :func:`price_at` — ціна в момент T: один запит по індексу (bike, start)
+  і двійковий пошук у декодованому блоці (без декодування, якщо T після
+  останньої зміни);
+* :func:`price_changes` — зміни за період: блоки, що перетинають період.
+
+Історія лише дописується; точність часу — секунда.
+"""
+
+from bisect import bisect_right
+from dataclasses import dataclass
+from datetime import datetime, timezone as dt_timezone
+from decimal import Decimal, ROUND_HALF_UP
+from typing import Iterable, List, Optional, Tuple
+
+from django.db import transaction
+from django.db.models import Max
+from django.utils import timezone
+
+from . import bulk
+from .models import PriceHistoryBlock
+
+BLOCK_EVENTS = 128
+CENT = Decimal('0.01')
+UPDATED_FIELDS = ('data', 'end', 'last_price', 'count')
+
+
+@dataclass(frozen=True)
+class PricePoint:
+    """Ціна, що діє з моменту ``at``."""
+    at: datetime
+    price: Decimal
+
+
+# ===== КОДУВАННЯ =====
+
+def zigzag(value: int) -> int:
+    return value * 2 if value >= 0 else -value * 2 - 1
+
+
+def unzigzag(value: int) -> int:
+    return value // 2 if not value & 1 else -(value + 1) // 2
+
+
+def encode_varints(values: Iterable[int]) -> bytes:
+    """LEB128: по 7 бітів на байт, старший біт — «далі є ще байти»."""
+    out = bytearray()
+    for value in values:
+        while value > 0x7f:
+            out.append((value & 0x7f) | 0x80)
+            value >>= 7
+        out.append(value)
+    return bytes(out)
+
+
+def decode_varints(data: bytes) -> List[int]:
+    values, value, shift = [], 0, 0
+    for byte in data:
+        value |= (byte & 0x7f) << shift
+        if byte & 0x80:
+            shift += 7
+        else:
+            values.append(value)
+            value, shift = 0, 0
+    return values
+
+
+def _seconds(moment: datetime) -> int:
+    return int(moment.timestamp())
+
+
+def _cents(price) -> int:
+    return int(Decimal(str(price)).quantize(CENT, rounding=ROUND_HALF_UP) * 100)
+
+
+def encode_event(seconds_delta: int, cents_delta: int) -> bytes:
+    return encode_varints((zigzag(seconds_delta), zigzag(cents_delta)))
+
+
+def decode_block(block: PriceHistoryBlock) -> List[PricePoint]:
+    """Усі події блоку в порядку часу."""
+    values = decode_varints(bytes(block.data))
+    seconds, cents = _seconds(block.start), 0
+    points = []
+    for i in range(0, len(values), 2):
+        seconds += unzigzag(values[i])
+        cents += unzigzag(values[i + 1])
+        points.append(PricePoint(datetime.fromtimestamp(seconds, dt_timezone.utc), Decimal(cents).scaleb(-2)))
+    return points
+
+
+# ===== ЗАПИС =====
+
+def record(changes: Iterable[Tuple[int, Decimal]], at: Optional[datetime] = None) -> int:
+    """
+    Дописує нові ціни ``(bike_id, ціна)`` в історію одним запитом на читання
+    головних блоків і пакетним записом. Ціна, що збігається з останньою
+    записаною, пропускається. Повертає кількість записаних подій.
+    """
+    changes = dict(changes)
+    if not changes:
+        return 0
+    at = (at or timezone.now()).replace(microsecond=0)
+    with transaction.atomic():
+        # Заповнені блоки мають рівно BLOCK_EVENTS подій, тож неповний блок — головний
+        heads = {
+            block.bike_id: block
+            for block in PriceHistoryBlock.objects.select_for_update()
+            .filter(bike_id__in=changes, count__lt=BLOCK_EVENTS)
+        }
+        # Кінець останнього заповненого блоку: новий блок не починається раніше
+        missing = [bike_id for bike_id in changes if bike_id not in heads]
+        ends = dict(
+            PriceHistoryBlock.objects.filter(bike_id__in=missing)
+            .values('bike_id').annotate(last_end=Max('end')).values_list('bike_id', 'last_end')
+        ) if missing else {}
+        to_create, to_update = [], []
+        for bike_id, price in changes.items():
+            cents = _cents(price)
+            head = heads.get(bike_id)
+            if head is not None and cents == _cents(head.last_price):
+                continue
+            if head is None:
+                # Перша подія або попередній блок заповнено: новий блок з абсолютною ціною
+                moment = max(at, ends.get(bike_id, at))
+                to_create.append(PriceHistoryBlock(
+                    bike_id=bike_id, start=moment, end=moment, count=1, last_price=Decimal(cents).scaleb(-2),
+                    data=encode_event(0, cents),
+                ))
+                continue
+            # Час не йде назад навіть при розсинхронізації годинників
+            moment = max(at, head.end)
+            head.data = bytes(head.data) + encode_event(
+                _seconds(moment) - _seconds(head.end), cents - _cents(head.last_price)
+            )
+            head.end, head.last_price, head.count = moment, Decimal(cents).scaleb(-2), head.count + 1
+            to_update.append(head)
+
+        PriceHistoryBlock.objects.bulk_create(to_create, batch_size=500)
+        bulk.update_rows(PriceHistoryBlock, UPDATED_FIELDS,
+                         ((block.pk, *(getattr(block, name) for name in UPDATED_FIELDS)) for block in to_update))
+    return len(to_create) + len(to_update)
+
+
+# ===== ЧИТАННЯ =====
+
+def price_at(bike_id: int, at: datetime) -> Optional[Decimal]:
+    """Ціна велосипеда в момент ``at`` або None, якщо історія починається пізніше."""
+    block = PriceHistoryBlock.objects.filter(bike_id=bike_id, start__lte=at).order_by('-start', '-pk').first()
+    if block is None:
+        return None
+    if at >= block.end:
+        return block.last_price
+    points = decode_block(block)
+    index = bisect_right([_seconds(point.at) for point in points], _seconds(at)) - 1
+    return points[index].price
+
+
+def price_changes(bike_id: int, since: datetime, until: datetime) -> List[PricePoint]:
+    """Зміни ціни в проміжку [since, until] у порядку часу."""
+    blocks = PriceHistoryBlock.objects.filter(
+        bike_id=bike_id, start__lte=until, end__gte=since,
+    ).order_by('start', 'pk')
+    return [
+        point for block in blocks for point in decode_block(block)
+        if since <= point.at <= until
+    ]
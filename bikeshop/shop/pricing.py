@@ -0,0 +1,200 @@
+"""
+Рушій ціноутворення на основі правил ``PromotionRule``.
+
+Правила компілюються один раз на версію (версія зберігається у спільному
+кеші та збільшується при зміні будь-якого правила) у структуру в пам'яті.
+Далі кошик обчислюється за один прохід над знімком позицій без запитів до БД,
+а в базу записуються лише ті значення, що справді змінилися.
+
+Для кожної позиції діє найбільший із застосовних відсотків (знижки не
+сумуються):
+
+* ``bike_type`` — відсоток на конкретний тип або на всі типи (порожній тип);
+* ``quantity_tier`` — відсоток, якщо загальна кількість одиниць у кошику
+  не менша за ``min_quantity``;
+* ``first_order`` — відсоток, якщо користувач ще не має завершених замовлень.
+"""
+
+import logging
+from dataclasses import dataclass, field
+from decimal import Decimal, ROUND_HALF_UP
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from .catalog import get_version, bump_version
+from .models import Order, OrderItem, PromotionRule
+
+logger = logging.getLogger(__name__)
+
+RULES_VERSION_KEY = 'shop:pricing_rules_version'
+CENT = Decimal('0.01')
+HUNDRED = Decimal(100)
+
+
+@dataclass(frozen=True)
+class CartLine:
+    """Позиція кошика у знімку для обчислення."""
+    item_id: int
+    bike_id: int
+    bike_type_id: int
+    quantity: int
+    price: Decimal
+
+
+@dataclass(frozen=True)
+class CartSnapshot:
+    """Незмінний знімок кошика: позиції та ознака першого замовлення."""
+    lines: Tuple[CartLine, ...]
+    first_order: bool = False
+
+
+@dataclass
+class PricingResult:
+    """Результат обчислення знижок для одного кошика."""
+    line_discounts: Dict[int, Decimal] = field(default_factory=dict)
+    total_before: Decimal = Decimal('0.00')
+    discount: Decimal = Decimal('0.00')
+    percent: int = 0
+    changed: bool = False
+
+    @property
+    def total(self) -> Decimal:
+        return self.total_before - self.discount
+
+
+class CompiledRules:
+    """Активні правила, зведені до таблиць пошуку."""
+
+    def __init__(self, rules: Iterable[PromotionRule]):
+        self.type_percent: Dict[Optional[int], int] = {}
+        thresholds: Dict[int, int] = {}
+        self.first_order_percent = 0
+
+        for rule in rules:
+            # Валідатор моделі не діє для правил, створених через ORM чи фікстури
+            percent = min(rule.percent, 100)
+            if rule.kind == 'bike_type':
+                key = rule.bike_type_id
+                self.type_percent[key] = max(self.type_percent.get(key, 0), percent)
+            elif rule.kind == 'quantity_tier':
+                thresholds[rule.min_quantity] = max(thresholds.get(rule.min_quantity, 0), percent)
+            elif rule.kind == 'first_order':
+                self.first_order_percent = max(self.first_order_percent, percent)
+
+        # Від найбільшого порогу до найменшого; у кожного порогу — найбільший
+        # відсоток серед нього й нижчих, тож перший придатний поріг і є максимумом
+        self.tiers: List[Tuple[int, int]] = []
+        best = 0
+        for min_quantity, percent in sorted(thresholds.items()):
+            best = max(best, percent)
+            self.tiers.append((min_quantity, best))
+        self.tiers.reverse()
+        self.all_types_percent = self.type_percent.pop(None, 0)
+
+    def tier_percent(self, quantity: int) -> int:
+        for min_quantity, percent in self.tiers:
+            if quantity >= min_quantity:
+                return percent
+        return 0
+
+    def evaluate(self, snapshot: CartSnapshot) -> PricingResult:
+        """Обчислює знижку кожної позиції за один прохід."""
+        base = max(
+            self.all_types_percent,
+            self.tier_percent(sum(line.quantity for line in snapshot.lines)),
+            self.first_order_percent if snapshot.first_order else 0,
+        )
+        result = PricingResult()
+        for line in snapshot.lines:
+            percent = max(base, self.type_percent.get(line.bike_type_id, 0))
+            line_total = line.quantity * line.price
+            line_discount = (line_total * percent / HUNDRED).quantize(CENT, rounding=ROUND_HALF_UP)
+            result.line_discounts[line.item_id] = line_discount
+            result.total_before += line_total
+            result.discount += line_discount
+        if result.total_before:
+            result.percent = int((result.discount * HUNDRED / result.total_before).quantize(Decimal(1), rounding=ROUND_HALF_UP))
+        return result
+
+
+_compiled: Tuple[Optional[int], Optional[CompiledRules]] = (None, None)
+
+
+def get_rules_version() -> int:
+    return get_version(RULES_VERSION_KEY)
+
+
+def bump_rules_version() -> int:
+    return bump_version(RULES_VERSION_KEY)
+
+
+def get_compiled_rules() -> CompiledRules:
+    """Повертає скомпільовані правила, перекомпільовуючи їх лише при зміні версії."""
+    global _compiled
+    version = get_rules_version()
+    cached_version, rules = _compiled
+    if rules is None or cached_version != version:
+        rules = CompiledRules(PromotionRule.objects.filter(is_active=True))
+        _compiled = (version, rules)
+        logger.debug("Compiled pricing rules version %s", version)
+    return rules
+
+
+def price_orders(orders: Sequence[Order]) -> Dict[int, PricingResult]:
+    """
+    Перераховує знижки для кількох кошиків: один запит на позиції, один — на
+    ознаку першого замовлення, і bulk_update лише для змінених рядків.
+    Оновлює поля переданих об'єктів ``Order``.
+    """
+    orders = [order for order in orders if order.pk]
+    if not orders:
+        return {}
+
+    rows = (
+        OrderItem.objects
+        .filter(order_id__in=[order.pk for order in orders])
+        .order_by('pk')
+        .values_list('pk', 'order_id', 'bike_id', 'bike__bike_type_id', 'quantity', 'price', 'discount')
+    )
+    lines: Dict[int, List[CartLine]] = {order.pk: [] for order in orders}
+    stored_discounts: Dict[int, Decimal] = {}
+    for item_id, order_id, bike_id, bike_type_id, quantity, price, discount in rows:
+        lines[order_id].append(CartLine(item_id, bike_id, bike_type_id, quantity, price))
+        stored_discounts[item_id] = discount
+
+    user_ids = {order.user_id for order in orders}
+    returning_users = set(
+        Order.objects.filter(user_id__in=user_ids, completed=True).values_list('user_id', flat=True).distinct()
+    )
+
+    rules = get_compiled_rules()
+    results: Dict[int, PricingResult] = {}
+    changed_items: List[OrderItem] = []
+    changed_orders: List[Order] = []
+
+    for order in orders:
+        snapshot = CartSnapshot(tuple(lines[order.pk]), first_order=order.user_id not in returning_users)
+        result = rules.evaluate(snapshot)
+        items_before = len(changed_items)
+        for item_id, discount in result.line_discounts.items():
+            if stored_discounts[item_id] != discount:
+                changed_items.append(OrderItem(pk=item_id, discount=discount))
+        order_changed = (order.discount, order.discount_percent, order.total) != (
+            result.discount, result.percent, result.total)
+        if order_changed:
+            order.discount = result.discount
+            order.discount_percent = result.percent
+            order.total = result.total
+            changed_orders.append(order)
+        result.changed = order_changed or len(changed_items) > items_before
+        results[order.pk] = result
+
+    if changed_items:
+        OrderItem.objects.bulk_update(changed_items, ['discount'], batch_size=500)
+    if changed_orders:
+        Order.objects.bulk_update(changed_orders, ['discount', 'discount_percent', 'total'], batch_size=500)
+    return results
+
+
+def apply_pricing(order: Order) -> PricingResult:
+    """Перераховує знижки одного кошика."""
+    return price_orders([order])[order.pk]
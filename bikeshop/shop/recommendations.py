@@ -0,0 +1,162 @@
+"""
+Рекомендації «часто купують разом» із спільних покупок.
+
+Для кожного велосипеда таблиця ``BikeRecommendation`` зберігає до
+``SHOP_RECOMMENDATION_SLOTS`` сусідів з лічильником замовлень, у яких вони
+траплялися разом. Сторінка замовлення читає найкращих сусідів одним запитом
+по індексу (bike, -score), без обчислень на шляху запиту.
+
+* :func:`rebuild` рахує точну матрицю спільних покупок з усіх завершених
+  замовлень (робочих і архівних) на Python: лічильники пар по кошиках
+  пачками замовлень. Пам'ять обмежена розміром пачки і кількістю
+  ненульових пар; 1 млн рядків замовлень — близько 4 с і 45 МБ
+  (benchmarks/bench_recommendations.py), тож NumPy/SciPy тут не потрібні.
+* :func:`order_completed` оновлює таблицю інкрементно для щойно
+  завершеного замовлення за алгоритмом Space-Saving: відомий сусід отримує
+  +1, новий займає вільний слот або витісняє найслабшого з сусідів поза
+  цим замовленням, успадкувавши його лічильник + 1. Оцінка може бути
+  трохи завищена для нових сусідів, тож періодичний
+  ``rebuild_recommendations`` повертає точні значення.
+"""
+
+import heapq
+import logging
+from collections import Counter, defaultdict
+from itertools import groupby
+from operator import itemgetter
+from typing import Dict, Iterable, Iterator, List, Tuple
+
+from django.conf import settings
+from django.db import transaction
+
+from .models import ArchivedOrderItem, Bike, BikeRecommendation, OrderItem
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SLOTS = 20
+DEFAULT_SHOWN = 4
+DEFAULT_CHUNK_SIZE = 100000
+
+Neighbours = Dict[int, List[Tuple[int, int]]]
+
+
+def _slots() -> int:
+    return getattr(settings, 'SHOP_RECOMMENDATION_SLOTS', DEFAULT_SLOTS)
+
+
+# ===== ЧИТАННЯ =====
+
+def for_bike(bike_id: int, limit: int = None) -> List[Bike]:
+    """Рекомендовані велосипеди в наявності, від найчастіших."""
+    limit = limit or getattr(settings, 'SHOP_RECOMMENDATIONS_SHOWN', DEFAULT_SHOWN)
+    rows = (
+        BikeRecommendation.objects
+        .filter(bike_id=bike_id, recommended__in_stock=True)
+        .select_related('recommended')
+        .order_by('-score')[:limit]
+    )
+    return [row.recommended for row in rows]
+
+
+# ===== ПОВНА ПЕРЕБУДОВА =====
+
+def order_lines(chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[List[Tuple[int, int]]]:
+    """
+    Пари (id замовлення, id велосипеда) завершених замовлень пачками, впорядковані
+    за замовленням. Пачка містить лише цілі замовлення: хвіст незавершеного
+    переноситься в наступну.
+    """
+    for item_model in (OrderItem, ArchivedOrderItem):
+        rows = (
+            item_model.objects.filter(order__completed=True)
+            .order_by('order_id').values_list('order_id', 'bike_id')
+            .iterator(chunk_size=min(chunk_size, 10000))
+        )
+        chunk: List[Tuple[int, int]] = []
+        for row in rows:
+            if len(chunk) >= chunk_size and row[0] != chunk[-1][0]:
+                yield chunk
+                chunk = []
+            chunk.append(row)
+        if chunk:
+            yield chunk
+
+
+def _top(counts: Iterable[Tuple[int, int]], slots: int) -> List[Tuple[int, int]]:
+    # За рівності лічильників — менший id, щоб результат був детермінованим
+    return heapq.nsmallest(slots, counts, key=lambda pair: (-pair[1], pair[0]))
+
+
+def cooccurrence_python(chunks: Iterable[List[Tuple[int, int]]], slots: int) -> Neighbours:
+    counts: Dict[int, Counter] = defaultdict(Counter)
+    for chunk in chunks:
+        for _, lines in groupby(chunk, key=itemgetter(0)):
+            bikes = {bike_id for _, bike_id in lines}
+            if len(bikes) < 2:
+                continue
+            for bike_id in bikes:
+                counts[bike_id].update(bikes)
+    return {
+        bike_id: _top(((other, n) for other, n in counter.items() if other != bike_id), slots)
+        for bike_id, counter in counts.items()
+    }
+
+
+def rebuild(chunk_size: int = DEFAULT_CHUNK_SIZE) -> int:
+    """
+    Перебудовує таблицю рекомендацій з усіх завершених замовлень.
+    Повертає кількість записаних пар.
+    """
+    neighbours = cooccurrence_python(order_lines(chunk_size), _slots())
+
+    with transaction.atomic():
+        BikeRecommendation.objects.all().delete()
+        rows = BikeRecommendation.objects.bulk_create(
+            (BikeRecommendation(bike_id=bike_id, recommended_id=other, score=score)
+             for bike_id, top in neighbours.items() for other, score in top),
+            batch_size=1000,
+        )
+    logger.info("Rebuilt %d bike recommendations for %d bikes", len(rows), len(neighbours))
+    return len(rows)
+
+
+# ===== ІНКРЕМЕНТНЕ ОНОВЛЕННЯ =====
+
+def order_completed(order_id: int) -> None:
+    """Додає спільні покупки щойно завершеного замовлення (Space-Saving на ``slots`` сусідів)."""
+    bikes = set(OrderItem.objects.filter(order_id=order_id).values_list('bike_id', flat=True))
+    if len(bikes) < 2:
+        return
+    slots = _slots()
+    with transaction.atomic():
+        current: Dict[int, Dict[int, BikeRecommendation]] = defaultdict(dict)
+        for row in BikeRecommendation.objects.select_for_update().filter(bike_id__in=bikes):
+            current[row.bike_id][row.recommended_id] = row
+
+        to_delete, to_create, to_update = [], [], []
+        for bike_id in bikes:
+            neighbours = current[bike_id]
+            others = bikes - {bike_id}
+            # Спершу +1 відомим сусідам: велосипед із цього ж кошика не може
+            # бути витісненим, інакше він і витіснив би інший рядок
+            for other in others & neighbours.keys():
+                neighbours[other].score += 1
+                to_update.append(neighbours[other])
+            for other in sorted(others - neighbours.keys()):
+                score = 1
+                if len(neighbours) >= slots:
+                    victims = [row for row in neighbours.values() if row.recommended_id not in bikes]
+                    if not victims:
+                        break
+                    weakest = min(victims, key=lambda r: r.score)
+                    del neighbours[weakest.recommended_id]
+                    to_delete.append(weakest.pk)
+                    score = weakest.score + 1
+                neighbours[other] = BikeRecommendation(bike_id=bike_id, recommended_id=other, score=score)
+                to_create.append(neighbours[other])
+
+        # Витіснення — видалення і вставка: жоден рядок не бере пару, яку
+        # ще тримає інший, тож унікальність (bike, recommended) не порушується
+        BikeRecommendation.objects.filter(pk__in=to_delete).delete()
+        BikeRecommendation.objects.bulk_create(to_create)
+        BikeRecommendation.objects.bulk_update(to_update, ['score'], batch_size=500)
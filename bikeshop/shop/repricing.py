@@ -0,0 +1,176 @@
+"""
+Масова зміна цін каталогу з перенесенням нових цін у відкриті кошики.
+
+Специфікація змін (``PriceChangeSpec``) складається з відсотків за типом
+велосипеда та абсолютних цін для окремих велосипедів (мають пріоритет).
+Нові ціни обчислюються в ``Decimal`` з округленням до копійки і
+записуються пачками: один ``executemany`` з параметризованим UPDATE на
+пачку (shop/bulk.py). Позиції відкритих замовлень
+(``completed=False``) отримують нову ціну одним UPDATE на пачку, після чого
+сума кожного зачепленого замовлення перераховується рівно один раз. Нові
+ціни пачки дописуються в історію цін (shop/price_history.py), а старі ціни
+велосипедів, за якими стежать, — у чергу розсилки (shop/watchlist.py).
+"""
+
+import csv
+import logging
+import time
+from dataclasses import dataclass, field
+from decimal import Decimal, ROUND_HALF_UP
+from typing import Dict, Iterable, Iterator, List, Tuple
+
+from django.db import transaction
+from django.db.models import OuterRef, Subquery
+from django.utils import timezone
+
+from .catalog import bump_catalog_version
+from .models import Bike, BikeType, Order, OrderItem
+from .pricing import price_orders
+from . import bulk, price_history, watchlist
+
+logger = logging.getLogger(__name__)
+
+CENT = Decimal('0.01')
+HUNDRED = Decimal(100)
+DEFAULT_CHUNK_SIZE = 1000
+
+
+class PriceSpecError(ValueError):
+    """Некоректна специфікація зміни цін."""
+
+
+@dataclass
+class PriceChangeSpec:
+    """Специфікація зміни цін: відсотки за типом і абсолютні ціни за id велосипеда."""
+    percent_by_type: Dict[str, Decimal] = field(default_factory=dict)
+    overrides: Dict[int, Decimal] = field(default_factory=dict)
+
+    @classmethod
+    def from_csv(cls, rows: Iterable[str]) -> 'PriceChangeSpec':
+        """
+        Читає CSV з заголовком. Рядки з колонками ``bike_id,price`` задають
+        абсолютні ціни, рядки з ``bike_type,percent`` — відсоток за типом.
+        """
+        spec = cls()
+        for line_no, row in enumerate(csv.DictReader(rows), start=2):
+            if not row.get('bike_id') and not row.get('bike_type'):
+                raise PriceSpecError(f"Рядок {line_no}: потрібна колонка bike_id або bike_type")
+            try:
+                if row.get('bike_id'):
+                    spec.overrides[int(row['bike_id'])] = Decimal(row['price'])
+                else:
+                    spec.percent_by_type[row['bike_type']] = Decimal(row['percent'])
+            except (KeyError, TypeError, ArithmeticError, ValueError) as e:
+                raise PriceSpecError(f"Рядок {line_no}: некоректне значення ({e!r})") from e
+        return spec
+
+    def resolve_types(self) -> Dict[int, Decimal]:
+        """Перетворює ключі типів (id або назва) на id ``BikeType``."""
+        resolved: Dict[int, Decimal] = {}
+        names = {key: percent for key, percent in self.percent_by_type.items() if not str(key).isdigit()}
+        for key, percent in self.percent_by_type.items():
+            if str(key).isdigit():
+                resolved[int(key)] = percent
+        found = dict(BikeType.objects.filter(name__in=names).values_list('name', 'id'))
+        missing = set(names) - set(found)
+        if missing:
+            raise PriceSpecError(f"Невідомі типи велосипедів: {', '.join(sorted(missing))}")
+        for name, percent in names.items():
+            resolved[found[name]] = percent
+        return resolved
+
+
+@dataclass
+class RepriceReport:
+    """Підсумок виконання зміни цін."""
+    bikes: int = 0
+    order_items: int = 0
+    orders: int = 0
+    seconds: float = 0.0
+
+
+def apply_percent(price: Decimal, percent: Decimal) -> Decimal:
+    """Ціна після зміни на ``percent`` відсотків (від'ємний — здешевлення)."""
+    return (price * (HUNDRED + percent) / HUNDRED).quantize(CENT, rounding=ROUND_HALF_UP)
+
+
+def compute_new_prices(spec: PriceChangeSpec, chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[Tuple[int, Decimal]]:
+    """
+    Генерує пари (id велосипеда, нова ціна) лише для тих, чия ціна змінюється.
+
+    Велосипеди читаються сторінками за pk, кожна — окремим повністю
+    прочитаним запитом: споживач між сторінками оновлює ту саму таблицю, а
+    ``iterator()`` тримав би відкритий курсор SQLite під час цих UPDATE.
+    """
+    type_percent = spec.resolve_types()
+    overrides = {bike_id: price.quantize(CENT, rounding=ROUND_HALF_UP) for bike_id, price in spec.overrides.items()}
+    if any(price < 0 for price in overrides.values()):
+        raise PriceSpecError("Ціна не може бути від'ємною")
+    if any(percent < -HUNDRED for percent in type_percent.values()):
+        raise PriceSpecError("Зниження ціни не може перевищувати 100%")
+
+    bikes = Bike.objects.order_by('pk').values_list('pk', 'bike_type_id', 'price')
+    if not overrides:
+        bikes = bikes.filter(bike_type_id__in=type_percent)
+    last_id = 0
+    while True:
+        page = list(bikes.filter(pk__gt=last_id)[:chunk_size])
+        if not page:
+            return
+        last_id = page[-1][0]
+        for bike_id, bike_type_id, price in page:
+            if bike_id in overrides:
+                new_price = overrides[bike_id]
+            elif bike_type_id in type_percent:
+                new_price = apply_percent(price, type_percent[bike_type_id])
+            else:
+                continue
+            if new_price != price:
+                yield bike_id, new_price
+
+
+def _chunks(iterable: Iterable, size: int) -> Iterator[List]:
+    chunk = []
+    for value in iterable:
+        chunk.append(value)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def reprice_catalog(spec: PriceChangeSpec, chunk_size: int = DEFAULT_CHUNK_SIZE) -> RepriceReport:
+    """Застосовує зміну цін до каталогу та відкритих кошиків."""
+    started = time.perf_counter()
+    report = RepriceReport()
+    changed_at = timezone.now()
+    open_order_ids = set()
+    current_price = Subquery(Bike.objects.filter(pk=OuterRef('bike_id')).values('price')[:1])
+
+    for chunk in _chunks(compute_new_prices(spec, chunk_size), chunk_size):
+        bike_ids = [bike_id for bike_id, _ in chunk]
+        with transaction.atomic():
+            # Старі ціни велосипедів зі списків бажань — у чергу розсилки, до їх перезапису
+            watchlist.record_price_changes(bike_ids, at=changed_at)
+            bulk.update_rows(Bike, ['price'], chunk)
+            price_history.record(chunk, at=changed_at)
+            open_items = OrderItem.objects.filter(order__completed=False, bike_id__in=bike_ids)
+            open_order_ids.update(open_items.values_list('order_id', flat=True).distinct())
+            report.order_items += open_items.update(price=current_price)
+        report.bikes += len(chunk)
+
+    # Одне перерахування суми на кожне зачеплене замовлення
+    for order_ids in _chunks(sorted(open_order_ids), chunk_size):
+        with transaction.atomic():
+            price_orders(list(Order.objects.filter(pk__in=order_ids)))
+        report.orders += len(order_ids)
+
+    if report.bikes:
+        transaction.on_commit(bump_catalog_version)
+    report.seconds = time.perf_counter() - started
+    logger.info(
+        "Repriced %d bikes, %d open order items, %d orders in %.2fs",
+        report.bikes, report.order_items, report.orders, report.seconds,
+    )
+    return report
@@ -0,0 +1,128 @@
+"""
+Інкрементні зведені таблиці продажів (``SalesRollup``).
+
+Кожен бакет — це день створення замовлення × тип велосипеда × статус
+замовлення з сумами одиниць, валового доходу, знижки та чистого доходу.
+Враховуються лише завершені (``completed=True``) замовлення. Коли замовлення
+завершується або змінює статус, його внесок віднімається зі старого бакета
+і додається до нового, тож звіти читають лише невелику таблицю підсумків.
+"""
+
+import logging
+from collections import defaultdict
+from decimal import Decimal
+from typing import Dict, Iterable, Optional, Tuple
+
+from django.db import transaction
+from django.db.models import F, QuerySet
+from django.utils import timezone
+
+from .models import ArchivedOrder, ArchivedOrderItem, Order, OrderItem, SalesRollup
+
+logger = logging.getLogger(__name__)
+
+# (день, id типу) -> [одиниці, валовий дохід, знижка]
+Contributions = Dict[Tuple, list]
+OrderState = Tuple[bool, Optional[str]]
+
+DEFAULT_CHUNK_SIZE = 5000
+
+
+def _new_totals() -> list:
+    return [0, Decimal('0.00'), Decimal('0.00')]
+
+
+def order_contributions(order_ids: Iterable[int], item_model=OrderItem) -> Contributions:
+    """
+    Агрегує позиції замовлень у внески за (день, тип) без урахування статусу.
+    ``order_ids`` — список id або підзапит ``values('pk')``; ``item_model`` —
+    ``OrderItem`` або ``ArchivedOrderItem`` для архівних замовлень.
+    """
+    if not isinstance(order_ids, QuerySet):
+        order_ids = list(order_ids)
+    contributions: Contributions = defaultdict(_new_totals)
+    rows = item_model.objects.filter(order_id__in=order_ids).values_list(
+        'order__created_at', 'bike__bike_type_id', 'quantity', 'price', 'discount'
+    )
+    for created_at, bike_type_id, quantity, price, discount in rows:
+        totals = contributions[(timezone.localdate(created_at), bike_type_id)]
+        totals[0] += quantity
+        totals[1] += quantity * price
+        totals[2] += discount
+    return contributions
+
+
+def apply_contributions(contributions: Contributions, status: str, sign: int) -> None:
+    """Додає (sign=1) або віднімає (sign=-1) внески в бакетах заданого статусу."""
+    for (day, bike_type_id), (units, gross, discount) in contributions.items():
+        bucket, _ = SalesRollup.objects.get_or_create(day=day, bike_type_id=bike_type_id, status=status)
+        SalesRollup.objects.filter(pk=bucket.pk).update(
+            units=F('units') + sign * units,
+            gross=F('gross') + sign * gross,
+            discount=F('discount') + sign * discount,
+            net=F('net') + sign * (gross - discount),
+        )
+
+
+def move_orders(order_ids: Iterable[int], old: OrderState, new: OrderState) -> None:
+    """Переносить внесок замовлень між бакетами при зміні (completed, status)."""
+    old_completed, old_status = old
+    new_completed, new_status = new
+    if not old_completed and not new_completed:
+        return
+    if old_completed and new_completed and old_status == new_status:
+        return
+    contributions = order_contributions(order_ids)
+    with transaction.atomic():
+        if old_completed:
+            apply_contributions(contributions, old_status, -1)
+        if new_completed:
+            apply_contributions(contributions, new_status, 1)
+
+
+def order_state_changed(order: Order) -> None:
+    """Оновлює зведення після збереження замовлення, якщо змінився його стан."""
+    old = getattr(order, '_loaded_state', (False, None))
+    new = (order.completed, order.status)
+    if old != new:
+        move_orders([order.pk], old, new)
+        order._loaded_state = new
+
+
+def rebuild(chunk_size: int = DEFAULT_CHUNK_SIZE) -> int:
+    """
+    Повністю перебудовує зведення з історії, обходячи завершені замовлення
+    (робочі й архівні) пачками за первинним ключем. Пам'ять обмежена
+    кількістю бакетів. Повертає кількість створених бакетів.
+    """
+    buckets: Dict[Tuple, list] = defaultdict(_new_totals)
+    for order_model, item_model in ((Order, OrderItem), (ArchivedOrder, ArchivedOrderItem)):
+        last_pk = 0
+        while True:
+            chunk = list(
+                order_model.objects.filter(completed=True, pk__gt=last_pk)
+                .order_by('pk').values_list('pk', 'status')[:chunk_size]
+            )
+            if not chunk:
+                break
+            last_pk = chunk[-1][0]
+            by_status = defaultdict(list)
+            for pk, status in chunk:
+                by_status[status].append(pk)
+            for status, pks in by_status.items():
+                for (day, bike_type_id), totals in order_contributions(pks, item_model).items():
+                    bucket = buckets[(day, bike_type_id, status)]
+                    for i, value in enumerate(totals):
+                        bucket[i] += value
+            logger.debug("Rollup rebuild processed %s up to #%s", order_model.__name__, last_pk)
+
+    with transaction.atomic():
+        SalesRollup.objects.all().delete()
+        SalesRollup.objects.bulk_create(
+            (SalesRollup(day=day, bike_type_id=bike_type_id, status=status,
+                         units=units, gross=gross, discount=discount, net=gross - discount)
+             for (day, bike_type_id, status), (units, gross, discount) in buckets.items()),
+            batch_size=1000,
+        )
+    logger.info("Rebuilt %d sales rollup buckets", len(buckets))
+    return len(buckets)
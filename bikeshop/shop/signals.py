@@ -0,0 +1,92 @@
+"""
+Обробники сигналів моделей shop. Підключаються в ``ShopConfig.ready``.
+"""
+
+from functools import partial
+
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from .catalog import bump_catalog_version
+from .models import Bike, BikeType, MountainBikeSpec, RoadBikeSpec, CityBikeSpec, Order, PromotionRule
+from .pricing import bump_rules_version
+from . import autocomplete, price_history, recommendations, rollups, specs, watchlist
+
+CATALOG_MODELS = (Bike, BikeType, MountainBikeSpec, RoadBikeSpec, CityBikeSpec)
+
+
+def catalog_changed(sender, **kwargs) -> None:
+    """Будь-яка зміна каталогу інвалідує кешовані фрагменти через нову версію."""
+    transaction.on_commit(bump_catalog_version)
+
+
+def spec_changed(sender, instance, signal, **kwargs) -> None:
+    """Зміна рядка spec-таблиці переноситься у зведені колонки велосипеда."""
+    if kwargs.get('raw'):
+        return
+    bike = instance.bike if sender.bike.is_cached(instance) else None
+    if signal is post_save:
+        specs.sync_bike(instance.bike_id, spec=instance, bike=bike)
+    else:
+        specs.sync_bike(instance.bike_id, bike=bike)
+
+
+# Підключення лише до конкретних моделей: обробник без sender змусив би
+# Django видаляти рядки будь-якої моделі (наприклад, при архівації
+# замовлень) по одному з надсиланням сигналів замість одного DELETE
+for _model in CATALOG_MODELS:
+    post_save.connect(catalog_changed, sender=_model, dispatch_uid='shop_catalog_saved')
+    post_delete.connect(catalog_changed, sender=_model, dispatch_uid='shop_catalog_deleted')
+for _model in specs.SPEC_MODELS:
+    post_save.connect(spec_changed, sender=_model, dispatch_uid='shop_spec_saved')
+    post_delete.connect(spec_changed, sender=_model, dispatch_uid='shop_spec_deleted')
+
+
+@receiver(post_save, sender=Bike, dispatch_uid='shop_bike_price_history')
+def bike_price_saved(sender, instance: Bike, created: bool, raw: bool = False, **kwargs) -> None:
+    """
+    Нова або змінена ціна велосипеда дописується в історію цін; зміна ціни
+    чи повернення в наявність — у чергу списку бажань.
+    """
+    if raw:
+        return
+    old_price = getattr(instance, '_loaded_price', None)
+    if created or instance.price != old_price:
+        price_history.record([(instance.pk, instance.price)])
+        instance._loaded_price = instance.price
+    if not created:
+        watchlist.record_change(instance, old_price, getattr(instance, '_loaded_in_stock', None))
+    instance._loaded_in_stock = instance.in_stock
+
+
+@receiver(post_save, sender=Bike, dispatch_uid='shop_bike_autocomplete_saved')
+@receiver(post_delete, sender=Bike, dispatch_uid='shop_bike_autocomplete_deleted')
+@receiver(post_save, sender=BikeType, dispatch_uid='shop_bike_type_autocomplete_saved')
+@receiver(post_delete, sender=BikeType, dispatch_uid='shop_bike_type_autocomplete_deleted')
+def autocomplete_changed(sender, instance, signal, raw: bool = False, **kwargs) -> None:
+    """Назва велосипеда в наявності чи типу потрапляє в індекс підказок процесу після коміту."""
+    if raw:
+        return
+    listed = signal is post_save and (sender is BikeType or instance.in_stock)
+    kind = autocomplete.BIKE if sender is Bike else autocomplete.TYPE
+    transaction.on_commit(partial(autocomplete.item_changed, kind, instance.pk, instance.name if listed else None))
+
+
+@receiver(post_save, sender=PromotionRule, dispatch_uid='shop_promotion_rule_saved')
+@receiver(post_delete, sender=PromotionRule, dispatch_uid='shop_promotion_rule_deleted')
+def promotion_rules_changed(sender, **kwargs) -> None:
+    """Нова версія правил змушує воркери перекомпілювати їх при наступному обчисленні."""
+    transaction.on_commit(bump_rules_version)
+
+
+@receiver(post_save, sender=Order, dispatch_uid='shop_order_rollups')
+def order_saved(sender, instance: Order, **kwargs) -> None:
+    """
+    Завершення замовлення або зміна статусу оновлює зведені таблиці продажів;
+    завершення ще й додає спільні покупки в рекомендації.
+    """
+    was_completed = getattr(instance, '_loaded_state', (False, None))[0]
+    rollups.order_state_changed(instance)
+    if instance.completed and not was_completed:
+        transaction.on_commit(partial(recommendations.order_completed, instance.pk))
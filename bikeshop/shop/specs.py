@@ -0,0 +1,62 @@
+"""
+Зведене зберігання специфікацій велосипедів.
+
+Специфікації живуть у колонках ``Bike.specs`` (JSON) і ``Bike.specifics_text``
+(готовий текст), тож сторінка каталогу читається одним запитом. Таблиці
+``MountainBikeSpec``/``RoadBikeSpec``/``CityBikeSpec`` лишаються шаром
+сумісності: ``BikeFactory`` та адмінка пишуть у них, а сигнали переносять
+зміни у зведені колонки. Якщо у велосипеда кілька специфікацій, діє той
+самий пріоритет, що й раніше в ``get_specifics``: гірська, шосейна, міська.
+"""
+
+from typing import Optional
+
+from .models import Bike, MountainBikeSpec, RoadBikeSpec, CityBikeSpec, DEFAULT_SPECIFICS
+
+# Порядок визначає пріоритет
+SPEC_MODELS = (MountainBikeSpec, RoadBikeSpec, CityBikeSpec)
+SPEC_MODELS_BY_KIND = {model.kind: model for model in SPEC_MODELS}
+
+
+def spec_payload(spec) -> dict:
+    """Зведений словник для рядка spec-таблиці."""
+    payload = {'kind': spec.kind}
+    payload.update((name, getattr(spec, name)) for name in spec.spec_fields)
+    return payload
+
+
+def describe(specs: dict) -> str:
+    """Текст специфіки для зведеного словника (той самий, що дає spec-модель)."""
+    model = SPEC_MODELS_BY_KIND.get(specs.get('kind'))
+    if model is None:
+        return DEFAULT_SPECIFICS
+    return model(**{name: specs[name] for name in model.spec_fields if name in specs}).get_specifics()
+
+
+def _legacy_spec(bike_id: int):
+    for model in SPEC_MODELS:
+        spec = model.objects.filter(bike_id=bike_id).first()
+        if spec is not None:
+            return spec
+    return None
+
+
+def sync_bike(bike_id: int, spec=None, bike: Optional[Bike] = None) -> bool:
+    """
+    Оновлює зведені колонки велосипеда з його spec-таблиць. ``spec`` — щойно
+    збережений рядок (пропускає пошук, якщо вищого за пріоритетом немає),
+    ``bike`` — об'єкт у пам'яті, який теж варто оновити. Повертає True, якщо
+    колонки змінилися.
+    """
+    if spec is None or any(
+        model.objects.filter(bike_id=bike_id).exists()
+        for model in SPEC_MODELS[:SPEC_MODELS.index(type(spec))]
+    ):
+        spec = _legacy_spec(bike_id)
+    specs = spec_payload(spec) if spec is not None else {}
+    text = describe(specs)
+    if bike is not None:
+        if (bike.specs, bike.specifics_text) == (specs, text):
+            return False
+        bike.specs, bike.specifics_text = specs, text
+    return bool(Bike.objects.filter(pk=bike_id).update(specs=specs, specifics_text=text))
@@ -0,0 +1,17 @@
+import atexit
+import os
+import shutil
+import tempfile
+
+from django.test.utils import override_settings
+
+# Бакети обмеження частоти, знімок каталогу і трасування не мають переходити між
+# прогонами тестів і змішуватися з файлами запущеного сервера
+_var_dir = tempfile.mkdtemp(prefix='shop-var-')
+atexit.register(shutil.rmtree, _var_dir, ignore_errors=True)
+override_settings(
+    SHOP_THROTTLE_TABLE=os.path.join(_var_dir, 'throttle.bin'),
+    SHOP_CATALOG_SNAPSHOT=os.path.join(_var_dir, 'catalog.snapshot'),
+    SHOP_TRACE_FILE=os.path.join(_var_dir, 'traces.jsonl'),
+    SHOP_TRACE_SAMPLE_RATE=0,
+).enable()
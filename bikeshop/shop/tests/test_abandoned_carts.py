@@ -0,0 +1,98 @@
+# shop/tests/test_abandoned_carts.py
+"""Tests for the abandoned-cart sweeper."""
+import io
+from datetime import timedelta
+from decimal import Decimal
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from ..abandoned_carts import delete_chunk, sweep_abandoned_carts
+from ..models import Bike, BikeType, Order, OrderItem
+from ..patterns.state import history
+
+
+class AbandonedCartTests(TestCase):
+    """Tests for finding, deleting and expiring idle carts."""
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='buyer', password='12345')
+        bike_type = BikeType.objects.create(name="road", description="")
+        self.bike = Bike.objects.create(
+            name="Bike", bike_type=bike_type, price=Decimal('100.00'), description="", image="test.jpg"
+        )
+        self.now = timezone.now()
+
+    def make_cart(self, idle_days, completed=False, items=1):
+        order = Order.objects.create(user=self.user, total=Decimal('100.00'), completed=completed)
+        OrderItem.objects.bulk_create(
+            OrderItem(order=order, bike=self.bike, price=Decimal('100.00')) for _ in range(items)
+        )
+        Order.objects.filter(pk=order.pk).update(updated_at=self.now - timedelta(days=idle_days))
+        return order
+
+    def test_idle_query_uses_index(self):
+        """Вибірка покинутих кошиків іде індексом (completed, updated_at)"""
+        if connection.vendor != 'sqlite':
+            self.skipTest("План запиту перевіряється лише на SQLite")
+        sql, params = Order.objects.idle_carts(self.now).order_by('updated_at', 'pk').query.sql_with_params()
+        with connection.cursor() as cursor:
+            cursor.execute('EXPLAIN QUERY PLAN ' + sql, params)
+            plan = ' '.join(str(row) for row in cursor.fetchall())
+        self.assertIn('shop_order_open_idle_idx', plan)
+
+    def test_sweep_deletes_only_idle_carts(self):
+        """Видаляються лише старі незавершені кошики, звіт рахує звільнені рядки"""
+        idle = [self.make_cart(30, items=2) for _ in range(3)]
+        fresh = self.make_cart(1)
+        completed = self.make_cart(30, completed=True)
+
+        report = sweep_abandoned_carts(14, chunk_size=2, now=self.now)
+
+        self.assertEqual((report.orders, report.items, report.chunks, report.rows), (3, 6, 2, 9))
+        self.assertFalse(Order.objects.filter(pk__in=[order.pk for order in idle]).exists())
+        self.assertEqual(set(Order.objects.values_list('pk', flat=True)), {fresh.pk, completed.pk})
+        self.assertEqual(OrderItem.objects.count(), 2)
+
+    def test_touched_cart_survives_chunk(self):
+        """Кошик, змінений після вибірки, не видаляється"""
+        order = self.make_cart(30)
+        Order.objects.filter(pk=order.pk).touch()
+        self.assertEqual(delete_chunk([order.pk], self.now - timedelta(days=14)), (0, 0))
+        self.assertTrue(Order.objects.filter(pk=order.pk).exists())
+
+    def test_expire_cancels_carts(self):
+        """Режим expire скасовує кошики через автомат статусів"""
+        order = self.make_cart(30)
+        report = sweep_abandoned_carts(14, expire=True, now=self.now)
+
+        self.assertEqual(report.orders, 1)
+        self.assertEqual(Order.objects.get(pk=order.pk).status, 'canceled')
+        self.assertEqual(history(order.pk)[0][1:3], ('new', 'canceled'))
+        self.assertFalse(self.user.order_set.open_carts().exists())
+        self.assertEqual(sweep_abandoned_carts(14, expire=True, now=self.now).orders, 0)
+
+    def test_visiting_cart_keeps_it_alive(self):
+        """Відвідування сторінки замовлення оновлює updated_at кошика"""
+        order = self.make_cart(30)
+        self.client.force_login(self.user)
+        self.client.get(reverse('shop:create_order', args=[self.bike.pk]))
+
+        self.assertGreater(Order.objects.get(pk=order.pk).updated_at, self.now - timedelta(minutes=1))
+        self.assertEqual(sweep_abandoned_carts(14, now=self.now).orders, 0)
+
+    def test_command(self):
+        """Команда з --dry-run лише рахує, без нього — видаляє"""
+        self.make_cart(30)
+        out = io.StringIO()
+        call_command('sweep_carts', '--dry-run', stdout=out)
+        self.assertIn("Покинутих кошиків: 1", out.getvalue())
+        self.assertEqual(Order.objects.count(), 1)
+
+        call_command('sweep_carts', stdout=out)
+        self.assertIn("Звільнено рядків: 2 (1 кошиків, 1 позицій", out.getvalue())
+        self.assertFalse(Order.objects.exists())
@@ -0,0 +1,117 @@
+# shop/tests/test_admin.py
+"""Tests for the shop admin configuration."""
+from decimal import Decimal
+from django.contrib.admin.sites import site
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from ..admin import EstimatedCountPaginator
+from ..models import Bike, BikeType, Order, OrderItem, SalesRollup
+
+
+class ShopAdminTests(TestCase):
+    """Tests for changelists and bulk actions."""
+
+    def setUp(self):
+        self.admin = User.objects.create_superuser(username='admin', password='12345', email='a@example.com')
+        self.client.force_login(self.admin)
+        self.bike_type = BikeType.objects.create(name="road", description="")
+        self.bike = Bike.objects.create(
+            name="Bike", bike_type=self.bike_type, price=Decimal('100.00'), description="", image="test.jpg"
+        )
+
+    def make_orders(self, count, completed=False):
+        for _ in range(count):
+            user = User.objects.create_user(username=f'user{Order.objects.count()}')
+            order = Order.objects.create(user=user, total=Decimal('100.00'))
+            OrderItem.objects.create(order=order, bike=self.bike, price=Decimal('100.00'))
+            if completed:
+                order.completed = True
+                order.save()
+
+    def changelist_queries(self, url):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return len(ctx)
+
+    def test_changelists_have_no_per_row_queries(self):
+        """Кількість запитів не залежить від кількості рядків"""
+        self.make_orders(2)
+        few_orders = self.changelist_queries('/admin/shop/order/')
+        few_items = self.changelist_queries('/admin/shop/orderitem/')
+        self.make_orders(8)
+
+        self.assertEqual(self.changelist_queries('/admin/shop/order/'), few_orders)
+        self.assertEqual(self.changelist_queries('/admin/shop/orderitem/'), few_items)
+
+    def test_exact_search(self):
+        """Пошук замовлень за точним id або іменем користувача"""
+        self.make_orders(3)
+        order = Order.objects.last()
+
+        response = self.client.get('/admin/shop/order/', {'q': str(order.pk)})
+        self.assertEqual(list(response.context['cl'].result_list), [order])
+
+        response = self.client.get('/admin/shop/order/', {'q': order.user.username})
+        self.assertEqual(list(response.context['cl'].result_list), [order])
+
+    def test_bike_prefix_search(self):
+        """Пошук велосипедів за id або початком назви читає індекс"""
+        other = Bike.objects.create(name="Bikepacker", bike_type=self.bike_type, price=Decimal('100.00'),
+                                    description="", image="test.jpg")
+        Bike.objects.create(name="Road", bike_type=self.bike_type, price=Decimal('100.00'),
+                            description="", image="test.jpg")
+
+        response = self.client.get('/admin/shop/bike/', {'q': 'Bike'})
+        self.assertEqual(set(response.context['cl'].result_list), {self.bike, other})
+        response = self.client.get('/admin/shop/bike/', {'q': str(other.pk)})
+        self.assertEqual(list(response.context['cl'].result_list), [other])
+        response = self.client.get('/admin/shop/bike/', {'q': 'bike'})
+        self.assertEqual(list(response.context['cl'].result_list), [])
+
+        queryset, _ = site._registry[Bike].get_search_results(None, Bike.objects.all(), 'Bike')
+        self.assertIn('shop_bike_name_idx', queryset.explain())
+
+    def test_status_action_updates_rollups(self):
+        """Масова зміна статусу — один UPDATE на вихідний статус, звіти оновлюються"""
+        self.make_orders(3, completed=True)
+        ids = list(Order.objects.values_list('pk', flat=True))
+
+        response = self.client.post('/admin/shop/order/', {
+            'action': 'mark_shipped', '_selected_action': [str(pk) for pk in ids],
+        })
+
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(Order.objects.filter(status='shipped').count(), 3)
+        self.assertEqual(SalesRollup.objects.get(status='new').units, 0)
+        self.assertEqual(SalesRollup.objects.get(status='shipped').units, 3)
+
+    def test_restock_action(self):
+        """Повернення в наявність одним UPDATE"""
+        Bike.objects.update(in_stock=False)
+
+        self.client.post('/admin/shop/bike/', {'action': 'restock', '_selected_action': [str(self.bike.pk)]})
+
+        self.bike.refresh_from_db()
+        self.assertTrue(self.bike.in_stock)
+
+    def test_estimated_count(self):
+        """Оцінка кількості — лише зі статистики СУБД; на SQLite — точний COUNT(*)"""
+        self.make_orders(3)
+        Order.objects.filter(pk__lt=Order.objects.order_by('pk').last().pk).delete()
+        paginator = EstimatedCountPaginator(Order.objects.order_by('pk'), 50)
+        paginator.exact_threshold = 1
+        with CaptureQueriesContext(connection) as ctx:
+            count = paginator.count
+        if connection.vendor == 'sqlite':
+            # Після видалення старих рядків MAX(pk) дав би 3 і порожні «фантомні» сторінки
+            self.assertEqual(count, 1)
+            self.assertIn('COUNT', ctx.captured_queries[-1]['sql'])
+        else:
+            self.assertNotIn('COUNT', ctx.captured_queries[0]['sql'])
+
+        filtered = EstimatedCountPaginator(Order.objects.filter(completed=True).order_by('pk'), 50)
+        self.assertEqual(filtered.count, 0)
@@ -0,0 +1,120 @@
+# shop/tests/test_archive.py
+"""Tests for moving old orders into the archive tables."""
+import io
+from datetime import timedelta
+from decimal import Decimal
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from .. import archive, rollups
+from ..models import ArchivedOrder, ArchivedOrderItem, Bike, BikeType, Order, OrderItem, SalesRollup
+
+
+class ArchiveOrdersTests(TestCase):
+    """Tests for archive_orders, user_orders and rollups over the archive."""
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='archive', password='12345')
+        self.bike_type = BikeType.objects.create(name="road", description="")
+        self.bike = Bike.objects.create(
+            name="Bike", bike_type=self.bike_type, price=Decimal('1000.00'), description="", image="test.jpg"
+        )
+        self.old = timezone.now() - timedelta(days=400)
+
+    def make_order(self, status, created_at, completed=True):
+        order = Order.objects.create(user=self.user, status=status, completed=completed, total=Decimal('900.00'))
+        OrderItem.objects.create(order=order, bike=self.bike, price=Decimal('1000.00'), discount=Decimal('100.00'))
+        Order.objects.filter(pk=order.pk).update(created_at=created_at)
+        return order
+
+    def test_moves_only_old_finished_orders(self):
+        """В архів переносяться лише старі доставлені та скасовані замовлення"""
+        delivered = self.make_order('delivered', self.old)
+        canceled = self.make_order('canceled', self.old)
+        shipped = self.make_order('shipped', self.old)
+        recent = self.make_order('delivered', timezone.now())
+
+        report = archive.archive_orders(180, chunk_size=1)
+
+        self.assertEqual((report.orders, report.items, report.chunks), (2, 2, 2))
+        self.assertEqual(set(ArchivedOrder.objects.values_list('pk', flat=True)), {delivered.pk, canceled.pk})
+        self.assertEqual(set(Order.objects.values_list('pk', flat=True)), {shipped.pk, recent.pk})
+        self.assertFalse(OrderItem.objects.filter(order_id__in=[delivered.pk, canceled.pk]).exists())
+
+        archived = ArchivedOrder.objects.get(pk=delivered.pk)
+        self.assertEqual(archived.created_at, self.old)
+        self.assertEqual(archived.get_status_display(), "Доставлено")
+        self.assertEqual(archived.items.get().get_total(), Decimal('900.00'))
+
+    def test_restart_after_failure(self):
+        """Після збою в пачці повторний запуск переносить решту без дублікатів"""
+        orders = [self.make_order('delivered', self.old) for _ in range(3)]
+        real_chunk = archive.archive_chunk
+        calls = []
+
+        def failing_chunk(order_ids):
+            calls.append(order_ids)
+            if len(calls) == 2:
+                raise RuntimeError("обрив з'єднання")
+            return real_chunk(order_ids)
+
+        with mock.patch.object(archive, 'archive_chunk', failing_chunk):
+            with self.assertRaises(RuntimeError):
+                archive.archive_orders(180, chunk_size=1)
+        self.assertEqual(ArchivedOrder.objects.count(), 1)
+        self.assertEqual(Order.objects.count(), 2)
+
+        report = archive.archive_orders(180, chunk_size=1)
+        self.assertEqual(report.orders, 2)
+        self.assertEqual(set(ArchivedOrder.objects.values_list('pk', flat=True)), {o.pk for o in orders})
+        self.assertEqual(ArchivedOrderItem.objects.count(), 3)
+
+    def test_repeated_chunk_is_idempotent(self):
+        """Повтор уже перенесеної пачки не створює дублікатів"""
+        order = self.make_order('delivered', self.old)
+        archive.archive_chunk([order.pk])
+        archive.archive_chunk([order.pk])
+        self.assertEqual(ArchivedOrder.objects.count(), 1)
+        self.assertEqual(ArchivedOrderItem.objects.count(), 1)
+
+    def test_rollups_survive_archiving(self):
+        """Звіт продажів не змінюється ні після архівації, ні після перебудови"""
+        self.make_order('delivered', self.old)
+        self.make_order('delivered', timezone.now())
+        rollups.rebuild()
+        expected = sorted(SalesRollup.objects.values_list('day', 'status', 'units', 'net'))
+
+        self.assertEqual(len(expected), 2)
+        archive.archive_orders(180)
+        self.assertEqual(sorted(SalesRollup.objects.values_list('day', 'status', 'units', 'net')), expected)
+
+        rollups.rebuild()
+        self.assertEqual(sorted(SalesRollup.objects.values_list('day', 'status', 'units', 'net')), expected)
+
+    def test_user_orders_merges_archive(self):
+        """Профіль та історія показують і робочі, і архівні замовлення"""
+        archived = self.make_order('delivered', self.old)
+        current = self.make_order('new', timezone.now(), completed=False)
+        archive.archive_orders(180)
+
+        self.assertEqual([o.pk for o in archive.user_orders(self.user)], [current.pk, archived.pk])
+        self.client.force_login(self.user)
+        response = self.client.get(reverse('profile'))
+        self.assertContains(response, f"#{archived.pk}")
+        self.assertContains(response, f"#{current.pk}")
+
+    def test_command_dry_run(self):
+        """--dry-run лише рахує замовлення"""
+        self.make_order('canceled', self.old)
+        out = io.StringIO()
+        call_command('archive_orders', '--dry-run', stdout=out)
+        self.assertIn("До архівації: 1", out.getvalue())
+        self.assertEqual(ArchivedOrder.objects.count(), 0)
+
+        call_command('archive_orders', '--days', '30', stdout=out)
+        self.assertIn("Перенесено в архів: 1 замовлень, 1 позицій", out.getvalue())
@@ -0,0 +1,125 @@
+# shop/tests/test_autocomplete.py
+"""Tests for the in-memory autocomplete index."""
+import os
+import tempfile
+from decimal import Decimal
+
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from .. import autocomplete, catalog_snapshot
+from ..catalog import bump_catalog_version
+from ..catalog_snapshot import fold, write_snapshot
+from ..models import Bike, BikeType
+
+
+class AutocompleteTests(TestCase):
+    """Tests for prefix search, incremental updates and snapshot reloads."""
+
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.path = os.path.join(tmp.name, 'catalog.snapshot')
+        settings = override_settings(SHOP_CATALOG_SNAPSHOT=self.path)
+        settings.enable()
+        self.addCleanup(settings.disable)
+        self.addCleanup(setattr, catalog_snapshot, '_current', None)
+        self.addCleanup(autocomplete.reset)
+        autocomplete.reset()
+
+        self.road = BikeType.objects.create(name="Шосейний", description="")
+        self.wind = self.bike("Швидкий Вітер")
+        self.soft = self.bike("М’який Шлях")
+        self.bike("Шосейка Стара", in_stock=False)
+        self.publish()
+
+    def bike(self, name, in_stock=True):
+        return Bike.objects.create(name=name, bike_type=self.road, price=Decimal('100.00'), description="",
+                                   image="test.jpg", in_stock=in_stock)
+
+    def publish(self):
+        """Нова версія каталогу і її знімок — як після перебудови іншим воркером."""
+        bump_catalog_version()
+        write_snapshot(self.path)
+
+    def names(self, query, **kwargs):
+        return [item['name'] for item in autocomplete.search(query, **kwargs)]
+
+    def test_fold(self):
+        """Регістр і різні апострофи не розрізняються"""
+        self.assertEqual(fold("М’ЯКИЙ"), fold("м'який"))
+        self.assertEqual(fold("мʼякий"), "м'який")
+
+    def test_prefix_search(self):
+        """Префікс будь-якого слова; типи першими; без велосипедів не в наявності"""
+        self.assertEqual(self.names("ШО"), ["Шосейний"])
+        self.assertEqual(self.names("віт"), ["Швидкий Вітер"])
+        self.assertEqual(self.names("швидкий  ві"), ["Швидкий Вітер"])
+        self.assertEqual(self.names("м'як"), ["М’який Шлях"])
+        self.assertEqual(self.names("ш"), ["Шосейний", "Швидкий Вітер", "М’який Шлях"])
+        self.assertEqual(self.names("ш", limit=1), ["Шосейний"])
+        self.assertEqual(self.names("  "), [])
+
+    def test_endpoint_without_queries(self):
+        """Запит обслуговується з пам'яті без звернень до БД"""
+        url = reverse('shop:bike_autocomplete')
+        with self.assertNumQueries(0):
+            response = self.client.get(url, {'q': 'вітер'})
+        self.assertEqual(response.json(), {'query': 'вітер', 'results': [
+            {'kind': 'bike', 'id': self.wind.pk, 'name': "Швидкий Вітер"},
+        ]})
+        with self.assertNumQueries(0):
+            self.assertEqual(len(self.client.get(url, {'q': 'ш', 'limit': '2'}).json()['results']), 2)
+
+    def test_malformed_limit(self):
+        """Некоректний limit замінюється типовим"""
+        url = reverse('shop:bike_autocomplete')
+        for limit in ('²', '0', '-1', 'x'):
+            with self.subTest(limit=limit):
+                response = self.client.get(url, {'q': 'ш', 'limit': limit})
+                self.assertEqual(len(response.json()['results']), 3)
+
+    def test_missing_snapshot_logged(self):
+        """Без знімка на диску індекс порожній, і це видно в лозі — один раз"""
+        os.unlink(self.path)
+        catalog_snapshot._current = None
+        bump_catalog_version()
+        with self.assertLogs('shop.autocomplete', 'WARNING') as logs:
+            self.assertEqual(self.names("ш"), [])
+            self.assertEqual(self.names("шв"), [])
+        self.assertEqual(len(logs.records), 1)
+        self.assertIn('build_catalog_snapshot', logs.output[0])
+
+    def test_incremental_updates(self):
+        """Збереження велосипедів і типів змінює індекс після коміту без знімка"""
+        autocomplete.get_index()
+        with self.captureOnCommitCallbacks(execute=True):
+            fresh = self.bike("Гірський Орел")
+        self.assertEqual(self.names("орел"), ["Гірський Орел"])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            fresh.name = "Гірський Беркут"
+            fresh.save()
+            self.wind.in_stock = False
+            self.wind.save()
+            BikeType.objects.create(name="Гравійний", description="")
+        self.assertEqual(self.names("орел"), [])
+        self.assertEqual(self.names("гір"), ["Гірський Беркут"])
+        self.assertEqual(self.names("віт"), [])
+        self.assertEqual(self.names("г"), ["Гравійний", "Гірський Беркут"])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            fresh.delete()
+        self.assertEqual(self.names("гір"), [])
+
+    def test_reloads_newer_snapshot(self):
+        """Зміни без сигналів підхоплюються, коли з'являється знімок нової версії"""
+        self.assertEqual(self.names("віт"), ["Швидкий Вітер"])
+        Bike.objects.filter(pk=self.wind.pk).update(name="Тихий Вітерець")
+        bump_catalog_version()
+        with self.assertNumQueries(0):
+            self.assertEqual(self.names("тих"), [])
+
+        write_snapshot(self.path)
+        with self.assertNumQueries(0):
+            self.assertEqual(self.names("тих"), ["Тихий Вітерець"])
@@ -0,0 +1,145 @@
+# shop/tests/test_backends.py
+"""Tests for session and flash-message backends."""
+import os
+import secrets
+import shutil
+import tempfile
+from unittest.mock import patch
+
+from django.contrib.auth import SESSION_KEY, HASH_SESSION_KEY
+from django.contrib.messages import constants
+from django.contrib.messages.storage.base import Message
+from django.contrib.sessions.models import Session
+from django.http import HttpResponse
+from django.test import TestCase, RequestFactory, SimpleTestCase, override_settings
+
+from ..backends.cache import SessionFileCache
+from ..backends.messages import GuardedCookieStorage
+from ..backends.sessions import SessionStore
+
+
+class WriteBehindSessionTests(TestCase):
+    """Tests for the write-behind cached session store."""
+
+    def setUp(self):
+        self.session = SessionStore()
+        self.session['cart'] = 1
+        self.session.save()
+        self.key = self.session.session_key
+
+    def tearDown(self):
+        self.session.delete(self.key)
+
+    def test_create_writes_to_db(self):
+        """Створення сесії одразу записує рядок у БД"""
+        self.assertTrue(Session.objects.filter(session_key=self.key).exists())
+
+    def test_plain_update_stays_in_cache(self):
+        """Звичайна зміна даних не пише в БД, але видима з кешу"""
+        session = SessionStore(self.key)
+        session['cart'] = 2
+        with self.assertNumQueries(0):
+            session.save()
+
+        self.assertEqual(SessionStore(self.key)['cart'], 2)
+        stored = Session.objects.get(session_key=self.key).get_decoded()
+        self.assertEqual(stored['cart'], 1)
+
+    def test_auth_change_syncs_to_db(self):
+        """Зміна даних автентифікації синхронізується з БД"""
+        session = SessionStore(self.key)
+        session[SESSION_KEY] = '1'
+        session[HASH_SESSION_KEY] = 'hash'
+        session.save()
+
+        stored = Session.objects.get(session_key=self.key).get_decoded()
+        self.assertEqual(stored[SESSION_KEY], '1')
+
+    @override_settings(SHOP_SESSION_SYNC_INTERVAL=0)
+    def test_sync_interval_elapsed(self):
+        """Після інтервалу синхронізації дані пишуться в БД"""
+        session = SessionStore(self.key)
+        session['cart'] = 3
+        session.save()
+
+        stored = Session.objects.get(session_key=self.key).get_decoded()
+        self.assertEqual(stored['cart'], 3)
+
+    def test_flush_removes_db_row(self):
+        """Вихід видаляє сесію з БД"""
+        session = SessionStore(self.key)
+        session.flush()
+        self.assertFalse(Session.objects.filter(session_key=self.key).exists())
+        self.assertFalse(SessionStore().exists(self.key))
+
+
+class SessionFileCacheTests(SimpleTestCase):
+    """Tests for the session file cache culling."""
+
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.dir)
+        SessionFileCache._culled_at.pop(os.path.abspath(self.dir), None)
+
+    def cache(self, **options):
+        return SessionFileCache(self.dir, {'OPTIONS': {'MAX_ENTRIES': 4, 'CULL_FREQUENCY': 2, **options}})
+
+    def test_directory_scanned_once_per_interval(self):
+        """Каталог перелічується не на кожен set, а раз на CULL_INTERVAL"""
+        cache = self.cache()
+        with patch.object(SessionFileCache, '_list_cache_files', autospec=True,
+                          side_effect=lambda self: []) as listing:
+            for i in range(10):
+                cache.set(f'k{i}', i)
+        self.assertEqual(listing.call_count, 1)
+
+    def test_expired_entries_culled_first(self):
+        """При переповненні видаляються прострочені записи, живі лишаються"""
+        cache = self.cache(CULL_INTERVAL=0)
+        for i in range(4):
+            cache.set(f'old{i}', i, timeout=-1)
+        cache.set('live', 'x')
+        self.assertEqual(cache.get('live'), 'x')
+        self.assertEqual(len(cache._list_cache_files()), 1)
+
+    def test_live_entries_culled_with_warning(self):
+        """Якщо кеш переповнений живими записами, відсіювання видно в лозі"""
+        cache = self.cache(CULL_INTERVAL=0)
+        for i in range(4):
+            cache.set(f'k{i}', i)
+        with self.assertLogs('shop.backends.cache', 'WARNING'):
+            cache.set('k4', 4)
+        self.assertEqual(len(cache._list_cache_files()), 3)
+
+
+@override_settings(SHOP_MESSAGE_COOKIE_MAX_SIZE=400, SHOP_MESSAGE_MAX_LENGTH=50)
+class GuardedCookieStorageTests(TestCase):
+    """Tests for the size-guarded cookie message storage."""
+
+    def setUp(self):
+        self.request = RequestFactory().get('/')
+
+    def test_long_message_truncated(self):
+        """Надто довге повідомлення обрізається"""
+        storage = GuardedCookieStorage(self.request)
+        storage.add(constants.INFO, 'x' * 200)
+        response = HttpResponse()
+        storage.update(response)
+
+        self.assertIn(storage.cookie_name, response.cookies)
+        messages = storage._decode(response.cookies[storage.cookie_name].value)
+        self.assertEqual(len(messages[0].message), 50)
+
+    def test_overflow_dropped_and_logged(self):
+        """Повідомлення, що не вмістилися в cookie, відкидаються з попередженням"""
+        storage = GuardedCookieStorage(self.request)
+        for i in range(20):
+            storage.add(constants.INFO, f'Повідомлення {i} {secrets.token_hex(20)}')
+        response = HttpResponse()
+
+        with self.assertLogs('shop.backends.messages', level='WARNING') as cm:
+            unstored = storage.update(response)
+
+        self.assertTrue(unstored)
+        self.assertTrue(all(isinstance(m, Message) for m in unstored))
+        self.assertIn('did not fit into the cookie', cm.output[0])
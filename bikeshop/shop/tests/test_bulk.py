@@ -0,0 +1,44 @@
+# shop/tests/test_bulk.py
+"""Tests for executemany bulk writes."""
+from decimal import Decimal
+from unittest.mock import patch
+from django.db.models import DateTimeField
+from django.test import TestCase
+from django.utils import timezone
+
+from .. import bulk
+from ..models import Bike, BikeType, OrderStatusTransition
+
+
+class BulkWriteTests(TestCase):
+    """Tests for update_rows and insert_rows."""
+
+    def setUp(self):
+        bike_type = BikeType.objects.create(name="road", description="")
+        self.bikes = [
+            Bike.objects.create(name=f"Bike {i}", bike_type=bike_type, price=Decimal('100.00'), description="",
+                                image="test.jpg")
+            for i in range(3)
+        ]
+
+    def test_update_rows(self):
+        """Оновлюються лише передані рядки й поля"""
+        first, second, third = self.bikes
+        updated = bulk.update_rows(Bike, ['price', 'in_stock'], [(first.pk, Decimal('90.5'), False),
+                                                                 (third.pk, Decimal('120.00'), True)])
+        self.assertEqual(updated, 2)
+        self.assertEqual(list(Bike.objects.order_by('pk').values_list('price', 'in_stock')), [
+            (Decimal('90.50'), False), (Decimal('100.00'), True), (Decimal('120.00'), True),
+        ])
+        self.assertEqual(bulk.update_rows(Bike, ['price'], []), 0)
+
+    def test_insert_rows_prepares_shared_value_once(self):
+        """Спільна мітка часу готується один раз на пачку"""
+        at = timezone.now()
+        fields = ('order_id', 'from_status', 'to_status', 'at', 'actor_id')
+        with patch.object(DateTimeField, 'get_db_prep_save', autospec=True,
+                          side_effect=DateTimeField.get_db_prep_save) as prep:
+            bulk.insert_rows(OrderStatusTransition, fields, ((order_id, 1, 2, at, None) for order_id in range(5)))
+        self.assertEqual(prep.call_count, 1)
+        self.assertEqual(list(OrderStatusTransition.objects.order_by('order_id').values_list('order_id', 'at')),
+                         [(order_id, at) for order_id in range(5)])
@@ -0,0 +1,122 @@
+# shop/tests/test_cart.py
+"""Tests for the batch cart endpoint."""
+import json
+from decimal import Decimal
+
+from django.contrib.auth.models import User
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.db import connection
+from django.urls import reverse
+
+from ..cart import MAX_QUANTITY, CartError, parse_lines, update_cart
+from ..models import Bike, BikeType, Order, OrderItem, PromotionRule
+
+
+class CartTests(TestCase):
+    """Tests for parse_lines, update_cart and the cart_items view."""
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='dealer', password='12345')
+        bike_type = BikeType.objects.create(name="road", description="")
+        self.bikes = [
+            Bike.objects.create(name=f"Bike {i}", bike_type=bike_type, price=Decimal('1000.00'),
+                                description="", image="test.jpg")
+            for i in range(40)
+        ]
+        self.url = reverse('shop:cart_items')
+
+    def post(self, payload):
+        return self.client.post(self.url, json.dumps(payload), content_type='application/json')
+
+    def test_parse_merges_duplicates(self):
+        """Повтори одного велосипеда підсумовуються"""
+        lines = parse_lines([{'bike_id': 1, 'quantity': 2}, {'bike_id': 1}, {'bike_id': 2, 'quantity': 3}])
+        self.assertEqual(lines, {1: 3, 2: 3})
+
+    def test_parse_rejects_bad_lines(self):
+        """Некоректні позиції відхиляються з номером рядка"""
+        for payload in ([], [{'quantity': 1}], [{'bike_id': '1'}], [{'bike_id': 1, 'quantity': 0}],
+                        [{'bike_id': 1, 'quantity': True}], 'bikes'):
+            with self.subTest(payload=payload), self.assertRaises(CartError):
+                parse_lines(payload)
+        self.assertEqual(parse_lines([{'bike_id': 1, 'quantity': 0}], mode='set'), {1: 0})
+
+    def test_query_count_does_not_grow_with_lines(self):
+        """Кількість запитів не залежить від кількості позицій"""
+        def count(bikes):
+            Order.objects.all().delete()
+            with CaptureQueriesContext(connection) as ctx:
+                update_cart(self.user, {bike.pk: 2 for bike in bikes})
+            return len(ctx.captured_queries)
+
+        self.assertEqual(count(self.bikes[:2]), count(self.bikes))
+
+    def test_add_and_set_modes(self):
+        """add збільшує кількість, set встановлює її, 0 прибирає позицію"""
+        first, second = self.bikes[:2]
+        update_cart(self.user, {first.pk: 1, second.pk: 1})
+        update = update_cart(self.user, {first.pk: 2})
+        self.assertEqual((update.created, update.updated), (0, 1))
+        self.assertEqual(OrderItem.objects.get(bike=first).quantity, 3)
+
+        update = update_cart(self.user, {first.pk: 5, second.pk: 0}, mode='set')
+        self.assertEqual((update.updated, update.removed), (1, 1))
+        self.assertEqual(list(OrderItem.objects.values_list('bike_id', 'quantity')), [(first.pk, 5)])
+        self.assertEqual(Order.objects.count(), 1)
+
+    def test_remove_out_of_stock_bike(self):
+        """Позицію з велосипедом, якого вже немає в наявності, можна прибрати"""
+        first, second = self.bikes[:2]
+        update_cart(self.user, {first.pk: 1, second.pk: 1})
+        Bike.objects.filter(pk=second.pk).update(in_stock=False)
+
+        update = update_cart(self.user, {second.pk: 0}, mode='set')
+        self.assertEqual(update.removed, 1)
+        self.assertEqual(list(OrderItem.objects.values_list('bike_id', flat=True)), [first.pk])
+        with self.assertRaises(CartError):
+            update_cart(self.user, {second.pk: 1}, mode='set')
+
+    def test_add_checks_merged_quantity(self):
+        """У режимі add межа кількості діє для суми з наявною позицією"""
+        bike = self.bikes[0]
+        update_cart(self.user, {bike.pk: MAX_QUANTITY - 1})
+        update_cart(self.user, {bike.pk: 1})
+        with self.assertRaises(CartError) as raised:
+            update_cart(self.user, {bike.pk: 1})
+        self.assertEqual(raised.exception.details, {'bike_ids': [bike.pk]})
+        self.assertEqual(OrderItem.objects.get(bike=bike).quantity, MAX_QUANTITY)
+
+    def test_endpoint_prices_cart_once(self):
+        """Ендпоінт повертає кошик із перерахованою знижкою"""
+        PromotionRule.objects.create(name="Опт", kind='quantity_tier', percent=10, min_quantity=40)
+        self.client.force_login(self.user)
+        response = self.post({'items': [{'bike_id': bike.pk, 'quantity': 1} for bike in self.bikes]})
+
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertEqual(data['created'], 40)
+        self.assertEqual(len(data['items']), 40)
+        self.assertEqual(data['discount_percent'], 10)
+        self.assertEqual(data['total'], '36000.00')
+        self.assertEqual(data['items'][0]['discount'], '100.00')
+
+    def test_unknown_bike_rejected_without_changes(self):
+        """Невідомий велосипед — 400 без змін у кошику"""
+        self.client.force_login(self.user)
+        response = self.post({'items': [{'bike_id': self.bikes[0].pk}, {'bike_id': 999999}]})
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json()['bike_ids'], [999999])
+        self.assertFalse(OrderItem.objects.exists())
+
+    def test_invalid_json(self):
+        """Некоректне тіло — 400"""
+        self.client.force_login(self.user)
+        response = self.client.post(self.url, 'not json', content_type='application/json')
+        self.assertEqual(response.status_code, 400)
+
+    def test_anonymous_gets_json_403(self):
+        """Анонімний користувач отримує JSON 403"""
+        response = self.post({'items': [{'bike_id': self.bikes[0].pk}]})
+        self.assertEqual(response.status_code, 403)
+        self.assertEqual(response.json(), {'error': 'Authentication required'})
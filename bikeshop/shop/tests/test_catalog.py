@@ -0,0 +1,76 @@
+# shop/tests/test_catalog.py
+"""Tests for catalog versioning, fragment caching and warmup."""
+from decimal import Decimal
+from unittest.mock import patch
+from django.contrib.auth.models import User
+from django.core.cache import caches
+from django.test import TestCase
+
+from ..catalog import get_bike_types, get_catalog_version, bump_catalog_version
+from ..models import Bike, BikeType
+from ..warmup import warm_catalog, warm_templates, warm_worker
+
+
+class CatalogCacheTests(TestCase):
+    """Tests for catalog version and cached bike cards."""
+
+    def setUp(self):
+        caches['default'].clear()
+        # Знімок каталогу позначено версією: нова версія не дає прочитати знімок попереднього тесту
+        bump_catalog_version()
+        self.user = User.objects.create_user(username='catalog', password='12345')
+        self.client.force_login(self.user)
+        self.bike_type = BikeType.objects.create(name="Test", description="Test")
+        self.bike = Bike.objects.create(
+            name="Cached Bike",
+            bike_type=self.bike_type,
+            price=Decimal('500.00'),
+            description="Test",
+            image="test.jpg"
+        )
+
+    def test_bump_increments_version(self):
+        """Збільшення версії каталогу"""
+        version = get_catalog_version()
+        self.assertEqual(bump_catalog_version(), version + 1)
+        self.assertEqual(get_catalog_version(), version + 1)
+
+    def test_bike_change_invalidates_card(self):
+        """Зміна велосипеда після коміту оновлює закешовану картку"""
+        response = self.client.get('/bikes/')
+        self.assertContains(response, '500,00 грн')
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.bike.price = Decimal('450.00')
+            self.bike.save()
+
+        response = self.client.get('/bikes/')
+        self.assertContains(response, '450,00 грн')
+        self.assertNotContains(response, '500,00 грн')
+
+    def test_warm_templates(self):
+        """Прогрів компілює всі шаблони додатку"""
+        self.assertGreaterEqual(warm_templates(), 9)
+
+    def test_bike_types_cached_per_version(self):
+        """Типи велосипедів читаються з БД лише після зміни версії каталогу"""
+        get_bike_types()
+        with self.assertNumQueries(0):
+            self.assertEqual(get_bike_types(), [self.bike_type])
+        new_type = BikeType.objects.create(name="New", description="")
+        bump_catalog_version()
+        with self.assertNumQueries(1):
+            self.assertEqual(get_bike_types(), [self.bike_type, new_type])
+
+    def test_warm_worker(self):
+        """Прогрів воркера заповнює кеш типів, і перший запит каталогу його використовує"""
+        timings = warm_worker()
+        self.assertEqual(set(timings), {'urls', 'templates', 'catalog'})
+        with self.assertNumQueries(0):
+            get_bike_types()
+
+    def test_warm_catalog_closes_connections(self):
+        """Прогрів не лишає відкритих з'єднань, які успадкували б воркери після fork"""
+        with patch('shop.warmup.connections') as connections:
+            self.assertTrue(warm_catalog())
+        connections.close_all.assert_called_once_with()
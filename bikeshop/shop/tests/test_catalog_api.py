@@ -0,0 +1,100 @@
+# shop/tests/test_catalog_api.py
+"""Tests for the JSON catalog API."""
+from decimal import Decimal
+
+from django.test import TestCase
+from django.urls import reverse
+
+from ..catalog import bump_catalog_version
+from ..catalog_api import decode_cursor, encode_cursor
+from ..models import Bike, BikeType, RoadBikeSpec
+
+
+class CatalogApiTests(TestCase):
+    """Tests for fieldsets, batch lookup, pagination and ETags."""
+
+    def setUp(self):
+        bump_catalog_version()
+        self.url = reverse('shop:api_bikes')
+        self.road = BikeType.objects.create(name="Шосейний", description="")
+        self.city = BikeType.objects.create(name="Міський", description="")
+        self.bikes = [
+            Bike.objects.create(name=f"Велосипед {i}", bike_type=self.road if i % 2 else self.city,
+                                price=Decimal('1000.05') + i, description="", image=f"bikes/{i}.jpg")
+            for i in range(5)
+        ]
+        RoadBikeSpec.objects.create(bike=self.bikes[1], weight=8.2)
+        self.archived = Bike.objects.create(name="Архівний", bike_type=self.city, price=Decimal('1.00'),
+                                            description="", image="", in_stock=False)
+        bump_catalog_version()
+
+    def test_default_fields(self):
+        """Без fields — типові поля; ціна рядком без втрати копійок"""
+        data = self.client.get(self.url).json()
+        first = data['results'][0]
+        self.assertEqual(first, {'id': self.bikes[0].pk, 'name': "Велосипед 0", 'type': self.city.pk,
+                                 'price': '1000.05', 'in_stock': True, 'image': '/media/bikes/0.jpg'})
+        self.assertEqual(len(data['results']), 5)
+        self.assertIsNone(data['next'])
+
+    def test_sparse_fields(self):
+        """fields обмежує і впорядковує поля відповіді"""
+        data = self.client.get(self.url, {'fields': 'price,id,type_name,specifics', 'type': self.road.pk}).json()
+        self.assertEqual(data['results'][0], {'price': '1001.05', 'id': self.bikes[1].pk, 'type_name': "Шосейний",
+                                              'specifics': Bike.objects.get(pk=self.bikes[1].pk).get_specifics()})
+        self.assertEqual(len(data['results']), 2)
+        response = self.client.get(self.url, {'fields': 'id,secret'})
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('secret', response.json()['error'])
+
+    def test_batch_lookup_without_queries(self):
+        """ids шукаються у знімку в порядку запиту, зокрема відсутні в наявності"""
+        self.client.get(self.url)
+        ids = f'{self.archived.pk},{self.bikes[2].pk},999999'
+        with self.assertNumQueries(0):
+            data = self.client.get(self.url, {'ids': ids, 'fields': 'id,in_stock,image'}).json()
+        self.assertEqual(data['results'], [{'id': self.archived.pk, 'in_stock': False, 'image': None},
+                                           {'id': self.bikes[2].pk, 'in_stock': True, 'image': '/media/bikes/2.jpg'}])
+        self.assertEqual(data['missing'], [999999])
+        self.assertEqual(self.client.get(self.url, {'ids': '1,x'}).status_code, 400)
+
+    def test_cursor_pagination(self):
+        """Курсор проходить усі сторінки без пропусків і повторів"""
+        seen, cursor = [], None
+        while True:
+            params = {'limit': 2, 'fields': 'id', 'in_stock': 'all'}
+            if cursor:
+                params['cursor'] = cursor
+            data = self.client.get(self.url, params).json()
+            seen += [bike['id'] for bike in data['results']]
+            cursor = data['next']
+            if cursor is None:
+                break
+        self.assertEqual(seen, [bike.pk for bike in self.bikes] + [self.archived.pk])
+        self.assertEqual(decode_cursor(encode_cursor(42)), 42)
+
+    def test_malformed_params(self):
+        """Некоректні курсор, limit і type дають 400, а не 500"""
+        for params in ({'cursor': '!!'}, {'cursor': 'é'},
+                       {'cursor': 'aWQ6wrI'}, {'limit': '0'}, {'limit': '²'}, {'limit': '١٠'},
+                       {'type': '²'}, {'type': '-1'}):
+            with self.subTest(params=params):
+                response = self.client.get(self.url, params)
+                self.assertEqual(response.status_code, 400)
+                self.assertIn('error', response.json())
+
+    def test_etag_not_modified(self):
+        """ETag за версією каталогу: 304 без запитів, після зміни — нові дані"""
+        response = self.client.get(self.url)
+        etag = response['ETag']
+        with self.assertNumQueries(0):
+            response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response['ETag'], etag)
+
+        Bike.objects.filter(pk=self.bikes[0].pk).update(price=Decimal('5.50'))
+        bump_catalog_version()
+        response = self.client.get(self.url, {'fields': 'price'}, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+        self.assertEqual(response.json()['results'][0], {'price': '5.50'})
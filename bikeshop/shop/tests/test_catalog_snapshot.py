@@ -0,0 +1,116 @@
+# shop/tests/test_catalog_snapshot.py
+"""Tests for the memory-mapped catalog snapshot."""
+import io
+import os
+import tempfile
+from decimal import Decimal
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+
+from .. import catalog_snapshot
+from ..catalog import bump_catalog_version
+from ..catalog_snapshot import CatalogSnapshot, SnapshotError, get_snapshot, write_snapshot
+from ..models import Bike, BikeType, RoadBikeSpec
+
+
+class CatalogSnapshotTests(TestCase):
+    """Tests for writing, reading and refreshing the snapshot."""
+
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.path = os.path.join(tmp.name, 'catalog.snapshot')
+        settings = override_settings(SHOP_CATALOG_SNAPSHOT=self.path)
+        settings.enable()
+        self.addCleanup(settings.disable)
+        self.addCleanup(setattr, catalog_snapshot, '_current', None)
+        bump_catalog_version()
+
+        self.road = BikeType.objects.create(name="Шосейний", description="Для асфальту")
+        self.city = BikeType.objects.create(name="Міський", description="")
+        self.bike = Bike.objects.create(name="Швидкий Вітер", bike_type=self.road, price=Decimal('12500.50'),
+                                        description="Легкий", image="bikes/wind.jpg")
+        RoadBikeSpec.objects.create(bike=self.bike, weight=8.2)
+        self.city_bike = Bike.objects.create(name="Міська Ластівка", bike_type=self.city, price=Decimal('7000.00'),
+                                             description="", image="bikes/swallow.jpg")
+        Bike.objects.create(name="Архівний", bike_type=self.city, price=Decimal('1.00'), description="",
+                            image="bikes/old.jpg", in_stock=False)
+
+    def test_roundtrip(self):
+        """Знімок відтворює поля велосипедів, типів і специфікацій"""
+        write_snapshot(self.path)
+        snapshot = CatalogSnapshot(self.path)
+
+        self.assertEqual(len(snapshot), 3)
+        bike = snapshot.get(self.bike.pk)
+        self.assertEqual((bike.id, bike.name, bike.description, bike.price, bike.in_stock, bike.bike_type_id),
+                         (self.bike.pk, "Швидкий Вітер", "Легкий", Decimal('12500.50'), True, self.road.pk))
+        self.assertEqual(bike.specs, {'kind': 'road', 'weight': 8.2})
+        self.assertEqual(bike.get_specifics(), Bike.objects.get(pk=self.bike.pk).get_specifics())
+        self.assertEqual(bike.image.url, '/media/bikes/wind.jpg')
+        self.assertIsNone(snapshot.get(10 ** 9))
+        self.assertEqual([(t.id, t.name) for t in snapshot.bike_types()],
+                         [(self.road.pk, "Шосейний"), (self.city.pk, "Міський")])
+
+    def test_filters(self):
+        """Фільтри наявності, типу і пошук за назвою без урахування регістру"""
+        write_snapshot(self.path)
+        snapshot = CatalogSnapshot(self.path)
+        self.assertEqual([b.id for b in snapshot.bikes(in_stock=True)], [self.bike.pk, self.city_bike.pk])
+        self.assertEqual([b.id for b in snapshot.bikes(in_stock=True, bike_type_id=self.city.pk)],
+                         [self.city_bike.pk])
+        self.assertEqual([b.id for b in snapshot.bikes(query='вітер')], [self.bike.pk])
+
+    def test_rejects_foreign_file(self):
+        """Файл іншого формату не відкривається"""
+        with open(self.path, 'wb') as f:
+            f.write(b'not a snapshot' * 4)
+        with self.assertRaises(SnapshotError):
+            CatalogSnapshot(self.path)
+
+    def test_rebuilt_on_new_version(self):
+        """Нова версія каталогу перебудовує файл; старе відображення лишається чинним"""
+        old = get_snapshot()
+        self.assertIs(get_snapshot(), old)
+
+        Bike.objects.filter(pk=self.bike.pk).update(name="Новий Вітер")
+        bump_catalog_version()
+        new = get_snapshot()
+
+        self.assertGreater(new.version, old.version)
+        self.assertEqual(new.get(self.bike.pk).name, "Новий Вітер")
+        self.assertEqual(old.get(self.bike.pk).name, "Швидкий Вітер")
+
+    def test_other_process_file_is_reused(self):
+        """Воркер відкриває знімок, уже записаний іншим воркером, без запитів до БД"""
+        write_snapshot(self.path)
+        with self.assertNumQueries(0):
+            self.assertEqual(len(get_snapshot()), 3)
+
+    def test_bike_list_served_without_queries(self):
+        """Каталог і пошук читаються зі знімка"""
+        self.client.force_login(User.objects.create_user(username='buyer', password='12345'))
+        self.client.get('/bikes/')
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get('/bikes/', {'type': self.road.pk})
+        # Лише автентифікація
+        self.assertFalse([q['sql'] for q in ctx if 'shop_' in q['sql']])
+        self.assertContains(response, "Швидкий Вітер")
+        self.assertNotContains(response, "Міська Ластівка")
+        self.assertContains(response, '12500,50 грн')
+
+        response = self.client.get('/bikes/', {'q': 'ЛАСТІВ'})
+        self.assertEqual([b.id for b in response.context['bikes']], [self.city_bike.pk])
+        self.assertEqual(self.client.get('/bikes/', {'type': '999999'}).status_code, 404)
+        self.assertEqual(self.client.get('/bikes/', {'type': 'abc'}).status_code, 404)
+
+    def test_command(self):
+        """Команда записує знімок"""
+        out = io.StringIO()
+        call_command('build_catalog_snapshot', stdout=out)
+        self.assertIn("3 велосипедів", out.getvalue())
+        self.assertEqual(len(CatalogSnapshot(self.path)), 3)
@@ -0,0 +1,130 @@
+# shop/tests/test_export.py
+"""Tests for streaming order exports."""
+import csv
+import gzip
+import io
+import itertools
+import json
+import os
+import tempfile
+import tracemalloc
+from datetime import timedelta
+from decimal import Decimal
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from .. import archive, export
+from ..models import Bike, BikeType, Order, OrderItem
+
+
+class ExportStreamTests(TestCase):
+    """Tests for the encoders and the bounded memory of the pipeline."""
+
+    def test_peak_memory_is_bounded(self):
+        """Вивантаження 1 млн рядків (з gzip) не накопичує їх у пам'яті"""
+        # Один і той самий кортеж: пам'ять займає лише сам конвеєр кодування
+        row = (1, timezone.now(), 'user', 'user@example.com', 'delivered', True, None, Decimal('1000.00'),
+               Decimal('0.00'), 2, 7, 'Гірський велосипед', 1, Decimal('1000.00'), Decimal('0.00'))
+        rows = itertools.repeat(row, 1_000_000)
+        tracemalloc.start()
+        try:
+            compressed = sum(len(chunk) for chunk in export.stream(rows, 'csv', gzip=True))
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+        self.assertGreater(compressed, 0)
+        self.assertLess(peak, 2 * 1024 * 1024)
+
+    def test_jsonl_keeps_decimals_as_strings(self):
+        """JSON Lines зберігає суми рядками"""
+        row = (1, timezone.now(), 'u', '', 'new', False, None, Decimal('10.50'), Decimal('0.00'),
+               2, 3, 'Bike', 1, Decimal('10.50'), Decimal('0.00'))
+        line = b''.join(export.stream([row], 'jsonl')).decode()
+        self.assertEqual(json.loads(line)['price'], '10.50')
+
+    def test_unknown_status_rejected(self):
+        """Невідомий статус — помилка"""
+        with self.assertRaises(ValueError):
+            export.ExportFilter(statuses=('lost',))
+
+
+class ExportOrdersTests(TestCase):
+    """Tests for the export endpoint and management command."""
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='accountant', password='12345', is_staff=True)
+        bike_type = BikeType.objects.create(name="road", description="")
+        self.bike = Bike.objects.create(
+            name="Шосейний", bike_type=bike_type, price=Decimal('1000.00'), description="", image="test.jpg"
+        )
+        self.client.force_login(self.user)
+
+    def make_order(self, status, days_ago=0):
+        order = Order.objects.create(user=self.user, status=status, total=Decimal('1000.00'))
+        OrderItem.objects.create(order=order, bike=self.bike, price=Decimal('1000.00'))
+        Order.objects.filter(pk=order.pk).update(created_at=timezone.now() - timedelta(days=days_ago))
+        return order
+
+    def read_csv(self, response):
+        return list(csv.DictReader(io.StringIO(b''.join(response.streaming_content).decode())))
+
+    def test_csv_with_filters(self):
+        """Фільтри за статусом і датою застосовуються до вивантаження"""
+        delivered = self.make_order('delivered', days_ago=10)
+        self.make_order('new', days_ago=10)
+        self.make_order('delivered', days_ago=40)
+        since = (timezone.localdate() - timedelta(days=20)).isoformat()
+
+        response = self.client.get(reverse('shop:export_orders'), {'status': 'delivered', 'since': since})
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        rows = self.read_csv(response)
+        self.assertEqual([row['order_id'] for row in rows], [str(delivered.pk)])
+        self.assertEqual(rows[0]['bike_name'], "Шосейний")
+        self.assertEqual(rows[0]['username'], 'accountant')
+
+    def test_includes_archived_orders(self):
+        """Архівні замовлення теж потрапляють у вивантаження"""
+        archived = self.make_order('delivered', days_ago=400)
+        current = self.make_order('new')
+        archive.archive_orders(180)
+
+        rows = self.read_csv(self.client.get(reverse('shop:export_orders')))
+        self.assertEqual(sorted(int(row['order_id']) for row in rows), [archived.pk, current.pk])
+
+    def test_gzip_jsonl(self):
+        """gzip=1 віддає стиснений файл"""
+        order = self.make_order('shipped')
+        response = self.client.get(reverse('shop:export_orders'), {'format': 'jsonl', 'gzip': '1'})
+        self.assertEqual(response['Content-Type'], 'application/gzip')
+        self.assertIn('.jsonl.gz', response['Content-Disposition'])
+        lines = gzip.decompress(b''.join(response.streaming_content)).decode().splitlines()
+        self.assertEqual(json.loads(lines[0])['order_id'], order.pk)
+
+    def test_bad_format(self):
+        """Невідомий формат — 400"""
+        response = self.client.get(reverse('shop:export_orders'), {'format': 'xml'})
+        self.assertEqual(response.status_code, 400)
+
+    def test_staff_only(self):
+        """Вивантаження доступне лише персоналу"""
+        self.client.force_login(User.objects.create_user(username='customer', password='12345'))
+        response = self.client.get(reverse('shop:export_orders'))
+        self.assertEqual(response.status_code, 302)
+
+    def test_command_writes_file(self):
+        """Команда пише стиснений файл"""
+        self.make_order('delivered')
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'orders.csv.gz')
+            call_command('export_orders', '--gzip', '-o', path, stderr=io.StringIO())
+            with gzip.open(path, 'rt') as f:
+                self.assertEqual(len(list(csv.DictReader(f))), 1)
+
+        out = io.StringIO()
+        call_command('export_orders', '--format', 'jsonl', stdout=out)
+        self.assertEqual(len(out.getvalue().splitlines()), 1)
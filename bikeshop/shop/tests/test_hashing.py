@@ -0,0 +1,97 @@
+# shop/tests/test_hashing.py
+"""Tests for pooled password hashing and the async auth views."""
+import time
+from django.contrib.auth.hashers import PBKDF2PasswordHasher, check_password
+from django.contrib.auth.models import User
+from django.test import SimpleTestCase, TestCase, override_settings
+
+from ..hashing import HashingPool, HashingPoolBusy, get_pool, stats
+
+PASSWORD = 'veloSIPED-2024'
+
+
+@override_settings(SHOP_HASHING_WORKERS=0)
+class AsyncAuthViewsTests(TestCase):
+    """Tests for login_view and register with inline hashing."""
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='rider', password=PASSWORD)
+
+    def test_login_success_redirects(self):
+        """Правильний пароль — вхід і перехід на next"""
+        response = self.client.post('/login/', {'username': 'rider', 'password': PASSWORD, 'next': '/profile/'})
+        self.assertRedirects(response, '/profile/', fetch_redirect_response=False)
+        self.assertEqual(int(self.client.session['_auth_user_id']), self.user.pk)
+
+    def test_login_rejects_bad_credentials(self):
+        """Невірний пароль, невідоме ім'я і неактивний користувач не входять"""
+        for data in ({'username': 'rider', 'password': 'wrong'}, {'username': 'ghost', 'password': PASSWORD}):
+            response = self.client.post('/login/', data)
+            self.assertContains(response, "Неправильне ім", status_code=400)
+        User.objects.filter(pk=self.user.pk).update(is_active=False)
+        response = self.client.post('/login/', {'username': 'rider', 'password': PASSWORD})
+        self.assertEqual(response.status_code, 400)
+        self.assertNotIn('_auth_user_id', self.client.session)
+
+    def test_login_ignores_external_next(self):
+        """next на чужий домен замінюється на LOGIN_REDIRECT_URL"""
+        response = self.client.post('/login/', {'username': 'rider', 'password': PASSWORD,
+                                                'next': 'https://evil.example/'})
+        self.assertRedirects(response, '/bikes/', fetch_redirect_response=False)
+
+    def test_login_upgrades_weak_hash(self):
+        """Хеш із застарілою кількістю ітерацій оновлюється після входу"""
+        weak = PBKDF2PasswordHasher().encode(PASSWORD, 'somesalt', iterations=1000)
+        User.objects.filter(pk=self.user.pk).update(password=weak)
+        self.client.post('/login/', {'username': 'rider', 'password': PASSWORD})
+        self.user.refresh_from_db()
+        self.assertNotEqual(self.user.password, weak)
+        self.assertTrue(check_password(PASSWORD, self.user.password))
+
+    def test_register_creates_user(self):
+        """Реєстрація зберігає хеш пароля і виконує вхід"""
+        response = self.client.post('/register/', {
+            'username': 'newbie', 'email': 'newbie@example.com', 'password1': PASSWORD, 'password2': PASSWORD,
+        })
+        self.assertRedirects(response, '/bikes/', fetch_redirect_response=False)
+        user = User.objects.get(username='newbie')
+        self.assertTrue(user.check_password(PASSWORD))
+        self.assertEqual(int(self.client.session['_auth_user_id']), user.pk)
+
+    @override_settings(SHOP_HASHING_WORKERS=1, SHOP_HASHING_MAX_PENDING=0)
+    def test_back_pressure_returns_503(self):
+        """Коли черга заповнена, вхід відповідає 503 з Retry-After"""
+        response = self.client.post('/login/', {'username': 'rider', 'password': PASSWORD})
+        self.assertEqual(response.status_code, 503)
+        self.assertIn('Retry-After', response)
+        self.assertEqual(stats()['rejected'], 1)
+
+
+class HashingPoolTests(SimpleTestCase):
+    """Tests for the bounded process pool."""
+
+    def test_queue_limit_and_stats(self):
+        """Понад max_pending завдання відхиляються, лічильники оновлюються"""
+        pool = HashingPool(workers=1, max_pending=1)
+        self.addCleanup(pool.shutdown)
+        future = pool.submit(time.sleep, 0.2)
+        with self.assertRaises(HashingPoolBusy):
+            pool.submit(time.sleep, 0)
+        future.result()
+        time.sleep(0.05)
+        self.assertEqual(pool.stats()['pending'], 0)
+        self.assertEqual(pool.stats()['peak_pending'], 1)
+        self.assertEqual(pool.stats()['completed'], 1)
+        self.assertEqual(pool.stats()['rejected'], 1)
+
+    @override_settings(SHOP_HASHING_WORKERS=1)
+    def test_pool_hashes_in_subprocess(self):
+        """Хеш, обчислений у процесі пулу, перевіряється звичайним check_password"""
+        from asgiref.sync import async_to_sync
+        from ..hashing import ahash_password, averify_password
+
+        encoded = async_to_sync(ahash_password)(PASSWORD)
+        self.assertTrue(check_password(PASSWORD, encoded))
+        self.assertEqual(async_to_sync(averify_password)(PASSWORD, encoded), (True, False))
+        self.assertEqual(async_to_sync(averify_password)('wrong', encoded), (False, False))
+        self.assertEqual(get_pool().stats()['completed'], 3)
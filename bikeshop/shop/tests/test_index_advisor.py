@@ -0,0 +1,115 @@
+# shop/tests/test_index_advisor.py
+"""Tests for the EXPLAIN QUERY PLAN index advisor."""
+import io
+import json
+import os
+import tempfile
+from decimal import Decimal
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+
+from ..index_advisor import analyze, distinct_queries, fingerprint, merge_proposals, parse_query_log, predicate_columns
+from ..models import Bike, BikeType, OrderItem
+
+
+class IndexAdvisorTests(TestCase):
+    """Tests for query log parsing, plan analysis and proposals."""
+
+    def setUp(self):
+        self.bike_type = BikeType.objects.create(name="road", description="")
+        Bike.objects.bulk_create(
+            Bike(name=f"Bike {i}", bike_type=self.bike_type, price=Decimal('100.00'), description="", image="test.jpg")
+            for i in range(50)
+        )
+
+    def test_parse_query_log_formats(self):
+        """Сирий SQL, JSONL і рядки логера django.db.backends"""
+        lines = [
+            'SELECT 1;',
+            json.dumps({'sql': 'SELECT * FROM "shop_bike" WHERE "shop_bike"."id" = %s', 'params': [3]}),
+            '(0.002) SELECT * FROM "shop_bike"; args=(); alias=default',
+            '',
+        ]
+        self.assertEqual(parse_query_log(lines), [
+            ('SELECT 1', None),
+            ('SELECT * FROM "shop_bike" WHERE "shop_bike"."id" = %s', [3]),
+            ('SELECT * FROM "shop_bike"', None),
+        ])
+
+    def test_fingerprint_groups_literals(self):
+        """Запити, що відрізняються лише літералами, групуються разом"""
+        queries = [
+            ('SELECT * FROM "t" WHERE "t"."a" = 1', None),
+            ('SELECT * FROM "t" WHERE "t"."a" = 25', None),
+            ("SELECT * FROM \"t\" WHERE \"t\".\"b\" = 'x'", None),
+            ('INSERT INTO "t" VALUES (1)', None),
+        ]
+        self.assertEqual(fingerprint(queries[0][0]), fingerprint(queries[1][0]))
+        self.assertEqual([count for _, _, count in distinct_queries(queries)], [2, 1])
+
+    def test_predicate_columns(self):
+        """Рівність (включно з булевими колонками) йде перед діапазоном і сортуванням"""
+        sql = ('SELECT * FROM "shop_order" WHERE (NOT "shop_order"."completed" AND "shop_order"."user_id" = 1 '
+               'AND "shop_order"."created_at" > \'2024-01-01\') ORDER BY "shop_order"."created_at" DESC')
+        self.assertEqual(predicate_columns(sql, 'shop_order'), (['completed', 'user_id'], ['created_at'], []))
+
+    def test_full_scan_proposal_improves_plan(self):
+        """Фільтр за неіндексованим полем дає повне сканування і пропозицію індексу"""
+        findings = analyze([self.captured(Bike.objects.filter(description='Bike 7'))], measure=False)
+        self.assertEqual(len(findings), 1)
+        finding = findings[0]
+        self.assertEqual(finding.problems, ['full_scan:shop_bike'])
+        self.assertEqual(finding.proposal.fields, ('description',))
+        self.assertTrue(finding.improved)
+        self.assertLess(finding.plan_after.cost, finding.plan_before.cost)
+        self.assertEqual(finding.plan_after.index_columns, {'shop_bike': ['description']})
+        self.assertEqual(finding.proposal.as_index().name, 'shop_bike_description')
+        # Пробний індекс відкочено
+        with connection.cursor() as cursor:
+            constraints = connection.introspection.get_constraints(cursor, 'shop_bike')
+        self.assertNotIn(['description'], [info['columns'] for info in constraints.values() if info['index']])
+
+    def test_existing_index_not_proposed(self):
+        """Індекс з міграцій (order, bike) не пропонується повторно"""
+        query = self.captured(OrderItem.objects.filter(order_id=1, bike_id=2))
+        self.assertEqual(analyze([query], measure=False), [])
+
+    def test_merge_proposals_drops_prefixes(self):
+        """Індекс-префікс іншої пропозиції відкидається"""
+        queries = [
+            self.captured(Bike.objects.filter(description='x')),
+            self.captured(Bike.objects.filter(description='x').filter(image='y')),
+        ]
+        proposals = merge_proposals(analyze(queries, measure=False))
+        self.assertEqual([p.fields for p in proposals], [('description', 'image')])
+
+    def test_timing_does_not_change_data(self):
+        """Заміри UPDATE/DELETE з журналу відкочуються"""
+        delete = ('DELETE FROM "shop_bike" WHERE "shop_bike"."description" = %s', [''])
+        update = ('UPDATE "shop_bike" SET "price" = 1 WHERE "shop_bike"."image" = %s', ['test.jpg'])
+        findings = analyze([delete, update])
+        self.assertEqual(len(findings), 2)
+        self.assertTrue(all(finding.ms_before is not None and finding.ms_after is not None for finding in findings))
+        self.assertEqual(Bike.objects.count(), 50)
+        self.assertEqual(Bike.objects.filter(price=Decimal('100.00')).count(), 50)
+
+    def test_command_with_log(self):
+        """Команда читає журнал і друкує план до/після та фрагмент Meta.indexes"""
+        sql, params = self.captured(Bike.objects.filter(description='Bike 3'))
+        path = self.tmp_log([json.dumps({'sql': sql, 'params': params})])
+        out = io.StringIO()
+        call_command('advise_indexes', log=path, no_timing=True, stdout=out)
+        output = out.getvalue()
+        self.assertIn('full_scan:shop_bike', output)
+        self.assertIn("Bike: models.Index(fields=['description']", output)
+
+    def captured(self, queryset):
+        sql, params = queryset.query.sql_with_params()
+        return sql, list(params)
+
+    def tmp_log(self, lines):
+        with tempfile.NamedTemporaryFile('w', suffix='.log', delete=False, encoding='utf-8') as f:
+            f.write('\n'.join(lines))
+        self.addCleanup(os.unlink, f.name)
+        return f.name
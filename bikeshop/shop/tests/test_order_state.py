@@ -0,0 +1,142 @@
+# shop/tests/test_order_state.py
+"""Tests for the order status state machine."""
+from decimal import Decimal
+from unittest.mock import patch
+
+from django.contrib.auth.models import User
+from django.db import connection
+from django.db.models import QuerySet
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from ..models import Bike, BikeType, Order, OrderItem, OrderStatusTransition, SalesRollup
+from ..patterns.state import OrderStateMachine, TransitionError, history, machine
+
+
+class OrderStateMachineTests(TestCase):
+    """Tests for single and bulk transitions, the log and rollups."""
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='clerk', password='12345')
+        bike_type = BikeType.objects.create(name="road", description="")
+        self.bike = Bike.objects.create(
+            name="Bike", bike_type=bike_type, price=Decimal('100.00'), description="", image="test.jpg"
+        )
+
+    def make_order(self, status='new', completed=True):
+        order = Order.objects.create(user=self.user, status=status, total=Decimal('100.00'))
+        OrderItem.objects.create(order=order, bike=self.bike, price=Decimal('100.00'))
+        if completed:
+            order.completed = True
+            order.save()
+        return order
+
+    def test_allowed_transitions(self):
+        """Кінцеві стани не мають виходів, new не має входів"""
+        self.assertTrue(machine.can_transition('new', 'processing'))
+        self.assertTrue(machine.can_transition('shipped', 'delivered'))
+        self.assertFalse(machine.can_transition('delivered', 'new'))
+        self.assertFalse(machine.can_transition('canceled', 'processing'))
+        self.assertEqual(machine.sources('new'), ())
+
+    def test_transition_logs_and_moves_rollups(self):
+        """Перехід пише журнал і переносить внесок у звітах"""
+        order = self.make_order()
+        machine.transition(order, 'processing', actor=self.user)
+        machine.transition(order, 'shipped')
+
+        self.assertEqual(Order.objects.get(pk=order.pk).status, 'shipped')
+        self.assertEqual([(source, target, actor) for _, source, target, actor in history(order.pk)], [
+            ('new', 'processing', self.user.pk),
+            ('processing', 'shipped', None),
+        ])
+        self.assertEqual(SalesRollup.objects.get(status='shipped').units, 1)
+        self.assertEqual(SalesRollup.objects.get(status='new').units, 0)
+
+    def test_forbidden_transition(self):
+        """Заборонений перехід не змінює замовлення"""
+        order = self.make_order(status='delivered')
+        with self.assertRaises(TransitionError):
+            machine.transition(order, 'processing')
+        self.assertFalse(OrderStatusTransition.objects.exists())
+
+    def test_stale_object_loses_race(self):
+        """Друга зміна зі застарілим статусом відхиляється умовним UPDATE"""
+        order = self.make_order()
+        stale = Order.objects.get(pk=order.pk)
+        machine.transition(order, 'canceled')
+
+        with self.assertRaises(TransitionError):
+            machine.transition(stale, 'processing')
+        self.assertEqual(Order.objects.get(pk=order.pk).status, 'canceled')
+        self.assertEqual(OrderStatusTransition.objects.count(), 1)
+
+    def test_bulk_transition_skips_forbidden(self):
+        """Масовий перехід пропускає замовлення з кінцевих станів"""
+        new = [self.make_order() for _ in range(3)]
+        processing = self.make_order(status='processing')
+        delivered = self.make_order(status='delivered')
+
+        result = machine.bulk_transition(Order.objects.all(), 'shipped', chunk_size=2)
+
+        self.assertEqual(result.moved, {'new': 3, 'processing': 1})
+        self.assertEqual(Order.objects.filter(status='shipped').count(), 4)
+        self.assertEqual(Order.objects.get(pk=delivered.pk).status, 'delivered')
+        self.assertEqual(OrderStatusTransition.objects.count(), 4)
+        self.assertEqual(history(processing.pk)[0][1:3], ('processing', 'shipped'))
+        self.assertEqual(SalesRollup.objects.get(status='shipped').units, 4)
+        self.assertEqual(len(new), OrderStatusTransition.objects.filter(from_status=1).count())
+
+    def test_bulk_logs_only_moved_orders(self):
+        """Замовлення, змінене між вибіркою і UPDATE, не потрапляє в журнал і зведення"""
+        orders = [self.make_order() for _ in range(3)]
+        loser = orders[1]
+        update = QuerySet.update
+
+        def racing_update(queryset, **kwargs):
+            # Інший процес скасовує замовлення між вибіркою пачки і її UPDATE
+            if queryset.model is Order and kwargs == {'status': 'processing'}:
+                update(Order.objects.filter(pk=loser.pk), status='canceled')
+            return update(queryset, **kwargs)
+
+        with patch.object(QuerySet, 'update', racing_update):
+            result = machine.bulk_transition(Order.objects.all(), 'processing')
+
+        self.assertEqual(result.moved, {'new': 2})
+        self.assertEqual(history(loser.pk), [])
+        self.assertEqual(OrderStatusTransition.objects.count(), 2)
+        self.assertEqual(SalesRollup.objects.get(status='processing').units, 2)
+
+    def test_bulk_ignores_orders_moved_by_others(self):
+        """Замовлення, переведене в той самий статус іншим процесом з іншого, не логується як наше"""
+        orders = [self.make_order() for _ in range(3)]
+        other = orders[1]
+        update = QuerySet.update
+
+        def racing_update(queryset, **kwargs):
+            # Інший процес уже переводить замовлення processing → shipped; його зміна
+            # закомічена, тож повторюється і після відкату нашої точки збереження
+            if queryset.model is Order and kwargs == {'status': 'shipped'}:
+                update(Order.objects.filter(pk=other.pk), status='shipped')
+            return update(queryset, **kwargs)
+
+        with patch.object(QuerySet, 'update', racing_update):
+            result = machine.bulk_transition(Order.objects.filter(status='new'), 'shipped')
+
+        self.assertEqual(result.moved, {'new': 2})
+        self.assertEqual(history(other.pk), [])
+        self.assertEqual(OrderStatusTransition.objects.count(), 2)
+        self.assertEqual(SalesRollup.objects.get(status='shipped').units, 2)
+        self.assertEqual(SalesRollup.objects.get(status='new').units, 1)
+
+    def test_bulk_statement_count_is_constant(self):
+        """Кількість запитів масового переходу не залежить від кількості замовлень"""
+        def count(orders):
+            Order.objects.all().delete()
+            for _ in range(orders):
+                self.make_order(completed=False)
+            with CaptureQueriesContext(connection) as ctx:
+                OrderStateMachine().bulk_transition(Order.objects.all(), 'processing')
+            return len(ctx)
+
+        self.assertEqual(count(2), count(30))
@@ -0,0 +1,118 @@
+# shop/tests/test_price_history.py
+"""Tests for the delta-encoded price history."""
+from datetime import timedelta
+from decimal import Decimal
+
+from django.contrib.auth.models import User
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from .. import price_history
+from ..models import Bike, BikeType, PriceHistoryBlock
+from ..repricing import PriceChangeSpec, reprice_catalog
+
+
+class PriceHistoryTests(TestCase):
+    """Tests for encoding, recording and querying price history."""
+
+    def setUp(self):
+        self.bike_type = BikeType.objects.create(name="road", description="")
+        self.bike = Bike.objects.create(
+            name="Bike", bike_type=self.bike_type, price=Decimal('1000.00'), description="", image="test.jpg"
+        )
+        self.t0 = timezone.now().replace(microsecond=0) - timedelta(days=30)
+
+    def test_varint_roundtrip(self):
+        """Кодування varint/zigzag відновлює значення, зокрема від'ємні"""
+        values = [0, 1, -1, 63, -64, 127, 128, 300, -300, 10 ** 12, -(10 ** 12)]
+        encoded = price_history.encode_varints(price_history.zigzag(v) for v in values)
+        decoded = [price_history.unzigzag(v) for v in price_history.decode_varints(encoded)]
+        self.assertEqual(decoded, values)
+
+    def test_save_records_only_real_changes(self):
+        """Збереження без зміни ціни не додає подій"""
+        bike = Bike.objects.get(pk=self.bike.pk)
+        bike.name = "Renamed"
+        bike.save()
+        bike.price = Decimal('900.00')
+        bike.save()
+
+        block = PriceHistoryBlock.objects.get(bike=self.bike)
+        self.assertEqual(block.count, 2)
+        self.assertEqual(block.last_price, Decimal('900.00'))
+
+    def test_price_at_and_range(self):
+        """Ціна в момент T і зміни за період"""
+        PriceHistoryBlock.objects.all().delete()
+        prices = ['1000.00', '950.50', '1100.00', '1099.99']
+        for day, price in enumerate(prices):
+            price_history.record([(self.bike.pk, Decimal(price))], at=self.t0 + timedelta(days=day))
+
+        self.assertIsNone(price_history.price_at(self.bike.pk, self.t0 - timedelta(seconds=1)))
+        self.assertEqual(price_history.price_at(self.bike.pk, self.t0), Decimal('1000.00'))
+        self.assertEqual(price_history.price_at(self.bike.pk, self.t0 + timedelta(days=1, hours=5)), Decimal('950.50'))
+        self.assertEqual(price_history.price_at(self.bike.pk, self.t0 + timedelta(days=10)), Decimal('1099.99'))
+
+        changes = price_history.price_changes(
+            self.bike.pk, self.t0 + timedelta(hours=1), self.t0 + timedelta(days=2)
+        )
+        self.assertEqual([(c.at, c.price) for c in changes], [
+            (self.t0 + timedelta(days=1), Decimal('950.50')),
+            (self.t0 + timedelta(days=2), Decimal('1100.00')),
+        ])
+
+    def test_blocks_roll_over_and_stay_small(self):
+        """Повний блок закривається, а подія займає кілька байтів"""
+        PriceHistoryBlock.objects.all().delete()
+        events = price_history.BLOCK_EVENTS * 2 + 5
+        for i in range(events):
+            price = Decimal(1000 + (i % 7) * 25)
+            price_history.record([(self.bike.pk, price)], at=self.t0 + timedelta(hours=i))
+
+        blocks = list(PriceHistoryBlock.objects.filter(bike=self.bike).order_by('start'))
+        self.assertEqual([b.count for b in blocks], [price_history.BLOCK_EVENTS] * 2 + [5])
+        self.assertLess(sum(len(b.data) for b in blocks) / events, 6)
+
+        at = self.t0 + timedelta(hours=200, minutes=30)
+        self.assertEqual(price_history.price_at(self.bike.pk, at), Decimal(1000 + (200 % 7) * 25))
+        changes = price_history.price_changes(self.bike.pk, self.t0, self.t0 + timedelta(hours=events))
+        self.assertEqual(len(changes), events)
+
+    def test_new_block_never_starts_before_previous(self):
+        """Новий блок після заповненого не починається раніше за його кінець навіть із відсталим годинником"""
+        PriceHistoryBlock.objects.all().delete()
+        for i in range(price_history.BLOCK_EVENTS):
+            price_history.record([(self.bike.pk, Decimal(1000 + i))], at=self.t0 + timedelta(hours=i))
+        full = PriceHistoryBlock.objects.get(bike=self.bike)
+
+        price_history.record([(self.bike.pk, Decimal('1.00'))], at=self.t0)
+        fresh = PriceHistoryBlock.objects.exclude(pk=full.pk).get(bike=self.bike)
+        self.assertEqual(fresh.start, full.end)
+        self.assertEqual(price_history.price_at(self.bike.pk, self.t0 + timedelta(hours=1)), Decimal('1001'))
+        self.assertEqual(price_history.price_at(self.bike.pk, full.end), Decimal('1.00'))
+
+    def test_reprice_records_history(self):
+        """Масова зміна цін дописує історію одним пакетом"""
+        other = Bike.objects.create(
+            name="Other", bike_type=self.bike_type, price=Decimal('500.00'), description="", image="test.jpg"
+        )
+        with self.captureOnCommitCallbacks(execute=True):
+            reprice_catalog(PriceChangeSpec(percent_by_type={'road': Decimal('10')}))
+
+        for bike, price in ((self.bike, Decimal('1100.00')), (other, Decimal('550.00'))):
+            block = PriceHistoryBlock.objects.get(bike=bike)
+            self.assertEqual((block.count, block.last_price), (2, price))
+            self.assertEqual(price_history.price_at(bike.pk, timezone.now()), price)
+
+    def test_staff_endpoint(self):
+        """JSON-ендпоінт віддає ціну в момент і зміни"""
+        staff = User.objects.create_user(username='staff', password='12345', is_staff=True)
+        self.client.force_login(staff)
+        url = reverse('shop:bike_price_history', args=[self.bike.pk])
+
+        data = self.client.get(url).json()
+        self.assertEqual([c['price'] for c in data['changes']], ['1000.00'])
+        data = self.client.get(url, {'at': (timezone.now() + timedelta(minutes=1)).isoformat()}).json()
+        self.assertEqual(data['price'], '1000.00')
+        self.assertEqual(self.client.get(url, {'at': 'вчора'}).status_code, 400)
@@ -0,0 +1,128 @@
+# shop/tests/test_pricing.py
+"""Tests for the rule-based pricing engine."""
+from decimal import Decimal
+from django.contrib.auth.models import User
+from django.core.exceptions import ValidationError
+from django.test import TestCase
+
+from ..models import Bike, BikeType, Order, OrderItem, PromotionRule
+from ..pricing import CartLine, CartSnapshot, CompiledRules, apply_pricing, bump_rules_version
+
+
+class CompiledRulesTests(TestCase):
+    """Tests for in-memory rule evaluation."""
+
+    def setUp(self):
+        self.road = BikeType.objects.create(name="road", description="")
+        self.city = BikeType.objects.create(name="city", description="")
+
+    def rules(self, *rules):
+        return CompiledRules(rules)
+
+    def test_type_percent(self):
+        """Знижка застосовується лише до позицій свого типу"""
+        rules = self.rules(PromotionRule(kind='bike_type', percent=20, bike_type=self.road))
+        snapshot = CartSnapshot((
+            CartLine(1, 1, self.road.id, 1, Decimal('1000.00')),
+            CartLine(2, 2, self.city.id, 1, Decimal('500.00')),
+        ))
+        result = rules.evaluate(snapshot)
+
+        self.assertEqual(result.line_discounts, {1: Decimal('200.00'), 2: Decimal('0.00')})
+        self.assertEqual(result.total, Decimal('1300.00'))
+        self.assertEqual(result.percent, 13)
+
+    def test_quantity_tier(self):
+        """Найбільший досягнутий поріг кількості"""
+        rules = self.rules(
+            PromotionRule(kind='quantity_tier', percent=5, min_quantity=3),
+            PromotionRule(kind='quantity_tier', percent=12, min_quantity=10),
+        )
+        small = rules.evaluate(CartSnapshot((CartLine(1, 1, self.road.id, 2, Decimal('100.00')),)))
+        medium = rules.evaluate(CartSnapshot((CartLine(1, 1, self.road.id, 4, Decimal('100.00')),)))
+        large = rules.evaluate(CartSnapshot((CartLine(1, 1, self.road.id, 10, Decimal('100.00')),)))
+
+        self.assertEqual(small.discount, Decimal('0.00'))
+        self.assertEqual(medium.discount, Decimal('20.00'))
+        self.assertEqual(large.discount, Decimal('120.00'))
+
+    def test_lower_tier_with_bigger_percent(self):
+        """Нижчий поріг з більшим відсотком не перекривається вищим"""
+        rules = self.rules(
+            PromotionRule(kind='quantity_tier', percent=15, min_quantity=3),
+            PromotionRule(kind='quantity_tier', percent=10, min_quantity=10),
+            PromotionRule(kind='quantity_tier', percent=12, min_quantity=10),
+        )
+        self.assertEqual([rules.tier_percent(n) for n in (2, 3, 10)], [0, 15, 15])
+        self.assertEqual(rules.tiers, [(10, 15), (3, 15)])
+
+    def test_best_rule_wins(self):
+        """Знижки не сумуються: діє найбільший відсоток"""
+        rules = self.rules(
+            PromotionRule(kind='bike_type', percent=10),
+            PromotionRule(kind='first_order', percent=15),
+        )
+        line = CartLine(1, 1, self.road.id, 1, Decimal('999.99'))
+
+        self.assertEqual(rules.evaluate(CartSnapshot((line,), first_order=True)).discount, Decimal('150.00'))
+        self.assertEqual(rules.evaluate(CartSnapshot((line,), first_order=False)).discount, Decimal('100.00'))
+
+    def test_percent_capped_at_hundred(self):
+        """Знижка понад 100% відхиляється валідатором, а в розрахунку обмежується сумою"""
+        rule = PromotionRule(name="Помилка", kind='bike_type', percent=150)
+        with self.assertRaises(ValidationError) as raised:
+            rule.full_clean()
+        self.assertIn('percent', raised.exception.message_dict)
+
+        result = self.rules(rule).evaluate(CartSnapshot((CartLine(1, 1, self.road.id, 1, Decimal('100.00')),)))
+        self.assertEqual((result.discount, result.total), (Decimal('100.00'), Decimal('0.00')))
+
+
+class ApplyPricingTests(TestCase):
+    """Tests for persisting pricing results."""
+
+    def setUp(self):
+        PromotionRule.objects.all().delete()
+        PromotionRule.objects.create(name='Базова', kind='bike_type', percent=10)
+        bump_rules_version()
+
+        self.user = User.objects.create_user(username='pricing', password='12345')
+        bike_type = BikeType.objects.create(name="Test", description="Test")
+        self.bike = Bike.objects.create(
+            name="Test Bike", bike_type=bike_type, price=Decimal('500.00'), description="Test", image="test.jpg"
+        )
+        self.order = Order.objects.create(user=self.user, total=0)
+        self.item = OrderItem.objects.create(order=self.order, bike=self.bike, price=Decimal('500.00'), quantity=2)
+
+    def test_fills_order_and_items(self):
+        """Заповнює discount_percent замовлення та discount позицій"""
+        result = apply_pricing(self.order)
+
+        self.assertTrue(result.changed)
+        self.order.refresh_from_db()
+        self.item.refresh_from_db()
+        self.assertEqual(self.order.discount_percent, 10)
+        self.assertEqual(self.order.discount, Decimal('100.00'))
+        self.assertEqual(self.order.total, Decimal('900.00'))
+        self.assertEqual(self.item.discount, Decimal('100.00'))
+
+    def test_unchanged_cart_not_written(self):
+        """Повторне обчислення незмінного кошика нічого не записує"""
+        apply_pricing(self.order)
+        order = Order.objects.get(pk=self.order.pk)
+
+        with self.assertNumQueries(2):
+            result = apply_pricing(order)
+        self.assertFalse(result.changed)
+
+    def test_create_order_view(self):
+        """Сторінка оформлення застосовує правила без декоратора"""
+        self.order.delete()
+        self.client.force_login(self.user)
+
+        response = self.client.get(f'/bikes/{self.bike.id}/order/')
+
+        self.assertEqual(response.status_code, 200)
+        order = Order.objects.get(user=self.user)
+        self.assertEqual(order.discount_percent, 10)
+        self.assertEqual(order.total, Decimal('450.00'))
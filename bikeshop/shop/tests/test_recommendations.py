@@ -0,0 +1,105 @@
+# shop/tests/test_recommendations.py
+"""Tests for frequently-bought-together recommendations."""
+import io
+from decimal import Decimal
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from .. import recommendations
+from ..models import Bike, BikeRecommendation, BikeType, Order, OrderItem
+
+
+class RecommendationTests(TestCase):
+    """Tests for rebuild, incremental updates and the order page."""
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='buyer', password='12345')
+        bike_type = BikeType.objects.create(name="road", description="")
+        self.bikes = [
+            Bike.objects.create(name=f"Bike {i}", bike_type=bike_type, price=Decimal('1000.00'),
+                                description="", image="test.jpg")
+            for i in range(5)
+        ]
+
+    def make_order(self, *bikes, completed=True):
+        order = Order.objects.create(user=self.user, total=0)
+        OrderItem.objects.bulk_create(OrderItem(order=order, bike=bike, price=bike.price) for bike in bikes)
+        if completed:
+            with self.captureOnCommitCallbacks(execute=True):
+                order.completed = True
+                order.save()
+        return order
+
+    def neighbours(self, bike):
+        return list(
+            BikeRecommendation.objects.filter(bike=bike).order_by('-score', 'recommended_id')
+            .values_list('recommended_id', 'score')
+        )
+
+    def test_rebuild_counts_cooccurrence(self):
+        """Перебудова рахує, у скількох замовленнях велосипеди були разом"""
+        a, b, c, d, _ = self.bikes
+        for _ in range(3):
+            self.make_order(a, b)
+        self.make_order(a, c, c)
+        self.make_order(d)
+        self.make_order(a, d, completed=False)
+        BikeRecommendation.objects.all().delete()
+
+        recommendations.rebuild(chunk_size=1)
+        self.assertEqual(self.neighbours(a), [(b.pk, 3), (c.pk, 1)])
+        self.assertEqual(self.neighbours(c), [(a.pk, 1)])
+        self.assertEqual(self.neighbours(d), [])
+
+    def test_completion_updates_incrementally(self):
+        """Завершення замовлення одразу оновлює рекомендації"""
+        a, b, c, _, _ = self.bikes
+        self.make_order(a, b)
+        self.make_order(a, b, c)
+        self.assertEqual(self.neighbours(a), [(b.pk, 2), (c.pk, 1)])
+
+        recommendations.rebuild()
+        self.assertEqual(self.neighbours(a), [(b.pk, 2), (c.pk, 1)])
+
+    @override_settings(SHOP_RECOMMENDATION_SLOTS=1)
+    def test_full_slots_evict_weakest(self):
+        """Новий сусід при заповнених слотах витісняє найслабшого з лічильником +1"""
+        a, b, c, _, _ = self.bikes
+        self.make_order(a, b)
+        self.make_order(a, c)
+        self.assertEqual(self.neighbours(a), [(c.pk, 2)])
+        self.assertEqual(BikeRecommendation.objects.filter(bike=a).count(), 1)
+
+    @override_settings(SHOP_RECOMMENDATION_SLOTS=3)
+    def test_basket_bike_never_evicted(self):
+        """Сусід із того ж кошика не витісняється: новий займає слот слабшого стороннього"""
+        bike, x, b, c, a = self.bikes
+        BikeRecommendation.objects.bulk_create([
+            BikeRecommendation(bike=bike, recommended=c, score=2),
+            BikeRecommendation(bike=bike, recommended=a, score=1),
+            BikeRecommendation(bike=bike, recommended=b, score=5),
+        ])
+        self.make_order(bike, x, a)
+        self.assertEqual(self.neighbours(bike), [(b.pk, 5), (x.pk, 3), (a.pk, 2)])
+        self.assertEqual(self.neighbours(a), [(bike.pk, 1), (x.pk, 1)])
+
+    def test_order_page_shows_recommendations(self):
+        """Сторінка замовлення показує рекомендації в наявності"""
+        a, b, c, _, _ = self.bikes
+        self.make_order(a, b, c)
+        Bike.objects.filter(pk=c.pk).update(in_stock=False)
+
+        self.client.force_login(self.user)
+        response = self.client.get(reverse('shop:create_order', args=[a.pk]))
+        self.assertContains(response, "Часто купують разом")
+        self.assertEqual(response.context['recommendations'], [b])
+
+    def test_command(self):
+        """Команда перебудовує таблицю"""
+        self.make_order(*self.bikes[:2])
+        out = io.StringIO()
+        call_command('rebuild_recommendations', stdout=out)
+        self.assertIn("Записано рекомендацій: 2", out.getvalue())
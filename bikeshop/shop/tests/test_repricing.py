@@ -0,0 +1,117 @@
+# shop/tests/test_repricing.py
+"""Tests for bulk catalog repricing."""
+import io
+from decimal import Decimal
+from django.contrib.auth.models import User
+from django.core.management import CommandError, call_command
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from ..models import Bike, BikeType, Order, OrderItem, PromotionRule
+from ..pricing import bump_rules_version
+from ..repricing import PriceChangeSpec, PriceSpecError, apply_percent, reprice_catalog
+
+
+class RepricingTests(TestCase):
+    """Tests for reprice_catalog and the reprice command."""
+
+    def setUp(self):
+        PromotionRule.objects.all().delete()
+        bump_rules_version()
+        self.user = User.objects.create_user(username='reprice', password='12345')
+        self.road = BikeType.objects.create(name="road", description="")
+        self.city = BikeType.objects.create(name="city", description="")
+        self.road_bike = self.make_bike(self.road, '1000.00')
+        self.city_bike = self.make_bike(self.city, '333.33')
+
+    def make_bike(self, bike_type, price):
+        return Bike.objects.create(
+            name="Bike", bike_type=bike_type, price=Decimal(price), description="", image="test.jpg"
+        )
+
+    def test_apply_percent_rounding(self):
+        """Округлення до копійки за правилом ROUND_HALF_UP"""
+        self.assertEqual(apply_percent(Decimal('333.33'), Decimal('-15')), Decimal('283.33'))
+        self.assertEqual(apply_percent(Decimal('0.05'), Decimal('10')), Decimal('0.06'))
+
+    def test_percent_by_type_and_override(self):
+        """Абсолютна ціна має пріоритет над відсотком типу"""
+        other_road = self.make_bike(self.road, '2000.00')
+        spec = PriceChangeSpec(percent_by_type={'road': Decimal('-10')}, overrides={other_road.pk: Decimal('1500')})
+
+        report = reprice_catalog(spec)
+
+        self.assertEqual(report.bikes, 2)
+        self.road_bike.refresh_from_db()
+        other_road.refresh_from_db()
+        self.city_bike.refresh_from_db()
+        self.assertEqual(self.road_bike.price, Decimal('900.00'))
+        self.assertEqual(other_road.price, Decimal('1500.00'))
+        self.assertEqual(self.city_bike.price, Decimal('333.33'))
+
+    def test_open_carts_repriced_completed_untouched(self):
+        """Відкриті кошики отримують нову ціну, завершені замовлення — ні"""
+        open_order = Order.objects.create(user=self.user, total=Decimal('2000.00'))
+        open_item = OrderItem.objects.create(order=open_order, bike=self.road_bike, price=Decimal('1000.00'), quantity=2)
+        done_order = Order.objects.create(user=self.user, total=Decimal('1000.00'), completed=True)
+        done_item = OrderItem.objects.create(order=done_order, bike=self.road_bike, price=Decimal('1000.00'))
+
+        report = reprice_catalog(PriceChangeSpec(percent_by_type={str(self.road.pk): Decimal('10')}))
+
+        self.assertEqual((report.order_items, report.orders), (1, 1))
+        open_item.refresh_from_db()
+        open_order.refresh_from_db()
+        done_item.refresh_from_db()
+        self.assertEqual(open_item.price, Decimal('1100.00'))
+        self.assertEqual(open_order.total, Decimal('2200.00'))
+        self.assertEqual(done_item.price, Decimal('1000.00'))
+
+    def test_csv_spec(self):
+        """Розбір CSV зі специфікацією змін"""
+        spec = PriceChangeSpec.from_csv(io.StringIO(
+            "bike_id,price,bike_type,percent\n"
+            f"{self.city_bike.pk},350.00,,\n"
+            ",,road,-5\n"
+        ))
+        self.assertEqual(spec.overrides, {self.city_bike.pk: Decimal('350.00')})
+        self.assertEqual(spec.percent_by_type, {'road': Decimal('-5')})
+
+        with self.assertRaises(PriceSpecError):
+            PriceChangeSpec.from_csv(io.StringIO("bike_id,price\nabc,1\n"))
+
+    def test_unknown_type_rejected(self):
+        """Невідомий тип велосипеда — помилка специфікації"""
+        with self.assertRaises(PriceSpecError):
+            reprice_catalog(PriceChangeSpec(percent_by_type={'gravel': Decimal('5')}))
+
+    def test_percent_below_minus_hundred_rejected(self):
+        """Зниження більш ніж на 100% дало б від'ємні ціни — помилка специфікації"""
+        with self.assertRaises(PriceSpecError):
+            reprice_catalog(PriceChangeSpec(percent_by_type={'city': Decimal('-101')}))
+        with self.assertRaises(CommandError):
+            call_command('reprice', '--type', 'city=-150', stdout=io.StringIO())
+        self.city_bike.refresh_from_db()
+        self.assertEqual(self.city_bike.price, Decimal('333.33'))
+
+    def test_pages_read_before_writes(self):
+        """Кожна пачка читається окремим завершеним запитом, без курсора поверх UPDATE"""
+        for _ in range(5):
+            self.make_bike(self.city, '100.00')
+        with CaptureQueriesContext(connection) as ctx:
+            report = reprice_catalog(PriceChangeSpec(percent_by_type={'city': Decimal('10')}), chunk_size=2)
+        pages = [q['sql'] for q in ctx.captured_queries
+                 if q['sql'].startswith('SELECT "shop_bike"."id", "shop_bike"."bike_type_id"')]
+        self.assertEqual(len(pages), 4)
+        self.assertTrue(all('LIMIT 2' in sql for sql in pages))
+        self.assertEqual(report.bikes, 6)
+        self.assertEqual(Bike.objects.filter(price=Decimal('110.00')).count(), 5)
+
+    def test_command(self):
+        """Команда manage.py reprice"""
+        out = io.StringIO()
+        call_command('reprice', '--type', 'city=100', stdout=out)
+
+        self.city_bike.refresh_from_db()
+        self.assertEqual(self.city_bike.price, Decimal('666.66'))
+        self.assertIn('Змінено цін: 1', out.getvalue())
@@ -0,0 +1,78 @@
+# shop/tests/test_rollups.py
+"""Tests for incremental sales rollups."""
+import io
+from decimal import Decimal
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.test import TestCase
+from django.utils import timezone
+
+from ..models import Bike, BikeType, Order, OrderItem, SalesRollup
+
+
+class SalesRollupTests(TestCase):
+    """Tests for rollup maintenance and the sales report."""
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='rollup', password='12345')
+        self.bike_type = BikeType.objects.create(name="road", description="")
+        self.bike = Bike.objects.create(
+            name="Bike", bike_type=self.bike_type, price=Decimal('1000.00'), description="", image="test.jpg"
+        )
+        self.order = Order.objects.create(user=self.user, total=Decimal('1800.00'))
+        OrderItem.objects.create(order=self.order, bike=self.bike, price=Decimal('1000.00'), quantity=2,
+                                 discount=Decimal('200.00'))
+
+    def bucket(self, status):
+        return SalesRollup.objects.get(day=timezone.localdate(), bike_type=self.bike_type, status=status)
+
+    def test_open_order_not_counted(self):
+        """Незавершене замовлення не потрапляє у звіт"""
+        self.order.save()
+        self.assertFalse(SalesRollup.objects.exists())
+
+    def test_completion_adds_bucket(self):
+        """Завершення замовлення додає його внесок"""
+        self.order.completed = True
+        self.order.save()
+
+        bucket = self.bucket('new')
+        self.assertEqual(bucket.units, 2)
+        self.assertEqual(bucket.gross, Decimal('2000.00'))
+        self.assertEqual(bucket.discount, Decimal('200.00'))
+        self.assertEqual(bucket.net, Decimal('1800.00'))
+
+    def test_status_change_moves_bucket(self):
+        """Зміна статусу переносить внесок між бакетами"""
+        self.order.completed = True
+        self.order.save()
+        order = Order.objects.get(pk=self.order.pk)
+        order.status = 'shipped'
+        order.save()
+
+        self.assertEqual(self.bucket('new').units, 0)
+        self.assertEqual(self.bucket('shipped').net, Decimal('1800.00'))
+
+    def test_rebuild_matches_incremental(self):
+        """Перебудова з історії дає ті самі підсумки"""
+        self.order.completed = True
+        self.order.save()
+        expected = list(SalesRollup.objects.values_list('status', 'units', 'gross', 'discount', 'net'))
+
+        call_command('rebuild_sales_rollups', '--chunk-size', '1', stdout=io.StringIO())
+
+        self.assertEqual(list(SalesRollup.objects.values_list('status', 'units', 'gross', 'discount', 'net')), expected)
+
+    def test_report_reads_rollups(self):
+        """Звіт для персоналу читає лише зведену таблицю"""
+        self.order.completed = True
+        self.order.save()
+        staff = User.objects.create_user(username='staff', password='12345', is_staff=True)
+        self.client.force_login(staff)
+
+        response = self.client.get('/reports/sales/')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, 'Продано одиниць: 2')
+        captured = response.context['by_type']
+        self.assertEqual(captured[0]['status_label'], 'Нове')
@@ -0,0 +1,78 @@
+# shop/tests/test_specs.py
+"""Tests for the consolidated bike specification columns."""
+import importlib
+from decimal import Decimal
+from django.apps import apps
+from django.test import TestCase
+
+from ..models import Bike, BikeType, CityBikeSpec, MountainBikeSpec, RoadBikeSpec
+from ..patterns import BikeFactory
+from ..specs import describe
+
+backfill = importlib.import_module('shop.migrations.0010_backfill_bike_specs')
+
+
+class BikeSpecsTests(TestCase):
+    """Tests for spec synchronisation, compatibility and the backfill migration."""
+
+    def setUp(self):
+        self.factory = BikeFactory()
+
+    def make_bike(self, **kwargs):
+        return self.factory.create_bike('mountain', 'MTB', Decimal('1000.00'), '', **kwargs)
+
+    def test_factory_fills_columns(self):
+        """Фабрика заповнює JSON і текст, у тому числі в об'єкті в пам'яті"""
+        bike = self.make_bike(suspension='повітряна')
+        self.assertEqual(bike.specs, {'kind': 'mountain', 'suspension': 'повітряна'})
+        self.assertEqual(bike.get_specifics(), 'Гірський велосипед з повітряна амортизацією')
+        bike.refresh_from_db()
+        self.assertEqual(bike.specifics_text, 'Гірський велосипед з повітряна амортизацією')
+
+    def test_describe_matches_spec_models(self):
+        """Текст зі словника збігається з get_specifics spec-моделей"""
+        self.assertEqual(describe({'kind': 'road', 'weight': 8.5}), 'Легкий шосейний велосипед (8.5 кг)')
+        self.assertEqual(describe({'kind': 'city', 'has_basket': False}), 'Міський велосипед')
+        self.assertEqual(describe({}), 'Звичайний велосипед')
+
+    def test_spec_update_and_delete_sync(self):
+        """Редагування і видалення рядка spec-таблиці оновлює зведені колонки"""
+        bike = self.make_bike()
+        spec = MountainBikeSpec.objects.get(bike=bike)
+        spec.suspension = 'Передня'
+        spec.save()
+        bike.refresh_from_db()
+        self.assertEqual(bike.specs['suspension'], 'Передня')
+        spec.delete()
+        bike.refresh_from_db()
+        self.assertEqual((bike.specs, bike.get_specifics()), ({}, 'Звичайний велосипед'))
+
+    def test_priority_matches_legacy_order(self):
+        """Гірська специфікація має пріоритет над міською, як у старому get_specifics"""
+        bike = self.make_bike()
+        CityBikeSpec.objects.create(bike=bike, has_basket=True)
+        bike.refresh_from_db()
+        self.assertEqual(bike.specs['kind'], 'mountain')
+        MountainBikeSpec.objects.filter(bike=bike).get().delete()
+        bike.refresh_from_db()
+        self.assertEqual(bike.get_specifics(), 'Міський велосипед з кошиком')
+
+    def test_catalog_page_single_query(self):
+        """Читання каталогу зі специфікаціями — один запит"""
+        self.make_bike()
+        self.factory.create_bike('road', 'Road', Decimal('2000.00'), '', weight=7.1)
+        self.factory.create_bike('city', 'City', Decimal('500.00'), '')
+        with self.assertNumQueries(1):
+            texts = [bike.get_specifics() for bike in Bike.objects.filter(in_stock=True)]
+        self.assertEqual(len(texts), 3)
+
+    def test_backfill_migration(self):
+        """Міграція заповнює колонки для рядків, створених до її появи"""
+        bike_type = BikeType.objects.create(name='road', description='')
+        bike = Bike.objects.create(name='Old', bike_type=bike_type, price=Decimal('1.00'), description='', image='x.jpg')
+        RoadBikeSpec.objects.bulk_create([RoadBikeSpec(bike=bike, weight=9.0)])
+        Bike.objects.filter(pk=bike.pk).update(specs={}, specifics_text='')
+        backfill.backfill_specs(apps, None)
+        bike.refresh_from_db()
+        self.assertEqual(bike.specs, {'kind': 'road', 'weight': 9.0})
+        self.assertEqual(bike.get_specifics(), 'Легкий шосейний велосипед (9.0 кг)')
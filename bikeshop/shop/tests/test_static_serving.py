@@ -0,0 +1,129 @@
+# shop/tests/test_static_serving.py
+"""Tests for hashed static storage and the file-serving middleware."""
+import gzip
+import os
+import shutil
+import tempfile
+from django.core.management import call_command
+from django.http import HttpResponse
+from django.templatetags.static import static
+from django.test import RequestFactory, SimpleTestCase, override_settings
+
+from ..middleware import FileServingMiddleware, parse_range
+
+CSS = b'body { color: #333; }\n' * 200
+
+
+class StaticStorageTests(SimpleTestCase):
+    """Tests for CompressedManifestStaticFilesStorage."""
+
+    def setUp(self):
+        self.source = tempfile.mkdtemp()
+        self.root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.source)
+        self.addCleanup(shutil.rmtree, self.root)
+        os.makedirs(os.path.join(self.source, 'css'))
+        with open(os.path.join(self.source, 'css', 'site.css'), 'wb') as f:
+            f.write(CSS)
+
+    def test_collectstatic_hashes_and_compresses(self):
+        """collectstatic пише хешовані імена, маніфест і gzip-варіанти"""
+        with override_settings(STATIC_ROOT=self.root, STATICFILES_DIRS=[self.source],
+                               INSTALLED_APPS=['django.contrib.staticfiles', 'shop.apps.ShopConfig']):
+            call_command('collectstatic', interactive=False, verbosity=0)
+            url = static('css/site.css')
+        self.assertRegex(url, r'^/static/css/site\.[0-9a-f]{12}\.css$')
+        hashed_path = os.path.join(self.root, url[len('/static/'):])
+        with gzip.open(hashed_path + '.gz') as f:
+            self.assertEqual(f.read(), CSS)
+        self.assertTrue(os.path.exists(os.path.join(self.root, 'css', 'site.css.gz')))
+
+    def test_plain_names_without_manifest(self):
+        """Без маніфесту {% static %} повертає звичайне ім'я"""
+        with override_settings(STATIC_ROOT=self.root):
+            self.assertEqual(static('css/site.css'), '/static/css/site.css')
+
+
+class FileServingMiddlewareTests(SimpleTestCase):
+    """Tests for FileServingMiddleware."""
+
+    def setUp(self):
+        self.static_root = tempfile.mkdtemp()
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.static_root)
+        self.addCleanup(shutil.rmtree, self.media_root)
+        self.write(self.static_root, 'css/site.css', CSS)
+        self.write(self.static_root, 'css/site.css.gz', gzip.compress(CSS))
+        self.write(self.static_root, 'css/site.0123456789ab.css', CSS)
+        self.write(self.media_root, 'bikes/bike.jpg', bytes(range(256)) * 4)
+        self.factory = RequestFactory()
+        settings = override_settings(STATIC_ROOT=self.static_root, MEDIA_ROOT=self.media_root, SHOP_SERVE_FILES=True)
+        settings.enable()
+        self.addCleanup(settings.disable)
+        self.middleware = FileServingMiddleware(lambda request: HttpResponse('view'))
+
+    def write(self, root, name, content):
+        path = os.path.join(root, name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'wb') as f:
+            f.write(content)
+
+    def get(self, path, **headers):
+        return self.middleware(self.factory.get(path, headers=headers))
+
+    def test_serves_media_file(self):
+        """Зображення з MEDIA_ROOT віддається FileResponse з Accept-Ranges"""
+        response = self.get('/media/bikes/bike.jpg')
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        self.assertEqual(response['Content-Type'], 'image/jpeg')
+        self.assertEqual(response['Accept-Ranges'], 'bytes')
+        self.assertEqual(b''.join(response.streaming_content), bytes(range(256)) * 4)
+
+    def test_range_request(self):
+        """Range повертає 206 лише з потрібними байтами"""
+        response = self.get('/media/bikes/bike.jpg', Range='bytes=10-19')
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(response['Content-Range'], 'bytes 10-19/1024')
+        self.assertEqual(response['Content-Length'], '10')
+        self.assertEqual(b''.join(response.streaming_content), bytes(range(10, 20)))
+
+    def test_unsatisfiable_range(self):
+        """Діапазон за межами файлу — 416"""
+        response = self.get('/media/bikes/bike.jpg', Range='bytes=5000-')
+        self.assertEqual(response.status_code, 416)
+        self.assertEqual(response['Content-Range'], 'bytes */1024')
+
+    def test_gzip_variant(self):
+        """Клієнт з Accept-Encoding: gzip отримує .gz-варіант"""
+        response = self.get('/static/css/site.css', Accept_Encoding='gzip, br')
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertEqual(response['Content-Type'], 'text/css')
+        self.assertEqual(response['Vary'], 'Accept-Encoding')
+        self.assertEqual(gzip.decompress(b''.join(response.streaming_content)), CSS)
+        plain = self.get('/static/css/site.css')
+        self.assertNotIn('Content-Encoding', plain)
+
+    def test_cache_headers(self):
+        """Імена з хешем кешуються назавжди, If-Modified-Since дає 304"""
+        hashed = self.get('/static/css/site.0123456789ab.css')
+        self.assertIn('immutable', hashed['Cache-Control'])
+        plain = self.get('/static/css/site.css')
+        self.assertNotIn('immutable', plain['Cache-Control'])
+        not_modified = self.get('/static/css/site.css', If_Modified_Since=plain['Last-Modified'])
+        self.assertEqual(not_modified.status_code, 304)
+
+    def test_falls_through(self):
+        """Відсутні файли, обхід каталогу і інші шляхи йдуть далі до представлень"""
+        for path in ('/static/css/missing.css', '/static/../secret.txt', '/static/css/', '/bikes/'):
+            self.assertEqual(self.get(path).content, b'view', path)
+
+    def test_parse_range(self):
+        """Розбір заголовка Range"""
+        self.assertEqual(parse_range('bytes=0-', 100), (0, 99))
+        self.assertEqual(parse_range('bytes=-10', 100), (90, 99))
+        self.assertEqual(parse_range('bytes=90-200', 100), (90, 99))
+        self.assertIsNone(parse_range('bytes=0-1,5-6', 100))
+        self.assertIsNone(parse_range(None, 100))
+        with self.assertRaises(ValueError):
+            parse_range('bytes=100-', 100)
@@ -0,0 +1,148 @@
+# shop/tests/test_throttling.py
+"""Tests for token-bucket throttling."""
+import os
+import shutil
+import tempfile
+import threading
+import time
+from decimal import Decimal
+from unittest.mock import Mock, patch
+from django.contrib.auth.models import User
+from asgiref.sync import iscoroutinefunction
+from django.test import TestCase, SimpleTestCase, override_settings
+
+from ..models import Bike, BikeType
+from .. import throttling
+from ..middleware import ThrottleMiddleware
+from ..throttling import BucketTable, Rate
+
+RULES = {
+    'register': {'ip': '2/m', 'methods': ['POST']},
+    'shop:create_order': {'user': '2/h'},
+}
+
+
+class BucketTableTests(SimpleTestCase):
+    """Tests for Rate parsing and the shared bucket table."""
+
+    def setUp(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        self.path = os.path.join(directory, 'throttle.bin')
+        self.table = BucketTable(self.path, slots=64)
+
+    def test_rate_parse(self):
+        """Швидкість 'N/період' задає місткість і поповнення за секунду"""
+        self.assertEqual(Rate.parse('5/m'), Rate(5, 5 / 60))
+        self.assertEqual(Rate.parse('10/2s'), Rate(10, 5.0))
+        self.assertEqual(Rate.parse('100/day'), Rate(100, 100 / 86400))
+        with self.assertRaises(ValueError):
+            Rate.parse('often')
+
+    def test_bucket_refills(self):
+        """Після вичерпання бакета запит чекає, доки поповниться токен"""
+        rate = Rate.parse('2/m')
+        self.assertEqual(self.table.consume('k', rate, now=1000.0), 0)
+        self.assertEqual(self.table.consume('k', rate, now=1000.0), 0)
+        self.assertAlmostEqual(self.table.consume('k', rate, now=1000.0), 30.0)
+        self.assertAlmostEqual(self.table.consume('k', rate, now=1015.0), 15.0)
+        self.assertEqual(self.table.consume('k', rate, now=1030.0), 0)
+
+    def test_keys_are_independent(self):
+        """Різні ключі мають окремі бакети"""
+        rate = Rate.parse('1/h')
+        self.assertEqual(self.table.consume('a', rate, now=0.0), 0)
+        self.assertGreater(self.table.consume('a', rate, now=0.0), 0)
+        self.assertEqual(self.table.consume('b', rate, now=0.0), 0)
+
+    def test_state_shared_between_tables(self):
+        """Інший відкритий екземпляр (як інший воркер) бачить той самий стан"""
+        rate = Rate.parse('1/h')
+        self.table.consume('shared', rate, now=0.0)
+        other = BucketTable(self.path, slots=64)
+        self.assertGreater(other.consume('shared', rate, now=1.0), 0)
+
+    def test_threads_do_not_over_admit(self):
+        """Потоки одного процесу не отримують більше токенів, ніж є в бакеті"""
+        unpack_from = throttling.SLOT.unpack_from
+
+        def slow_unpack(buffer, offset):
+            # Розширює вікно між читанням і записом слота, щоб гонка проявилася
+            time.sleep(0.0005)
+            return unpack_from(buffer, offset)
+
+        rate = Rate.parse('50/h')
+        admitted = []
+        with patch.object(throttling, 'SLOT', Mock(size=throttling.SLOT.size, unpack_from=slow_unpack,
+                                                   pack_into=throttling.SLOT.pack_into)):
+            def worker():
+                for _ in range(20):
+                    admitted.append(self.table.consume('burst', rate, now=0.0) == 0)
+            threads = [threading.Thread(target=worker) for _ in range(8)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+        self.assertEqual(sum(admitted), 50)
+
+
+@override_settings(SHOP_THROTTLE_RULES=RULES)
+class ThrottleMiddlewareTests(TestCase):
+    """Tests for ThrottleMiddleware on real routes."""
+
+    def setUp(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        settings = override_settings(SHOP_THROTTLE_TABLE=os.path.join(directory, 'throttle.bin'))
+        settings.enable()
+        self.addCleanup(settings.disable)
+
+    def test_register_post_throttled_by_ip(self):
+        """Третій POST реєстрації за хвилину з однієї IP отримує 429 з Retry-After"""
+        for _ in range(2):
+            self.assertEqual(self.client.post('/register/', {}).status_code, 200)
+        response = self.client.post('/register/', {})
+        self.assertEqual(response.status_code, 429)
+        self.assertTrue(1 <= int(response['Retry-After']) <= 30)
+        # GET не обмежується
+        self.assertEqual(self.client.get('/register/').status_code, 200)
+        # Інша IP має власний бакет
+        self.assertEqual(self.client.post('/register/', {}, REMOTE_ADDR='10.0.0.2').status_code, 200)
+
+    def test_create_order_throttled_per_user(self):
+        """Бакет create_order окремий для кожного користувача"""
+        bike_type = BikeType.objects.create(name="road", description="")
+        bike = Bike.objects.create(name="Bike", bike_type=bike_type, price=Decimal('100.00'),
+                                   description="", image="test.jpg")
+        url = f'/bikes/{bike.pk}/order/'
+        self.client.force_login(User.objects.create_user(username='first', password='12345'))
+        for _ in range(2):
+            self.assertEqual(self.client.get(url).status_code, 200)
+        self.assertEqual(self.client.get(url).status_code, 429)
+        # Непідпорядковані правилам маршрути працюють
+        self.assertEqual(self.client.get('/bikes/').status_code, 200)
+
+        self.client.force_login(User.objects.create_user(username='second', password='12345'))
+        self.assertEqual(self.client.get(url).status_code, 200)
+
+    def test_async_process_view(self):
+        """В ASGI process_view — корутина, тож Django не обгортає її в sync_to_async"""
+        async def get_response(request):
+            pass
+        self.assertTrue(iscoroutinefunction(ThrottleMiddleware(get_response).process_view))
+        self.assertFalse(iscoroutinefunction(ThrottleMiddleware(lambda request: None).process_view))
+
+    async def test_async_client_throttled(self):
+        """Через ASGI бакети IP і користувача працюють так само"""
+        for _ in range(2):
+            self.assertEqual((await self.async_client.post('/register/', {})).status_code, 200)
+        self.assertEqual((await self.async_client.post('/register/', {})).status_code, 429)
+
+        bike_type = await BikeType.objects.acreate(name="road", description="")
+        bike = await Bike.objects.acreate(name="Bike", bike_type=bike_type, price=Decimal('100.00'),
+                                          description="", image="test.jpg")
+        url = f'/bikes/{bike.pk}/order/'
+        await self.async_client.aforce_login(await User.objects.acreate(username='async'))
+        for _ in range(2):
+            self.assertEqual((await self.async_client.get(url)).status_code, 200)
+        self.assertEqual((await self.async_client.get(url)).status_code, 429)
@@ -0,0 +1,153 @@
+# shop/tests/test_tracing.py
+"""Tests for request tracing."""
+import json
+import logging
+import os
+import tempfile
+from decimal import Decimal
+from unittest.mock import patch
+
+from django.contrib.auth.models import User
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from .. import tracing
+from ..models import Bike, BikeType, Order
+from ..patterns import CreditCardPayment, PaymentContext
+from ..tracing import NOOP_SPAN, OtlpHttpExporter, start_span, traced
+
+
+class TracingTests(TestCase):
+    """Tests for spans, sampling and export."""
+
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.path = os.path.join(tmp.name, 'traces.jsonl')
+        self.trace(1)
+
+    def trace(self, sample_rate):
+        settings = override_settings(SHOP_TRACE_SAMPLE_RATE=sample_rate, SHOP_TRACE_EXPORTER='jsonl',
+                                     SHOP_TRACE_FILE=self.path)
+        settings.enable()
+        self.addCleanup(settings.disable)
+
+    def spans(self):
+        if not os.path.exists(self.path):
+            return []
+        with open(self.path, encoding='utf-8') as f:
+            return [json.loads(line) for line in f]
+
+    def test_disabled_returns_shared_noop(self):
+        """З нульовою часткою спани — спільний NOOP_SPAN, файл не створюється"""
+        self.trace(0)
+        with start_span('outer', {'a': 1}) as span:
+            span.set_attribute('b', 2)
+            self.assertIs(span, NOOP_SPAN)
+        self.assertFalse(span.recording)
+        self.assertFalse(os.path.exists(self.path))
+
+    def test_sampled_out_children_are_noop(self):
+        """Вкладені спани трасування поза вибіркою не записуються"""
+        with start_span('root', traceparent='00-' + 'a' * 32 + '-' + 'b' * 16 + '-00') as root:
+            self.assertIs(root, NOOP_SPAN)
+            self.assertIs(start_span('child'), NOOP_SPAN)
+        self.assertEqual(self.spans(), [])
+
+    def test_nested_spans_exported_with_parents(self):
+        """Трасування експортується після кореневого спана з посиланнями на батьків"""
+        @traced('work')
+        def work():
+            with start_span('inner', {'n': 3}):
+                pass
+
+        with start_span('root') as root:
+            work()
+            self.assertEqual(self.spans(), [])
+
+        spans = {span['name']: span for span in self.spans()}
+        self.assertEqual(set(spans), {'root', 'inner', 'work'})
+        self.assertEqual({span['trace_id'] for span in spans.values()}, {root.trace_id})
+        self.assertIsNone(spans['root']['parent_id'])
+        self.assertEqual(spans['work']['parent_id'], spans['root']['span_id'])
+        self.assertEqual(spans['inner']['parent_id'], spans['work']['span_id'])
+        self.assertEqual(spans['inner']['attributes'], {'n': 3})
+
+    def test_exception_marks_span(self):
+        """Виняток у спані позначає його помилкою і не поглинається"""
+        with self.assertRaises(ValueError):
+            with start_span('root'):
+                raise ValueError("збій")
+        span, = self.spans()
+        self.assertEqual(span['status'], 'error')
+        self.assertEqual(span['attributes'], {'exception.type': 'ValueError', 'exception.message': 'збій'})
+
+    def test_traceparent_continues_trace(self):
+        """Вхідний traceparent задає trace_id і батька кореневого спана"""
+        with start_span('root', traceparent='00-' + 'a' * 32 + '-' + 'b' * 16 + '-01') as root:
+            self.assertEqual(root.traceparent(), f"00-{'a' * 32}-{root.span_id}-01")
+        span, = self.spans()
+        self.assertEqual((span['trace_id'], span['parent_id']), ('a' * 32, 'b' * 16))
+
+    def test_otlp_payload(self):
+        """Спани перетворюються на OTLP/HTTP JSON"""
+        tracer = tracing.Tracer(1.0, exporter=None)
+        exported = []
+        tracer.exporter = type('Exporter', (), {'export': staticmethod(exported.extend)})()
+        with tracer.start_span('root', {'ok': True, 'n': 2, 'amount': Decimal('1.50')}):
+            with tracer.start_span('child'):
+                pass
+
+        payload = OtlpHttpExporter.payload(type('Stub', (), {'service_name': 'bikeshop'})(), exported)
+        resource, = payload['resourceSpans']
+        child, root = resource['scopeSpans'][0]['spans']
+        self.assertEqual(resource['resource']['attributes'][0]['value'], {'stringValue': 'bikeshop'})
+        self.assertEqual(child['parentSpanId'], root['spanId'])
+        self.assertNotIn('parentSpanId', root)
+        self.assertEqual(root['attributes'], [
+            {'key': 'ok', 'value': {'boolValue': True}},
+            {'key': 'n', 'value': {'intValue': '2'}},
+            {'key': 'amount', 'value': {'stringValue': '1.50'}},
+        ])
+
+    def test_payment_span(self):
+        """Оплата записує стратегію і результат"""
+        with start_span('root'):
+            PaymentContext(CreditCardPayment()).execute_payment(Decimal('10.00'))
+        payment = next(span for span in self.spans() if span['name'] == 'payment.execute')
+        self.assertEqual(payment['attributes']['payment.strategy'], 'CreditCardPayment')
+        self.assertIs(payment['attributes']['payment.success'], True)
+
+    def test_request_traced_by_middleware(self):
+        """Запит оформлення замовлення — кореневий спан з вкладеними етапами"""
+        user = User.objects.create_user(username='buyer', password='12345')
+        bike_type = BikeType.objects.create(name="road", description="")
+        bike = Bike.objects.create(name="Bike", bike_type=bike_type, price=Decimal('100.00'),
+                                   description="", image="test.jpg")
+        self.client.force_login(user)
+        response = self.client.post(reverse('shop:create_order', args=[bike.pk]),
+                                    {'action': 'confirm_order', 'payment': 'credit'})
+        self.assertEqual(response.status_code, 302)
+
+        spans = self.spans()
+        root, = [span for span in spans if span['name'] == 'http.request']
+        self.assertEqual(root['attributes']['http.route'], 'shop:create_order')
+        self.assertEqual(root['attributes']['http.status_code'], 302)
+        self.assertEqual(root['attributes']['user.id'], user.pk)
+        children = {span['name'] for span in spans if span['parent_id'] == root['span_id']}
+        self.assertEqual(children, {'pricing.apply', 'payment.execute'})
+
+    def test_discount_logs_are_lazy(self):
+        """Без рівня DEBUG замовлення не форматується в рядок логу"""
+        from ..patterns import apply_discount
+
+        user = User.objects.create_user(username='buyer', password='12345')
+        Order.objects.create(user=user, total=Decimal('0'))
+        request = type('Request', (), {'user': user})()
+        logger = logging.getLogger('shop.patterns.decorator')
+        level = logger.level
+        logger.setLevel(logging.INFO)
+        self.addCleanup(logger.setLevel, level)
+        with patch.object(Order, '__str__', return_value='order') as order_str:
+            self.assertTrue(apply_discount(10)(lambda request: True)(request))
+        order_str.assert_not_called()
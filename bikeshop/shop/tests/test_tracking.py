@@ -0,0 +1,144 @@
+# shop/tests/test_tracking.py
+"""Tests for carrier manifest ingestion."""
+import csv
+import gzip
+import io
+import json
+import os
+import tempfile
+from decimal import Decimal
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from .. import tracking
+from ..models import Bike, BikeType, Order, OrderItem, OrderStatusTransition, SalesRollup
+from ..patterns.state import history, machine
+
+
+class TrackingIngestTests(TestCase):
+    """Tests for parsing, matching and applying manifest lines."""
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='buyer', password='12345')
+        bike_type = BikeType.objects.create(name="road", description="")
+        self.bike = Bike.objects.create(
+            name="Bike", bike_type=bike_type, price=Decimal('100.00'), description="", image="test.jpg"
+        )
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+
+    def make_order(self, status='new', tracking_number=None):
+        order = Order.objects.create(user=self.user, status=status, tracking_number=tracking_number,
+                                     total=Decimal('100.00'))
+        OrderItem.objects.create(order=order, bike=self.bike, price=Decimal('100.00'))
+        order.completed = True
+        order.save()
+        return order
+
+    def ingest_csv(self, rows, **kwargs):
+        f = io.StringIO()
+        writer = csv.DictWriter(f, fieldnames=('order_id', 'tracking_number', 'status'))
+        writer.writeheader()
+        writer.writerows(rows)
+        f.seek(0)
+        return tracking.ingest(tracking.read_records(f, 'csv'), **kwargs)
+
+    def test_path(self):
+        """Автомат знаходить найкоротший ланцюжок переходів"""
+        self.assertEqual(machine.path('new', 'delivered'), ('shipped', 'delivered'))
+        self.assertEqual(machine.path('processing', 'processing'), ())
+        self.assertIsNone(machine.path('canceled', 'shipped'))
+
+    def test_parse_record(self):
+        """Статуси перевізника нормалізуються, некоректні рядки відхиляються"""
+        line = tracking.parse_record(3, {'order_id': '7', 'tracking_number': ' UA1 ', 'status': 'In_Transit'})
+        self.assertEqual(line, tracking.ManifestLine(3, 7, 'UA1', 'shipped'))
+        for record in (None, {'status': 'shipped'}, {'order_id': 'x'}, {'order_id': 1, 'status': 'lost'}):
+            with self.assertRaises(ValueError):
+                tracking.parse_record(1, record)
+
+    def test_ingest_by_id_and_tracking_number(self):
+        """Рядки зіставляються за id або номером, статуси йдуть через автомат"""
+        first = self.make_order()
+        second = self.make_order(status='shipped', tracking_number='UA200')
+        canceled = self.make_order(status='canceled')
+        problems = []
+
+        report = self.ingest_csv([
+            {'order_id': first.pk, 'tracking_number': 'UA100', 'status': 'in_transit'},
+            {'tracking_number': 'UA200', 'status': 'delivered'},
+            {'order_id': 999999, 'tracking_number': 'UA999'},
+            {'order_id': canceled.pk, 'status': 'delivered'},
+            {'order_id': 'abc'},
+        ], chunk_size=2, on_problem=lambda number, record, reason: problems.append((number, reason)))
+
+        first.refresh_from_db()
+        self.assertEqual((first.tracking_number, first.status), ('UA100', 'shipped'))
+        self.assertEqual(Order.objects.get(pk=second.pk).status, 'delivered')
+        self.assertEqual(Order.objects.get(pk=canceled.pk).status, 'canceled')
+        self.assertEqual(
+            (report.lines, report.matched, report.tracking_updated, report.unmatched, report.invalid, report.rejected),
+            (5, 3, 1, 1, 1, 1),
+        )
+        self.assertEqual(report.transitions, {'shipped': 1, 'delivered': 1})
+        self.assertEqual([number for number, _ in problems], [4, 5, 6])
+        self.assertEqual(problems[0][1], tracking.NOT_FOUND)
+        self.assertEqual(SalesRollup.objects.get(status='delivered').units, 1)
+
+    def test_delivery_walks_intermediate_statuses(self):
+        """Доставка невідправленого замовлення проходить через shipped і пишеться в журнал"""
+        order = self.make_order()
+        self.ingest_csv([{'order_id': order.pk, 'tracking_number': 'UA1', 'status': 'delivered'}])
+        self.assertEqual([(source, target) for _, source, target, _ in history(order.pk)],
+                         [('new', 'shipped'), ('shipped', 'delivered')])
+
+    def test_last_line_wins_and_repeat_is_noop(self):
+        """Повторне завантаження того самого маніфесту нічого не змінює"""
+        order = self.make_order()
+        rows = [
+            {'order_id': order.pk, 'tracking_number': 'UA1', 'status': 'shipped'},
+            {'order_id': order.pk, 'tracking_number': 'UA2', 'status': 'delivered'},
+        ]
+        self.ingest_csv(rows)
+        report = self.ingest_csv(rows)
+        order.refresh_from_db()
+        self.assertEqual((order.tracking_number, order.status), ('UA2', 'delivered'))
+        self.assertEqual((report.tracking_updated, report.transitions), (0, {}))
+        self.assertEqual(OrderStatusTransition.objects.count(), 2)
+
+    def test_query_count_is_constant(self):
+        """Кількість запитів на пачку не залежить від кількості рядків"""
+        def count(orders):
+            Order.objects.all().delete()
+            rows = [{'order_id': self.make_order().pk, 'tracking_number': f'UA{i}', 'status': 'shipped'}
+                    for i in range(orders)]
+            with CaptureQueriesContext(connection) as ctx:
+                self.ingest_csv(rows)
+            return len(ctx)
+
+        count(1)  # створює бакети зведень
+        self.assertEqual(count(2), count(40))
+
+    def test_command_gzip_jsonl(self):
+        """Команда читає стиснений JSONL і пише незіставлені рядки в CSV"""
+        order = self.make_order()
+        manifest = os.path.join(self.tmp.name, 'manifest.jsonl.gz')
+        with gzip.open(manifest, 'wt', encoding='utf-8') as f:
+            f.write(json.dumps({'order_id': order.pk, 'tracking_number': 'UA1', 'status': 'shipped'}) + '\n')
+            f.write('\n{not json}\n')
+            f.write(json.dumps({'tracking_number': 'UA404'}) + '\n')
+        unmatched = os.path.join(self.tmp.name, 'unmatched.csv')
+
+        out = io.StringIO()
+        call_command('ingest_tracking', manifest, '--unmatched', unmatched, stdout=out)
+
+        self.assertIn("зіставлено 1", out.getvalue())
+        self.assertIn("Не знайдено замовлення: 1, некоректних: 1", out.getvalue())
+        self.assertEqual(Order.objects.get(pk=order.pk).status, 'shipped')
+        with open(unmatched, encoding='utf-8') as f:
+            rows = list(csv.DictReader(f))
+        self.assertEqual([(row['line'], row['tracking_number']) for row in rows], [('3', ''), ('4', 'UA404')])
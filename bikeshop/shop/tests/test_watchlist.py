@@ -0,0 +1,153 @@
+# shop/tests/test_watchlist.py
+"""Tests for the watchlist queue and digest notifier."""
+import io
+from decimal import Decimal
+
+from django.contrib.auth.models import User
+from django.core import mail
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from ..models import Bike, BikeType, WatchlistEntry, WatchlistEvent
+from ..repricing import PriceChangeSpec, reprice_catalog
+from ..watchlist import iter_watchers, notify_watchers
+
+
+class WatchlistTests(TestCase):
+    """Tests for recording changes and sending digests."""
+
+    def setUp(self):
+        self.bike_type = BikeType.objects.create(name="road", description="")
+        self.bikes = [
+            Bike.objects.create(name=f"Bike {i}", bike_type=self.bike_type, price=Decimal('100.00'),
+                                description="", image="test.jpg", in_stock=i != 1)
+            for i in range(3)
+        ]
+        self.users = [User.objects.create_user(username=f'user{i}', email=f'user{i}@example.com', password='12345')
+                      for i in range(2)]
+
+    def watch(self, user, *bikes):
+        WatchlistEntry.objects.bulk_create(WatchlistEntry(user=user, bike=bike) for bike in bikes)
+
+    def test_save_records_changes(self):
+        """Збереження з новою ціною чи поверненням у наявність додає події"""
+        self.watch(self.users[0], self.bikes[1])
+        bike = Bike.objects.get(pk=self.bikes[1].pk)
+        bike.price = Decimal('90.00')
+        bike.in_stock = True
+        bike.save()
+        bike.save()
+
+        self.assertEqual(
+            sorted(WatchlistEvent.objects.values_list('bike_id', 'kind', 'old_price')),
+            [(bike.pk, 'price', Decimal('100.00')), (bike.pk, 'restock', None)],
+        )
+
+    def test_unwatched_bikes_not_queued(self):
+        """Зміни велосипедів, за якими ніхто не стежить, у чергу не потрапляють"""
+        bike = Bike.objects.get(pk=self.bikes[1].pk)
+        bike.price = Decimal('90.00')
+        bike.in_stock = True
+        bike.save()
+        self.assertFalse(WatchlistEvent.objects.exists())
+
+    def test_admin_restock_queues_events(self):
+        """Дія адмінки «Повернути в наявність» додає події для велосипедів, за якими стежать"""
+        admin = User.objects.create_superuser(username='admin', password='12345', email='a@example.com')
+        self.client.force_login(admin)
+        Bike.objects.update(in_stock=False)
+        self.watch(self.users[0], self.bikes[0], self.bikes[1])
+        selected = [str(bike.pk) for bike in self.bikes]
+
+        self.client.post('/admin/shop/bike/', {'action': 'restock', '_selected_action': selected})
+        self.client.post('/admin/shop/bike/', {'action': 'restock', '_selected_action': selected})
+
+        self.assertEqual(sorted(WatchlistEvent.objects.values_list('bike_id', 'kind')),
+                         [(self.bikes[0].pk, 'restock'), (self.bikes[1].pk, 'restock')])
+        notify_watchers()
+        self.assertIn("Bike 0: знову в наявності", mail.outbox[0].body)
+
+    def test_one_digest_per_user(self):
+        """Користувач отримує один лист з усіма здешевленими і поверненими велосипедами"""
+        cheaper, restocked, pricier = self.bikes[0], self.bikes[1], self.bikes[2]
+        self.watch(self.users[0], cheaper, restocked, pricier)
+        self.watch(self.users[1], pricier)
+        for bike, changes in ((cheaper, {'price': Decimal('80.00')}), (restocked, {'in_stock': True}),
+                              (pricier, {'price': Decimal('120.00')})):
+            bike = Bike.objects.get(pk=bike.pk)
+            for name, value in changes.items():
+                setattr(bike, name, value)
+            bike.save()
+
+        report = notify_watchers()
+
+        self.assertEqual((report.events, report.bikes, report.digests, report.sent), (3, 2, 1, 1))
+        message, = mail.outbox
+        self.assertEqual(message.to, ['user0@example.com'])
+        self.assertIn("Bike 0: 100.00 → 80.00 грн", message.body)
+        self.assertIn("Bike 1: знову в наявності", message.body)
+        self.assertNotIn("Bike 2", message.body)
+        self.assertFalse(WatchlistEvent.objects.exists())
+        self.assertEqual(notify_watchers().sent, 0)
+
+    def test_reprice_records_only_watched_bikes(self):
+        """Масова зміна цін ставить у чергу лише велосипеди, за якими стежать"""
+        self.watch(self.users[0], self.bikes[0])
+        reprice_catalog(PriceChangeSpec(percent_by_type={'road': Decimal('-10')}))
+
+        self.assertEqual(list(WatchlistEvent.objects.values_list('bike_id', 'old_price')),
+                         [(self.bikes[0].pk, Decimal('100.00'))])
+        notify_watchers()
+        self.assertIn("Bike 0: 100.00 → 90.00 грн", mail.outbox[0].body)
+
+    def test_batches_over_one_connection(self):
+        """Листи надсилаються пачками через одне з'єднання"""
+        users = [User.objects.create_user(username=f'fan{i}', email=f'fan{i}@example.com') for i in range(5)]
+        for user in users:
+            self.watch(user, self.bikes[0], self.bikes[2])
+        Bike.objects.filter(pk=self.bikes[0].pk).update(price=Decimal('50.00'))
+        WatchlistEvent.objects.create(bike=self.bikes[0], kind='price', old_price=Decimal('100.00'))
+
+        backend = mail.get_connection()
+        batches, send_messages = [], backend.send_messages
+        backend.send_messages = lambda messages: batches.append(len(messages)) or send_messages(messages)
+        report = notify_watchers(page_size=3, mail_batch=2, mail_connection=backend)
+
+        self.assertEqual(batches, [2, 2, 1])
+        self.assertEqual((report.digests, report.entries), (5, 5))
+        self.assertEqual(sorted(m.to[0] for m in mail.outbox), sorted(user.email for user in users))
+
+    def test_watchers_query_uses_index(self):
+        """Сторінка записів читається по індексу (user, bike) без сортування"""
+        if connection.vendor != 'sqlite':
+            self.skipTest("План запиту перевіряється лише на SQLite")
+        self.watch(self.users[0], *self.bikes)
+        WatchlistEvent.objects.create(bike=self.bikes[0], kind='restock')
+        with CaptureQueriesContext(connection) as ctx:
+            next(iter_watchers(10 ** 9, page_size=2))
+        query, = ctx.captured_queries
+        with connection.cursor() as cursor:
+            cursor.execute('EXPLAIN QUERY PLAN ' + query['sql'])
+            plan = ' '.join(str(row) for row in cursor.fetchall())
+        self.assertIn('INDEX', plan)
+        self.assertNotIn('TEMP B-TREE', plan)
+
+    def test_watch_view(self):
+        """Користувач додає і прибирає велосипед зі списку бажань"""
+        self.client.force_login(self.users[0])
+        url = reverse('shop:bike_watch', args=[self.bikes[0].pk])
+        self.assertEqual(self.client.post(url).json(), {'bike_id': self.bikes[0].pk, 'watching': True})
+        self.client.post(url)
+        self.assertEqual(self.users[0].watchlist.count(), 1)
+        self.assertEqual(self.client.post(url, {'action': 'unwatch'}).json()['watching'], False)
+        self.assertFalse(self.users[0].watchlist.exists())
+        self.assertEqual(self.client.post(reverse('shop:bike_watch', args=[999999])).status_code, 404)
+
+    def test_command(self):
+        """Команда звітує про надіслані листи"""
+        out = io.StringIO()
+        call_command('notify_watchers', stdout=out)
+        self.assertIn("Надіслано листів: 0", out.getvalue())
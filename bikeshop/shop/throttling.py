@@ -0,0 +1,181 @@
+"""
+Обмеження частоти запитів токен-бакетами на користувача та на IP.
+
+Правила задаються в ``SHOP_THROTTLE_RULES`` за іменем маршруту::
+
+    SHOP_THROTTLE_RULES = {
+        'register': {'ip': '5/m', 'methods': ['POST']},
+        'shop:create_order': {'user': '30/m', 'ip': '120/m'},
+    }
+
+Швидкість ``N/період`` (``s``, ``m``, ``h``, ``d``) означає бакет місткістю N
+токенів, що поповнюється на N за період. Кожен запит забирає один токен
+з кожного бакета правила; якщо хоча б у одному токенів немає, відповідь —
+429 з ``Retry-After``.
+
+Стан бакетів лежить у спільній для воркерів хоста таблиці в пам'яті —
+файлі ``SHOP_THROTTLE_TABLE``, відображеному через mmap. Кожен слот займає
+32 байти, доступ до нього захищено блокуванням діапазону байтів (fcntl)
+між процесами і ``threading.Lock`` між потоками воркера (блокування fcntl
+належать процесу і потоки одного процесу не розділяють), тож перевірка
+коштує кілька мікросекунд. Файловий кеш Django для цього
+не підходить: кожен ``set`` у ньому обходить увесь каталог кешу.
+"""
+
+import hashlib
+import math
+import mmap
+import os
+import re
+import struct
+import threading
+import time
+from dataclasses import dataclass
+from typing import Dict, Optional
+
+try:
+    import fcntl
+except ImportError:  # Windows: без блокувань, можливі поодинокі гонки
+    fcntl = None
+
+RATE_RE = re.compile(r'^\s*(\d+)\s*/\s*(\d*)\s*([smhd])\w*\s*$')
+PERIODS = {'s': 1, 'm': 60, 'h': 3600, 'd': 86400}
+
+# Слот: хеш ключа, токени, час останнього оновлення, час повного поповнення
+SLOT = struct.Struct('<Qddd')
+PROBE = 4
+DEFAULT_SLOTS = 65536
+
+
+@dataclass(frozen=True)
+class Rate:
+    """Місткість бакета і швидкість поповнення (токенів за секунду)."""
+    capacity: int
+    per_second: float
+
+    @classmethod
+    def parse(cls, value: str) -> 'Rate':
+        match = RATE_RE.match(value)
+        if not match:
+            raise ValueError(f"Некоректна швидкість {value!r}, очікується 'N/s|m|h|d'")
+        count, multiplier, unit = match.groups()
+        period = PERIODS[unit] * int(multiplier or 1)
+        return cls(int(count), int(count) / period)
+
+
+class BucketTable:
+    """
+    Таблиця токен-бакетів у спільному mmap-файлі з відкритою адресацією:
+    ключ потрапляє в один із ``PROBE`` сусідніх слотів; якщо всі зайняті
+    іншими ключами, перезаписується слот, що поповнився найраніше.
+    """
+
+    def __init__(self, path: str, slots: int = DEFAULT_SLOTS):
+        self.path = path
+        self.slots = slots
+        size = slots * SLOT.size
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        self.fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o600)
+        if os.fstat(self.fd).st_size < size:
+            os.ftruncate(self.fd, size)
+        self.map = mmap.mmap(self.fd, size)
+        # fcntl.lockf блокує для процесу: потоки ASGI чи gthread-воркера впорядковує цей лок
+        self.lock = threading.Lock()
+
+    @staticmethod
+    def key_hash(key: str) -> int:
+        # hash() рандомізований у кожному процесі, тож потрібен стабільний хеш
+        return int.from_bytes(hashlib.blake2b(key.encode(), digest_size=8).digest(), 'little') or 1
+
+    def consume(self, key: str, rate: Rate, now: Optional[float] = None) -> float:
+        """
+        Забирає токен з бакета ключа. Повертає 0, якщо запит дозволено,
+        інакше — скільки секунд чекати до появи токена.
+        """
+        now = time.time() if now is None else now
+        key_hash = self.key_hash(key)
+        first = key_hash % (self.slots - PROBE + 1)
+        offset = first * SLOT.size
+        length = PROBE * SLOT.size
+        with self.lock:
+            return self._consume(key_hash, rate, now, offset, length)
+
+    def _consume(self, key_hash: int, rate: Rate, now: float, offset: int, length: int) -> float:
+        if fcntl:
+            fcntl.lockf(self.fd, fcntl.LOCK_EX, length, offset)
+        try:
+            target, tokens, updated = None, float(rate.capacity), now
+            oldest_offset, oldest_full_at = offset, math.inf
+            for slot_offset in range(offset, offset + length, SLOT.size):
+                slot_hash, slot_tokens, slot_updated, full_at = SLOT.unpack_from(self.map, slot_offset)
+                if slot_hash == key_hash:
+                    target, tokens, updated = slot_offset, slot_tokens, slot_updated
+                    break
+                if full_at < oldest_full_at:
+                    oldest_offset, oldest_full_at = slot_offset, full_at
+            if target is None:
+                target = oldest_offset
+
+            tokens = min(float(rate.capacity), tokens + max(now - updated, 0.0) * rate.per_second)
+            if tokens < 1.0:
+                wait = (1.0 - tokens) / rate.per_second
+            else:
+                tokens -= 1.0
+                wait = 0.0
+            full_at = now + (rate.capacity - tokens) / rate.per_second
+            SLOT.pack_into(self.map, target, key_hash, tokens, now, full_at)
+            return wait
+        finally:
+            if fcntl:
+                fcntl.lockf(self.fd, fcntl.LOCK_UN, length, offset)
+
+
+_tables: Dict[str, BucketTable] = {}
+_tables_lock = threading.Lock()
+
+
+def get_table(path: str, slots: int = DEFAULT_SLOTS) -> BucketTable:
+    """Таблиця для файлу; відкривається один раз на процес."""
+    table = _tables.get(path)
+    if table is None:
+        with _tables_lock:
+            table = _tables.get(path)
+            if table is None:
+                table = _tables[path] = BucketTable(path, slots)
+    return table
+
+
+@dataclass(frozen=True)
+class ThrottleRule:
+    """Правило для маршруту: швидкості за користувачем та IP і методи HTTP."""
+    user: Optional[Rate] = None
+    ip: Optional[Rate] = None
+    methods: Optional[frozenset] = None
+
+    @classmethod
+    def from_setting(cls, value: dict) -> 'ThrottleRule':
+        methods = value.get('methods')
+        return cls(
+            user=Rate.parse(value['user']) if value.get('user') else None,
+            ip=Rate.parse(value['ip']) if value.get('ip') else None,
+            methods=frozenset(method.upper() for method in methods) if methods else None,
+        )
+
+
+def check(table: BucketTable, view_name: str, rule: ThrottleRule, request) -> float:
+    """Перевіряє бакети правила для запиту; повертає час очікування (0 — дозволено)."""
+    return _check(table, view_name, rule, request, request.user if rule.user else None)
+
+
+async def acheck(table: BucketTable, view_name: str, rule: ThrottleRule, request) -> float:
+    """Як :func:`check`, але користувач читається через ``request.auser()``."""
+    return _check(table, view_name, rule, request, await request.auser() if rule.user else None)
+
+
+def _check(table: BucketTable, view_name: str, rule: ThrottleRule, request, user) -> float:
+    wait = 0.0
+    if rule.ip:
+        wait = table.consume(f'ip:{view_name}:{request.META.get("REMOTE_ADDR", "")}', rule.ip)
+    if user is not None and user.is_authenticated:
+        wait = max(wait, table.consume(f'user:{view_name}:{user.pk}', rule.user))
+    return wait
@@ -0,0 +1,361 @@
+"""
+Легке трасування запитів: спани з атрибутами і семплюванням на вході.
+
+    with tracing.start_span('pricing.apply', {'order.id': order.pk}) as span:
+        ...
+        span.set_attribute('pricing.changed', result.changed)
+
+    @tracing.traced('orders.send_confirmation')
+    def send_order_confirmation_email(order): ...
+
+Поточний спан зберігається в ``contextvars``, тож вкладені спани
+знаходять батька і в потоках, і в async-коді. Рішення «трасувати чи ні»
+ухвалюється один раз для кореневого спана (частка
+``SHOP_TRACE_SAMPLE_RATE`` або прапорець ``sampled`` із вхідного
+заголовка W3C ``traceparent``) і успадковується всіма вкладеними.
+
+Накладні витрати без трасування:
+
+* ``SHOP_TRACE_SAMPLE_RATE = 0`` — ``start_span`` одразу повертає спільний
+  ``NOOP_SPAN``, а ``TracingMiddleware`` вимикається (``MiddlewareNotUsed``);
+* запит не потрапив у вибірку — вкладені спани бачать у контексті
+  ``NOOP_SPAN`` і повертають його ж: без виділення пам'яті й годинника.
+
+Атрибути, які дорого обчислювати, варто додавати під ``if span.recording``.
+
+Завершені спани трасування експортуються разом після завершення
+кореневого: ``jsonl`` — рядок на спан у ``SHOP_TRACE_FILE``; ``otlp`` —
+OTLP/HTTP JSON на ``SHOP_TRACE_OTLP_ENDPOINT`` (локальний колектор
+OpenTelemetry) з фонового потоку, тож запит не чекає мережі.
+"""
+
+import json
+import logging
+import os
+import queue
+import random
+import re
+import threading
+import time
+import urllib.request
+from contextvars import ContextVar
+from functools import wraps
+from typing import Any, Callable, Dict, List, Optional
+
+from django.conf import settings
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+
+logger = logging.getLogger(__name__)
+
+TRACEPARENT_RE = re.compile(r'^00-([0-9a-f]{32})-([0-9a-f]{16})-([0-9a-f]{2})$')
+EXPORTERS = ('jsonl', 'otlp')
+DEFAULT_OTLP_ENDPOINT = 'http://127.0.0.1:4318/v1/traces'
+OTLP_QUEUE_SIZE = 1000
+OTLP_BATCH_SIZE = 512
+
+
+# ===== СПАНИ =====
+
+class NoopSpan:
+    """Спан поза вибіркою: усі операції нічого не роблять."""
+    __slots__ = ()
+    recording = False
+    trace_id = span_id = None
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        pass
+
+    def set_attributes(self, attributes: Dict[str, Any]) -> None:
+        pass
+
+    def record_exception(self, exc: BaseException) -> None:
+        pass
+
+    def traceparent(self) -> Optional[str]:
+        return None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        pass
+
+
+NOOP_SPAN = NoopSpan()
+_current: ContextVar[Optional[Any]] = ContextVar('shop_trace_span', default=None)
+
+
+class _SampledOutRoot(NoopSpan):
+    """Кореневий спан поза вибіркою: позначає контекст, щоб вкладені спани були NOOP_SPAN."""
+    __slots__ = ('_token',)
+
+    def __enter__(self):
+        self._token = _current.set(NOOP_SPAN)
+        return NOOP_SPAN
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        _current.reset(self._token)
+
+
+class Span:
+    """Записуваний спан; експортується разом з усім трасуванням після кореневого."""
+    __slots__ = ('tracer', 'name', 'trace_id', 'span_id', 'parent_id', 'attributes', 'status',
+                 'start_ns', 'end_ns', '_spans', '_root', '_token')
+    recording = True
+
+    def __init__(self, tracer: 'Tracer', name: str, trace_id: str, parent_id: Optional[str],
+                 spans: List['Span'], root: bool, attributes: Optional[Dict[str, Any]] = None):
+        self.tracer = tracer
+        self.name = name
+        self.trace_id = trace_id
+        self.span_id = '%016x' % random.getrandbits(64)
+        self.parent_id = parent_id
+        self.attributes = dict(attributes) if attributes else {}
+        self.status = 'ok'
+        self.start_ns = time.time_ns()
+        self.end_ns = None
+        self._spans = spans
+        self._root = root
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        self.attributes[key] = value
+
+    def set_attributes(self, attributes: Dict[str, Any]) -> None:
+        self.attributes.update(attributes)
+
+    def record_exception(self, exc: BaseException) -> None:
+        self.status = 'error'
+        self.attributes['exception.type'] = type(exc).__name__
+        self.attributes['exception.message'] = str(exc)
+
+    def traceparent(self) -> str:
+        """Заголовок W3C для передачі трасування далі."""
+        return f'00-{self.trace_id}-{self.span_id}-01'
+
+    def end(self) -> None:
+        self.end_ns = time.time_ns()
+        self._spans.append(self)
+        if self._root:
+            self.tracer.exporter.export(self._spans)
+
+    @property
+    def duration_ms(self) -> float:
+        return (self.end_ns - self.start_ns) / 1e6
+
+    def __enter__(self):
+        self._token = _current.set(self)
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        if exc is not None:
+            self.record_exception(exc)
+        self.end()
+        _current.reset(self._token)
+
+
+# ===== ЕКСПОРТ =====
+
+class JsonlExporter:
+    """Дописує спани трасування в JSONL-файл одним write (O_APPEND)."""
+
+    def __init__(self, path: str, service_name: str):
+        self.path = path
+        self.service_name = service_name
+        self.lock = threading.Lock()
+
+    def export(self, spans: List[Span]) -> None:
+        lines = ''.join(json.dumps({
+            'service': self.service_name,
+            'trace_id': span.trace_id,
+            'span_id': span.span_id,
+            'parent_id': span.parent_id,
+            'name': span.name,
+            'start_ns': span.start_ns,
+            'duration_ms': round(span.duration_ms, 3),
+            'status': span.status,
+            'attributes': span.attributes,
+        }, ensure_ascii=False, default=str) + '\n' for span in spans)
+        try:
+            with self.lock:
+                os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+                with open(self.path, 'a', encoding='utf-8') as f:
+                    f.write(lines)
+        except OSError:
+            logger.warning("Could not write spans to %s", self.path, exc_info=True)
+
+
+def _otlp_value(value: Any) -> dict:
+    if isinstance(value, bool):
+        return {'boolValue': value}
+    if isinstance(value, int):
+        return {'intValue': str(value)}
+    if isinstance(value, float):
+        return {'doubleValue': value}
+    return {'stringValue': str(value)}
+
+
+class OtlpHttpExporter:
+    """
+    Надсилає спани на OTLP/HTTP (JSON) колектор з фонового потоку. Черга
+    обмежена: якщо колектор не встигає, нові трасування відкидаються.
+    """
+
+    def __init__(self, endpoint: str, service_name: str, timeout: float = 2.0):
+        self.endpoint = endpoint
+        self.service_name = service_name
+        self.timeout = timeout
+        self.queue: 'queue.Queue[List[Span]]' = queue.Queue(maxsize=OTLP_QUEUE_SIZE)
+        self.dropped = 0
+        self.thread = threading.Thread(target=self._run, name='shop-otlp-exporter', daemon=True)
+        self.thread.start()
+
+    def export(self, spans: List[Span]) -> None:
+        try:
+            self.queue.put_nowait(spans)
+        except queue.Full:
+            self.dropped += 1
+
+    def payload(self, spans: List[Span]) -> dict:
+        return {'resourceSpans': [{
+            'resource': {'attributes': [{'key': 'service.name', 'value': {'stringValue': self.service_name}}]},
+            'scopeSpans': [{
+                'scope': {'name': __name__},
+                'spans': [{
+                    'traceId': span.trace_id,
+                    'spanId': span.span_id,
+                    **({'parentSpanId': span.parent_id} if span.parent_id else {}),
+                    'name': span.name,
+                    'kind': 2 if span._root else 1,  # SERVER / INTERNAL
+                    'startTimeUnixNano': str(span.start_ns),
+                    'endTimeUnixNano': str(span.end_ns),
+                    'attributes': [{'key': key, 'value': _otlp_value(value)}
+                                   for key, value in span.attributes.items()],
+                    'status': {'code': 2 if span.status == 'error' else 1},
+                } for span in spans],
+            }],
+        }]}
+
+    def send(self, spans: List[Span]) -> None:
+        request = urllib.request.Request(
+            self.endpoint, data=json.dumps(self.payload(spans), default=str).encode(),
+            headers={'Content-Type': 'application/json'}, method='POST',
+        )
+        with urllib.request.urlopen(request, timeout=self.timeout) as response:
+            response.read()
+
+    def _run(self) -> None:
+        while True:
+            batch = self.queue.get()
+            # Усе, що накопичилося, — одним запитом
+            while len(batch) < OTLP_BATCH_SIZE:
+                try:
+                    batch = batch + self.queue.get_nowait()
+                except queue.Empty:
+                    break
+            try:
+                self.send(batch)
+            except OSError:
+                logger.warning("Could not send %d spans to %s", len(batch), self.endpoint, exc_info=True)
+
+
+# ===== ТРАСУВАЛЬНИК =====
+
+class Tracer:
+    """Семплювання кореневих спанів і експортер."""
+
+    def __init__(self, sample_rate: float, exporter=None):
+        self.sample_rate = max(0.0, min(1.0, sample_rate))
+        self.exporter = exporter
+
+    def start_span(self, name: str, attributes: Optional[Dict[str, Any]] = None,
+                   traceparent: Optional[str] = None):
+        if not self.sample_rate:
+            return NOOP_SPAN
+        parent = _current.get()
+        if parent is NOOP_SPAN:
+            return NOOP_SPAN
+        if parent is not None:
+            return Span(self, name, parent.trace_id, parent.span_id, parent._spans, False, attributes)
+
+        # Кореневий спан: рішення вищого сервісу має пріоритет над власною часткою
+        remote = TRACEPARENT_RE.match(traceparent) if traceparent else None
+        if remote:
+            sampled = bool(int(remote.group(3), 16) & 1)
+        else:
+            sampled = self.sample_rate >= 1.0 or random.random() < self.sample_rate
+        if not sampled:
+            return _SampledOutRoot()
+        trace_id = remote.group(1) if remote else '%032x' % random.getrandbits(128)
+        return Span(self, name, trace_id, remote.group(2) if remote else None, [], True, attributes)
+
+
+_tracer: Optional[Tracer] = None
+_tracer_lock = threading.Lock()
+
+
+def _build_tracer() -> Tracer:
+    sample_rate = float(getattr(settings, 'SHOP_TRACE_SAMPLE_RATE', 0) or 0)
+    if not sample_rate:
+        return Tracer(0.0)
+    service_name = getattr(settings, 'SHOP_TRACE_SERVICE_NAME', 'bikeshop')
+    kind = getattr(settings, 'SHOP_TRACE_EXPORTER', 'jsonl')
+    if kind not in EXPORTERS:
+        raise ValueError(f"Невідомий експортер трасування: {kind}")
+    if kind == 'otlp':
+        exporter = OtlpHttpExporter(getattr(settings, 'SHOP_TRACE_OTLP_ENDPOINT', DEFAULT_OTLP_ENDPOINT),
+                                    service_name)
+    else:
+        exporter = JsonlExporter(str(settings.SHOP_TRACE_FILE), service_name)
+    return Tracer(sample_rate, exporter)
+
+
+def get_tracer() -> Tracer:
+    """Трасувальник процесу з налаштувань; створюється при першому зверненні."""
+    tracer = _tracer
+    if tracer is None:
+        with _tracer_lock:
+            tracer = _tracer
+            if tracer is None:
+                tracer = _set_tracer(_build_tracer())
+    return tracer
+
+
+def _set_tracer(tracer: Optional[Tracer]) -> Optional[Tracer]:
+    global _tracer
+    _tracer = tracer
+    return tracer
+
+
+@receiver(setting_changed, dispatch_uid='shop_tracing_settings')
+def _reset_tracer(setting: str, **kwargs) -> None:
+    if setting.startswith('SHOP_TRACE_'):
+        _set_tracer(None)
+
+
+def start_span(name: str, attributes: Optional[Dict[str, Any]] = None, traceparent: Optional[str] = None):
+    """Контекстний менеджер спана (``NOOP_SPAN``, якщо трасування поза вибіркою)."""
+    tracer = _tracer or get_tracer()
+    if not tracer.sample_rate:
+        return NOOP_SPAN
+    return tracer.start_span(name, attributes, traceparent)
+
+
+def current_span():
+    """Активний спан контексту або ``NOOP_SPAN``."""
+    return _current.get() or NOOP_SPAN
+
+
+def traced(name: Optional[str] = None) -> Callable:
+    """Декоратор: виклик функції — спан з іменем ``name`` (або модуль.функція)."""
+    def decorator(func):
+        span_name = name or f'{func.__module__}.{func.__qualname__}'
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            if _current.get() is NOOP_SPAN:
+                return func(*args, **kwargs)
+            with start_span(span_name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
@@ -0,0 +1,237 @@
+"""
+Завантаження щоденних маніфестів перевізника.
+
+Маніфест — CSV (із заголовком) або JSON Lines, за потреби стиснений gzip.
+Рядок містить ``order_id`` та/або ``tracking_number`` і необов'язковий
+``status`` — статус замовлення або статус перевізника з ``CARRIER_STATUSES``.
+
+Рядки читаються потоком і обробляються пачками по ``chunk_size``. На пачку:
+
+* два запити зіставлення — за первинним ключем і за ``tracking_number``
+  (індекс ``shop_order_tracking_idx``);
+* один executemany для нових номерів відстеження (shop/bulk.py);
+* зміни статусу через автомат ``patterns.state`` масовими переходами
+  (журнал і зведення продажів оновлюються як при ручній зміні). Якщо
+  перевізник повідомляє про доставку замовлення, яке ще не відправлене,
+  замовлення проходить проміжні статуси; недосяжний статус (наприклад,
+  для скасованого замовлення) — відхилений рядок.
+
+Рядки без відповідного замовлення, некоректні й відхилені не зупиняють
+завантаження: вони передаються в ``on_problem`` і рахуються у звіті.
+"""
+
+import csv
+import gzip
+import io
+import json
+import logging
+import time
+from collections import defaultdict
+from dataclasses import dataclass, field
+from itertools import islice
+from typing import Callable, Dict, Iterable, Iterator, List, NamedTuple, Optional, TextIO, Tuple
+
+from django.db import transaction
+
+from . import bulk
+from .models import Order
+from .patterns.state import machine
+
+logger = logging.getLogger(__name__)
+
+FORMATS = ('csv', 'jsonl')
+DEFAULT_CHUNK_SIZE = 5000
+
+ORDER_STATUSES = frozenset(status for status, _ in Order.STATUS_CHOICES)
+# Статуси перевізника, що відповідають статусам замовлення
+CARRIER_STATUSES = {
+    'accepted': 'shipped',
+    'picked_up': 'shipped',
+    'in_transit': 'shipped',
+    'out_for_delivery': 'shipped',
+}
+
+NOT_FOUND = "замовлення не знайдено"
+
+
+class ManifestLine(NamedTuple):
+    """Розібраний рядок маніфесту; ``line`` — номер рядка у файлі."""
+    line: int
+    order_id: Optional[int]
+    tracking_number: Optional[str]
+    status: Optional[str]
+
+
+ProblemHandler = Callable[[int, dict, str], None]
+
+
+@dataclass
+class IngestReport:
+    """Підсумок завантаження маніфесту."""
+    lines: int = 0
+    matched: int = 0
+    tracking_updated: int = 0
+    # Кількість переходів у кожен статус, зокрема проміжних
+    transitions: Dict[str, int] = field(default_factory=dict)
+    unmatched: int = 0
+    invalid: int = 0
+    rejected: int = 0
+    seconds: float = 0.0
+
+
+# ===== ЧИТАННЯ =====
+
+def detect_format(path: str) -> str:
+    """Формат за розширенням: ``*.jsonl`` / ``*.jsonl.gz`` або CSV."""
+    name = path[:-3] if path.endswith('.gz') else path
+    return 'jsonl' if name.endswith(('.jsonl', '.ndjson')) else 'csv'
+
+
+def open_manifest(path: str) -> TextIO:
+    """Відкриває маніфест як текст; ``*.gz`` розпаковується на льоту."""
+    if path.endswith('.gz'):
+        return io.TextIOWrapper(gzip.open(path, 'rb'), encoding='utf-8', newline='')
+    return open(path, encoding='utf-8', newline='')
+
+
+def read_records(f: TextIO, fmt: str) -> Iterator[Tuple[int, Optional[dict]]]:
+    """
+    Пари (номер рядка, запис). Порожні рядки JSONL пропускаються,
+    некоректний JSON дає запис None.
+    """
+    if fmt not in FORMATS:
+        raise ValueError(f"Невідомий формат: {fmt}")
+    if fmt == 'csv':
+        # Рядок 1 — заголовок
+        yield from enumerate(csv.DictReader(f), start=2)
+        return
+    for number, text in enumerate(f, start=1):
+        if not text.strip():
+            continue
+        try:
+            record = json.loads(text)
+        except ValueError:
+            record = None
+        yield number, record if isinstance(record, dict) else None
+
+
+def parse_record(number: int, record: Optional[dict]) -> ManifestLine:
+    """Перевіряє й нормалізує запис. ValueError — з причиною відхилення."""
+    if record is None:
+        raise ValueError("некоректний рядок")
+    order_id = record.get('order_id')
+    if order_id in (None, ''):
+        order_id = None
+    else:
+        try:
+            order_id = int(order_id)
+        except (TypeError, ValueError):
+            raise ValueError(f"некоректний order_id: {order_id}")
+    tracking_number = str(record.get('tracking_number') or '').strip() or None
+    if tracking_number and len(tracking_number) > Order._meta.get_field('tracking_number').max_length:
+        raise ValueError("задовгий tracking_number")
+    if order_id is None and tracking_number is None:
+        raise ValueError("немає order_id і tracking_number")
+    status = str(record.get('status') or '').strip().lower() or None
+    if status is not None:
+        status = CARRIER_STATUSES.get(status, status)
+        if status not in ORDER_STATUSES:
+            raise ValueError(f"невідомий статус: {status}")
+    return ManifestLine(number, order_id, tracking_number, status)
+
+
+# ===== ЗАСТОСУВАННЯ =====
+
+def ingest(records: Iterable[Tuple[int, Optional[dict]]], chunk_size: int = DEFAULT_CHUNK_SIZE,
+           on_problem: Optional[ProblemHandler] = None) -> IngestReport:
+    """
+    Застосовує записи маніфесту пачками; кожна пачка — окрема транзакція.
+    ``on_problem(номер рядка, запис, причина)`` викликається для кожного
+    незіставленого, некоректного або відхиленого рядка.
+    """
+    started = time.perf_counter()
+    report = IngestReport()
+    records = iter(records)
+    while True:
+        chunk = list(islice(records, chunk_size))
+        if not chunk:
+            break
+        report.lines += len(chunk)
+        raw = dict(chunk)
+        lines = []
+        for number, record in chunk:
+            try:
+                lines.append(parse_record(number, record))
+            except ValueError as e:
+                report.invalid += 1
+                _problem(on_problem, number, record, str(e))
+        with transaction.atomic():
+            _apply_chunk(lines, raw, report, on_problem)
+    report.seconds = time.perf_counter() - started
+    logger.info(
+        "Ingested %d manifest lines: %d matched, %d tracking numbers, %s, %d unmatched, %d invalid, %d rejected",
+        report.lines, report.matched, report.tracking_updated, report.transitions,
+        report.unmatched, report.invalid, report.rejected,
+    )
+    return report
+
+
+def _problem(on_problem: Optional[ProblemHandler], number: int, record, reason: str) -> None:
+    if on_problem is not None:
+        on_problem(number, record, reason)
+
+
+def _apply_chunk(lines: List[ManifestLine], raw: dict, report: IngestReport,
+                 on_problem: Optional[ProblemHandler]) -> None:
+    # Поточний стан замовлень пачки: pk -> [status, tracking_number]
+    by_id = [line.order_id for line in lines if line.order_id is not None]
+    orders = {
+        pk: [status, number]
+        for pk, status, number in Order.objects.filter(pk__in=by_id)
+        .values_list('pk', 'status', 'tracking_number')
+    } if by_id else {}
+    # Рядки без відомого order_id шукаються за номером відстеження
+    by_number = [line.tracking_number for line in lines if line.order_id not in orders and line.tracking_number]
+    numbers = defaultdict(list)
+    if by_number:
+        for pk, status, number in (Order.objects.filter(tracking_number__in=by_number)
+                                   .values_list('pk', 'status', 'tracking_number')):
+            orders.setdefault(pk, [status, number])
+            numbers[number].append(pk)
+
+    # Пізніший рядок про те саме замовлення перекриває попередній
+    tracking: Dict[int, str] = {}
+    targets: Dict[int, Tuple[int, str]] = {}
+    for line in lines:
+        matched = [line.order_id] if line.order_id in orders else numbers.get(line.tracking_number, ())
+        if not matched:
+            report.unmatched += 1
+            _problem(on_problem, line.line, raw[line.line], NOT_FOUND)
+            continue
+        report.matched += 1
+        for pk in matched:
+            if line.order_id is not None and line.tracking_number:
+                tracking[pk] = line.tracking_number
+            if line.status:
+                targets[pk] = (line.line, line.status)
+
+    changed = [(pk, number) for pk, number in tracking.items() if orders[pk][1] != number]
+    bulk.update_rows(Order, ['tracking_number'], changed)
+    report.tracking_updated += len(changed)
+
+    # Ланцюжки переходів розкладаються по кроках: крок i усіх замовлень — до кроку i + 1
+    steps: List[Dict[str, List[int]]] = []
+    for pk, (number, target) in targets.items():
+        path = machine.path(orders[pk][0], target)
+        if path is None:
+            report.rejected += 1
+            _problem(on_problem, number, raw[number], f"перехід {orders[pk][0]} → {target} заборонено")
+            continue
+        for i, status in enumerate(path):
+            if i == len(steps):
+                steps.append(defaultdict(list))
+            steps[i][status].append(pk)
+    for step in steps:
+        for status, order_ids in step.items():
+            result = machine.bulk_transition(Order.objects.filter(pk__in=order_ids), status)
+            report.transitions[status] = report.transitions.get(status, 0) + result.total
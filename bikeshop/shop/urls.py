@@ -10,9 +10,33 @@ urlpatterns = [
     # Сторінка зі списком велосипедів, з можливістю фільтрації по типу через GET-параметр
     path('bikes/', views.bike_list, name='bike_list'),
 
+    # Підказки пошуку під час набору (JSON, з індексу в пам'яті без запитів до БД)
+    path('bikes/autocomplete/', views.bike_autocomplete, name='bike_autocomplete'),
+
+    # JSON-каталог для мобільного застосунку: розріджені поля, пошук за ids, курсор
+    path('api/bikes/', views.api_bikes, name='api_bikes'),
+
     # Створення замовлення для конкретного велосипеда
     path('bikes/<int:bike_id>/order/', views.create_order, name='create_order'),
 
+    # Список бажань: стежити за ціною й наявністю велосипеда (JSON)
+    path('bikes/<int:bike_id>/watch/', views.bike_watch, name='bike_watch'),
+
+    # Пакетне додавання велосипедів у кошик (JSON)
+    path('cart/items/', views.cart_items, name='cart_items'),
+
     # Сторінка успішного замовлення
     path('orders/<int:order_id>/success/', views.order_success, name='order_success'),
+
+    # Звіт продажів для персоналу (читає лише зведені таблиці)
+    path('reports/sales/', views.sales_report, name='sales_report'),
+
+    # Потокове вивантаження замовлень для бухгалтерії (CSV/JSONL, gzip)
+    path('reports/orders/export/', views.export_orders, name='export_orders'),
+
+    # Історія ціни велосипеда (JSON для графіків і аудиту)
+    path('reports/bikes/<int:bike_id>/prices/', views.bike_price_history, name='bike_price_history'),
+
+    # Метрики черги хешування паролів для персоналу
+    path('reports/auth-pool/', views.auth_pool_stats, name='auth_pool_stats'),
 ]
@@ -1,55 +1,190 @@
-from django.shortcuts import render, redirect, get_object_or_404
-from django.contrib.auth import login
+import json
+
+from asgiref.sync import sync_to_async
+from django.shortcuts import render, redirect, get_object_or_404, resolve_url
+from django.contrib.auth import alogin, get_user_model
 from django.contrib.auth.decorators import login_required
+from django.contrib.admin.views.decorators import staff_member_required
 from django.contrib import messages
 from django.db import transaction
 from django.core.mail import send_mail
 from django.conf import settings
 from django.urls import reverse
-
-from typing import Optional
-
-from .models import Bike, BikeType, Order, OrderItem
+from django.db.models import Sum
+from django.http import Http404, HttpResponse, HttpResponseBadRequest, JsonResponse, StreamingHttpResponse
+from django.utils import timezone
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.dateparse import parse_date, parse_datetime
+from django.utils.http import url_has_allowed_host_and_scheme
+from django.views.decorators.http import require_POST, require_safe
+
+from datetime import datetime, time, timedelta
+
+from .models import Bike, Order, OrderItem, SalesRollup, WatchlistEntry
+from .archive import user_orders
+from . import export
+from .cart import CartError, cart_payload, parse_lines, update_cart
+from . import autocomplete, catalog_api
+from .catalog import get_bike_types, get_catalog_version
+from .catalog_snapshot import get_snapshot
 from .forms import SignUpForm
+from .hashing import HashingPoolBusy, ahash_password, averify_password
+from . import hashing
+from .patterns.decorator import login_required_ajax
 from .patterns.strategy import PaymentContext, CreditCardPayment, PayPalPayment, CashOnDeliveryPayment
-from .patterns.decorator import apply_discount
+from .pricing import apply_pricing
+from . import price_history, recommendations, tracing
 
 
 def home(request):
     return render(request, 'shop/home.html')
 
 
-def register(request):
+def hashing_busy_response() -> HttpResponse:
+    """503 з Retry-After, коли черга хешування паролів заповнена."""
+    response = HttpResponse("Сервер перевантажений, спробуйте за хвилину.", status=503,
+                            content_type='text/plain; charset=utf-8')
+    response['Retry-After'] = 5
+    return response
+
+
+async def register(request):
+    """Реєстрація: пароль хешується в пулі процесів (див. shop/hashing.py)."""
     if request.method == 'POST':
         form = SignUpForm(request.POST)
-        if form.is_valid():
-            user = form.save()
-            login(request, user)
+        # Перевірка форми звертається до БД (унікальність імені)
+        if await sync_to_async(form.is_valid)():
+            user = form.instance
+            try:
+                user.password = await ahash_password(form.cleaned_data['password1'])
+            except HashingPoolBusy:
+                return hashing_busy_response()
+            await user.asave()
+            await alogin(request, user)
             messages.success(request, 'Реєстрація успішна!')
             return redirect('shop:bike_list')
     else:
         form = SignUpForm()
-    return render(request, 'registration/register.html', {'form': form})
+    return await sync_to_async(render)(request, 'registration/register.html', {'form': form})
+
+
+def _login_redirect_url(request, next_url: str) -> str:
+    if next_url and url_has_allowed_host_and_scheme(next_url, {request.get_host()}, request.is_secure()):
+        return next_url
+    return resolve_url(settings.LOGIN_REDIRECT_URL)
+
+
+async def login_view(request):
+    """
+    Вхід з перевіркою пароля в пулі процесів. Повторює поведінку LoginView
+    з ModelBackend: неактивні користувачі не входять, для невідомого імені
+    пароль однаково хешується (вирівнювання часу), застарілий хеш оновлюється.
+    """
+    next_url = request.POST.get('next') or request.GET.get('next', '')
+    if (await request.auser()).is_authenticated:
+        return redirect(_login_redirect_url(request, next_url))
+
+    error = None
+    if request.method == 'POST':
+        user_model = get_user_model()
+        username = request.POST.get(user_model.USERNAME_FIELD, '')
+        password = request.POST.get('password', '')
+        user = await user_model._default_manager.filter(**{user_model.USERNAME_FIELD: username}).afirst()
+        try:
+            if user is None:
+                await ahash_password(password)
+                valid, must_update = False, False
+            else:
+                valid, must_update = await averify_password(password, user.password)
+            if valid and user.is_active:
+                if must_update:
+                    user.password = await ahash_password(password)
+                    await user.asave(update_fields=['password'])
+                await alogin(request, user)
+                return redirect(_login_redirect_url(request, next_url))
+        except HashingPoolBusy:
+            return hashing_busy_response()
+        error = "Неправильне ім'я користувача або пароль."
+
+    return await sync_to_async(render)(
+        request, 'registration/login.html', {'error': error, 'next': next_url}, status=400 if error else 200
+    )
 
 
 @login_required
 def bike_list(request):
+    # Каталог читається зі спільного знімка (shop/catalog_snapshot.py) без запитів до БД
     bike_type_id = request.GET.get('type')
-    bikes = Bike.objects.filter(in_stock=True)
-    active_type: Optional[BikeType] = None
+    query = request.GET.get('q', '').strip()
+    snapshot = get_snapshot()
+    active_type = None
 
     if bike_type_id and bike_type_id != 'all':
-        active_type = get_object_or_404(BikeType, pk=bike_type_id)
-        bikes = bikes.filter(bike_type=active_type)
+        active_type = snapshot.bike_type(int(bike_type_id)) if bike_type_id.isdigit() else None
+        if active_type is None:
+            raise Http404("Тип велосипеда не знайдено")
 
-    bike_types = BikeType.objects.all()
     return render(request, 'shop/bike_list.html', {
-        'bikes': bikes,
-        'bike_types': bike_types,
-        'active_type': active_type
+        'bikes': snapshot.bikes(in_stock=True, bike_type_id=active_type and active_type.id, query=query),
+        'bike_types': get_bike_types(),
+        'active_type': active_type,
+        'query': query,
+        'catalog_version': snapshot.version,
     })
 
 
+@require_safe
+def bike_autocomplete(request):
+    """
+    Підказки під час набору: ``?q=<префікс>&limit=N`` — назви велосипедів у
+    наявності й типів з індексу процесу (shop/autocomplete.py), без запитів до БД.
+    """
+    query = request.GET.get('q', '')[:autocomplete.MAX_QUERY_LENGTH]
+    limit = request.GET.get('limit', '')
+    limit = min(int(limit), autocomplete.MAX_LIMIT) if catalog_api.is_number(limit) and int(limit) else autocomplete.DEFAULT_LIMIT
+    return JsonResponse({'query': query, 'results': autocomplete.search(query, limit)})
+
+
+@require_safe
+def api_bikes(request):
+    """
+    JSON-каталог для мобільного застосунку (див. shop/catalog_api.py):
+    ``?ids=1,2`` — пакетний пошук, інакше сторінка з ``type``, ``in_stock``,
+    ``limit`` і ``cursor``; ``fields`` — набір полів.
+    """
+    # ETag — версія каталогу зі спільного кешу: повторний запит отримує 304 без читання знімка
+    etag = f'"catalog-{get_catalog_version()}"'
+    response = get_conditional_response(request, etag=etag)
+    if response is None:
+        params = request.GET
+        try:
+            fields = catalog_api.parse_fields(params.get('fields'))
+            snapshot = get_snapshot()
+            if 'ids' in params:
+                payload = catalog_api.bike_batch(snapshot, catalog_api.parse_ids(params['ids']), fields)
+            else:
+                bike_type = params.get('type')
+                if bike_type and not catalog_api.is_number(bike_type):
+                    raise catalog_api.CatalogApiError("type — id типу велосипеда")
+                if params.get('in_stock', '1') not in catalog_api.STOCK_FILTERS:
+                    raise catalog_api.CatalogApiError("in_stock — 1, 0 або all")
+                payload = catalog_api.bike_page(
+                    snapshot, fields,
+                    after=catalog_api.decode_cursor(params.get('cursor')),
+                    limit=catalog_api.parse_limit(params.get('limit')),
+                    in_stock=catalog_api.STOCK_FILTERS[params.get('in_stock', '1')],
+                    bike_type_id=int(bike_type) if bike_type else None,
+                )
+        except catalog_api.CatalogApiError as e:
+            return JsonResponse({'error': str(e)}, status=400)
+        response = HttpResponse(catalog_api.render(payload), content_type='application/json')
+        # Знімок міг бути новішим за версію, прочитану для If-None-Match
+        etag = f'"catalog-{snapshot.version}"'
+    response['ETag'] = etag
+    patch_cache_control(response, public=True, no_cache=True)
+    return response
+
+
 def get_payment_strategy(payment_method: str):
     if payment_method == 'paypal':
         return PayPalPayment()
@@ -60,10 +195,9 @@ def get_payment_strategy(payment_method: str):
 
 @login_required
 @transaction.atomic
-@apply_discount(10)
 def create_order(request, bike_id):
     bike = get_object_or_404(Bike, pk=bike_id)
-    order = request.user.order_set.filter(completed=False).last()
+    order = request.user.order_set.open_carts().last()
 
     if not order:
         # Створюємо нове замовлення та одразу додаємо товар
@@ -74,10 +208,15 @@ def create_order(request, bike_id):
         item_exists = order.items.filter(bike=bike).exists()
         if not item_exists:
             OrderItem.objects.create(order=order, bike=bike, quantity=1, price=bike.price)
+        # Кошик активний: прибиральник покинутих кошиків його не чіпатиме
+        Order.objects.filter(pk=order.pk).touch()
 
-    # 🔧 Оновлюємо суму ДО виклику декоратора (він буде після return wrapper(...))
-    order.total = sum(item.get_total() for item in order.items.all())
-    order.save()
+    # Знижки за правилами; у БД пишеться лише те, що змінилося
+    with tracing.start_span('pricing.apply', {'order.id': order.pk}) as span:
+        pricing = apply_pricing(order)
+        span.set_attribute('pricing.changed', pricing.changed)
+    if pricing.changed and pricing.discount:
+        messages.info(request, f"Застосовано знижку {pricing.percent}% (-{pricing.discount} грн)")
 
     if request.method == 'POST':
         action = request.POST.get('action')
@@ -96,7 +235,51 @@ def create_order(request, bike_id):
 
         return redirect('shop:create_order', bike_id=bike.id)
 
-    return render(request, 'shop/create_order.html', {'bike': bike, 'order': order})
+    return render(request, 'shop/create_order.html', {
+        'bike': bike,
+        'order': order,
+        'recommendations': recommendations.for_bike(bike.pk),
+    })
+
+@login_required_ajax
+@require_POST
+def cart_items(request):
+    """
+    Пакетне оновлення кошика: ``{"items": [{"bike_id": 1, "quantity": 2}, ...],
+    "mode": "add"|"set"}``. Повертає стан кошика з перерахованими знижками.
+    """
+    try:
+        payload = json.loads(request.body)
+        mode = payload.get('mode', 'add')
+        update = update_cart(request.user, parse_lines(payload.get('items'), mode), mode)
+    except (ValueError, AttributeError) as e:
+        # JSONDecodeError і CartError — підкласи ValueError; AttributeError — тіло не є об'єктом
+        details = e.details if isinstance(e, CartError) else {}
+        message = str(e) if isinstance(e, CartError) else "Некоректний JSON"
+        return JsonResponse({'error': message, **details}, status=400)
+
+    return JsonResponse({
+        **cart_payload(update.order),
+        'created': update.created,
+        'updated': update.updated,
+        'removed': update.removed,
+    })
+
+
+@login_required_ajax
+@require_POST
+def bike_watch(request, bike_id):
+    """Додає велосипед у список бажань (``action=watch``) або прибирає (``action=unwatch``)."""
+    action = request.POST.get('action', 'watch')
+    if action not in ('watch', 'unwatch'):
+        return JsonResponse({'error': "action — watch або unwatch"}, status=400)
+    bike = get_object_or_404(Bike.objects.only('pk'), pk=bike_id)
+    if action == 'watch':
+        WatchlistEntry.objects.get_or_create(user=request.user, bike=bike)
+    else:
+        WatchlistEntry.objects.filter(user=request.user, bike=bike).delete()
+    return JsonResponse({'bike_id': bike.pk, 'watching': action == 'watch'})
+
 
 @login_required
 def order_success(request, order_id):
@@ -113,6 +296,7 @@ def order_success(request, order_id):
     return render(request, 'shop/order_success.html', {'order': order})
 
 
+@tracing.traced('orders.send_confirmation')
 def send_order_confirmation_email(order: Order) -> None:
     subject = f'Підтвердження замовлення #{order.id}'
     message = (
@@ -131,6 +315,7 @@ def send_order_confirmation_email(order: Order) -> None:
     )
 
 
+@tracing.traced('orders.update_inventory')
 def update_inventory(order: Order) -> None:
     for item in order.items.select_related('bike').all():
         bike = item.bike
@@ -138,6 +323,7 @@ def update_inventory(order: Order) -> None:
         bike.save()
 
 
+@tracing.traced('orders.notify_admin')
 def notify_admin(order: Order) -> None:
     # TODO: Додати логіку повідомлення адміну (email/telegram/slack)
     pass
@@ -145,11 +331,97 @@ def notify_admin(order: Order) -> None:
 
 @login_required
 def profile(request):
-    orders = Order.objects.filter(user=request.user).order_by('-created_at')
+    orders = user_orders(request.user)
     return render(request, 'shop/profile.html', {'orders': orders})
 
 
 @login_required
 def order_history(request):
-    orders = Order.objects.filter(user=request.user).order_by('-created_at')
+    orders = user_orders(request.user)
     return render(request, 'shop/order_history.html', {'orders': orders})
+
+
+@staff_member_required
+def sales_report(request):
+    """Звіт продажів, що читає лише зведену таблицю SalesRollup."""
+    until = parse_date(request.GET.get('until', '')) or timezone.localdate()
+    since = parse_date(request.GET.get('since', '')) or until - timedelta(days=30)
+
+    rollups = SalesRollup.objects.filter(day__range=(since, until))
+    totals = dict(units=Sum('units'), gross=Sum('gross'), discount=Sum('discount'), net=Sum('net'))
+    status_labels = dict(Order.STATUS_CHOICES)
+    by_type = [
+        dict(row, status_label=status_labels.get(row['status'], row['status']))
+        for row in rollups.values('bike_type__name', 'status').annotate(**totals).order_by('bike_type__name', 'status')
+    ]
+    by_day = rollups.values('day').annotate(**totals).order_by('day')
+
+    return render(request, 'shop/sales_report.html', {
+        'since': since,
+        'until': until,
+        'by_type': by_type,
+        'by_day': by_day,
+        'summary': rollups.aggregate(**totals),
+    })
+
+
+@staff_member_required
+def export_orders(request):
+    """
+    Потокове вивантаження позицій замовлень: ``?format=csv|jsonl``,
+    ``since``/``until`` (YYYY-MM-DD), ``status`` (можна кілька), ``gzip=1``.
+    """
+    fmt = request.GET.get('format', 'csv')
+    compress = request.GET.get('gzip') == '1'
+    try:
+        filters = export.ExportFilter(
+            since=parse_date(request.GET.get('since', '')),
+            until=parse_date(request.GET.get('until', '')),
+            statuses=tuple(request.GET.getlist('status')),
+        )
+        content = export.stream(export.export_rows(filters), fmt, gzip=compress)
+    except ValueError as e:
+        return HttpResponseBadRequest(str(e))
+
+    response = StreamingHttpResponse(
+        content, content_type='application/gzip' if compress else export.CONTENT_TYPES[fmt],
+    )
+    response['Content-Disposition'] = f'attachment; filename="{export.filename(fmt, compress)}"'
+    return response
+
+
+@staff_member_required
+def bike_price_history(request, bike_id):
+    """
+    Історія ціни велосипеда: ``?at=<дата-час>`` — ціна в момент,
+    інакше зміни за ``since``/``until`` (YYYY-MM-DD, за замовчуванням 90 днів).
+    """
+    bike = get_object_or_404(Bike.objects.only('pk', 'price'), pk=bike_id)
+    if 'at' in request.GET:
+        at = parse_datetime(request.GET['at'])
+        if at is None:
+            return HttpResponseBadRequest("Некоректний параметр at")
+        if timezone.is_naive(at):
+            at = timezone.make_aware(at)
+        price = price_history.price_at(bike.pk, at)
+        return JsonResponse({'bike_id': bike.pk, 'at': at.isoformat(),
+                             'price': str(price) if price is not None else None})
+
+    until = parse_date(request.GET.get('until', '')) or timezone.localdate()
+    since = parse_date(request.GET.get('since', '')) or until - timedelta(days=90)
+    changes = price_history.price_changes(
+        bike.pk,
+        timezone.make_aware(datetime.combine(since, time.min)),
+        timezone.make_aware(datetime.combine(until, time.max)),
+    )
+    return JsonResponse({
+        'bike_id': bike.pk,
+        'current': str(bike.price),
+        'changes': [{'at': point.at.isoformat(), 'price': str(point.price)} for point in changes],
+    })
+
+
+@staff_member_required
+def auth_pool_stats(request):
+    """Лічильники черги хешування паролів цього процесу."""
+    return JsonResponse(hashing.stats())
@@ -0,0 +1,87 @@
+"""
+Прогрів воркера під час старту, щоб перші запити після деплою
+не платили за імпорт модулів, компіляцію шаблонів і заповнення кешів.
+
+``ShopConfig.ready`` викликає :func:`warm_worker`, якщо ввімкнено
+``SHOP_WARMUP_ON_READY`` (його встановлюють точки входу wsgi.py/asgi.py;
+команди manage.py і тести працюють без прогріву).
+"""
+
+import logging
+import time
+import warnings
+from pathlib import Path
+from typing import Dict
+
+from django.db import DatabaseError, connections
+from django.template.loader import get_template
+from django.urls import get_resolver
+
+logger = logging.getLogger(__name__)
+
+TEMPLATES_DIR = Path(__file__).resolve().parent / 'templates'
+
+
+def warm_templates() -> int:
+    """
+    Компілює всі шаблони з shop/templates; кешований завантажувач Django
+    зберігає їх до перезапуску процесу. Повертає кількість шаблонів.
+    """
+    started = time.perf_counter()
+    names = sorted(path.relative_to(TEMPLATES_DIR).as_posix() for path in TEMPLATES_DIR.rglob('*.html'))
+    for name in names:
+        get_template(name)
+    logger.info("Warmed %d templates in %.1f ms", len(names), (time.perf_counter() - started) * 1000)
+    return len(names)
+
+
+def warm_url_resolvers() -> int:
+    """
+    Імпортує URLconf (а з ним представлення та їхні залежності) і будує
+    словники reverse(). Повертає кількість іменованих маршрутів.
+    """
+    resolver = get_resolver()
+    return len(resolver.reverse_dict) + sum(
+        len(namespace_resolver.reverse_dict) for _, namespace_resolver in resolver.namespace_dict.values()
+    )
+
+
+def warm_catalog() -> bool:
+    """
+    Заповнює версію каталогу і список типів велосипедів, відкриває знімок
+    каталогу і будує з нього індекс підказок пошуку. Повертає False, якщо
+    база ще недоступна (наприклад, до застосування міграцій).
+
+    Наприкінці з'єднання з БД закриваються: з ``gunicorn --preload`` прогрів
+    іде в майстер-процесі, і відкрите з'єднання успадкували б усі воркери
+    після fork. Кожен воркер відкриває власне з першим запитом.
+    """
+    from .autocomplete import get_index
+    from .catalog import get_bike_types
+    from .catalog_snapshot import get_snapshot
+
+    try:
+        # Прогрів свідомо звертається до БД з ready(): він вмикається лише
+        # в точках входу сервера, де база вже налаштована
+        with warnings.catch_warnings():
+            warnings.filterwarnings('ignore', message='Accessing the database during app initialization')
+            get_bike_types()
+            get_snapshot()
+            get_index()
+    except DatabaseError:
+        logger.warning("Catalog warmup skipped: database is not ready", exc_info=True)
+        return False
+    finally:
+        connections.close_all()
+    return True
+
+
+def warm_worker() -> Dict[str, float]:
+    """Виконує всі кроки прогріву і повертає тривалість кожного в мілісекундах."""
+    timings = {}
+    for name, step in (('urls', warm_url_resolvers), ('templates', warm_templates), ('catalog', warm_catalog)):
+        started = time.perf_counter()
+        step()
+        timings[name] = (time.perf_counter() - started) * 1000
+    logger.info("Worker warmup: %s", ', '.join(f"{name} {ms:.1f} ms" for name, ms in timings.items()))
+    return timings
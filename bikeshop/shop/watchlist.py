@@ -0,0 +1,264 @@
+"""
+Список бажань: листи про здешевлення і повернення велосипедів у наявність.
+
+Зміни потрапляють у чергу ``WatchlistEvent``:
+
+* збереження ``Bike`` (сигнал) — зміна ціни з ціною до неї або перехід
+  ``in_stock`` з False у True;
+* ``reprice_catalog`` — один INSERT … SELECT на пачку до запису нових цін
+  (:func:`record_price_changes`);
+* дія адмінки «Повернути в наявність» — один INSERT … SELECT перед масовим
+  UPDATE (:func:`record_restocks`).
+
+Події додаються лише для велосипедів, за якими хтось стежить.
+
+:func:`notify_watchers` (команда notify_watchers, з cron) розбирає чергу:
+
+1. події до поточного максимального id згортаються по велосипедах —
+   найстаріша ціна «до» і чи було повернення в наявність;
+2. поточні ціни й наявність цих велосипедів читаються пачками: лист
+   отримують лише ті, хто стежить за велосипедом, що зараз у наявності й
+   дешевший, ніж до змін, або повернувся в наявність;
+3. записи списку бажань для велосипедів з черги обходяться в порядку
+   (user, bike) сторінками — на сторінку один запит по унікальному
+   індексу (user, bike), тож записи користувача йдуть поспіль;
+4. на користувача — один лист-дайджест з усіма його велосипедами; листи
+   надсилаються пачками ``send_messages`` через одне поштове з'єднання.
+
+Пам'ять обмежена розміром каталогу (згорнуті події) плюс сторінка записів
+і пачка листів, незалежно від кількості тих, хто стежить. Опрацьовані події
+видаляються наприкінці; якщо розсилка перервалася, наступний запуск
+повторить її (доставка «щонайменше один раз»).
+"""
+
+import logging
+import time
+from dataclasses import dataclass
+from decimal import Decimal
+from typing import Dict, Iterable, Iterator, List, Optional
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.db import connection, transaction
+from django.db.models import F, Max, Q, QuerySet
+from django.utils import timezone
+
+from .models import Bike, WatchlistEntry, WatchlistEvent
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PAGE_SIZE = 5000
+DEFAULT_MAIL_BATCH = 100
+SUBJECT = "Зміни у вашому списку бажань"
+
+
+@dataclass
+class BikeChange:
+    """Згорнуті події велосипеда і його поточний стан."""
+    name: str
+    price: Decimal
+    old_price: Optional[Decimal] = None
+    restocked: bool = False
+
+    @property
+    def price_dropped(self) -> bool:
+        return self.old_price is not None and self.price < self.old_price
+
+    def describe(self) -> str:
+        if self.price_dropped:
+            line = f"{self.name}: {self.old_price:.2f} → {self.price:.2f} грн"
+            return line + " (знову в наявності)" if self.restocked else line
+        return f"{self.name}: знову в наявності, {self.price:.2f} грн"
+
+
+@dataclass
+class NotifyReport:
+    """Підсумок розсилки."""
+    events: int = 0
+    bikes: int = 0
+    entries: int = 0
+    digests: int = 0
+    without_email: int = 0
+    sent: int = 0
+    batches: int = 0
+    seconds: float = 0.0
+
+
+# ===== ЗАПИС ПОДІЙ =====
+
+def record_change(bike: Bike, old_price: Optional[Decimal], was_in_stock: Optional[bool]) -> None:
+    """
+    Додає в чергу події збереженого велосипеда (виклик із сигналу post_save),
+    якщо за ним хтось стежить.
+    """
+    events = []
+    if old_price is not None and bike.price != old_price:
+        events.append(WatchlistEvent(bike_id=bike.pk, kind=WatchlistEvent.PRICE, old_price=old_price))
+    if bike.in_stock and was_in_stock is False:
+        events.append(WatchlistEvent(bike_id=bike.pk, kind=WatchlistEvent.RESTOCK))
+    if events and WatchlistEntry.objects.filter(bike_id=bike.pk).exists():
+        WatchlistEvent.objects.bulk_create(events)
+
+
+def _queue_watched(kind: str, bikes_sql: str, bikes_params: Iterable, at=None) -> None:
+    """
+    Один INSERT … SELECT подій ``kind`` для велосипедів з ``bikes_sql``
+    (список id чи підзапит), за якими хтось стежить. Для зміни ціни
+    зберігається поточна (ще стара) ціна.
+    """
+    qn = connection.ops.quote_name
+    bike, event, entry = Bike._meta, WatchlistEvent._meta, WatchlistEntry._meta
+    sql = (
+        'INSERT INTO {event} ({bike_id}, {kind}, {old_price}, {created_at}) '
+        'SELECT b.{pk}, %s, {price}, %s FROM {bike} b WHERE b.{pk} IN ({bikes}) '
+        'AND EXISTS (SELECT 1 FROM {entry} w WHERE w.{entry_bike} = b.{pk})'
+    ).format(
+        event=qn(event.db_table), bike_id=qn(event.get_field('bike').column), kind=qn(event.get_field('kind').column),
+        old_price=qn(event.get_field('old_price').column), created_at=qn(event.get_field('created_at').column),
+        pk=qn(bike.pk.column), bike=qn(bike.db_table), bikes=bikes_sql,
+        price='b.' + qn(bike.get_field('price').column) if kind == WatchlistEvent.PRICE else 'NULL',
+        entry=qn(entry.db_table), entry_bike=qn(entry.get_field('bike').column),
+    )
+    created_at = WatchlistEvent._meta.get_field('created_at').get_db_prep_save(at or timezone.now(), connection)
+    with connection.cursor() as cursor:
+        cursor.execute(sql, [kind, created_at, *bikes_params])
+
+
+def record_price_changes(bike_ids: List[int], at=None) -> None:
+    """
+    Додає в чергу поточні (ще старі) ціни велосипедів пачки, за якими хтось
+    стежить. Викликається перед записом нових цін, одним запитом.
+    """
+    if bike_ids:
+        _queue_watched(WatchlistEvent.PRICE, ', '.join(['%s'] * len(bike_ids)), bike_ids, at)
+
+
+def record_restocks(bikes: QuerySet, at=None) -> None:
+    """
+    Додає в чергу повернення в наявність велосипедів вибірки, що зараз не в
+    наявності і за якими хтось стежить. Викликається в транзакції перед
+    масовим UPDATE ``in_stock`` (без сигналів), одним запитом.
+    """
+    sql, params = bikes.filter(in_stock=False).values('pk').query.sql_with_params()
+    _queue_watched(WatchlistEvent.RESTOCK, sql, params, at)
+
+
+# ===== РОЗСИЛКА =====
+
+def collect_changes(max_event_id: int, chunk_size: int = DEFAULT_PAGE_SIZE) -> Dict[int, BikeChange]:
+    """Велосипеди з черги, про які варто повідомити, з їхнім поточним станом."""
+    old_prices: Dict[int, Decimal] = {}
+    restocked = set()
+    events = (WatchlistEvent.objects.filter(pk__lte=max_event_id).order_by('pk')
+              .values_list('bike_id', 'kind', 'old_price'))
+    for bike_id, kind, old_price in events.iterator(chunk_size=chunk_size):
+        if kind == WatchlistEvent.RESTOCK:
+            restocked.add(bike_id)
+        else:
+            # Найстаріша ціна: кілька змін між запусками порівнюються з тією, яку бачили користувачі
+            old_prices.setdefault(bike_id, old_price)
+
+    changes = {}
+    bike_ids = sorted(old_prices.keys() | restocked)
+    for start in range(0, len(bike_ids), chunk_size):
+        bikes = Bike.objects.filter(pk__in=bike_ids[start:start + chunk_size], in_stock=True)
+        for bike_id, name, price in bikes.values_list('pk', 'name', 'price'):
+            change = BikeChange(name=name, price=price, old_price=old_prices.get(bike_id),
+                                restocked=bike_id in restocked)
+            if change.price_dropped or change.restocked:
+                changes[bike_id] = change
+    return changes
+
+
+def iter_watchers(max_event_id: int, page_size: int = DEFAULT_PAGE_SIZE) -> Iterator[List[tuple]]:
+    """
+    Сторінки ``(user_id, email, bike_id)`` записів списку бажань для
+    велосипедів з черги в порядку (user, bike).
+    """
+    event_bikes = WatchlistEvent.objects.filter(pk__lte=max_event_id).values('bike_id')
+    # «bike_id + 0» не дає планувальнику взяти індекс за bike: інакше він вибирає всі
+    # записи велосипедів з черги і сортує їх заново на кожній сторінці. Так сторінка —
+    # прохід унікальним індексом (user, bike) від позиції курсора до page_size збігів
+    entries = (WatchlistEntry.objects.annotate(watched_bike_id=F('bike_id') + 0)
+               .filter(watched_bike_id__in=event_bikes).order_by('user_id', 'bike_id'))
+    position = None
+    while True:
+        page = entries
+        if position is not None:
+            user_id, bike_id = position
+            # Окреме user_id >= … задає початок проходу індексом; з одним лише OR SQLite сканує його спочатку
+            page = page.filter(Q(user_id__gte=user_id),
+                               Q(user_id__gt=user_id) | Q(user_id=user_id, bike_id__gt=bike_id))
+        rows = list(page.values_list('user_id', 'user__email', 'bike_id')[:page_size])
+        if not rows:
+            return
+        position = rows[-1][0], rows[-1][2]
+        yield rows
+
+
+def build_digest(email: str, changes: Iterable[BikeChange]) -> EmailMessage:
+    lines = "\n".join(f"• {change.describe()}" for change in changes)
+    body = (
+        "Вітаємо!\n\n"
+        "Велосипеди з вашого списку бажань подешевшали або знову в наявності:\n\n"
+        f"{lines}\n\n"
+        "Встигніть замовити!"
+    )
+    return EmailMessage(SUBJECT, body, settings.DEFAULT_FROM_EMAIL, [email])
+
+
+def notify_watchers(page_size: int = DEFAULT_PAGE_SIZE, mail_batch: int = DEFAULT_MAIL_BATCH,
+                    mail_connection=None) -> NotifyReport:
+    """Розсилає дайджести за чергою подій і очищає опрацьовану частину черги."""
+    started = time.perf_counter()
+    report = NotifyReport()
+    max_event_id = WatchlistEvent.objects.aggregate(last=Max('pk'))['last']
+    if max_event_id is None:
+        return report
+    report.events = WatchlistEvent.objects.filter(pk__lte=max_event_id).count()
+    changes = collect_changes(max_event_id, page_size)
+    report.bikes = len(changes)
+
+    if changes:
+        mail_connection = mail_connection or get_connection()
+        batch: List[EmailMessage] = []
+
+        def flush():
+            report.sent += mail_connection.send_messages(batch) or 0
+            report.batches += 1
+            batch.clear()
+
+        def finish_user(email, bikes):
+            if not bikes:
+                return
+            if not email:
+                report.without_email += 1
+                return
+            batch.append(build_digest(email, bikes))
+            report.digests += 1
+            if len(batch) >= mail_batch:
+                flush()
+
+        # Одне з'єднання на всю розсилку: open/close — один раз, а не на кожну пачку
+        with mail_connection:
+            user_id, email, bikes = None, None, []
+            for rows in iter_watchers(max_event_id, page_size):
+                for row_user_id, row_email, bike_id in rows:
+                    change = changes.get(bike_id)
+                    if change is None:
+                        continue
+                    report.entries += 1
+                    if row_user_id != user_id:
+                        finish_user(email, bikes)
+                        user_id, email, bikes = row_user_id, row_email, []
+                    bikes.append(change)
+            finish_user(email, bikes)
+            if batch:
+                flush()
+
+    with transaction.atomic():
+        WatchlistEvent.objects.filter(pk__lte=max_event_id).delete()
+    report.seconds = time.perf_counter() - started
+    logger.info("Sent %d watchlist digests (%d bikes, %d entries, %d events) in %.2fs",
+                report.sent, report.bikes, report.entries, report.events, report.seconds)
+    return report